@@ -0,0 +1,264 @@
+"""
+Health Probes for DETROIT Robot System
+======================================
+A small diagnostics framework of registered health probes.
+
+Each probe is a plain function registered with @register_probe. run_probes()
+starts every requested probe on its own daemon thread, in-process, and waits
+for each one only until its deadline, so a full health check is bounded by
+the slowest deadline (well under a second) instead of the sum of all checks.
+Results are cached for a per-probe TTL; a probe that finishes after its
+deadline still refreshes the cache for the next caller.
+
+A probe receives its deadline in seconds and returns a dict with at least
+"ok" (bool) and "detail" (str). The framework adds "status", "latency_ms",
+"cached" and "checked_at".
+"""
+
+import os
+import json
+import time
+import socket
+import logging
+import threading
+import importlib.util
+
+logger = logging.getLogger('DETROIT.DIAGNOSTICS')
+
+DEFAULT_DEADLINE = 0.5   # seconds a single probe may take before it is reported as timed out
+DEFAULT_TTL = 30.0       # seconds a probe result stays valid in the cache
+OVERALL_DEADLINE = 0.9   # upper bound for a whole run_probes() call
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(PROJECT_ROOT, 'BRAIN', 'config.json')
+SOUNDS_DIR = os.path.join(PROJECT_ROOT, 'VOCAL_CORDS', 'SOUNDS')
+
+
+class Probe:
+    """A registered health probe"""
+
+    def __init__(self, name, func, deadline=DEFAULT_DEADLINE, ttl=DEFAULT_TTL):
+        self.name = name
+        self.func = func
+        self.deadline = deadline
+        self.ttl = ttl
+
+
+class _ProbeRun:
+    """One in-flight execution of a probe"""
+
+    def __init__(self, probe):
+        self.probe = probe
+        self.done = threading.Event()
+        self.result = None
+        self.thread = threading.Thread(target=self._run, name=f"probe-{probe.name}")
+        self.thread.daemon = True  # A hung probe must never block interpreter exit
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            outcome = self.probe.func(self.probe.deadline) or {}
+            ok = bool(outcome.get("ok"))
+            result = dict(outcome)
+            result["status"] = "operational" if ok else "offline"
+        except Exception as e:
+            result = {"ok": False, "status": "error", "detail": str(e)}
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        result["checked_at"] = time.time()
+        result["cached"] = False
+        self.result = result
+        with _lock:
+            _cache[self.probe.name] = (time.monotonic() + self.probe.ttl, result)
+            if _in_flight.get(self.probe.name) is self:
+                del _in_flight[self.probe.name]
+        self.done.set()
+
+
+_probes = {}
+_cache = {}
+_in_flight = {}
+_lock = threading.Lock()
+
+
+def register_probe(name, deadline=DEFAULT_DEADLINE, ttl=DEFAULT_TTL):
+    """Decorator registering a health probe function under a name"""
+    def decorator(func):
+        _probes[name] = Probe(name, func, deadline, ttl)
+        return func
+    return decorator
+
+
+def list_probes():
+    """Get the names of all registered probes"""
+    return list(_probes)
+
+
+def clear_cache(name=None):
+    """Forget cached results, for one probe or all of them"""
+    with _lock:
+        if name is None:
+            _cache.clear()
+        else:
+            _cache.pop(name, None)
+
+
+def run_probes(names=None, use_cache=True, deadline=OVERALL_DEADLINE):
+    """Run probes concurrently and return {name: result}
+
+    Args:
+        names (list, optional): Probes to run, all registered probes if None
+        use_cache (bool): Return cached results that are still within their TTL
+        deadline (float): Overall time budget in seconds for the whole call
+
+    Returns:
+        dict: Result per probe. Probes that miss their deadline are reported
+        with status "timeout" and keep running in the background.
+    """
+    started = time.monotonic()
+    names = list(_probes) if names is None else list(names)
+    results = {}
+    runs = {}
+
+    with _lock:
+        for name in names:
+            probe = _probes.get(name)
+            if probe is None:
+                results[name] = {"ok": False, "status": "unknown", "detail": "No such probe"}
+                continue
+            cached = _cache.get(name)
+            if use_cache and cached and cached[0] > time.monotonic():
+                results[name] = dict(cached[1], cached=True)
+                continue
+            # Reuse an execution that is still running from an earlier call
+            run = _in_flight.get(name)
+            if run is None:
+                run = _in_flight[name] = _ProbeRun(probe)
+                run.thread.start()
+            runs[name] = run
+
+    for name, run in runs.items():
+        remaining = min(started + run.probe.deadline, started + deadline) - time.monotonic()
+        if run.done.wait(max(0.0, remaining)):
+            results[name] = run.result
+        else:
+            logger.warning(f"Health probe '{name}' missed its {run.probe.deadline}s deadline")
+            results[name] = {
+                "ok": False,
+                "status": "timeout",
+                "detail": f"No answer within {run.probe.deadline}s",
+                "latency_ms": round((time.monotonic() - started) * 1000, 1),
+                "cached": False,
+            }
+
+    return {name: results[name] for name in names}
+
+
+def _load_config():
+    """Read the robot configuration without importing the functions module"""
+    try:
+        with open(CONFIG_PATH, 'r') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+# Registered probes
+@register_probe("microphone")
+def probe_microphone(deadline):
+    """Enumerate PyAudio input devices in-process"""
+    import pyaudio
+
+    p = pyaudio.PyAudio()
+    try:
+        inputs = []
+        for i in range(p.get_device_count()):
+            try:
+                info = p.get_device_info_by_index(i)
+                if info.get('maxInputChannels', 0) > 0:
+                    inputs.append(f"{i}: {info.get('name', f'Device {i}')}")
+            except Exception:
+                pass
+    finally:
+        p.terminate()
+    return {
+        "ok": bool(inputs),
+        "detail": f"{len(inputs)} input device(s) found" if inputs else "No input devices found",
+        "devices": inputs,
+    }
+
+
+@register_probe("mixer")
+def probe_mixer(deadline):
+    """Check that the pygame mixer is initialized and the sound files exist"""
+    if importlib.util.find_spec('pygame') is None:
+        return {"ok": False, "detail": "pygame is not installed"}
+    from pygame import mixer
+
+    missing = []
+    if os.path.isdir(SOUNDS_DIR):
+        for sound in ("bankai.mp3", "no_like_rain.mp3", "nakime_biwa_sound.mp3"):
+            if not os.path.exists(os.path.join(SOUNDS_DIR, sound)):
+                missing.append(sound)
+    init = mixer.get_init()
+    if not init:
+        return {"ok": False, "detail": "Mixer not initialized", "missing_sounds": missing}
+    frequency, size, channels = init
+    return {
+        "ok": not missing,
+        "detail": f"{frequency} Hz, {channels} channel(s)" + (f", missing {missing}" if missing else ""),
+        "missing_sounds": missing,
+    }
+
+
+# The "tts" probe is registered by functions.py: the engine lives on its speech
+# thread, and a probe here would create a second pyttsx3 engine
+
+
+@register_probe("recognizer", ttl=60.0)
+def probe_recognizer(deadline):
+    """Check that SpeechRecognition is installed and the Google endpoint is reachable"""
+    if importlib.util.find_spec('speech_recognition') is None:
+        return {"ok": False, "detail": "SpeechRecognition is not installed"}
+    start = time.perf_counter()
+    with socket.create_connection(("www.google.com", 443), timeout=deadline):
+        pass
+    return {"ok": True, "detail": f"Recognition service reachable in {(time.perf_counter() - start) * 1000:.0f} ms"}
+
+
+@register_probe("serial")
+def probe_serial(deadline):
+    """Check that the configured robot serial port is present"""
+    if importlib.util.find_spec('serial') is None:
+        return {"ok": False, "detail": "pyserial is not installed"}
+    from serial.tools import list_ports
+
+    ports = [p.device for p in list_ports.comports()]
+    port = _load_config().get("serial", {}).get("port")
+    if not port:
+        return {"ok": False, "detail": f"No serial port configured ({len(ports)} available)", "ports": ports}
+    present = port in ports or os.path.exists(port)
+    return {"ok": present, "detail": f"{port} {'present' if present else 'not found'}", "ports": ports}
+
+
+@register_probe("camera")
+def probe_camera(deadline):
+    """Check that the ESP32-CAM stream answers with a multipart stream"""
+    from urllib.parse import urlsplit
+    import http.client
+
+    url = _load_config().get("camera", {}).get("stream_url")
+    if not url:
+        return {"ok": False, "detail": "No camera stream URL configured"}
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=deadline)
+    try:
+        connection.request("GET", parts.path or "/")
+        response = connection.getresponse()
+        content_type = response.getheader("Content-Type", "")
+    finally:
+        connection.close()
+    ok = response.status == 200 and content_type.startswith("multipart/x-mixed-replace")
+    return {"ok": ok, "detail": f"HTTP {response.status}, {content_type or 'no content type'}"}
+
+
+__all__ = ['register_probe', 'run_probes', 'list_probes', 'clear_cache', 'Probe']
@@ -20,6 +20,24 @@ import tempfile
 from pathlib import Path
 import random
 
+import threading
+import queue
+
+# BRAIN's own modules, the legs and the ear's stop lane are imported flat, the
+# way the LEGS and EYES modules import each other, so each is loaded once
+# whatever the working directory
+BRAIN_DIR = os.path.dirname(os.path.abspath(__file__))
+for _module_dir in (BRAIN_DIR, os.path.join(os.path.dirname(BRAIN_DIR), 'LEGS'),
+                    os.path.join(os.path.dirname(BRAIN_DIR), 'EARS')):
+    if _module_dir not in sys.path:
+        sys.path.append(_module_dir)
+
+import telemetry
+from diagnostics import run_probes, register_probe
+from supervisor import Supervisor
+from startup import StagedStartup
+from shutdown import ShutdownOrchestrator, SHUTDOWN_DEADLINE, HARD_STOP_CHILD_TIMEOUT
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -67,6 +85,30 @@ def load_config():
                     "rate": 175,
                     "volume": 1.0,
                     "voice_id": 0
+                },
+                "serial": {
+                    "port": None,
+                    "baud": 9600,
+                    "fleet": {}
+                },
+                "camera": {
+                    "stream_url": None,
+                    "relay_port": None,
+                    "detector": "hog",
+                    "detector_workers": 2,
+                    "face_embedder": "face_recognition",
+                    "motion_fps": 8,
+                    "follow_target": "blob",
+                    "follow_colour": [230, 120, 30],
+                    "follow_speed": 10,
+                    "recorder_mb": 64,
+                    "recorder_clips": 50,
+                    "recorder_clips_mb": 512
+                },
+                "navigation": {
+                    "robot_radius": 0.15,
+                    "camera_height": 0.12,
+                    "speed_level": 9
                 }
             }
             save_config(default_config)
@@ -95,24 +137,46 @@ parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
+from motion_bridge import MotionBridge, parse_motion_command
+from estop import EStopListener, ESTOP_PORT
+
 # Create our own sound manager instance instead of importing it
 class SoundManager:
-    """A simplified sound manager that handles basic sound playback"""
+    """A simplified sound manager that handles basic sound playback
+    
+    pygame and its mixer are only loaded by initialize(), which startup()
+    runs in parallel with the other subsystems (or the first play_sound()).
+    """
     def __init__(self):
-        try:
-            from pygame import mixer
-            mixer.init(buffer=512)
-            self.mixer = mixer
-            self.sounds_dir = os.path.join(parent_dir, 'VOCAL_CORDS', 'SOUNDS')
-            self.initialized = True
-            logger.info("Sound system initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize sound system: {e}")
-            self.initialized = False
+        self.mixer = None
+        self.sounds_dir = os.path.join(parent_dir, 'VOCAL_CORDS', 'SOUNDS')
+        self.initialized = False
+        self._init_lock = threading.Lock()
+        self._init_attempted = False
+    
+    def initialize(self):
+        """Initialize the pygame mixer once"""
+        with self._init_lock:
+            if self._init_attempted:
+                return self.initialized
+            self._init_attempted = True
+            try:
+                from pygame import mixer
+                mixer.init(buffer=512)
+                self.mixer = mixer
+                self.initialized = True
+                logger.info("Sound system initialized successfully")
+            except Exception as e:
+                logger.error(f"Failed to initialize sound system: {e}")
+                self.initialized = False
+            return self.initialized
     
-    def play_sound(self, sound_name, wait_for_completion=False):
-        """Play a sound file from the sounds directory"""
-        if not self.initialized:
+    def play_sound(self, sound_name, wait_for_completion=False, max_wait=2.0):
+        """Play a sound file from the sounds directory
+        
+        With wait_for_completion, block until the sound ends or max_wait seconds pass.
+        """
+        if not self.initialize():
             return False
             
         sound_path = os.path.join(self.sounds_dir, sound_name)
@@ -126,8 +190,9 @@ class SoundManager:
             self.mixer.music.play()
             
             if wait_for_completion:
-                import time
-                time.sleep(2)  # Wait a moment for the sound to play
+                deadline = time.monotonic() + max_wait
+                while self.mixer.music.get_busy() and time.monotonic() < deadline:
+                    time.sleep(0.05)
                 
             return True
         except Exception as e:
@@ -138,9 +203,9 @@ class SoundManager:
         """Play the system startup sound"""
         return self.play_sound("bankai.mp3")
         
-    def play_shutdown_sound(self):
+    def play_shutdown_sound(self, max_wait=2.0):
         """Play the system shutdown sound"""
-        return self.play_sound("no_like_rain.mp3", wait_for_completion=True)
+        return self.play_sound("no_like_rain.mp3", wait_for_completion=True, max_wait=max_wait)
         
     def play_wake_word_sound(self):
         """Play sound when wake word is detected"""
@@ -207,39 +272,113 @@ EMERGENCY_MESSAGES = [
 ]
 
 # System Control Functions
-def startup():
-    """Initialize the robot system"""
+# Timings of the most recent startup(), used by the cold-start benchmark in startup.py
+last_startup = None
+
+def startup(with_ear=False, greet=True):
+    """Initialize the robot system
+    
+    Args:
+        with_ear (bool): Also bring up the speech recognition process in parallel
+        greet (bool): Speak a startup message once the subsystems are up
+    """
+    global last_startup, _shutdown_done
     logger.info("Starting DETROIT robot system")
+    _shutdown_done = False
+    stages = last_startup = StagedStartup()
+    
+    config = stages.run_stage("config", load_config)
+    if not config:
+        logger.error("Failed to initialize system")
+        return False
+    
+    # Independent subsystems come up in parallel; the ear needs the longest,
+    # so it is started first and keeps warming up while we greet the user
+    tasks = {}
+    if with_ear:
+        tasks["ear"] = start_ear
+    tasks.update({
+        "mixer": sound_manager.initialize,
+        "tts": init_speech_engine,
+        "memory": memory.load,
+        "health": run_probes,
+        "telemetry": telemetry.start_sampler,  # RSS/CPU history for long sessions
+    })
+    stages.run_parallel("subsystems", tasks)
     
     # Play startup sound
-    sound_manager.play_startup_sound()
+    stages.run_stage("startup_sound", sound_manager.play_startup_sound)
     
-    config = load_config()
-    if config:
-        logger.info(f"Initialized {config['robot_model']} #{config['robot_serial']} - {config['robot_name']}")
+    logger.info(f"Initialized {config['robot_model']} #{config['robot_serial']} - {config['robot_name']}")
+    if greet:
         # Choose a random startup message
         startup_message = random.choice(STARTUP_MESSAGES)
-        run_speech(startup_message)
-        return True
-    else:
-        logger.error("Failed to initialize system")
-        return False
+        stages.run_stage("greeting", lambda: run_speech(startup_message))
+    logger.info(f"Startup phases:\n{stages.report()}")
+    return True
+
+
+# Set once the system has been shut down, so terminate() followed by shutdown() runs only once
+_shutdown_done = False
+
+def _flush_logs():
+    """Flush every logging handler to disk"""
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+    return True
 
+def _run_shutdown(farewell_message, emergency=False, hard_stop=False, deadline=SHUTDOWN_DEADLINE):
+    """Tear down all subsystems in parallel under a global deadline"""
+    global _shutdown_done
+    if _shutdown_done:
+        return True
+    _shutdown_done = True
+    
+    orchestrator = ShutdownOrchestrator()
+    # Save any pending data first
+    orchestrator.add_persist_step("memory", lambda remaining: memory.flush())
+    orchestrator.add_persist_step("state", lambda remaining: save_state(emergency=emergency))
+    orchestrator.add_persist_step("telemetry", lambda remaining: telemetry.stop())
+    orchestrator.add_persist_step("logs", lambda remaining: _flush_logs())
+    
+    child_timeout = HARD_STOP_CHILD_TIMEOUT if hard_stop else 2.0
+    orchestrator.add_teardown_step(
+        "children",
+        lambda remaining: _supervisor.shutdown(timeout=min(child_timeout, remaining)) if _supervisor else True
+    )
+    orchestrator.add_teardown_step(
+        "legs",
+        lambda remaining: close_motion_bridge()
+    )
+    orchestrator.add_teardown_step(
+        "vision",
+        lambda remaining: close_vision()
+    )
+    if hard_stop:
+        orchestrator.add_teardown_step("sound", lambda remaining: sound_manager.cleanup())
+    
+    def farewell(remaining):
+        # Speak, then play the shutdown sound with whatever time is left
+        end = time.monotonic() + remaining
+        run_speech(farewell_message, timeout=remaining)
+        sound_manager.play_shutdown_sound(max_wait=max(0.0, end - time.monotonic()))
+        sound_manager.cleanup()
+        return True
+    orchestrator.add_farewell_step("farewell", farewell)
+    
+    return orchestrator.run(deadline=deadline, hard_stop=hard_stop)
 
-def shutdown():
-    """Properly shutdown the robot system"""
+def shutdown(hard_stop=False, deadline=SHUTDOWN_DEADLINE):
+    """Properly shutdown the robot system
+    
+    Args:
+        hard_stop (bool): Skip the farewell and kill children almost immediately (< 300 ms)
+        deadline (float): Seconds the whole shutdown may take, farewells included
+    """
     logger.info("Shutting down DETROIT robot system")
     # Choose a random shutdown message
     shutdown_message = random.choice(SHUTDOWN_MESSAGES)
-    run_speech(shutdown_message)
-    
-    # Play shutdown sound and wait for it to finish
-    sound_manager.play_shutdown_sound()
-    
-    # Save any pending data
-    save_state()
-    time.sleep(1)
-    return True
+    return _run_shutdown(shutdown_message, hard_stop=hard_stop, deadline=deadline)
 
 def restart():
     """Restart the robot system"""
@@ -250,14 +389,13 @@ def restart():
     startup()
     return True
 
-def terminate(exit_code=0):
+def terminate(exit_code=0, hard_stop=False):
     """Terminate the robot system with an exit code"""
     logger.info(f"Terminating system with exit code {exit_code}")
     # Choose a random emergency message
     emergency_message = random.choice(EMERGENCY_MESSAGES)
-    run_speech(emergency_message)
-    # Save critical data
-    save_state(emergency=True)
+    # Save critical data and tear everything down under the shutdown deadline
+    _run_shutdown(emergency_message, emergency=True, hard_stop=hard_stop)
     sys.exit(exit_code)
 
 def save_state(emergency=False):
@@ -280,41 +418,103 @@ def save_state(emergency=False):
         return False
 
 # Speech and Communication Functions
-def run_speech(text):
-    """Interface with the voice.py module to speak text"""
-    try:
-        # Simple direct approach - just use pyttsx3 directly in this function
-        # This avoids import issues by using the TTS engine directly
-        import pyttsx3
-        
-        # Use a global engine to prevent "run loop already started" errors
-        global speech_engine
-        if 'speech_engine' not in globals():
-            speech_engine = pyttsx3.init()
+class SpeechWorker:
+    """Owns the pyttsx3 engine on a dedicated thread
+    
+    Keeping every engine call on one thread avoids "run loop already started"
+    errors and COM apartment issues, and lets the (slow) engine creation run
+    in parallel with the rest of startup.
+    """
+    def __init__(self):
+        self.engine = None
+        self.available = False
+        self.ready = threading.Event()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+    
+    def start(self):
+        """Start the worker thread (idempotent)"""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="speech-worker")
+                self._thread.daemon = True
+                self._thread.start()
+        return self
+    
+    def _run(self):
+        try:
+            # Simple direct approach - just use pyttsx3 directly
+            # This avoids import issues by using the TTS engine directly
+            import pyttsx3
+            self.engine = pyttsx3.init()
             # Lower rate for better clarity
-            speech_engine.setProperty('rate', 150)
-            
-        print(f"Speaking: {text}")
-        # Set volume to 100%
-        speech_engine.setProperty('volume', 1.0)
-        speech_engine.say(text)
+            self.engine.setProperty('rate', 150)
+            self.available = True
+        except ImportError as e:
+            logger.error(f"Could not import pyttsx3. Text-to-speech unavailable. Error: {e}")
+        except Exception as e:
+            logger.error(f"Error initializing speech engine: {e}")
+        finally:
+            self.ready.set()
+        if not self.available:
+            return
         
-        try:
-            speech_engine.runAndWait()
-        except RuntimeError as re:
-            # Handle "run loop already started" error gracefully
-            logger.warning(f"Speech engine runtime issue: {re}")
-            print(f"DETROIT says: {text}")
-            
-        return True
-    except ImportError as e:
-        logger.error(f"Could not import pyttsx3. Text-to-speech unavailable. Error: {e}")
+        while True:
+            text, done = self._queue.get()
+            try:
+                # Set volume to 100%
+                self.engine.setProperty('volume', 1.0)
+                self.engine.say(text)
+                self.engine.runAndWait()
+            except RuntimeError as re:
+                # Handle "run loop already started" error gracefully
+                logger.warning(f"Speech engine runtime issue: {re}")
+                print(f"DETROIT says: {text}")
+            except Exception as e:
+                logger.error(f"Error in speech function: {e}")
+                print(f"DETROIT says: {text}")
+            finally:
+                done.set()
+    
+    def say(self, text):
+        """Queue text to be spoken and return an Event set once it has been said"""
+        done = threading.Event()
+        self._queue.put((text, done))
+        return done
+
+_speech_worker = SpeechWorker()
+
+def init_speech_engine():
+    """Create the TTS engine (on the speech thread) and wait until it is ready"""
+    _speech_worker.start().ready.wait()
+    return _speech_worker.available
+
+# The engine lives on the speech thread, so the health probe reports on it
+# instead of creating a second engine from the probe thread
+@register_probe("tts", deadline=0.8)
+def probe_speech_engine(deadline):
+    """Check that the speech worker's TTS engine came up"""
+    if not _speech_worker.start().ready.wait(deadline):
+        return {"ok": False, "detail": "Speech engine still initializing"}
+    if not _speech_worker.available:
+        return {"ok": False, "detail": "Text-to-speech unavailable"}
+    return {"ok": True, "detail": "Speech engine ready"}
+
+def run_speech(text, timeout=None):
+    """Speak text with the TTS engine, blocking until it has been said
+    
+    With a timeout, stop waiting after that many seconds (speech may continue).
+    """
+    if not init_speech_engine():
         print(f"DETROIT says: {text}")
         return False
-    except Exception as e:
-        logger.error(f"Error in speech function: {e}")
-        print(f"DETROIT says: {text}")
+    
+    print(f"Speaking: {text}")
+    if not _speech_worker.say(text).wait(timeout):
+        logger.warning(f"Speech did not finish within {timeout}s")
         return False
+    return True
 
 def listen():
     """Interface with the ear.py module to recognize speech"""
@@ -398,17 +598,285 @@ def analyze_emotion(text):
     }
 
 # Environmental Interaction
+FACE_INDEX_PATH = os.path.join(os.path.dirname(__file__), 'faces.{embedder}.fidx')  # one index per embedder
+RECORDER_RING = os.path.join(os.path.dirname(__file__), 'recordings', 'camera.ring')
+GREET_INTERVAL = 600  # seconds before the same person is greeted again
+DETECTION_MAX_AGE = 1.0  # seconds after which detections no longer describe the view
+UNKNOWN_CLIP_REPEATS = 3  # unmatched commands within UNKNOWN_CLIP_WINDOW that save a clip
+UNKNOWN_CLIP_WINDOW = 60  # seconds
+UNKNOWN_CLIP_COOLDOWN = 600  # seconds between unknown command clips
+
+_camera = None
+_detector = None
+_face_recognizer = None
+_face_recognizer_error = None
+_motion_detector = None
+_recorder = None
+_greeted = {}
+_unknown_commands = []   # monotonic times of the latest unmatched commands
+_vision_lock = threading.Lock()
+_attention_busy = threading.Lock()   # held while an attention event is being looked at
+
+def get_camera():
+    """Get the shared camera stream relay, connecting to camera.stream_url on first use"""
+    global _camera
+    with _vision_lock:
+        if _camera is None:
+            camera_config = (load_config() or {}).get("camera", {})
+            url = camera_config.get("stream_url")
+            if not url:
+                return None
+            eyes_dir = os.path.join(parent_dir, 'EYES')
+            if eyes_dir not in sys.path:
+                sys.path.append(eyes_dir)
+            from relay import StreamRelay
+            # Everything that needs frames shares this one connection to the camera
+            relay_port = camera_config.get("relay_port")
+            _camera = StreamRelay(url, "127.0.0.1" if relay_port else None, relay_port or 0).start()
+        return _camera
+
+def get_detector():
+    """Get the object detection pipeline, started on the camera stream on first use"""
+    global _detector
+    camera = get_camera()
+    if camera is None:
+        return None
+    with _vision_lock:
+        if _detector is None:
+            from detection import DetectionPipeline
+            camera_config = (load_config() or {}).get("camera", {})
+            _detector = DetectionPipeline(camera.client, camera_config.get("detector", "hog"),
+                                          camera_config.get("detector_workers", 2)).start()
+        return _detector
+
+def _on_face_seen(name, similarity):
+    """A known face was recognised: refresh the person's last_seen"""
+    logger.info(f"Recognised {name} ({similarity:.2f})")
+    memory.remember_person(name, {})
+
+def get_face_recognizer():
+    """Get the face recognizer over the enrolled faces, or None without a usable embedder
+
+    The embedder and its options (model files for "sface") come from the
+    camera config. An embedder without a face detector is refused, since it
+    would report a face in an empty room.
+    """
+    global _face_recognizer, _face_recognizer_error
+    with _vision_lock:
+        if _face_recognizer is None and _face_recognizer_error is None:
+            eyes_dir = os.path.join(parent_dir, 'EYES')
+            if eyes_dir not in sys.path:
+                sys.path.append(eyes_dir)
+            from faces import FaceIndex, FaceRecognizer, make_embedder
+            camera_config = (load_config() or {}).get("camera", {})
+            name = camera_config.get("face_embedder", "face_recognition")
+            options = dict(camera_config.get("face_embedder_options") or {})
+            for key in ("model", "detector_model"):
+                # Model files may be given relative to the BRAIN
+                path = os.path.join(BRAIN_DIR, str(options.get(key, "")))
+                if options.get(key) and os.path.isfile(path):
+                    options[key] = path
+            try:
+                embedder = make_embedder(name, options, fallback=None)
+                if embedder is None:
+                    _face_recognizer_error = f"face embedder '{name}' is not installed"
+                elif not embedder.detects:
+                    _face_recognizer_error = f"face embedder '{name}' has no face detector"
+                else:
+                    index = FaceIndex(FACE_INDEX_PATH.format(embedder=embedder.name), embedder.dim, embedder.name)
+                    _face_recognizer = FaceRecognizer(index, embedder, on_seen=_on_face_seen)
+            except Exception as e:
+                _face_recognizer_error = f"face embedder '{name}' failed to load: {e}"
+            if _face_recognizer_error:
+                logger.warning(f"Face recognition is off: {_face_recognizer_error}")
+        return _face_recognizer
+
+def _latest_camera_image():
+    """RGB pixels of the newest camera frame, or None"""
+    camera = get_camera()
+    if camera is None:
+        logger.info("No camera stream is configured")
+        return None
+    frame = camera.client.latest()
+    if frame is None:
+        return None
+    from decode import get_pixels
+    with frame:
+        return get_pixels(frame)
+
+def get_motion_detector():
+    """Get the motion attention trigger, watching the camera at camera.motion_fps
+
+    Attention events are handled by _on_attention as they happen.
+    """
+    global _motion_detector
+    camera = get_camera()
+    if camera is None:
+        return None
+    with _vision_lock:
+        if _motion_detector is None:
+            from motion import MotionDetector
+            fps = (load_config() or {}).get("camera", {}).get("motion_fps", 8)
+            _motion_detector = MotionDetector(camera.subscribe(fps, "motion"), on_attention=_on_attention).start()
+        return _motion_detector
+
+def get_recorder():
+    """Get the flight recorder, keeping every camera frame in recordings/camera.ring"""
+    global _recorder
+    camera = get_camera()
+    if camera is None:
+        return None
+    with _vision_lock:
+        if _recorder is None:
+            camera_config = (load_config() or {}).get("camera", {})
+            size_mb = camera_config.get("recorder_mb", 64)
+            if not size_mb:
+                return None
+            from recorder import RingRecorder, MAX_CLIPS, MAX_CLIPS_MB
+            _recorder = RingRecorder(RECORDER_RING, size_mb, max_clips=camera_config.get("recorder_clips", MAX_CLIPS),
+                                     max_clips_mb=camera_config.get("recorder_clips_mb", MAX_CLIPS_MB))
+            if _recorder.recovered:
+                # The last session died with the ring open: keep what led up to it
+                clip = _recorder.snapshot(reason="crash")
+                if clip:
+                    logger.warning(f"Saved the recording before the last crash to {clip}")
+            _recorder.watch_crashes().start(camera.subscribe(None, "recorder"))
+        return _recorder
+
+def record_event(kind, details=None, save_clip=False, cooldown=None):
+    """Note a robot event in the flight recorder, and save a clip around it if asked"""
+    if _recorder is None:
+        return None
+    if save_clip:
+        if cooldown is None:
+            return _recorder.trigger(kind, details)
+        return _recorder.trigger(kind, details, cooldown=cooldown)
+    return _recorder.write_event(kind, details)
+
+def _unknown_command_clip():
+    """Note an unmatched command; True when UNKNOWN_CLIP_REPEATS came within UNKNOWN_CLIP_WINDOW"""
+    now = time.monotonic()
+    _unknown_commands.append(now)
+    del _unknown_commands[:-UNKNOWN_CLIP_REPEATS]
+    if len(_unknown_commands) == UNKNOWN_CLIP_REPEATS and now - _unknown_commands[0] <= UNKNOWN_CLIP_WINDOW:
+        _unknown_commands.clear()
+        return True
+    return False
+
+def save_recording(seconds=30):
+    """Save the last seconds of camera recording as a clip; returns the spoken response"""
+    recorder = get_recorder()
+    if recorder is None:
+        return "I am not recording the camera."
+    clip = recorder.snapshot(seconds, "requested")
+    if clip is None:
+        return "There is nothing recorded yet."
+    log_interaction("recording_saved", clip)
+    return f"Saved the last {seconds} seconds."
+
+def handle_attention(event):
+    """Someone moved in view: look for a known face and greet them
+
+    Returns the greeting to speak, or None.
+    """
+    logger.info(f"Attention: {event['fraction']:.0%} of the view moving")
+    face = recognize_face()
+    person = face.get("person")
+    if not person:
+        return None
+    now = time.monotonic()
+    if now - _greeted.get(person, -GREET_INTERVAL) < GREET_INTERVAL:
+        return None
+    _greeted[person] = now
+    return f"Hello {person}."
+
+def _attend(event):
+    """Handle one attention event on the attention thread"""
+    try:
+        greeting = handle_attention(event)
+        if greeting:
+            run_speech(greeting)
+    except Exception as e:
+        logger.error(f"Attention handling failed: {e}")
+    finally:
+        _attention_busy.release()
+
+def _on_attention(event):
+    """Motion detector callback: recognise and greet on a thread of its own
+
+    Decoding and embedding a frame takes longer than a motion frame, so it
+    runs neither on the detector's thread nor on the voice loop. Events that
+    arrive while one is still being handled are dropped.
+    """
+    if not _attention_busy.acquire(blocking=False):
+        return
+    threading.Thread(target=_attend, args=(event,), name="attention", daemon=True).start()
+
+def close_vision():
+    """Stop the detection workers and the camera stream"""
+    global _camera, _detector, _face_recognizer, _face_recognizer_error, _motion_detector, _recorder
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+    if _motion_detector is not None:
+        _motion_detector.stop()
+        _motion_detector = None
+    if _detector is not None:
+        _detector.stop()
+        _detector = None
+    if _face_recognizer is not None:
+        _face_recognizer.index.close()
+        _face_recognizer = None
+    _face_recognizer_error = None
+    if _camera is not None:
+        _camera.stop()
+        _camera = None
+    return True
+
 def detect_objects():
-    """Placeholder for computer vision object detection"""
-    # This would interface with a vision system
-    logger.info("Object detection requested (placeholder)")
-    return ["placeholder object 1", "placeholder object 2"]
+    """Labels of the objects in the latest processed camera frame
+
+    Returns the newest finished detections straight away; inference runs in
+    the background, so this never waits for the detector. Detections of a
+    frame older than DETECTION_MAX_AGE (a stalled stream or detector) are
+    not reported.
+    """
+    pipeline = get_detector()
+    if pipeline is None:
+        logger.info("Object detection requested but no camera stream is configured")
+        return []
+    result = pipeline.latest()
+    if result is None:
+        return []
+    age = time.monotonic() - result["timestamp"]
+    if age > DETECTION_MAX_AGE:
+        logger.info(f"Latest detections are {age:.1f}s old; not reporting them")
+        return []
+    return [detection["label"] for detection in result["detections"]]
 
 def recognize_face():
-    """Placeholder for facial recognition"""
-    # This would interface with a facial recognition system
-    logger.info("Face recognition requested (placeholder)")
-    return {"detected": False, "person": None, "confidence": 0}
+    """Recognise the most confident face in the current camera view
+
+    A match refreshes the person's last_seen in memory (at most once a minute).
+    """
+    recognizer = get_face_recognizer()
+    image = _latest_camera_image() if recognizer is not None else None
+    if image is None:
+        return {"detected": False, "person": None, "confidence": 0}
+    faces = recognizer.recognize(image)
+    if not faces:
+        return {"detected": False, "person": None, "confidence": 0}
+    best = max(faces, key=lambda face: (face["person"] is not None, face["confidence"]))
+    return {"detected": True, "person": best["person"], "confidence": best["confidence"]}
+
+def enroll_face(name):
+    """Remember the face currently in view as `name`"""
+    recognizer = get_face_recognizer()
+    image = _latest_camera_image() if recognizer is not None else None
+    if image is None or not recognizer.enroll(name, image):
+        return False
+    recognizer.index.flush()
+    return memory.remember_person(name, {"face_enrolled": True})
 
 # Task Management
 def create_task(task_name, priority=3, due_time=None):
@@ -503,36 +971,40 @@ def get_tasks(include_completed=False):
         return []
 
 # System Health and Diagnostics
-def run_diagnostics():
-    """Run system diagnostics and return results"""
+# Health probes (see diagnostics.py) backing each subsystem
+SUBSYSTEM_PROBES = {
+    "audio": ["microphone", "mixer", "tts"],
+    "vision": ["camera"],
+    "movement": ["serial"],
+    "thinking": ["recognizer"],
+    "emotion": []
+}
+
+def run_diagnostics(use_cache=True):
+    """Run system diagnostics and return results
+    
+    All health probes run concurrently with per-probe deadlines, and results
+    are cached for a short TTL, so this returns in well under a second.
+    """
     logger.info("Running system diagnostics")
     
+    probes = run_probes(use_cache=use_cache)
+    systems = {}
+    for system_name, probe_names in SUBSYSTEM_PROBES.items():
+        checks = {name: probes[name] for name in probe_names if name in probes}
+        if not SYSTEM_STATUS[system_name]:
+            status = "offline"
+        elif all(check["ok"] for check in checks.values()):
+            status = "operational"
+        else:
+            status = "degraded"
+        systems[system_name] = {"status": status, "probes": checks}
+    
     diagnostics = {
         "timestamp": datetime.datetime.now().isoformat(),
-        "systems": {
-            "audio": {
-                "status": "operational" if SYSTEM_STATUS["audio"] else "offline",
-                "latency": random.uniform(0.01, 0.1)  # Placeholder value
-            },
-            "vision": {
-                "status": "operational" if SYSTEM_STATUS["vision"] else "offline",
-                "resolution": "1080p"  # Placeholder value
-            },
-            "movement": {
-                "status": "operational" if SYSTEM_STATUS["movement"] else "offline",
-                "response_time": random.uniform(0.05, 0.2)  # Placeholder value
-            },
-            "thinking": {
-                "status": "operational" if SYSTEM_STATUS["thinking"] else "offline",
-                "processing_speed": random.uniform(0.8, 1.2)  # Placeholder value
-            },
-            "emotion": {
-                "status": "operational" if SYSTEM_STATUS["emotion"] else "offline",
-                "stability": random.uniform(0.7, 1.0)  # Placeholder value
-            }
-        },
-        "memory_usage": random.uniform(30, 70),  # Placeholder percentage
-        "power_level": random.uniform(60, 100)  # Placeholder percentage
+        "systems": systems,
+        "memory_usage": get_memory_usage(),
+        "power_level": get_power_level()  # Placeholder percentage
     }
     
     return diagnostics
@@ -577,9 +1049,13 @@ def get_date():
     return datetime.datetime.now().strftime("%B %d, %Y")
 
 def get_memory_usage():
-    """Get the memory usage of the robot system"""
-    # Placeholder - in a real system this would use psutil or similar
-    return random.uniform(30, 70)  # Return a random percentage for now
+    """Get the memory usage of the robot system as a percentage"""
+    try:
+        import psutil
+        return psutil.virtual_memory().percent
+    except ImportError:
+        # Placeholder when psutil is not installed
+        return random.uniform(30, 70)
 
 def get_power_level():
     """Get the current power/battery level"""
@@ -652,7 +1128,23 @@ class Memory:
     
     def __init__(self):
         self.memory_path = os.path.join(os.path.dirname(__file__), 'memory.json')
-        self.memories = self._load_memories()
+        self._memories = None
+        self._load_lock = threading.Lock()
+        self._lock = threading.RLock()   # held while memories change or are saved (voice loop and attention thread)
+    
+    @property
+    def memories(self):
+        """Memories, loaded from file on first use"""
+        if self._memories is None:
+            self.load()
+        return self._memories
+    
+    def load(self):
+        """Load memories from file if they are not loaded yet"""
+        with self._load_lock:
+            if self._memories is None:
+                self._memories = self._load_memories()
+        return True
     
     def _load_memories(self):
         """Load memories from file"""
@@ -675,11 +1167,20 @@ class Memory:
                 "experiences": []
             }
     
+    def flush(self):
+        """Write memories to file if they were loaded"""
+        if self._memories is None:
+            return True
+        return self._save_memories()
+    
     def _save_memories(self):
-        """Save memories to file"""
+        """Save memories to file, replacing it in one step so a reader never sees half of it"""
+        temporary = self.memory_path + ".tmp"
         try:
-            with open(self.memory_path, 'w') as f:
-                json.dump(self.memories, f, indent=4)
+            with self._lock:
+                with open(temporary, 'w') as f:
+                    json.dump(self.memories, f, indent=4)
+                os.replace(temporary, self.memory_path)
             return True
         except Exception as e:
             logger.error(f"Error saving memories: {e}")
@@ -687,48 +1188,52 @@ class Memory:
     
     def remember_fact(self, key, value):
         """Remember a factual piece of information"""
-        self.memories["facts"][key] = {
-            "value": value,
-            "timestamp": datetime.datetime.now().isoformat()
-        }
-        return self._save_memories()
+        with self._lock:
+            self.memories["facts"][key] = {
+                "value": value,
+                "timestamp": datetime.datetime.now().isoformat()
+            }
+            return self._save_memories()
     
     def remember_person(self, name, details):
         """Remember information about a person"""
-        if name not in self.memories["people"]:
-            self.memories["people"][name] = {
-                "first_seen": datetime.datetime.now().isoformat(),
-                "last_seen": datetime.datetime.now().isoformat(),
-                "details": details
-            }
-        else:
-            self.memories["people"][name]["last_seen"] = datetime.datetime.now().isoformat()
-            self.memories["people"][name]["details"].update(details)
-        
-        return self._save_memories()
+        with self._lock:
+            if name not in self.memories["people"]:
+                self.memories["people"][name] = {
+                    "first_seen": datetime.datetime.now().isoformat(),
+                    "last_seen": datetime.datetime.now().isoformat(),
+                    "details": details
+                }
+            else:
+                self.memories["people"][name]["last_seen"] = datetime.datetime.now().isoformat()
+                self.memories["people"][name]["details"].update(details)
+            
+            return self._save_memories()
     
     def remember_preference(self, category, item, value):
         """Remember a preference"""
-        if category not in self.memories["preferences"]:
-            self.memories["preferences"][category] = {}
-        
-        self.memories["preferences"][category][item] = {
-            "value": value,
-            "timestamp": datetime.datetime.now().isoformat()
-        }
-        
-        return self._save_memories()
+        with self._lock:
+            if category not in self.memories["preferences"]:
+                self.memories["preferences"][category] = {}
+            
+            self.memories["preferences"][category][item] = {
+                "value": value,
+                "timestamp": datetime.datetime.now().isoformat()
+            }
+            
+            return self._save_memories()
     
     def add_experience(self, description, emotions=None, importance=3):
         """Add an experience to memory"""
-        self.memories["experiences"].append({
-            "timestamp": datetime.datetime.now().isoformat(),
-            "description": description,
-            "emotions": emotions or {},
-            "importance": importance
-        })
-        
-        return self._save_memories()
+        with self._lock:
+            self.memories["experiences"].append({
+                "timestamp": datetime.datetime.now().isoformat(),
+                "description": description,
+                "emotions": emotions or {},
+                "importance": importance
+            })
+            
+            return self._save_memories()
     
     def recall_fact(self, key):
         """Recall a fact from memory"""
@@ -747,15 +1252,16 @@ class Memory:
     def recall_experiences(self, count=5):
         """Recall the most recent experiences"""
         # Sort by timestamp in reverse order (newest first)
-        sorted_experiences = sorted(
-            self.memories["experiences"],
-            key=lambda x: x["timestamp"],
-            reverse=True
-        )
+        with self._lock:
+            sorted_experiences = sorted(
+                self.memories["experiences"],
+                key=lambda x: x["timestamp"],
+                reverse=True
+            )
         
         return sorted_experiences[:count]
 
-# Initialize memory system
+# Initialize memory system (memory.json is read on first use or by startup())
 memory = Memory()
 
 # Integrated speech and voice system
@@ -813,6 +1319,184 @@ def check_speech_results(comm_file):
         
     return None
 
+# Legs: serial link to the SPARK firmware, opened on the first motion command
+_motion_bridge = None
+_fleet = None
+_follower = None
+_navigator = None
+_estop_listener = None
+_motion_lock = threading.Lock()
+NAVIGATION_MAP = os.path.join(os.path.dirname(__file__), 'navigation_map.npz')
+
+def _on_emergency_stop(message):
+    """Halt the legs for a stop word heard by the ear (runs on the listener thread)"""
+    if _follower is not None:
+        _follower.stop(wait=False)
+    if _navigator is not None:
+        _navigator.stop(wait=False)
+    if _motion_bridge is not None:
+        _motion_bridge.emergency_stop()
+    if _fleet is not None:
+        _fleet.stop_all()
+    record_event("emergency_stop", {"message": message}, save_clip=True)
+
+def _start_estop_listener():
+    """Stop words from the ear skip the command queue and go straight to the serial links"""
+    global _estop_listener
+    if _estop_listener is None:
+        _estop_listener = EStopListener(_on_emergency_stop, port=ESTOP_PORT)
+        _estop_listener.start()
+
+def close_motion_bridge():
+    """Stop the emergency stop listener and close the serial links"""
+    global _motion_bridge, _fleet, _estop_listener, _navigator
+    stop_follow()
+    if _navigator is not None:
+        stop_navigation()
+        _navigator.grid.save(NAVIGATION_MAP)
+        _navigator = None
+    if _estop_listener is not None:
+        _estop_listener.stop()
+        _estop_listener = None
+    if _motion_bridge is not None:
+        _motion_bridge.close()
+        _motion_bridge = None
+    if _fleet is not None:
+        _fleet.close()
+        _fleet = None
+    return True
+
+def get_fleet():
+    """Get the fleet controller when several robots are configured (serial.fleet maps names to ports)"""
+    global _fleet
+    with _motion_lock:
+        if _fleet is None:
+            serial_config = (load_config() or {}).get("serial", {})
+            units = serial_config.get("fleet") or {}
+            if not units:
+                return None
+            from fleet import FleetController
+            fleet = FleetController(units, serial_config.get("baud", 9600))
+            fleet.start()
+            _fleet = fleet
+            _start_estop_listener()
+        return _fleet
+
+def get_motion_bridge():
+    """Get the motion bridge, connecting to the configured serial port on first use"""
+    global _motion_bridge
+    with _motion_lock:
+        if _motion_bridge is None:
+            serial_config = (load_config() or {}).get("serial", {})
+            port = serial_config.get("port")
+            if not port:
+                logger.warning("No serial port configured for the legs")
+                return None
+            bridge = MotionBridge(port, serial_config.get("baud", 9600))
+            if not bridge.open():
+                return None
+            _motion_bridge = bridge
+            _start_estop_listener()
+        return _motion_bridge
+
+def handle_motion_command(action, value=None, cycles=None):
+    """Send a parsed motion intent to the legs and return the spoken response"""
+    bridge = get_motion_bridge()
+    if bridge is None:
+        return "My legs are not connected."
+    log_interaction("motion_command", f"{action} {value or ''} {cycles or ''}".strip())
+    record_event("motion_command", {"action": action, "value": value, "cycles": cycles})
+    if action == "move":
+        bridge.move(value, cycles)
+        if value in ("left", "right"):
+            return f"Turning {value}."
+        return f"Walking {value}." if cycles == 1 else f"Walking {value} for {cycles} steps."
+    elif action == "speed":
+        bridge.set_speed(value)
+        return f"Speed set to {value}."
+    elif action == "stand":
+        bridge.stand()
+        return "Standing by."
+    elif action == "stop":
+        bridge.emergency_stop()
+        return "Stopping."
+    return None
+
+def start_follow():
+    """Follow the configured target with the camera and the legs; returns the spoken response"""
+    global _follower
+    if _follower is not None and _follower.running:
+        return "I am already following."
+    bridge = get_motion_bridge()
+    if bridge is None:
+        return "My legs are not connected."
+    camera = get_camera()
+    if camera is None:
+        return "I cannot follow without a camera."
+    from follow import FollowController, BlobTracker, DetectionTracker, FOLLOW_SPEED
+    camera_config = (load_config() or {}).get("camera", {})
+    target = camera_config.get("follow_target", "blob")
+    if target == "blob":
+        tracker = BlobTracker(camera.client, tuple(camera_config.get("follow_colour", (230, 120, 30))))
+    else:
+        # Any other value is a detection label, e.g. "person"
+        tracker = DetectionTracker(get_detector(), target)
+    log_interaction("motion_command", f"follow {target}")
+    _follower = FollowController(bridge, tracker, speed_level=camera_config.get("follow_speed", FOLLOW_SPEED)).start()
+    return "Following you."
+
+def stop_follow():
+    """Leave follow mode, if it is on"""
+    global _follower
+    if _follower is None:
+        return False
+    _follower.stop()
+    logger.info(f"Follow mode ended: {_follower.report()}")
+    _follower = None
+    return True
+
+def get_navigator():
+    """Get the navigator on the legs, with the map and places saved in navigation_map.npz"""
+    global _navigator
+    if _navigator is None:
+        bridge = get_motion_bridge()
+        if bridge is None:
+            return None
+        from navigation import Navigator, OccupancyGrid, DetectionSensor, NAV_SPEED
+        nav_config = (load_config() or {}).get("navigation", {})
+        grid = OccupancyGrid.load(NAVIGATION_MAP) if os.path.exists(NAVIGATION_MAP) else OccupancyGrid()
+        # Obstacles come from the detector when there is a camera; otherwise only the saved map is known
+        detector = get_detector()
+        sensor = DetectionSensor(detector, nav_config.get("camera_height", 0.12)) if detector else None
+        _navigator = Navigator(bridge, grid, sensor, speed_level=nav_config.get("speed_level", NAV_SPEED),
+                               robot_radius=nav_config.get("robot_radius", 0.15))
+    return _navigator
+
+def handle_navigation_command(action, place):
+    """Walk to a remembered place, or remember this one; returns the spoken response"""
+    navigator = get_navigator()
+    if navigator is None:
+        return "My legs are not connected."
+    log_interaction("navigation_command", f"{action} {place}")
+    if action == "remember":
+        navigator.remember(place)
+        navigator.grid.save(NAVIGATION_MAP)
+        return f"I will remember this place as the {place}."
+    if place not in navigator.grid.places:
+        return f"I do not know where the {place} is."
+    stop_follow()
+    stop_navigation()
+    navigator.start(place)
+    return f"Going to the {place}."
+
+def stop_navigation():
+    """End a walk to a place, if one is under way"""
+    if _navigator is None or not _navigator.running:
+        return False
+    _navigator.stop()
+    logger.info(f"Navigation ended: {_navigator.report()}")
+    return True
+
 def process_speech_text(text):
     """Process recognized speech and determine response with enhanced capabilities"""
     if not text:
@@ -820,6 +1504,30 @@ def process_speech_text(text):
         
     text = text.lower()
     
+    if "follow me" in text:
+        return start_follow()
+    if "save recording" in text or "save the recording" in text:
+        return save_recording()
+    
+    # Places before motion, so "go to the door" is not read as a walk forward
+    from navigation import parse_navigation_command
+    navigation = parse_navigation_command(text)
+    if navigation:
+        return handle_navigation_command(*navigation)
+    
+    # Motion commands go to the legs
+    motion = parse_motion_command(text)
+    if motion:
+        # A manual command (including "stop following") ends follow mode and any walk to a place
+        stop_follow()
+        stop_navigation()
+        fleet = get_fleet()
+        if fleet is not None:
+            # Several robots: the command may name one of them
+            log_interaction("fleet_command", text)
+            return fleet.handle_text(text) or "I did not catch which robot that was for."
+        return handle_motion_command(*motion)
+    
     # Advanced command handling with more capabilities
     if "hello" in text:
         return "Hello, I am Connor, the android sent by CyberLife."
@@ -851,8 +1559,8 @@ def process_speech_text(text):
     elif "thank you" in text or "thanks" in text:
         responses = ["You're welcome.", "Happy to assist.", "At your service."]
         return random.choice(responses)    
-    elif any(word in text for word in ["exit", "quit", "stop", "goodbye", "shutdown", "turn off", "power off", "terminate", "end"]):
-        # Enhanced exit command detection with more keywords
+    elif any(word in text for word in ["exit", "quit", "goodbye", "shutdown", "turn off", "power off", "terminate", "end"]):
+        # Enhanced exit command detection with more keywords ("stop" halts the legs instead)
         print(f"User command detected: {text}")
         logger.info(f"Exit command received: {text}")
         return "__EXIT__"
@@ -861,198 +1569,108 @@ def process_speech_text(text):
     else:
         # Log unknown commands for future improvements
         log_interaction("unknown_command", text)
+        # One misheard phrase is not worth a clip; several close together may be the robot misbehaving
+        record_event("unknown_command", {"text": text}, save_clip=_unknown_command_clip(),
+                     cooldown=UNKNOWN_CLIP_COOLDOWN)
         return "I heard you say: " + text
 
-def run_interactive_mode():
-    """Run the robot in interactive voice mode"""
-    logger.info("Starting interactive mode")
+# Speech recognition process (ear) bring-up
+EAR_SCRIPT_PATH = os.path.join(parent_dir, 'EARS', 'ear_simple.py')
+COMM_FILE = os.path.join(tempfile.gettempdir(), "detroit_speech_data.txt")
+EAR_READY_TIMEOUT = 15  # seconds to wait for the ear's "ready" message
+
+def start_ear(comm_file=COMM_FILE):
+    """Launch the speech recognition process under the supervisor
     
-    # Use the new simple version of the speech recognition system
-    ear_script_path = r"D:\GIT\DETROIT\EARS\ear_simple.py"
-    if not os.path.exists(ear_script_path):
-        logger.error(f"Error: The speech recognition script '{ear_script_path}' was not found.")
+    Returns immediately; use get_supervisor().wait_ready("ear") to wait for
+    the ear to report that its recognizer and microphone are set up.
+    """
+    supervisor = get_supervisor()
+    if supervisor.get("ear"):
+        return True
+    if not os.path.exists(EAR_SCRIPT_PATH):
+        logger.error(f"Error: The speech recognition script '{EAR_SCRIPT_PATH}' was not found.")
         return False
     
-    # Try the main script first, but have a fallback method if it fails repeatedly
-    use_fallback_method = False
-    
-    logger.info(f"Starting simplified speech recognition script: {ear_script_path}")
-    try:
-        # Create a temp file for communication
-        comm_file = os.path.join(tempfile.gettempdir(), "detroit_speech_data.txt")
-        
-        # Check if there's an old communication file and delete it
-        if os.path.exists(comm_file):
-            try:
-                os.remove(comm_file)
-                logger.info("Removed old communication file")
-            except Exception as e:
-                logger.warning(f"Failed to remove old communication file: {e}")
-          # First, make sure we have required dependencies installed
+    # Check if there's an old communication file and delete it
+    if os.path.exists(comm_file):
         try:
-            # Install dependencies if needed
-            try:
-                import importlib.util
-                speech_spec = importlib.util.find_spec('speech_recognition')
-                pyaudio_spec = importlib.util.find_spec('pyaudio')
-                
-                if speech_spec is None or pyaudio_spec is None:
-                    logger.warning("Required dependencies missing. Installing now...")
-                    print("Installing required dependencies for speech recognition...")
-                    
-                    # Install the dependencies with timeout to prevent hanging
-                    subprocess.check_call(
-                        [sys.executable, "-m", "pip", "install", "--no-cache-dir", "SpeechRecognition", "PyAudio"],
-                        timeout=60
-                    )
-                    logger.info("Dependencies installed successfully")
-                else:
-                    logger.info("All required dependencies are installed")
-            except Exception as e:
-                logger.error(f"Error checking/installing dependencies: {e}")
-                print(f"Warning: Error with dependencies: {e}")
+            os.remove(comm_file)
+            logger.info("Removed old communication file")
         except Exception as e:
-            logger.error(f"Failed to check dependencies: {e}")
-          # Launch the simplified speech recognition script with ALWAYS-ACTIVE mode enabled
-        try:
-            # Create a temporary script to test PyAudio and microphone access
-            test_script_path = os.path.join(tempfile.gettempdir(), "detroit_mic_test.py")
-            with open(test_script_path, "w") as f:
-                f.write("""
-import pyaudio
-import sys
+            logger.warning(f"Failed to remove old communication file: {e}")
+    
+    # The supervisor restarts the ear with backoff if it dies or stops answering heartbeats
+    logger.info(f"Starting simplified speech recognition script: {EAR_SCRIPT_PATH}")
+    supervisor.add_child(
+        "ear",
+        [sys.executable, EAR_SCRIPT_PATH, "--output", comm_file, "--always-active", "--supervised",
+         "--estop-port", str(ESTOP_PORT)],
+        cwd=os.path.dirname(EAR_SCRIPT_PATH)
+    )
+    supervisor.start()
+    logger.info(f"Speech recognition process started (PID: {supervisor.get('ear').pid}).")
+    return True
 
-try:
-    p = pyaudio.PyAudio()
-    device_count = p.get_device_count()
+def run_interactive_mode():
+    """Run the robot in interactive voice mode"""
+    logger.info("Starting interactive mode")
+    comm_file = COMM_FILE
     
-    # Find input devices (microphones)
-    input_devices = []
-    for i in range(device_count):
+    try:
+        # Launch the simplified speech recognition script with ALWAYS-ACTIVE mode enabled
+        # (a no-op if startup() already brought it up in parallel)
         try:
-            device_info = p.get_device_info_by_index(i)
-            if device_info.get('maxInputChannels', 0) > 0:
-                name = device_info.get('name', f"Device {i}")
-                input_devices.append(f"{i}: {name}")
-        except:
-            pass
-    
-    # Print results
-    print(f"PyAudio found {device_count} total audio devices")
-    print(f"Found {len(input_devices)} input devices (microphones):")
-    for dev in input_devices:
-        print(f"  - {dev}")
-    
-    # Return success only if we found input devices
-    sys.exit(0 if input_devices else 1)
-except Exception as e:
-    print(f"Error testing PyAudio: {e}")
-    sys.exit(2)
-finally:
-    if 'p' in locals():
-        p.terminate()
-""")
-            
-            # Run the test script
-            test_result = subprocess.run(
-                [sys.executable, test_script_path],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            # Check if test was successful
-            if test_result.returncode == 0:
-                logger.info(f"PyAudio test successful: {test_result.stdout.strip()}")
-                print(f"Audio system check: {test_result.stdout.strip()}")
-            else:
-                logger.warning(f"PyAudio test failed with code {test_result.returncode}: {test_result.stdout.strip()}")
-                print(f"Audio system issue detected: {test_result.stdout.strip()}")
-
-            # Try to launch speech recognition with a basic non-PyAudio test first
-            # This prevents using CREATE_NEW_CONSOLE which can hide error output
-            test_process = subprocess.Popen(
-                [sys.executable, "-c", "import speech_recognition as sr; print('SpeechRecognition available')"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            test_process.wait(timeout=5)
-            
-            # Now launch the actual speech recognition process
-            # Start in a normal console first to capture any startup errors
-            process = subprocess.Popen(
-                [sys.executable, ear_script_path, "--output", comm_file, "--always-active"],
-                # Don't use shell=True for better error handling
-                shell=False,
-                # Capture both stdout and stderr for diagnostics
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                # Use text mode for easier decoding
-                text=True
-            )
-            logger.info(f"Speech recognition process started (PID: {process.pid}).")
+            if not start_ear(comm_file):
+                return False
         except Exception as e:
             logger.error(f"Failed to initialize audio system: {e}")
             print(f"Audio system initialization error: {e}")
-            # Use a fallback approach with minimal dependencies
-            process = subprocess.Popen(
-                [sys.executable, ear_script_path, "--output", comm_file, "--always-active"],
-                shell=False,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            logger.info(f"Speech recognition process started in fallback mode (PID: {process.pid}).")
+            raise
+        supervisor = get_supervisor()
         
-        # Wait a moment to let the process start up
-        time.sleep(3)
+        # Check microphone access and the recognizer in-process (cached from startup)
+        for name, check in run_probes(["microphone", "recognizer"]).items():
+            if check["ok"]:
+                logger.info(f"{name} check passed: {check['detail']}")
+            else:
+                logger.warning(f"{name} check failed ({check['status']}): {check.get('detail')}")
+                print(f"Audio system issue detected ({name}): {check.get('detail')}")
         
-        # Check if the process died immediately
-        if process.poll() is not None:
-            # Try to get error output
-            stdout_output = ""
-            stderr_output = ""
-            try:
-                if process.stdout:
-                    stdout_output = process.stdout.read()
-                if process.stderr:
-                    stderr_output = process.stderr.read()
-            except:
-                pass
-                
-            error_msg = f"STDOUT: {stdout_output}\nSTDERR: {stderr_output}"
-            logger.error(f"Speech recognition process failed to start. Error: {error_msg}")
+        # Wait for the ear to report that it is listening instead of a fixed sleep
+        if not supervisor.wait_ready("ear", timeout=EAR_READY_TIMEOUT):
+            # Report the failure; the supervisor keeps retrying in the background
+            error_msg = "\n".join(list(supervisor.get("ear").output))
+            logger.error(f"Speech recognition process not ready after {EAR_READY_TIMEOUT}s. Output: {error_msg}")
             print(f"Error starting speech recognition: {error_msg}")
-            
-            # Switch to fallback method
-            use_fallback_method = True
-            raise Exception("Speech recognition process failed immediately")
         
         # Speak the welcome message
         run_speech("Voice system activated. I am ready to listen.")
-        print("Say something! (Exit with 'quit', 'exit', or 'stop')")
+        print("Say something! (Exit with 'quit' or 'exit'; 'stop' halts the robot)")
         print("Speech recognition is running in a separate window.")
         
+        # Motion in front of the camera is a second, visual wake trigger, handled off this loop
+        get_motion_detector()
+        # Keep the last minutes of camera frames for when something goes wrong
+        get_recorder()
+        
         # Main interaction loop
         running = True
         no_activity_count = 0
-        restart_count = 0
-        max_restarts = 3  # Only try to restart a few times before using fallback
         while running:
             # Check for speech recognition results
             text = check_speech_results(comm_file)
             if text:
                 no_activity_count = 0  # Reset inactivity counter
+                command_start = time.perf_counter()
                 response = process_speech_text(text)
+                telemetry.record("latency_ms", (time.perf_counter() - command_start) * 1000)
                 if response == "__EXIT__":
                     run_speech("Shutting down voice system.")
                     running = False
-                    # Kill all speech recognition processes and terminate entire system 
+                    # Stop the supervised speech recognition process and terminate entire system 
                     kill_all_child_processes()
                     logger.info("Complete system shutdown initiated via voice command")
-                    if 'process' in locals() and process and process.poll() is None:
-                        process.terminate()
                     terminate(0)  # Exit with status code 0 (clean exit)
                     return True  # This ensures the function returns successfully
                 else:
@@ -1062,16 +1680,6 @@ finally:
                 # If no activity for a while, just print a simple status message
                 if no_activity_count % 40 == 0:  # About every 20 seconds
                     print("Listening... Waiting for wake word or command...")
-              # Check if process is still alive
-            if process.poll() is not None:
-                logger.warning("Speech recognition process has ended unexpectedly. Shutting down.")
-                print("The speech recognition process has stopped. Shutting down.")
-                run_speech("Speech recognition stopped. Shutting down system.")
-                running = False
-                # Initiate shutdown
-                kill_all_child_processes()
-                terminate(0)  # Exit with status code 0 (clean exit)
-                return True
                 
             # Sleep to avoid high CPU usage
             time.sleep(0.5)
@@ -1086,17 +1694,9 @@ finally:
         return False    
     finally:
         # Clean up
-        if 'process' in locals() and process and process.poll() is None:
-            try:
-                # Try to cleanly terminate the process first
-                process.terminate()
-                # Wait a moment for it to clean up
-                process.wait(timeout=2)
-                logger.info("Speech recognition process terminated")
-            except:
-                # Force kill if needed
-                process.kill()
-                logger.info("Speech recognition process forcefully killed")
+        if _supervisor is not None:
+            _supervisor.shutdown()
+            logger.info("Speech recognition process terminated")
         
         # Completely remove the communication file to prevent any lingering processes
         if os.path.exists(comm_file):
@@ -1106,69 +1706,39 @@ finally:
             except Exception as e:
                 logger.warning(f"Failed to remove communication file: {e}")
 
+# Process supervision
+_supervisor = None
+
+def _on_child_restart(name, restart_count):
+    """Announce that a supervised process had to be restarted"""
+    logger.warning(f"Supervised process '{name}' restarted (restart #{restart_count})")
+    print(f"The {name} process was restarted (restart #{restart_count}).")
+
+def get_supervisor():
+    """Get the supervisor that owns the robot's child processes"""
+    global _supervisor
+    if _supervisor is None:
+        _supervisor = Supervisor(on_restart=_on_child_restart)
+    return _supervisor
+
 # Process cleanup function
 def kill_all_child_processes():
-    """Kill all child processes to ensure clean exit"""
-    import psutil
+    """Stop all supervised child processes to ensure clean exit
     
+    Only the children tracked by the supervisor are touched, so this is
+    O(children) instead of scanning every process on the machine.
+    """
     try:
         # First, make sure sound system is properly cleaned up
         sound_manager.cleanup()
         logger.info("Sound system cleaned up")
         
-        # Get the current process
-        current_process = psutil.Process()
-        logger.info(f"Cleaning up processes. Current PID: {current_process.pid}")
-        
-        # Helper function to safely terminate a process
-        def terminate_safely(proc, proc_name="Unknown"):
-            try:
-                if proc.is_running():
-                    logger.info(f"Terminating {proc_name} process (PID: {proc.pid})")
-                    proc.terminate()
-                    # Give it a moment to terminate
-                    gone, alive = psutil.wait_procs([proc], timeout=2)
-                    if proc in alive:
-                        logger.info(f"Force killing {proc_name} process (PID: {proc.pid})")
-                        proc.kill()
-                return True
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                return True
-            except Exception as err:
-                logger.error(f"Error terminating {proc_name} process: {err}")
-                return False
-        
-        # Find and terminate all child processes
-        children = current_process.children(recursive=True)
-        if children:
-            logger.info(f"Found {len(children)} child processes to terminate")
-            for child in children:
-                terminate_safely(child, "child")
-            logger.info("All child processes terminated")
-        else:
-            logger.info("No child processes found")
-        
-        # Look for speech recognition processes (both ear_robust.py and ear_simple.py)
-        current_pid = os.getpid()
-        ear_process_count = 0
-        
-        for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-            try:
-                # Only check python processes that aren't us
-                if proc.pid != current_pid and proc.info['name'] == 'python.exe':
-                    cmdline = proc.info['cmdline']
-                    if cmdline and any(ear_file in ' '.join(cmdline) for ear_file in ['ear_robust.py', 'ear_simple.py']):
-                        ear_process_count += 1
-                        terminate_safely(proc, "speech recognition")
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
-            except Exception as e:
-                logger.error(f"Error checking process: {e}")
-                
-        if ear_process_count > 0:
-            logger.info(f"Terminated {ear_process_count} speech recognition processes")
+        if _supervisor is None:
+            logger.info("No child processes to terminate")
+            return True
         
-        return True
+        logger.info(f"Terminating {len(_supervisor.children)} supervised child processes")
+        return _supervisor.shutdown()
     except Exception as e:
         logger.error(f"Error in process cleanup: {e}")
         print(f"Error cleaning up processes: {e}")
@@ -1176,22 +1746,15 @@ def kill_all_child_processes():
 
 # Main execution for the whole system
 if __name__ == "__main__":
-    # First, make sure we have psutil installed
-    try:
-        import psutil
-    except ImportError:
-        print("Installing psutil for process management...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "psutil"])
-        import psutil
-        
     print("DETROIT Robot Core Functions Module")
     print("-----------------------------------")
     
-    # Initialize system
-    startup()
+    # Initialize system, bringing the ear up in parallel with the other subsystems
+    startup(with_ear=True)
     print(f"Current time: {get_time()}")
     print(f"Current date: {get_date()}")
     
+    hard_stop = False
     try:
         # Run diagnostics
         diagnostics = run_diagnostics()
@@ -1199,16 +1762,18 @@ if __name__ == "__main__":
         
         # Start interactive mode
         print("Starting interactive mode. You can now speak to the robot.")
-        print("Say 'exit', 'quit', or 'stop' to end the session.")
+        print("Say 'exit' or 'quit' to end the session ('stop' halts the robot).")
         run_interactive_mode()
         
     except KeyboardInterrupt:
         print("Interrupted by user.")
+        # The user wants out now: skip the farewell
+        hard_stop = True
     except Exception as e:
         print(f"Error in main execution: {e}")
     finally:
         # Ensure proper shutdown
-        shutdown()
+        shutdown(hard_stop=hard_stop)
         
         # Kill all related processes to ensure clean exit
         kill_all_child_processes()
@@ -0,0 +1,94 @@
+"""
+Shutdown Orchestrator for DETROIT Robot System
+==============================================
+Tears the robot's subsystems down in parallel under one global deadline.
+
+Shutdown runs in two stages:
+    1. persist - flush memory, logs, state and telemetry. These run first
+       so nothing is lost even if a later step hangs.
+    2. teardown - stop child processes, release the sound system and say
+       goodbye, all at once. Farewells are best-effort: whatever is still
+       playing when the deadline hits is abandoned.
+
+Hard-stop mode skips the farewells and gives children only a few tens of
+milliseconds to exit before they are killed, finishing in under 300 ms.
+"""
+
+import time
+import logging
+
+from startup import StagedStartup
+
+logger = logging.getLogger('DETROIT.SHUTDOWN')
+
+SHUTDOWN_DEADLINE = 3.0       # seconds for a normal shutdown, farewells included
+HARD_STOP_DEADLINE = 0.25     # seconds for a hard stop
+HARD_STOP_CHILD_TIMEOUT = 0.05
+
+
+class ShutdownOrchestrator:
+    """Runs registered shutdown steps in parallel under a global deadline
+
+    Steps are callables taking the seconds remaining until the deadline, so
+    each one can bound its own blocking calls.
+    """
+
+    def __init__(self):
+        self.persist_steps = {}
+        self.teardown_steps = {}
+        self.farewell_steps = {}
+        self.last_run = None
+        self.completed = False
+
+    def add_persist_step(self, name, func):
+        """Register a step that saves data (runs first)"""
+        self.persist_steps[name] = func
+
+    def add_teardown_step(self, name, func):
+        """Register a step that stops a subsystem"""
+        self.teardown_steps[name] = func
+
+    def add_farewell_step(self, name, func):
+        """Register a best-effort step (speech, sounds) skipped in hard-stop mode"""
+        self.farewell_steps[name] = func
+
+    def run(self, deadline=SHUTDOWN_DEADLINE, hard_stop=False):
+        """Run the shutdown once; later calls are no-ops
+
+        Returns:
+            bool: True if every step finished before the deadline
+        """
+        if self.completed:
+            return True
+        self.completed = True
+        if hard_stop:
+            deadline = min(deadline, HARD_STOP_DEADLINE)
+        start = time.monotonic()
+        end = start + deadline
+        stages = self.last_run = StagedStartup()
+
+        def bounded(func):
+            return lambda: func(max(0.0, end - time.monotonic()))
+
+        stages.run_parallel(
+            "persist", {name: bounded(func) for name, func in self.persist_steps.items()},
+            timeout=max(0.0, end - time.monotonic())
+        )
+        teardown = {name: bounded(func) for name, func in self.teardown_steps.items()}
+        if not hard_stop:
+            teardown.update({name: bounded(func) for name, func in self.farewell_steps.items()})
+        stages.run_parallel("teardown", teardown, timeout=max(0.0, end - time.monotonic()))
+
+        elapsed = time.monotonic() - start
+        # Steps record their timing when they finish, so missing entries were abandoned
+        unfinished = [name for name in self.persist_steps if f"persist.{name}" not in stages.timings]
+        unfinished += [name for name in teardown if f"teardown.{name}" not in stages.timings]
+        on_time = elapsed <= deadline and not unfinished
+        logger.info(f"Shutdown {'(hard stop) ' if hard_stop else ''}finished in {elapsed * 1000:.0f} ms "
+                    f"(deadline {deadline * 1000:.0f} ms)\n{stages.report()}")
+        if unfinished:
+            logger.warning(f"Shutdown steps abandoned at the deadline: {', '.join(unfinished)}")
+        return on_time
+
+
+__all__ = ['ShutdownOrchestrator', 'SHUTDOWN_DEADLINE', 'HARD_STOP_DEADLINE', 'HARD_STOP_CHILD_TIMEOUT']
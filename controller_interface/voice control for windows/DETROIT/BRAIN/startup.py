@@ -0,0 +1,177 @@
+"""
+Staged Startup for DETROIT Robot System
+=======================================
+Runs system bring-up as timed stages. Independent subsystems (sound mixer,
+TTS engine, memory, ear process, health probes) come up in parallel threads
+within one stage, so start-to-listening is bounded by the slowest subsystem
+rather than by their sum. Every task and stage is timed for the cold-start
+benchmark.
+
+Benchmark usage:
+    python startup.py --benchmark --runs 5
+    python startup.py --benchmark --with-ear --greet
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import subprocess
+
+logger = logging.getLogger('DETROIT.STARTUP')
+
+
+class StagedStartup:
+    """Runs startup stages and records how long each one took"""
+
+    def __init__(self):
+        self.timings = {}   # phase name -> seconds
+        self.errors = {}    # task name -> error message
+        self._lock = threading.Lock()
+
+    def _record(self, name, seconds):
+        with self._lock:
+            self.timings[name] = seconds
+
+    def run_stage(self, name, func):
+        """Run a single sequential stage and return its result"""
+        start = time.perf_counter()
+        try:
+            return func()
+        except Exception as e:
+            logger.error(f"Startup stage '{name}' failed: {e}")
+            self.errors[name] = str(e)
+            return None
+        finally:
+            self._record(name, time.perf_counter() - start)
+
+    def run_parallel(self, name, tasks, timeout=None):
+        """Run independent tasks concurrently and wait for all of them
+
+        Args:
+            name (str): Name of the stage
+            tasks (dict): Task name -> callable
+            timeout (float, optional): Seconds to wait before giving up on stragglers
+
+        Returns:
+            dict: Task name -> result (None for failed or unfinished tasks)
+        """
+        start = time.perf_counter()
+        results = {}
+        threads = []
+
+        def run_task(task_name, func):
+            task_start = time.perf_counter()
+            try:
+                results[task_name] = func()
+            except Exception as e:
+                logger.error(f"Startup task '{task_name}' failed: {e}")
+                self.errors[task_name] = str(e)
+                results[task_name] = None
+            finally:
+                self._record(f"{name}.{task_name}", time.perf_counter() - task_start)
+
+        for task_name, func in tasks.items():
+            thread = threading.Thread(target=run_task, args=(task_name, func), name=f"startup-{task_name}")
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for thread in threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.perf_counter()))
+        for task_name in tasks:
+            if task_name not in results:
+                logger.warning(f"Startup task '{task_name}' still running after {timeout}s")
+                results[task_name] = None
+
+        self._record(name, time.perf_counter() - start)
+        return results
+
+    def mark(self, name, since):
+        """Record a phase measured by the caller from a perf_counter() start value"""
+        self._record(name, time.perf_counter() - since)
+
+    def report(self):
+        """Format the phase timings as a table"""
+        lines = []
+        for name, seconds in self.timings.items():
+            indent = "    " if "." in name else ""
+            lines.append(f"{indent}{name:<{32 - len(indent)}} {seconds * 1000:9.1f} ms")
+        return "\n".join(lines)
+
+
+def _cold_start_run(with_ear, greet):
+    """Child side of the benchmark: one cold start in a fresh interpreter"""
+    start = time.perf_counter()
+    import functions
+    import_seconds = time.perf_counter() - start
+
+    functions.startup(with_ear=with_ear, greet=greet)
+    timings = {"import": import_seconds}
+    timings.update(functions.last_startup.timings)
+    if with_ear:
+        ready_start = time.perf_counter()
+        ready = functions.get_supervisor().wait_ready("ear", timeout=30)
+        timings["ear_ready_wait"] = time.perf_counter() - ready_start
+        if not ready:
+            timings["ear_ready_wait"] = float("nan")
+    timings["start_to_listening"] = time.perf_counter() - start
+    functions.kill_all_child_processes()
+    print("@@TIMINGS " + json.dumps(timings))
+
+
+def benchmark(runs=3, with_ear=False, greet=False):
+    """Measure cold starts in fresh interpreters and print a per-phase breakdown"""
+    samples = []
+    for run in range(runs):
+        args = [sys.executable, os.path.abspath(__file__), "--cold-start-run"]
+        if with_ear:
+            args.append("--with-ear")
+        if greet:
+            args.append("--greet")
+        result = subprocess.run(args, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        for line in result.stdout.splitlines():
+            if line.startswith("@@TIMINGS "):
+                samples.append(json.loads(line[len("@@TIMINGS "):]))
+                break
+        else:
+            print(f"Run {run + 1} failed:\n{result.stderr[-2000:]}")
+
+    if not samples:
+        return 1
+    print(f"Cold start over {len(samples)} run(s) (with_ear={with_ear}, greet={greet})")
+    print(f"{'phase':<32} {'mean':>10} {'min':>10} {'max':>10}")
+    for name in samples[0]:
+        values = [s[name] for s in samples if name in s]
+        indent = "    " if "." in name else ""
+        print(f"{indent}{name:<{32 - len(indent)}} {sum(values) / len(values) * 1000:8.1f}ms "
+              f"{min(values) * 1000:8.1f}ms {max(values) * 1000:8.1f}ms")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DETROIT cold-start benchmark")
+    parser.add_argument("--benchmark", action="store_true", help="Run the cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=3, help="Number of cold starts to measure")
+    parser.add_argument("--with-ear", action="store_true", help="Include ear bring-up and its ready handshake")
+    parser.add_argument("--greet", action="store_true", help="Include the spoken startup message")
+    parser.add_argument("--cold-start-run", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_start_run:
+        _cold_start_run(args.with_ear, args.greet)
+        return 0
+    if args.benchmark:
+        return benchmark(args.runs, args.with_ear, args.greet)
+    parser.print_help()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+__all__ = ['StagedStartup', 'benchmark']
@@ -0,0 +1,283 @@
+"""
+Process Supervisor for DETROIT Robot System
+===========================================
+Owns the robot's child processes (the ear) by handle.
+
+The supervisor starts each child with pipes for stdin/stdout/stderr, reads
+its IPC messages (see EARS/ipc.py), pings it periodically and restarts it
+with exponential backoff when it exits, stops answering heartbeats or reports
+that its main loop is stuck. The brain keeps running throughout.
+
+Shutdown only touches the tracked children, so it is O(children) rather than
+a scan over every process on the machine.
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+import subprocess
+from collections import deque
+
+# Add the parent directory to the Python path so we can import modules from sibling directories
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from EARS import ipc
+
+logger = logging.getLogger('DETROIT.SUPERVISOR')
+
+HEARTBEAT_INTERVAL = 2.0    # seconds between pings
+HEARTBEAT_TIMEOUT = 10.0    # seconds without any pong before a child counts as hung
+HANG_TIMEOUT = 60.0         # seconds the child's main loop may go without progress
+BACKOFF_INITIAL = 1.0       # first restart delay in seconds
+BACKOFF_MAX = 30.0          # upper bound for the restart delay
+STABLE_PERIOD = 60.0        # a child running this long resets its backoff
+OUTPUT_TAIL = 50            # console lines kept per child for error reports
+
+
+class ChildProcess:
+    """A supervised child process and its health bookkeeping"""
+
+    def __init__(self, name, args, hang_timeout=HANG_TIMEOUT, on_message=None, cwd=None):
+        self.name = name
+        self.args = list(args)
+        self.hang_timeout = hang_timeout
+        self.on_message = on_message
+        self.cwd = cwd
+        self.process = None
+        self.started_at = None
+        self.last_pong = None
+        self.ready = threading.Event()
+        self.restart_count = 0
+        self.backoff = BACKOFF_INITIAL
+        self.restart_at = None
+        self.output = deque(maxlen=OUTPUT_TAIL)
+        self._ping_seq = 0
+        self._stdin_lock = threading.Lock()
+
+    @property
+    def pid(self):
+        return self.process.pid if self.process else None
+
+    def is_alive(self):
+        """Check whether the child process is running"""
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """Launch the child and start draining its output"""
+        self.ready.clear()
+        self.process = subprocess.Popen(
+            self.args,
+            shell=False,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            cwd=self.cwd
+        )
+        self.started_at = time.monotonic()
+        self.last_pong = self.started_at
+        self.restart_at = None
+        for stream, is_error in ((self.process.stdout, False), (self.process.stderr, True)):
+            reader = threading.Thread(target=self._read_stream, args=(self.process, stream, is_error),
+                                      name=f"{self.name}-{'stderr' if is_error else 'stdout'}")
+            reader.daemon = True
+            reader.start()
+        logger.info(f"Started {self.name} process (PID: {self.process.pid})")
+        return self.process
+
+    def _read_stream(self, process, stream, is_error):
+        """Read lines from the child, dispatching IPC messages"""
+        try:
+            for line in stream:
+                message = None if is_error else ipc.parse_message(line)
+                if message is None:
+                    line = line.rstrip()
+                    if line:
+                        self.output.append(line)
+                        if is_error:
+                            logger.warning(f"[{self.name}] {line}")
+                        else:
+                            logger.debug(f"[{self.name}] {line}")
+                    continue
+                # Ignore late messages from a previous incarnation of the child
+                if process is not self.process:
+                    continue
+                if message["type"] == "pong":
+                    self.last_pong = time.monotonic()
+                    if message.get("loop_age", 0) > self.hang_timeout:
+                        logger.warning(f"{self.name} main loop stalled for {message['loop_age']:.0f}s")
+                        self.last_pong = None
+                elif message["type"] == "ready":
+                    self.ready.set()
+                if self.on_message:
+                    self.on_message(self.name, message)
+        except Exception as e:
+            logger.debug(f"Stopped reading {self.name} output: {e}")
+
+    def ping(self):
+        """Send a heartbeat request to the child"""
+        if not self.is_alive():
+            return False
+        self._ping_seq += 1
+        try:
+            with self._stdin_lock:
+                self.process.stdin.write(ipc.encode_message("ping", seq=self._ping_seq))
+                self.process.stdin.flush()
+            return True
+        except (BrokenPipeError, OSError, ValueError):
+            return False
+
+    def is_hung(self):
+        """Check whether the child stopped answering heartbeats"""
+        return self.last_pong is None or time.monotonic() - self.last_pong > HEARTBEAT_TIMEOUT
+
+    def stop(self, timeout=2.0):
+        """Terminate the child, killing it if it does not exit in time"""
+        process = self.process
+        if process is None:
+            return True
+        try:
+            if process.stdin:
+                process.stdin.close()
+        except Exception:
+            pass
+        if process.poll() is None:
+            try:
+                process.terminate()
+                process.wait(timeout=timeout)
+                logger.info(f"{self.name} process terminated (PID: {process.pid})")
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait(timeout=timeout)
+                logger.info(f"{self.name} process forcefully killed (PID: {process.pid})")
+            except Exception as e:
+                logger.error(f"Error stopping {self.name} process: {e}")
+                return False
+        return True
+
+
+class Supervisor:
+    """Keeps a set of child processes alive with heartbeats and restart backoff"""
+
+    def __init__(self, heartbeat_interval=HEARTBEAT_INTERVAL, on_restart=None):
+        self.heartbeat_interval = heartbeat_interval
+        self.on_restart = on_restart
+        self.children = {}
+        self.running = False
+        self.monitor_thread = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def add_child(self, name, args, hang_timeout=HANG_TIMEOUT, on_message=None, cwd=None):
+        """Register a child process to supervise (started by start())"""
+        with self._lock:
+            child = ChildProcess(name, args, hang_timeout, on_message, cwd)
+            self.children[name] = child
+        if self.running:
+            child.start()
+        return child
+
+    def start(self):
+        """Start all registered children and the monitor thread"""
+        if self.running:
+            return False
+        self.running = True
+        self._stop_event.clear()
+        with self._lock:
+            for child in self.children.values():
+                child.start()
+        self.monitor_thread = threading.Thread(target=self._monitor_loop, name="supervisor")
+        self.monitor_thread.daemon = True
+        self.monitor_thread.start()
+        return True
+
+    def get(self, name):
+        """Get a supervised child by name"""
+        return self.children.get(name)
+
+    def is_alive(self, name):
+        """Check whether a supervised child is currently running"""
+        child = self.children.get(name)
+        return child is not None and child.is_alive()
+
+    def wait_ready(self, name, timeout=None):
+        """Wait until a child has sent its "ready" message"""
+        child = self.children.get(name)
+        return child is not None and child.ready.wait(timeout)
+
+    def _monitor_loop(self):
+        while not self._stop_event.wait(self.heartbeat_interval):
+            with self._lock:
+                children = list(self.children.values())
+            for child in children:
+                try:
+                    self._check_child(child)
+                except Exception as e:
+                    logger.error(f"Error supervising {child.name}: {e}")
+
+    def _check_child(self, child):
+        now = time.monotonic()
+        if child.restart_at is not None:
+            if now >= child.restart_at and self.running:
+                self._restart(child)
+            return
+
+        if child.is_alive():
+            if child.is_hung():
+                logger.warning(f"{child.name} is not responding to heartbeats, restarting")
+                child.stop(timeout=1.0)
+                self._schedule_restart(child, "hung")
+                return
+            # A child that stayed healthy long enough earns a fresh backoff
+            if now - child.started_at > STABLE_PERIOD:
+                child.backoff = BACKOFF_INITIAL
+            child.ping()
+        else:
+            code = child.process.returncode if child.process else None
+            tail = " | ".join(list(child.output)[-3:])
+            logger.warning(f"{child.name} exited with code {code}" + (f": {tail}" if tail else ""))
+            self._schedule_restart(child, f"exit code {code}")
+
+    def _schedule_restart(self, child, reason):
+        child.restart_at = time.monotonic() + child.backoff
+        logger.info(f"Restarting {child.name} in {child.backoff:.1f}s ({reason})")
+        child.backoff = min(child.backoff * 2, BACKOFF_MAX)
+
+    def _restart(self, child):
+        child.restart_count += 1
+        try:
+            child.start()
+        except Exception as e:
+            logger.error(f"Failed to restart {child.name}: {e}")
+            self._schedule_restart(child, "start failed")
+            return
+        if self.on_restart:
+            self.on_restart(child.name, child.restart_count)
+
+    def shutdown(self, timeout=2.0):
+        """Stop monitoring and terminate every tracked child"""
+        self.running = False
+        self._stop_event.set()
+        if self.monitor_thread and self.monitor_thread is not threading.current_thread():
+            self.monitor_thread.join(timeout=timeout)
+        with self._lock:
+            children = list(self.children.values())
+        # Ask everyone to stop first, then wait, so the total time is bounded by one timeout
+        for child in children:
+            if child.is_alive():
+                try:
+                    child.process.terminate()
+                except Exception:
+                    pass
+        ok = True
+        for child in children:
+            ok = child.stop(timeout=timeout) and ok
+        return ok
+
+
+__all__ = ['Supervisor', 'ChildProcess']
@@ -0,0 +1,437 @@
+"""
+Telemetry History for DETROIT Robot System
+==========================================
+A round-robin time-series store for long robot sessions.
+
+state.json only keeps the last snapshot written by save_state(). This module
+keeps the history: every metric is consolidated into three fixed-size archive
+files (1 second, 1 minute and 1 hour resolution). Each archive is a ring of
+slots, and the slot for a timestamp is (timestamp // step) % slots, so files
+never grow and old data is simply overwritten once it ages out.
+
+File layout (little endian):
+    header   - magic, version, step, slot count, metric count (HEADER_FORMAT)
+    names    - metric names, NAME_SIZE bytes each, NUL padded
+    slots    - slot_count rows of float64:
+               [bucket_start, avg_0..avg_n, min_0..min_n, max_0..max_n]
+
+Because the slot area is a plain float64 matrix, readers can memory-map it
+with numpy.memmap (see read_archive) while the robot is still writing.
+
+Command line usage:
+    python telemetry.py print --resolution 1m --last 60
+    python telemetry.py plot --resolution 1h --metric rss_mb
+"""
+
+import os
+import sys
+import time
+import math
+import mmap
+import struct
+import logging
+import argparse
+import threading
+
+logger = logging.getLogger('DETROIT.TELEMETRY')
+
+TELEMETRY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'telemetry')
+
+# Metrics recorded by default - latency of handling a voice command, resident
+# memory of the brain process and its CPU usage
+METRICS = ("latency_ms", "rss_mb", "cpu_percent")
+
+# Archive name -> (step in seconds, number of slots)
+ARCHIVES = {
+    "1s": (1, 3600),         # last hour at 1 second resolution
+    "1m": (60, 1440 * 2),    # last two days at 1 minute resolution
+    "1h": (3600, 24 * 90),   # last ninety days at 1 hour resolution
+}
+
+MAGIC = b"DRRD"
+VERSION = 1
+HEADER_FORMAT = "<4sHHIII"   # magic, version, reserved, step, slots, metric count
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+NAME_SIZE = 32
+
+
+def archive_path(name, directory=TELEMETRY_DIR):
+    """Get the file path of an archive by resolution name"""
+    return os.path.join(directory, f"telemetry_{name}.rrd")
+
+
+def _data_offset(metric_count):
+    """Byte offset of the first slot row"""
+    offset = HEADER_SIZE + NAME_SIZE * metric_count
+    # Keep the float64 rows 8-byte aligned for memory mapping
+    return (offset + 7) // 8 * 8
+
+
+class RoundRobinArchive:
+    """A single fixed-size, memory-mapped archive at one resolution"""
+
+    def __init__(self, path, step, slots, metrics):
+        self.path = path
+        self.step = step
+        self.slots = slots
+        self.metrics = tuple(metrics)
+        self.row_doubles = 1 + 3 * len(self.metrics)
+        self.row_size = 8 * self.row_doubles
+        self.data_offset = _data_offset(len(self.metrics))
+        self.file_size = self.data_offset + self.row_size * self.slots
+        self._row_format = f"<{self.row_doubles}d"
+        self._file = None
+        self._map = None
+        self._open()
+
+    def _header_matches(self):
+        """Check that an existing file was created with the same layout"""
+        try:
+            if os.path.getsize(self.path) != self.file_size:
+                return False
+            with open(self.path, 'rb') as f:
+                magic, version, _, step, slots, count = struct.unpack(HEADER_FORMAT, f.read(HEADER_SIZE))
+                names = [f.read(NAME_SIZE).rstrip(b"\0").decode() for _ in range(count)]
+            return (magic == MAGIC and version == VERSION and step == self.step
+                    and slots == self.slots and tuple(names) == self.metrics)
+        except Exception:
+            return False
+
+    def _create(self):
+        """Create an empty archive file with every slot marked unused"""
+        empty_row = struct.pack(self._row_format, *([math.nan] * self.row_doubles))
+        with open(self.path, 'wb') as f:
+            f.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, 0, self.step, self.slots, len(self.metrics)))
+            for name in self.metrics:
+                f.write(name.encode()[:NAME_SIZE].ljust(NAME_SIZE, b"\0"))
+            f.write(b"\0" * (self.data_offset - f.tell()))
+            f.write(empty_row * self.slots)
+
+    def _open(self):
+        """Open (creating or recreating if needed) and memory-map the file"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if not os.path.exists(self.path) or not self._header_matches():
+            if os.path.exists(self.path):
+                logger.warning(f"Telemetry archive layout changed, recreating: {self.path}")
+            self._create()
+        self._file = open(self.path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), self.file_size)
+
+    def write_bucket(self, bucket_start, averages, minimums, maximums):
+        """Write one consolidated bucket into its ring slot"""
+        slot = int(bucket_start // self.step) % self.slots
+        struct.pack_into(self._row_format, self._map, self.data_offset + slot * self.row_size,
+                         bucket_start, *averages, *minimums, *maximums)
+
+    def flush(self):
+        """Flush dirty pages to disk"""
+        if self._map is not None:
+            self._map.flush()
+
+    def close(self):
+        """Flush and release the memory map"""
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class _Bucket:
+    """Running avg/min/max accumulator for one archive's current time bucket"""
+
+    def __init__(self, start, metric_count):
+        self.start = start
+        self.sums = [0.0] * metric_count
+        self.counts = [0] * metric_count
+        self.minimums = [math.nan] * metric_count
+        self.maximums = [math.nan] * metric_count
+
+    def add(self, index, value):
+        self.sums[index] += value
+        self.counts[index] += 1
+        if not value >= self.minimums[index]:
+            self.minimums[index] = value
+        if not value <= self.maximums[index]:
+            self.maximums[index] = value
+
+    def averages(self):
+        return [s / c if c else math.nan for s, c in zip(self.sums, self.counts)]
+
+
+class TelemetryStore:
+    """Multi-resolution round-robin store fed with (metric, value) samples
+
+    Samples are consolidated in memory for the current bucket of every
+    archive. Whenever a new second starts, the finished 1 s bucket and the
+    still-open minute and hour buckets are written to their slots, so the
+    files are always at most one second behind and never grow.
+    """
+
+    def __init__(self, directory=TELEMETRY_DIR, metrics=METRICS, archives=None):
+        self.metrics = tuple(metrics)
+        self._index = {name: i for i, name in enumerate(self.metrics)}
+        self._lock = threading.Lock()
+        self.archives = {}
+        self._buckets = {}
+        for name, (step, slots) in (archives or ARCHIVES).items():
+            self.archives[name] = RoundRobinArchive(archive_path(name, directory), step, slots, self.metrics)
+            self._buckets[name] = None
+        # The finest archive drives incremental writes of the coarser ones
+        self._finest = min(self.archives, key=lambda n: self.archives[n].step)
+
+    def record(self, metric, value, timestamp=None):
+        """Record a sample for a metric"""
+        index = self._index.get(metric)
+        if index is None:
+            logger.warning(f"Unknown telemetry metric: {metric}")
+            return False
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            rolled = False
+            for name, archive in self.archives.items():
+                start = timestamp - timestamp % archive.step
+                bucket = self._buckets[name]
+                if bucket is None or bucket.start != start:
+                    if bucket is not None:
+                        self._write(name, bucket)
+                        rolled = rolled or name == self._finest
+                    bucket = self._buckets[name] = _Bucket(start, len(self.metrics))
+                bucket.add(index, float(value))
+            if rolled:
+                # Persist the partial coarse buckets so a crash loses at most one step
+                for name, bucket in self._buckets.items():
+                    if name != self._finest and bucket is not None:
+                        self._write(name, bucket)
+        return True
+
+    def _write(self, name, bucket):
+        self.archives[name].write_bucket(bucket.start, bucket.averages(), bucket.minimums, bucket.maximums)
+
+    def flush(self):
+        """Write all open buckets and flush the archives to disk"""
+        with self._lock:
+            for name, bucket in self._buckets.items():
+                if bucket is not None:
+                    self._write(name, bucket)
+            for archive in self.archives.values():
+                archive.flush()
+
+    def close(self):
+        """Flush and close every archive"""
+        self.flush()
+        with self._lock:
+            for archive in self.archives.values():
+                archive.close()
+
+
+class TelemetrySampler:
+    """Background thread that samples RSS and CPU of this process once per interval"""
+
+    def __init__(self, store, interval=1.0):
+        self.store = store
+        self.interval = interval
+        self.running = False
+        self.sample_thread = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """Start sampling in a daemon thread"""
+        if self.running:
+            return False
+        try:
+            import psutil
+            self._process = psutil.Process()
+            self._process.cpu_percent(None)  # Prime the CPU counter
+        except ImportError:
+            logger.warning("psutil not available, RSS and CPU telemetry disabled")
+            return False
+        self.running = True
+        self._stop_event.clear()
+        self.sample_thread = threading.Thread(target=self._sample_loop, name="telemetry-sampler")
+        self.sample_thread.daemon = True
+        self.sample_thread.start()
+        logger.info("Telemetry sampler started")
+        return True
+
+    def stop(self):
+        """Stop the sampling thread"""
+        self.running = False
+        self._stop_event.set()
+        if self.sample_thread:
+            self.sample_thread.join(timeout=2)
+        return True
+
+    def _sample_loop(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                now = time.time()
+                self.store.record("rss_mb", self._process.memory_info().rss / (1024 * 1024), now)
+                self.store.record("cpu_percent", self._process.cpu_percent(None), now)
+            except Exception as e:
+                logger.error(f"Error sampling telemetry: {e}")
+
+
+# Module-level store shared by the brain (created on first use)
+_store = None
+_sampler = None
+
+
+def get_store():
+    """Get the shared telemetry store, creating it on first use"""
+    global _store
+    if _store is None:
+        _store = TelemetryStore()
+    return _store
+
+
+def record(metric, value, timestamp=None):
+    """Record a sample into the shared store, never raising"""
+    try:
+        return get_store().record(metric, value, timestamp)
+    except Exception as e:
+        logger.error(f"Error recording telemetry: {e}")
+        return False
+
+
+def start_sampler(interval=1.0):
+    """Start the shared background RSS/CPU sampler"""
+    global _sampler
+    try:
+        if _sampler is None:
+            _sampler = TelemetrySampler(get_store(), interval)
+        return _sampler.start()
+    except Exception as e:
+        logger.error(f"Error starting telemetry sampler: {e}")
+        return False
+
+
+def stop():
+    """Stop the sampler and flush the shared store"""
+    global _sampler, _store
+    try:
+        if _sampler is not None:
+            _sampler.stop()
+            _sampler = None
+        if _store is not None:
+            _store.close()
+            _store = None
+        return True
+    except Exception as e:
+        logger.error(f"Error stopping telemetry: {e}")
+        return False
+
+
+# Readers
+def read_header(path):
+    """Read (step, slots, metrics) from an archive file"""
+    with open(path, 'rb') as f:
+        magic, version, _, step, slots, count = struct.unpack(HEADER_FORMAT, f.read(HEADER_SIZE))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a DETROIT telemetry archive: {path}")
+        metrics = tuple(f.read(NAME_SIZE).rstrip(b"\0").decode() for _ in range(count))
+    return step, slots, metrics
+
+
+def read_archive(path):
+    """Memory-map an archive and return (timestamps, {metric: (avg, min, max)})
+
+    Rows are returned in time order with unused slots removed. The arrays are
+    views into a read-only numpy.memmap, so opening a large archive is cheap.
+    """
+    import numpy as np
+
+    step, slots, metrics = read_header(path)
+    count = len(metrics)
+    rows = np.memmap(path, dtype='<f8', mode='r', offset=_data_offset(count), shape=(slots, 1 + 3 * count))
+    timestamps = rows[:, 0]
+    order = np.argsort(timestamps)
+    order = order[~np.isnan(timestamps[order])]
+    ordered = rows[order]
+    series = {}
+    for i, name in enumerate(metrics):
+        series[name] = (ordered[:, 1 + i], ordered[:, 1 + count + i], ordered[:, 1 + 2 * count + i])
+    return ordered[:, 0], series
+
+
+def _sparkline(values):
+    """Render values as a one-line text chart"""
+    blocks = " .:-=+*#%@"
+    finite = [v for v in values if v == v]
+    if not finite:
+        return ""
+    low, high = min(finite), max(finite)
+    span = (high - low) or 1.0
+    return "".join(" " if v != v else blocks[int((v - low) / span * (len(blocks) - 1))] for v in values)
+
+
+def main():
+    """Print or plot trends from the telemetry archives"""
+    parser = argparse.ArgumentParser(description="DETROIT telemetry history")
+    parser.add_argument("action", choices=["print", "plot"], help="Print a table or plot trends")
+    parser.add_argument("--resolution", choices=sorted(ARCHIVES), default="1m", help="Archive to read")
+    parser.add_argument("--metric", action="append", help="Metric to show (repeatable, default all)")
+    parser.add_argument("--last", type=int, default=60, help="Number of most recent points to show")
+    parser.add_argument("--dir", default=TELEMETRY_DIR, help="Telemetry directory")
+    args = parser.parse_args()
+
+    path = archive_path(args.resolution, args.dir)
+    if not os.path.exists(path):
+        print(f"No telemetry archive found at {path}")
+        return 1
+
+    timestamps, series = read_archive(path)
+    metrics = args.metric or list(series)
+    unknown = [m for m in metrics if m not in series]
+    if unknown:
+        print(f"Unknown metric(s): {', '.join(unknown)}. Available: {', '.join(series)}")
+        return 1
+    timestamps = timestamps[-args.last:]
+    series = {m: tuple(a[-args.last:] for a in series[m]) for m in metrics}
+
+    if args.action == "print":
+        print("time                 " + "".join(f"{m:>24}" for m in metrics))
+        for row, t in enumerate(timestamps):
+            cells = "".join(
+                f"{series[m][0][row]:.2f} [{series[m][1][row]:.1f}-{series[m][2][row]:.1f}]".rjust(24)
+                for m in metrics
+            )
+            print(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t)) + cells)
+        return 0
+
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError:
+        # Fall back to text sparklines when matplotlib is not installed
+        for m in metrics:
+            avg = series[m][0]
+            finite = [v for v in avg if v == v]
+            summary = f"min {min(finite):.2f} max {max(finite):.2f}" if finite else "no data"
+            print(f"{m:>12} |{_sparkline(list(avg))}| {summary}")
+        return 0
+
+    import datetime
+    times = [datetime.datetime.fromtimestamp(t) for t in timestamps]
+    fig, axes = plt.subplots(len(metrics), 1, sharex=True, squeeze=False)
+    for axis, m in zip(axes[:, 0], metrics):
+        avg, low, high = series[m]
+        axis.plot(times, avg, label=f"{m} avg")
+        axis.fill_between(times, low, high, alpha=0.3, label="min-max")
+        axis.set_ylabel(m)
+        axis.legend(loc="upper left")
+    fig.suptitle(f"DETROIT telemetry ({args.resolution} resolution)")
+    plt.show()
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    sys.exit(main())
+
+__all__ = ['TelemetryStore', 'TelemetrySampler', 'RoundRobinArchive', 'read_archive',
+           'record', 'start_sampler', 'stop', 'get_store']
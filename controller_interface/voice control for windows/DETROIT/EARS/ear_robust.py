@@ -39,6 +39,7 @@ SUCCESS_MESSAGE = "DETROIT EARS module started successfully. Waiting for voice c
 # Path to sound files
 WAKE_SOUND_PATH = r"/home/jaideepchouhan/pythonProjects/DETROIT/VOCAL_CORDS/SOUNDS/nakime_biwa_sound.mp3"
 EXIT_SOUND_PATH = r"/home/jaideepchouhan/pythonProjects/DETROIT/VOCAL_CORDS/SOUNDS/no_like_rain.mp3"
+EXIT_SOUND_MAX_WAIT = 1.0  # seconds the exit sound may delay shutdown
 
 # Initialize sound mixer - using try/except to handle potential initialization failures
 try:
@@ -338,7 +339,9 @@ def main_loop(output_file):
                     mixer.music.load(EXIT_SOUND_PATH)
                     mixer.music.play()
                     # Wait for the sound to finish (but not too long)
-                    time.sleep(2.5)
+                    deadline = time.monotonic() + EXIT_SOUND_MAX_WAIT
+                    while mixer.music.get_busy() and time.monotonic() < deadline:
+                        time.sleep(0.05)
                 
                 # Then clean up
                 mixer.music.stop()
@@ -14,6 +14,9 @@ import logging
 import time
 import sys
 
+import ipc  # Supervisor heartbeat channel (EARS/ipc.py)
+import estop  # Emergency stop fast lane (EARS/estop.py)
+
 # Basic logging setup
 logging.basicConfig(
     level=logging.INFO,
@@ -27,6 +30,7 @@ logger = logging.getLogger("DETROIT.EARS")
 
 # Global variables
 OUTPUT_FILE = None
+ESTOP_PORT = None  # UDP port of the brain's emergency stop listener, None to disable
 
 # Load the wake words configuration
 config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
@@ -217,6 +221,22 @@ def select_microphone():
         # Return None instead of an error string - this will make the code use the default device
         return None
 
+def check_emergency_stop(audio_end, recognizer=None, audio=None, text=None):
+    """Send an emergency stop straight to the brain if a stop word was heard
+    
+    Checks captured audio with offline keyword spotting, or a transcript.
+    """
+    if ESTOP_PORT is None:
+        return False
+    if audio is not None:
+        word = estop.spot_stop_word(recognizer, audio)
+    else:
+        word = estop.match_stop_word(text)
+    if word:
+        print(f"Emergency stop: '{word}'")
+        return estop.send_stop(word, audio_end, port=ESTOP_PORT)
+    return False
+
 def listen_for_speech(recognizer, mic_index=None):
     """Listen for speech and convert to text"""
     try:
@@ -256,16 +276,22 @@ def listen_for_speech(recognizer, mic_index=None):
             # Listen for audio with timeout
             try:
                 audio = recognizer.listen(source, timeout=5, phrase_time_limit=10)
+                audio_end = time.time()
                 print("Processing...")
             except Exception as listen_err:
                 print(f"Error listening: {listen_err}")
                 logger.error(f"Error during listening: {listen_err}")
                 return None
             
+            # Stop words are spotted locally before the round trip to the cloud
+            stop_sent = check_emergency_stop(audio_end, recognizer=recognizer, audio=audio)
+            
             # Try to recognize speech with Google (most reliable)
             try:
                 text = recognizer.recognize_google(audio)
                 print(f"Recognized: {text}")
+                if not stop_sent:
+                    check_emergency_stop(audio_end, text=text)
                 return text.lower()
             except sr.UnknownValueError:
                 # Speech was unintelligible
@@ -284,6 +310,8 @@ def listen_for_speech(recognizer, mic_index=None):
                         print("Trying offline recognition with Sphinx...")
                         text = recognizer.recognize_sphinx(audio)
                         print(f"Recognized with Sphinx: {text}")
+                        if not stop_sent:
+                            check_emergency_stop(audio_end, text=text)
                         return text.lower()
                 except:
                     # If offline recognition also fails, return None
@@ -360,7 +388,15 @@ def main():
     parser.add_argument("--output", help="Output file for results")
     parser.add_argument("--always-active", action="store_true", 
                       help="Always stay in active mode after wake word")
+    parser.add_argument("--supervised", action="store_true",
+                      help="Answer heartbeats from the DETROIT supervisor on stdin/stdout")
+    parser.add_argument("--estop-port", type=int,
+                      help="Send spoken stop words to the brain's emergency stop listener on this UDP port")
     args = parser.parse_args()
+    global ESTOP_PORT
+    ESTOP_PORT = args.estop_port
+    if args.supervised:
+        ipc.start_responder()
     # Set output file
     global OUTPUT_FILE
     if args.output:
@@ -379,9 +415,12 @@ def main():
     # Current state
     active_mode = False
     always_active = args.always_active
-    print("Say something! (Exit with 'quit', 'exit', or 'stop')")
+    print("Say something! (Exit with 'quit' or 'exit'; 'stop' halts the robot)")
     print("Starting speech recognition - waiting for wake word...")
     logger.info(f"Speech recognition started with wake words: {', '.join(WAKE_WORDS)}")
+    if args.supervised:
+        # Tell the brain we are listening (replaces its fixed startup sleep)
+        ipc.send("ready", mic_index=mic_index)
     
     try:
         crash_count = 0
@@ -390,9 +429,15 @@ def main():
             try:
                 # Listen for speech
                 text = listen_for_speech(recognizer, mic_index)
+                ipc.mark_progress()
                 
-                # Check for exit commands
-                if text and ("quit" in text or "exit" in text or "stop" in text):
+                # Check for exit commands ("stop" halts the legs and is handled above)
+                if text and ("quit" in text or "exit" in text):
+                    if args.supervised:
+                        # The brain decides when to shut down; exiting here would only trigger a restart
+                        print("Exit command detected. Forwarding to the brain...")
+                        write_result_to_file(text)
+                        continue
                     print("Exit command detected. Stopping...")
                     break
                 
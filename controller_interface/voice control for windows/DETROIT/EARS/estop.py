@@ -0,0 +1,266 @@
+"""
+Emergency Stop Fast Lane for DETROIT EARS
+=========================================
+A dedicated path from a spoken "stop" or "halt" to the robot's serial link.
+
+The ear checks every captured utterance for a stop word before anything else:
+first with local keyword spotting on the audio (PocketSphinx, no network),
+then on the transcript as soon as one arrives. A match is sent as a single UDP
+datagram to the brain, where an EStopListener thread writes the stand command
+straight to the serial port. The comm file, its 0.5 s poll and the
+process_speech_text chain are bypassed entirely.
+
+Each datagram carries the time the utterance's audio ended, so the brain can
+measure word-end-to-serial-write latency (target: under 250 ms). The keyword
+spotting decode runs after that time on the ear, so the benchmark only covers
+the whole budget when it is given recordings of a stop word to decode.
+
+Benchmark usage (needs pyserial and a POSIX pty; --audio needs SpeechRecognition
+and PocketSphinx):
+    python estop.py --benchmark --count 200
+    python estop.py --benchmark --audio stop1.wav stop2.wav
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import argparse
+import threading
+from collections import deque
+
+logger = logging.getLogger('DETROIT.EARS.ESTOP')
+
+ESTOP_HOST = "127.0.0.1"
+ESTOP_PORT = 47615
+STOP_WORDS = ("stop", "halt", "freeze")
+SPOTTING_THRESHOLD = 1e-20        # PocketSphinx keyword threshold (lower = more sensitive)
+LATENCY_BUDGET_MS = 250.0
+
+_sphinx_available = None
+_sequence = 0
+
+
+def match_stop_word(text):
+    """Find a stop word in a transcript (or partial transcript)
+
+    "stop listening" is an ear mode switch, not an emergency stop.
+    """
+    if not text:
+        return None
+    words = text.lower().replace("stop listening", "").split()
+    for word in STOP_WORDS:
+        if word in words:
+            return word
+    return None
+
+
+def spot_stop_word(recognizer, audio):
+    """Look for a stop word in captured audio with offline keyword spotting
+
+    Returns:
+        str: The spotted stop word, or None (also when PocketSphinx is unavailable)
+    """
+    global _sphinx_available
+    if _sphinx_available is False:
+        return None
+    try:
+        text = recognizer.recognize_sphinx(audio, keyword_entries=[(word, SPOTTING_THRESHOLD) for word in STOP_WORDS])
+        _sphinx_available = True
+    except Exception as e:
+        # UnknownValueError means nothing was spotted; RequestError means no PocketSphinx
+        if type(e).__name__ == "RequestError":
+            logger.warning(f"Offline keyword spotting unavailable, using transcripts only: {e}")
+            _sphinx_available = False
+        return None
+    return match_stop_word(text)
+
+
+def send_stop(word, audio_end, host=ESTOP_HOST, port=ESTOP_PORT):
+    """Send an emergency stop datagram to the brain
+
+    Args:
+        word (str): The stop word that was heard
+        audio_end (float): time.time() when the utterance's audio ended
+    """
+    global _sequence
+    _sequence += 1
+    message = {"type": "estop", "word": word, "seq": _sequence, "pid": os.getpid(),
+               "audio_end": audio_end, "sent_at": time.time()}
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(json.dumps(message).encode("utf-8"), (host, port))
+        logger.info(f"Emergency stop sent ('{word}')")
+        return True
+    except Exception as e:
+        logger.error(f"Error sending emergency stop: {e}")
+        return False
+
+
+class EStopListener:
+    """Receives emergency stop datagrams and acts on them immediately
+
+    Args:
+        on_stop (callable): Called with the message dict on the listener thread;
+            it should write the stop to the serial link and return quickly
+    """
+
+    def __init__(self, on_stop, host=ESTOP_HOST, port=ESTOP_PORT):
+        self.on_stop = on_stop
+        self.host = host
+        self.port = port
+        self.latencies_ms = deque(maxlen=200)
+        self._socket = None
+        self._thread = None
+        self._running = False
+        self._last_seq = {}   # sender pid -> last sequence number handled
+
+    def start(self):
+        """Bind the UDP socket and start listening"""
+        if self._running:
+            return True
+        try:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._socket.bind((self.host, self.port))
+        except OSError as e:
+            logger.error(f"Could not bind emergency stop listener on {self.host}:{self.port}: {e}")
+            self._socket = None
+            return False
+        self.port = self._socket.getsockname()[1]
+        self._running = True
+        self._thread = threading.Thread(target=self._listen_loop, name="estop-listener")
+        self._thread.daemon = True
+        self._thread.start()
+        logger.info(f"Emergency stop listener on {self.host}:{self.port}")
+        return True
+
+    def _listen_loop(self):
+        while self._running:
+            try:
+                data, _ = self._socket.recvfrom(1024)
+            except OSError:
+                break
+            try:
+                message = json.loads(data.decode("utf-8"))
+            except ValueError:
+                continue
+            if message.get("type") != "estop":
+                continue
+            pid, seq = message.get("pid"), message.get("seq", 0)
+            if seq <= self._last_seq.get(pid, 0):
+                continue
+            self._last_seq[pid] = seq
+            try:
+                self.on_stop(message)
+            except Exception as e:
+                logger.error(f"Emergency stop handler failed: {e}")
+                continue
+            if message.get("audio_end"):
+                latency = (time.time() - message["audio_end"]) * 1000
+                self.latencies_ms.append(latency)
+                if latency > LATENCY_BUDGET_MS:
+                    logger.warning(f"Emergency stop took {latency:.0f} ms from word end to serial write")
+                else:
+                    logger.info(f"Emergency stop ('{message.get('word')}') in {latency:.0f} ms")
+
+    def stop(self):
+        """Close the socket and stop listening"""
+        self._running = False
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+        return True
+
+
+def time_spotting(paths, repeats=3):
+    """Time the keyword spotting decode on recorded utterances
+
+    Returns:
+        list: (path, spotted word, best decode milliseconds), or None when
+        SpeechRecognition or PocketSphinx is unavailable
+    """
+    try:
+        import speech_recognition as sr
+    except ImportError:
+        return None
+    recognizer = sr.Recognizer()
+    results = []
+    for path in paths:
+        with sr.AudioFile(path) as source:
+            audio = recognizer.record(source)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            word = spot_stop_word(recognizer, audio)
+            timings.append((time.perf_counter() - start) * 1000)
+            if _sphinx_available is False:
+                return None
+        results.append((path, word, min(timings)))
+    return results
+
+
+def benchmark(count=200, audio=None):
+    """Measure datagram-to-serial-write latency against the firmware loopback
+
+    With recordings, the keyword spotting decode is timed too and added to
+    the datagram path for the word-end-to-serial-write figure.
+    """
+    parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.append(os.path.join(parent_dir, 'LEGS'))
+    from loopback import FirmwareLoopback
+    from motion_bridge import MotionBridge
+
+    loopback = FirmwareLoopback()
+    bridge = MotionBridge(loopback.start())
+    if not bridge.open():
+        return 1
+    listener = EStopListener(lambda message: bridge.emergency_stop(), port=0)
+    listener.start()
+    try:
+        for _ in range(count):
+            send_stop("stop", time.time(), port=listener.port)
+            time.sleep(0.005)
+        time.sleep(0.2)
+    finally:
+        listener.stop()
+        bridge.close(stand=False)
+        loopback.stop()
+
+    latencies = sorted(listener.latencies_ms)
+    if not latencies:
+        print("No emergency stops were received")
+        return 1
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+    print(f"{len(latencies)} stops: p50 {p(0.5):.2f} ms, p99 {p(0.99):.2f} ms, max {latencies[-1]:.2f} ms "
+          f"from datagram to serial write")
+    spotting = time_spotting(audio) if audio else None
+    if not spotting:
+        reason = "SpeechRecognition or PocketSphinx is unavailable" if audio else "no --audio recordings given"
+        print(f"Keyword spotting was not timed ({reason}): the {LATENCY_BUDGET_MS:.0f} ms word-end-to-serial "
+              f"budget is unverified")
+        return 0
+    for path, word, decode_ms in spotting:
+        print(f"{os.path.basename(path)}: spotted {word!r} in {decode_ms:.1f} ms")
+    worst = max(decode_ms for _, _, decode_ms in spotting) + p(0.99)
+    print(f"Word end to serial write: {worst:.1f} ms worst case (budget {LATENCY_BUDGET_MS:.0f} ms, "
+          f"{'within' if worst <= LATENCY_BUDGET_MS else 'OVER'})")
+    return 0 if worst <= LATENCY_BUDGET_MS else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="DETROIT emergency stop fast lane")
+    parser.add_argument("--benchmark", action="store_true", help="Measure datagram-to-serial latency")
+    parser.add_argument("--count", type=int, default=200, help="Number of stops to send")
+    parser.add_argument("--audio", nargs="+", help="Recordings of a stop word to time keyword spotting on")
+    args = parser.parse_args()
+    if args.benchmark:
+        sys.exit(benchmark(args.count, args.audio))
+    parser.print_help()
+
+__all__ = ['match_stop_word', 'spot_stop_word', 'send_stop', 'time_spotting', 'EStopListener', 'STOP_WORDS', 'ESTOP_PORT']
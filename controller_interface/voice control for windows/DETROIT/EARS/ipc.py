@@ -0,0 +1,98 @@
+"""
+Supervisor IPC Channel for DETROIT EARS
+=======================================
+A tiny line protocol between a supervised ear process and the brain.
+
+Messages are single JSON lines prefixed with MESSAGE_PREFIX. The ear writes
+them to stdout (mixed with its normal console output) and reads requests from
+stdin. The brain's supervisor sends {"type": "ping"} requests and the ear
+answers with {"type": "pong"}, including how long ago its main loop last made
+progress, so a hung recognizer can be told apart from a slow one.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+
+logger = logging.getLogger('DETROIT.EARS.IPC')
+
+MESSAGE_PREFIX = "@@DETROIT "
+
+_write_lock = threading.Lock()
+_last_progress = time.monotonic()
+_responder_thread = None
+
+
+def encode_message(message_type, **fields):
+    """Encode a message as a protocol line (including the newline)"""
+    fields["type"] = message_type
+    return MESSAGE_PREFIX + json.dumps(fields) + "\n"
+
+
+def parse_message(line):
+    """Parse a protocol line, returning the message dict or None for console output"""
+    index = line.find(MESSAGE_PREFIX)
+    if index < 0:
+        return None
+    try:
+        message = json.loads(line[index + len(MESSAGE_PREFIX):])
+        return message if isinstance(message, dict) and "type" in message else None
+    except json.JSONDecodeError:
+        return None
+
+
+def send(message_type, stream=None, **fields):
+    """Send a message to the supervisor over stdout"""
+    stream = stream or sys.stdout
+    try:
+        with _write_lock:
+            stream.write(encode_message(message_type, **fields))
+            stream.flush()
+        return True
+    except Exception as e:
+        logger.error(f"Error sending IPC message '{message_type}': {e}")
+        return False
+
+
+def mark_progress():
+    """Record that the main loop completed an iteration"""
+    global _last_progress
+    _last_progress = time.monotonic()
+
+
+def loop_age():
+    """Seconds since the main loop last made progress"""
+    return time.monotonic() - _last_progress
+
+
+def _respond_loop(exit_on_eof):
+    """Answer supervisor requests read from stdin"""
+    for line in sys.stdin:
+        message = parse_message(line)
+        if not message:
+            continue
+        if message["type"] == "ping":
+            send("pong", seq=message.get("seq"), loop_age=round(loop_age(), 3), pid=os.getpid())
+    # stdin closed: the supervisor is gone, so nobody will ever read our results
+    logger.warning("Supervisor channel closed")
+    if exit_on_eof:
+        os._exit(0)
+
+
+def start_responder(exit_on_eof=True):
+    """Start answering heartbeats on a daemon thread"""
+    global _responder_thread
+    if _responder_thread is not None:
+        return False
+    mark_progress()
+    _responder_thread = threading.Thread(target=_respond_loop, args=(exit_on_eof,), name="ipc-responder")
+    _responder_thread.daemon = True
+    _responder_thread.start()
+    return True
+
+
+__all__ = ['MESSAGE_PREFIX', 'encode_message', 'parse_message', 'send',
+           'mark_progress', 'loop_age', 'start_responder']
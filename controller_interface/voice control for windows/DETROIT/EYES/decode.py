@@ -0,0 +1,211 @@
+"""
+Frame Decoding for DETROIT EYES
+===============================
+Frames from mjpeg.py and relay.py stay compressed; a consumer asks for pixels
+at the scale it needs and only then is the JPEG decoded. Scales 1, 2, 4 and 8
+are done in the DCT domain through PIL's draft mode, so a 1/4 scale decode
+skips most of the IDCT and colour conversion work instead of decoding in
+full and resizing. Asking for mode "L" decodes only the luma channel.
+
+Decoded images are cached per (frame source, frame id, scale, mode); every
+client numbers its frames from 1, so the source keeps two cameras apart.
+When several consumers want the same frame at the same scale, the first one
+decodes and the others wait for and share its result. Cached arrays are
+read-only for that reason; copy one before changing it.
+
+Usage:
+    from decode import get_pixels
+    with client.latest() as frame:
+        gray = get_pixels(frame, scale=4, mode="L")   # (60, 80) uint8 for QVGA
+
+    python decode.py                    # decode cost at each scale, and the cache
+"""
+
+import io
+import time
+import logging
+import argparse
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger('DETROIT.EYES')
+
+SCALES = (1, 2, 4, 8)       # reductions libjpeg can do in the DCT domain
+DEFAULT_CACHE_SIZE = 32
+
+
+def decode(data, scale=1, mode="RGB"):
+    """Decode JPEG bytes at 1/scale of their size
+
+    Args:
+        data (bytes | memoryview): The JPEG
+        scale (int): One of SCALES
+        mode (str): "RGB" or "L" (grayscale)
+
+    Returns:
+        numpy.ndarray: (h, w, 3) or (h, w) uint8 image
+    """
+    from PIL import Image
+
+    if scale not in SCALES:
+        raise ValueError(f"Scale must be one of {SCALES}, got {scale}")
+    image = Image.open(io.BytesIO(data))
+    width, height = image.size
+    if scale > 1 or mode != image.mode:
+        # draft picks the largest DCT reduction that still covers the requested size
+        image.draft(mode, (-(-width // scale), -(-height // scale)))
+    image = image.convert(mode)
+    return np.asarray(image)
+
+
+class DecodeCache:
+    """Decoded frames keyed by (frame source, frame id, scale, mode), least recently used out
+
+    Args:
+        max_entries (int): Decoded images to keep
+    """
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.stats = {"requests": 0, "misses": 0, "waits": 0, "decode_seconds": 0.0}
+        self._entries = OrderedDict()
+        self._pending = {}        # key -> Event set when its decode finishes
+        self._lock = threading.Lock()
+
+    def get(self, frame, scale=1, mode="RGB"):
+        """Pixels of a Frame at the given scale, decoded at most once per key"""
+        key = (frame.source, frame.id, scale, mode)
+        with self._lock:
+            self.stats["requests"] += 1
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    return self._entries[key]
+                event = self._pending.get(key)
+                if event is None:
+                    event = self._pending[key] = threading.Event()
+                    self.stats["misses"] += 1
+                    break
+                self.stats["waits"] += 1
+            # Someone else is decoding this key; use their result
+            event.wait()
+
+        try:
+            start = time.perf_counter()
+            pixels = decode(frame.data, scale, mode)
+            pixels.flags.writeable = False
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stats["decode_seconds"] += elapsed
+                self._entries[key] = pixels
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return pixels
+        finally:
+            with self._lock:
+                del self._pending[key]
+            event.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def summary(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._entries)
+        requests = stats["requests"]
+        stats["hit_rate"] = (requests - stats["misses"]) / requests if requests else 0.0
+        stats["mean_decode_ms"] = stats["decode_seconds"] * 1000 / stats["misses"] if stats["misses"] else 0.0
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """The process-wide decode cache shared by every EYES consumer"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DecodeCache()
+        return _cache
+
+
+def get_pixels(frame, scale=1, mode="RGB"):
+    """Pixels of a Frame through the shared cache"""
+    return get_cache().get(frame, scale, mode)
+
+
+def _benchmark(jpeg, repeats, consumers):
+    from PIL import Image
+    from mjpeg import Frame, BufferPool
+
+    height, width = decode(jpeg).shape[:2]   # also warms up the decoder
+    print(f"JPEG: {len(jpeg)} bytes, {width}x{height}")
+    print(f"{'scale':>5} {'mode':>4} {'size':>9} {'draft ms':>9} {'full+resize ms':>15} {'speedup':>8}")
+    for mode in ("RGB", "L"):
+        for scale in SCALES:
+            start = time.perf_counter()
+            for _ in range(repeats):
+                pixels = decode(jpeg, scale, mode)
+            draft_ms = (time.perf_counter() - start) * 1000 / repeats
+            # The same output the naive way: full decode, then resize
+            start = time.perf_counter()
+            for _ in range(repeats):
+                image = Image.open(io.BytesIO(jpeg)).convert(mode)
+                if scale > 1:
+                    image = image.resize((pixels.shape[1], pixels.shape[0]), Image.BILINEAR)
+                np.asarray(image)
+            naive_ms = (time.perf_counter() - start) * 1000 / repeats
+            size = f"{pixels.shape[1]}x{pixels.shape[0]}"
+            print(f"{scale:>5} {mode:>4} {size:>9} {draft_ms:>9.2f} {naive_ms:>15.2f} {naive_ms / draft_ms:>7.1f}x")
+
+    # Several consumers asking for the same frames at the same time
+    cache = DecodeCache()
+    pool = BufferPool(len(jpeg))
+    frames = []
+    for frame_id in range(1, repeats + 1):
+        buffer = pool.get(len(jpeg))
+        buffer.data[:len(jpeg)] = jpeg
+        frames.append(Frame(frame_id, time.monotonic(), memoryview(buffer.data)[:len(jpeg)], buffer))
+
+    def consume():
+        for frame in frames:
+            cache.get(frame, 4, "L")
+
+    threads = [threading.Thread(target=consume) for _ in range(consumers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = (time.perf_counter() - start) * 1000
+    stats = cache.summary()
+    print(f"{consumers} consumers x {repeats} frames at 1/4 gray: {stats['misses']} decodes, "
+          f"hit rate {stats['hit_rate']:.0%}, {elapsed:.1f} ms total")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DETROIT frame decode benchmark")
+    parser.add_argument("--jpeg", help="JPEG file to decode (default: a synthetic frame)")
+    parser.add_argument("--size", default="320x240", help="Synthetic frame size, e.g. 800x600")
+    parser.add_argument("--repeats", type=int, default=50, help="Decodes per measurement")
+    parser.add_argument("--consumers", type=int, default=4, help="Concurrent consumers in the cache test")
+    args = parser.parse_args()
+
+    if args.jpeg:
+        with open(args.jpeg, 'rb') as f:
+            jpeg = f.read()
+    else:
+        from replay_server import synthetic_jpegs
+
+        width, height = (int(v) for v in args.size.lower().split("x"))
+        jpeg = synthetic_jpegs(2, (width, height))[1]
+    _benchmark(jpeg, args.repeats, args.consumers)
+
+__all__ = ['decode', 'DecodeCache', 'get_cache', 'get_pixels', 'SCALES']
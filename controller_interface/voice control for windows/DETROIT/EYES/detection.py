@@ -0,0 +1,407 @@
+"""
+Object Detection Pipeline for DETROIT EYES
+==========================================
+Runs a CPU object detector on the camera stream in a pool of worker
+processes, so inference never blocks the reader or the voice loop.
+
+Detectors are registered with @register_detector as factories: a factory
+receives the options dict once per worker process and returns a function
+taking JPEG bytes and returning a list of detections
+
+    {"label": str, "confidence": float, "box": (x, y, w, h)}
+
+with boxes in full-frame pixels. Registered here:
+
+    hog     OpenCV's HOG people detector (needs cv2)
+    dnn     An OpenCV DNN SSD model, e.g. MobileNet-SSD (needs cv2 and the
+            model files given as options "model" and "config")
+    blobs   Saturated colour blobs from a 1/4 scale decode; NumPy and Pillow
+            only, and the fallback when a detector's dependencies are missing
+
+Frame skipping follows the detector: the dispatcher hands a worker the
+newest frame only when that worker is free, so a slow detector processes
+every Nth frame and a fast one every frame, and detections are never made
+on a backlog of stale frames. Results are cached by frame id, and latest()
+returns the newest ones immediately.
+
+Usage:
+    python detection.py                                  # synthetic footage (blobs without OpenCV)
+    python detection.py --dir footage/ --detector hog --workers 1 2 4
+"""
+
+import time
+import logging
+import argparse
+import threading
+import importlib.util
+import multiprocessing
+from collections import OrderedDict, deque
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+logger = logging.getLogger('DETROIT.EYES')
+
+DEFAULT_DETECTOR = "hog"
+FALLBACK_DETECTOR = "blobs"
+DEFAULT_WORKERS = 2
+RESULT_HISTORY = 64      # frames whose detections stay available through result_for()
+STATS_WINDOW = 5.0       # seconds of history behind the rate and latency figures
+
+VOC_LABELS = ["background", "aeroplane", "bicycle", "bird", "boat", "bottle", "bus", "car", "cat", "chair",
+              "cow", "diningtable", "dog", "horse", "motorbike", "person", "pottedplant", "sheep", "sofa",
+              "train", "tvmonitor"]
+
+_detectors = {}
+
+
+def register_detector(name, requires=()):
+    """Decorator registering a detector factory under a name
+
+    Args:
+        name (str): Detector name used in config and on the command line
+        requires (tuple): Modules the detector needs; without them the pipeline falls back
+    """
+    def decorator(factory):
+        _detectors[name] = (factory, tuple(requires))
+        return factory
+    return decorator
+
+
+def list_detectors():
+    """Names of the registered detectors"""
+    return list(_detectors)
+
+
+def detector_available(name):
+    if name not in _detectors:
+        return False
+    return all(importlib.util.find_spec(module) is not None for module in _detectors[name][1])
+
+
+@register_detector("hog", requires=("cv2",))
+def _hog_detector(options):
+    import cv2
+
+    hog = cv2.HOGDescriptor()
+    hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+    stride = int(options.get("stride", 8))
+    threshold = float(options.get("threshold", 0.3))
+
+    def detect(jpeg):
+        image = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        boxes, weights = hog.detectMultiScale(image, winStride=(stride, stride), padding=(8, 8), scale=1.05)
+        return [{"label": "person", "confidence": float(weight), "box": tuple(int(v) for v in box)}
+                for box, weight in zip(boxes, np.ravel(weights)) if weight >= threshold]
+    return detect
+
+
+@register_detector("dnn", requires=("cv2",))
+def _dnn_detector(options):
+    import cv2
+
+    if not options.get("model"):
+        raise ValueError("The dnn detector needs a 'model' option (and usually 'config')")
+    net = cv2.dnn.readNet(options["model"], options.get("config", ""))
+    labels = options.get("labels") or VOC_LABELS
+    size = int(options.get("size", 300))
+    threshold = float(options.get("threshold", 0.5))
+
+    def detect(jpeg):
+        image = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+        height, width = image.shape[:2]
+        net.setInput(cv2.dnn.blobFromImage(image, 0.007843, (size, size), 127.5))
+        output = net.forward().reshape(-1, 7)
+        detections = []
+        for _, class_id, confidence, x1, y1, x2, y2 in output:
+            if confidence < threshold:
+                continue
+            class_id = int(class_id)
+            x, y = int(x1 * width), int(y1 * height)
+            detections.append({"label": labels[class_id] if class_id < len(labels) else str(class_id),
+                               "confidence": float(confidence),
+                               "box": (x, y, int(x2 * width) - x, int(y2 * height) - y)})
+        return detections
+    return detect
+
+
+def _runs(flags):
+    """(start, stop) index pairs of the True runs in a 1-D bool array"""
+    edges = np.diff(np.concatenate(([0], flags.astype(np.int8), [0])))
+    return zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1))
+
+
+def _colour_name(rgb):
+    import colorsys
+
+    hue, saturation, value = colorsys.rgb_to_hsv(*(c / 255.0 for c in rgb))
+    names = ["red", "orange", "yellow", "green", "cyan", "blue", "purple", "pink", "red"]
+    bounds = [0.04, 0.11, 0.18, 0.45, 0.54, 0.72, 0.82, 0.95, 1.01]
+    return names[next(i for i, bound in enumerate(bounds) if hue < bound)]
+
+
+@register_detector("blobs", requires=("PIL",))
+def _blob_detector(options):
+    from decode import decode
+
+    scale = int(options.get("scale", 4))
+    saturation = int(options.get("saturation", 80))
+    min_area = int(options.get("min_area", 12))   # in decoded pixels
+
+    def detect(jpeg):
+        rgb = decode(jpeg, scale, "RGB").astype(np.int16)
+        spread = rgb.max(axis=2) - rgb.min(axis=2)
+        mask = (spread > saturation) & (rgb.max(axis=2) > 60)
+        detections = []
+        # Split on empty columns, then on empty rows inside each column band
+        for left, right in _runs(mask.any(axis=0)):
+            band = mask[:, left:right]
+            for top, bottom in _runs(band.any(axis=1)):
+                region = band[top:bottom]
+                area = int(region.sum())
+                if area < min_area:
+                    continue
+                mean = rgb[top:bottom, left:right][region].mean(axis=0)
+                detections.append({"label": f"{_colour_name(mean)} object",
+                                   "confidence": round(area / region.size, 3),
+                                   "box": (int(left * scale), int(top * scale), int((right - left) * scale),
+                                           int((bottom - top) * scale))})
+        return detections
+    return detect
+
+
+_worker_detect = None
+
+
+def _init_worker(name, options):
+    global _worker_detect
+    _worker_detect = _detectors[name][0](options)
+
+
+def _run_detector(jpeg):
+    start = time.perf_counter()
+    detections = _worker_detect(jpeg)
+    return detections, time.perf_counter() - start
+
+
+class DetectionPipeline:
+    """Detections for the newest camera frames, computed in worker processes
+
+    Args:
+        client (MJPEGClient): Frame source (anything with wait_frame(after_id, timeout))
+        detector (str): Registered detector name
+        workers (int): Worker processes
+        options (dict): Passed to the detector factory
+        max_fps (float): Upper bound on frames processed per second; None for
+            as many as the workers can take
+    """
+
+    def __init__(self, client, detector=DEFAULT_DETECTOR, workers=DEFAULT_WORKERS, options=None, max_fps=None):
+        self.client = client
+        self.detector = detector
+        self.workers = max(1, int(workers))
+        self.options = options or {}
+        self.max_fps = max_fps
+        self.stats = {"received": 0, "processed": 0, "skipped": 0, "errors": 0}
+        self._results = OrderedDict()
+        self._latest = None
+        self._in_flight = 0
+        self._history = deque()     # (finished, latency, inference) per processed frame
+        self._condition = threading.Condition()
+        self._executor = None
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        if self._running:
+            return self
+        if not detector_available(self.detector):
+            logger.warning(f"Detector '{self.detector}' is not available here; using '{FALLBACK_DETECTOR}'")
+            self.detector = FALLBACK_DETECTOR
+        # spawn on every platform, as on Windows, so workers never inherit the reader threads
+        self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                             initializer=_init_worker, initargs=(self.detector, self.options))
+        self._running = True
+        self._thread = threading.Thread(target=self._dispatch, name="detection-dispatch")
+        self._thread.daemon = True
+        self._thread.start()
+        logger.info(f"Object detection started: {self.detector} on {self.workers} worker(s)")
+        return self
+
+    def _dispatch(self):
+        last_id = 0
+        next_at = time.monotonic()
+        while self._running:
+            with self._condition:
+                while self._running and self._in_flight >= self.workers:
+                    self._condition.wait(0.5)
+            if not self._running:
+                break
+            if self.max_fps:
+                delay = next_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_at = max(next_at + 1.0 / self.max_fps, time.monotonic())
+            frame = self.client.wait_frame(last_id, timeout=0.5)
+            if frame is None:
+                continue
+            with frame:
+                jpeg = frame.tobytes()   # it is pickled to the worker anyway
+                frame_id, timestamp = frame.id, frame.timestamp
+            with self._condition:
+                self.stats["received"] = frame_id
+                if last_id:
+                    self.stats["skipped"] += frame_id - last_id - 1
+                self._in_flight += 1
+            last_id = frame_id
+            try:
+                future = self._executor.submit(_run_detector, jpeg)
+            except RuntimeError:
+                break   # pool shut down
+            future.add_done_callback(partial(self._finished, frame_id, timestamp))
+
+    def _finished(self, frame_id, timestamp, future):
+        now = time.monotonic()
+        try:
+            detections, inference = future.result()
+        except Exception as e:
+            with self._condition:
+                self._in_flight -= 1
+                self.stats["errors"] += 1
+                self._condition.notify_all()
+            if self._running:
+                logger.error(f"Detector failed on frame {frame_id}: {e}")
+            return
+        result = {"frame_id": frame_id, "timestamp": timestamp, "detections": detections,
+                  "latency": now - timestamp, "inference": inference}
+        with self._condition:
+            self._in_flight -= 1
+            self.stats["processed"] += 1
+            self._results[frame_id] = result
+            while len(self._results) > RESULT_HISTORY:
+                self._results.popitem(last=False)
+            # With several workers results can finish out of order
+            if self._latest is None or frame_id > self._latest["frame_id"]:
+                self._latest = result
+            self._history.append((now, result["latency"], inference))
+            while self._history and now - self._history[0][0] > STATS_WINDOW:
+                self._history.popleft()
+            self._condition.notify_all()
+
+    def reset_stats(self):
+        """Start the counters and the rate window afresh"""
+        with self._condition:
+            for key in ("processed", "skipped", "errors"):
+                self.stats[key] = 0
+            self._history.clear()
+
+    def latest(self):
+        """The newest finished result (frame_id, timestamp, detections, latency, inference), or None"""
+        with self._condition:
+            return self._latest
+
+    def result_for(self, frame_id):
+        """Detections for a recent frame id, or None if it was skipped or has expired"""
+        with self._condition:
+            return self._results.get(frame_id)
+
+    def wait_result(self, after_id=0, timeout=None):
+        """Block until a result newer than after_id is available"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._latest is None or self._latest["frame_id"] <= after_id:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+            return self._latest
+
+    def rates(self):
+        """Processed fps, skip ratio and latency/inference percentiles (ms) over the recent window"""
+        with self._condition:
+            history = list(self._history)
+            stats = dict(self.stats)
+            stats["in_flight"] = self._in_flight
+        fps = (len(history) - 1) / (history[-1][0] - history[0][0]) if len(history) >= 2 else 0.0
+        stats["fps"] = fps
+        seen = stats["processed"] + stats["skipped"]
+        stats["skip_ratio"] = stats["skipped"] / seen if seen else 0.0
+        for key, index in (("latency", 1), ("inference", 2)):
+            values = np.array([entry[index] for entry in history]) * 1000
+            stats[f"{key}_p50_ms"] = float(np.percentile(values, 50)) if len(values) else None
+            stats[f"{key}_p95_ms"] = float(np.percentile(values, 95)) if len(values) else None
+        return stats
+
+    def stop(self):
+        self._running = False
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        return True
+
+
+def benchmark(jpegs, detector, workers, seconds=5.0, fps=25.0, options=None):
+    """Replay footage through the pipeline once per worker count and print the figures"""
+    from mjpeg import MJPEGClient
+    from replay_server import ReplayServer
+
+    print(f"{len(jpegs)} frames replayed at {fps:g} fps, detector {detector}")
+    print(f"{'workers':>7} {'det fps':>8} {'skipped':>8} {'latency p50':>11} {'p95':>7} {'infer p50':>9} "
+          f"{'latest() us':>11}")
+    for count in workers:
+        server = ReplayServer(jpegs, fps).start()
+        client = MJPEGClient(server.url).start()
+        pipeline = DetectionPipeline(client, detector, count, options).start()
+        try:
+            pipeline.wait_result(timeout=30.0)   # worker start-up is not part of the figures
+            pipeline.reset_stats()
+            start = time.monotonic()
+            calls = 0
+            call_time = 0.0
+            while time.monotonic() - start < seconds:
+                before = time.perf_counter()
+                pipeline.latest()
+                call_time += time.perf_counter() - before
+                calls += 1
+                time.sleep(0.01)
+            rates = pipeline.rates()
+        finally:
+            pipeline.stop()
+            client.stop()
+            server.stop()
+        fmt = lambda value: f"{value:.1f}" if value is not None else "-"
+        print(f"{count:>7} {rates['fps']:>8.1f} {rates['skip_ratio']:>8.0%} {fmt(rates['latency_p50_ms']):>9}ms "
+              f"{fmt(rates['latency_p95_ms']):>5}ms {fmt(rates['inference_p50_ms']):>7}ms "
+              f"{call_time / calls * 1e6:>11.2f}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="DETROIT object detection benchmark")
+    parser.add_argument("--dir", help="Directory of recorded JPEG frames (default: synthetic footage)")
+    parser.add_argument("--detector", default=DEFAULT_DETECTOR, choices=list_detectors(), help="Detector")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2], help="Worker counts to compare")
+    parser.add_argument("--fps", type=float, default=25.0, help="Replay frame rate")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Measurement time per worker count")
+    parser.add_argument("--model", help="Model file for the dnn detector")
+    parser.add_argument("--config", help="Model config for the dnn detector")
+    args = parser.parse_args()
+
+    if args.dir:
+        from replay_server import load_jpegs
+
+        footage = load_jpegs(args.dir)
+    else:
+        from replay_server import synthetic_jpegs
+
+        footage = synthetic_jpegs(100)
+    detector_options = {key: value for key, value in (("model", args.model), ("config", args.config)) if value}
+    benchmark(footage, args.detector, args.workers, args.seconds, args.fps, detector_options)
+
+__all__ = ['DetectionPipeline', 'register_detector', 'list_detectors', 'detector_available', 'benchmark',
+           'DEFAULT_DETECTOR', 'FALLBACK_DETECTOR']
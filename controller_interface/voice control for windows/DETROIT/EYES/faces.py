@@ -0,0 +1,489 @@
+"""
+Face Recognition for DETROIT EYES
+=================================
+Face embeddings computed on the CPU and a nearest-neighbour index over them.
+
+Embedders are registered with @register_embedder. A factory receives an
+options dict and returns an Embedder, whose embed() takes an RGB image and
+returns (box, embedding) for every face it finds:
+
+    face_recognition   dlib's 128-d ResNet embedding (needs face_recognition)
+    sface              OpenCV's YuNet detector + SFace embedding (needs cv2 and
+                       the two model files as options "detector_model", "model")
+    pixels             Normalised 32x32 luma of the central region, randomly
+                       projected to 64-d; NumPy and Pillow only. It has no face
+                       detector (Embedder.detects is False): it "finds" a face in
+                       every image, so it is only useful with a face filling the
+                       view and never as an implicit fallback for a robot
+
+FaceIndex stores unit-length embeddings as rows of one contiguous float32
+matrix, so a query is a single matrix-vector product giving the cosine
+similarity to every enrolled face. The index is a file (little endian):
+
+    header   - magic, version, embedding size, capacity, count, embedder
+               name (HEADER_FORMAT), padded to DATA_ALIGN bytes
+    names    - capacity names, NAME_SIZE bytes each, NUL padded
+    vectors  - capacity rows of float32, starting at a DATA_ALIGN boundary
+
+It is opened with mmap, so loading takes the same time for ten faces or ten
+thousand. Adding a face writes one row and then the count; the file doubles
+in capacity when it is full.
+
+Usage:
+    python faces.py bench --count 5000           # query time for 5000 enrolled faces
+    python faces.py enroll --index faces.fidx --name Ada --image ada.jpg
+    python faces.py query --index faces.fidx --image someone.jpg
+"""
+
+import os
+import sys
+import time
+import mmap
+import struct
+import logging
+import argparse
+import threading
+import importlib.util
+
+import numpy as np
+
+logger = logging.getLogger('DETROIT.EYES')
+
+MAGIC = b"DFIX"
+VERSION = 1
+HEADER_FORMAT = "<4sHHIII16s"   # magic, version, reserved, dim, capacity, count, embedder
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+COUNT_OFFSET = struct.calcsize("<4sHHII")
+NAME_SIZE = 48
+DATA_ALIGN = 64
+INITIAL_CAPACITY = 256
+
+DEFAULT_EMBEDDER = "face_recognition"
+FALLBACK_EMBEDDER = "pixels"
+SEEN_INTERVAL = 60.0     # seconds between last_seen updates for the same person
+
+
+class Embedder:
+    """A face embedding model
+
+    Attributes:
+        name (str): Registered name, stored in the index header
+        dim (int): Embedding size
+        threshold (float): Cosine similarity at which two faces are the same person
+        embed (callable): RGB uint8 image -> list of ((x, y, w, h), vector)
+        detects (bool): Whether embed() runs a face detector, so that an empty
+            result means nobody is in view
+    """
+
+    def __init__(self, name, dim, threshold, embed, detects=True):
+        self.name = name
+        self.dim = dim
+        self.threshold = threshold
+        self.embed = embed
+        self.detects = detects
+
+
+_embedders = {}
+
+
+def register_embedder(name, requires=()):
+    """Decorator registering an embedder factory under a name"""
+    def decorator(factory):
+        _embedders[name] = (factory, tuple(requires))
+        return factory
+    return decorator
+
+
+def embedder_available(name):
+    if name not in _embedders:
+        return False
+    return all(importlib.util.find_spec(module) is not None for module in _embedders[name][1])
+
+
+def make_embedder(name=DEFAULT_EMBEDDER, options=None, fallback=FALLBACK_EMBEDDER):
+    """Build a registered embedder
+
+    Without its dependencies the `fallback` embedder is built instead, or None
+    is returned when fallback is None.
+    """
+    if not embedder_available(name):
+        if fallback is None:
+            logger.warning(f"Face embedder '{name}' is not available here")
+            return None
+        logger.warning(f"Face embedder '{name}' is not available here; using '{fallback}'")
+        name = fallback
+    return _embedders[name][0](options or {})
+
+
+@register_embedder("face_recognition", requires=("face_recognition",))
+def _dlib_embedder(options):
+    import face_recognition
+
+    model = options.get("model", "hog")
+
+    def embed(rgb):
+        locations = face_recognition.face_locations(rgb, model=model)
+        vectors = face_recognition.face_encodings(rgb, locations)
+        # face_locations gives (top, right, bottom, left)
+        return [((left, top, right - left, bottom - top), vector)
+                for (top, right, bottom, left), vector in zip(locations, vectors)]
+    # dlib's usual 0.6 euclidean distance between near-unit vectors
+    return Embedder("face_recognition", 128, 0.82, embed)
+
+
+@register_embedder("sface", requires=("cv2",))
+def _sface_embedder(options):
+    import cv2
+
+    if not options.get("detector_model") or not options.get("model"):
+        raise ValueError("The sface embedder needs 'detector_model' (YuNet) and 'model' (SFace) options")
+    detector = cv2.FaceDetectorYN.create(options["detector_model"], "", (320, 240))
+    recognizer = cv2.FaceRecognizerSF.create(options["model"], "")
+
+    def embed(rgb):
+        image = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+        detector.setInputSize((image.shape[1], image.shape[0]))
+        _, faces = detector.detect(image)
+        results = []
+        for face in faces if faces is not None else []:
+            aligned = recognizer.alignCrop(image, face)
+            vector = recognizer.feature(aligned).ravel()
+            results.append((tuple(int(v) for v in face[:4]), vector))
+        return results
+    return Embedder("sface", 128, 0.363, embed)
+
+
+@register_embedder("pixels", requires=("PIL",))
+def _pixel_embedder(options):
+    from PIL import Image
+
+    size = int(options.get("size", 32))
+    dim = int(options.get("dim", 64))
+    # A fixed projection so embeddings stay comparable across runs
+    projection = np.random.default_rng(1234).standard_normal((size * size, dim)).astype(np.float32)
+
+    def embed(rgb):
+        height, width = rgb.shape[:2]
+        side = int(min(height, width) * 0.8)
+        left, top = (width - side) // 2, (height - side) // 2
+        crop = Image.fromarray(np.ascontiguousarray(rgb[top:top + side, left:left + side])).convert("L")
+        pixels = np.asarray(crop.resize((size, size), Image.BILINEAR), dtype=np.float32).ravel()
+        pixels -= pixels.mean()
+        pixels /= pixels.std() + 1e-6
+        return [((left, top, side, side), pixels @ projection)]
+    return Embedder("pixels", dim, 0.9, embed, detects=False)
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _data_offsets(capacity):
+    names_offset = -(-HEADER_SIZE // DATA_ALIGN) * DATA_ALIGN
+    vectors_offset = -(-(names_offset + capacity * NAME_SIZE) // DATA_ALIGN) * DATA_ALIGN
+    return names_offset, vectors_offset
+
+
+class FaceIndex:
+    """Enrolled face embeddings in a memory-mapped file
+
+    Args:
+        path (str): Index file, created if missing
+        dim (int): Embedding size (only needed when creating the file)
+        embedder (str): Embedder name recorded in a new file and checked on open
+    """
+
+    def __init__(self, path, dim=128, embedder=""):
+        self.path = path
+        self._lock = threading.RLock()
+        self._file = None
+        self._map = None
+        if not os.path.exists(path):
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._create(path, dim, INITIAL_CAPACITY, embedder)
+        self._open()
+        if embedder and self.embedder and embedder != self.embedder:
+            raise ValueError(f"{path} holds '{self.embedder}' embeddings, not '{embedder}'")
+        if self.dim != dim and embedder:
+            raise ValueError(f"{path} holds {self.dim}-d embeddings, not {dim}-d")
+
+    @staticmethod
+    def _create(path, dim, capacity, embedder, names=None, vectors=None):
+        _, vectors_offset = _data_offsets(capacity)
+        count = 0 if vectors is None else len(vectors)
+        with open(path, 'wb') as f:
+            f.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, 0, dim, capacity, count,
+                                embedder.encode("utf-8")[:16]))
+            f.truncate(vectors_offset + capacity * dim * 4)
+        if count:
+            with open(path, 'r+b') as f:
+                names_offset, _ = _data_offsets(capacity)
+                f.seek(names_offset)
+                f.write(np.asarray(names, dtype=f"S{NAME_SIZE}").tobytes())
+                f.seek(vectors_offset)
+                f.write(np.ascontiguousarray(vectors, dtype='<f4').tobytes())
+
+    def _open(self):
+        self._file = open(self.path, 'r+b')
+        magic, version, _, dim, capacity, count, embedder = struct.unpack(HEADER_FORMAT,
+                                                                          self._file.read(HEADER_SIZE))
+        if magic != MAGIC or version != VERSION:
+            self._file.close()
+            raise ValueError(f"{self.path} is not a face index")
+        self.dim = dim
+        self.capacity = capacity
+        self.embedder = embedder.rstrip(b"\0").decode("utf-8")
+        self._count = count
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        names_offset, vectors_offset = _data_offsets(capacity)
+        self._names = np.ndarray((capacity,), dtype=f"S{NAME_SIZE}", buffer=self._map, offset=names_offset)
+        self._vectors = np.ndarray((capacity, dim), dtype='<f4', buffer=self._map, offset=vectors_offset)
+
+    def _close_map(self):
+        # Views must go before the map can be closed
+        self._names = self._vectors = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def names(self):
+        """Distinct enrolled names"""
+        with self._lock:
+            return sorted({name.decode("utf-8") for name in self._names[:self._count]})
+
+    def _grow(self):
+        count, capacity = self._count, self.capacity * 2
+        names = self._names[:count].copy()
+        vectors = self._vectors[:count].copy()
+        self._close_map()
+        temporary = self.path + ".tmp"
+        self._create(temporary, self.dim, capacity, self.embedder, names, vectors)
+        os.replace(temporary, self.path)
+        self._open()
+
+    def add(self, name, embedding):
+        """Enroll one embedding under a name (a person may have several)
+
+        Returns:
+            int: Row of the new embedding
+        """
+        encoded = name.encode("utf-8")
+        if not encoded or len(encoded) > NAME_SIZE:
+            raise ValueError(f"Names must be 1 to {NAME_SIZE} bytes")
+        vector = _normalize(embedding)
+        if vector.shape != (self.dim,):
+            raise ValueError(f"Expected a {self.dim}-d embedding, got shape {vector.shape}")
+        with self._lock:
+            if self._count == self.capacity:
+                self._grow()
+            row = self._count
+            self._vectors[row] = vector
+            self._names[row] = encoded
+            # Count last, so a crash never exposes a half written row
+            self._count += 1
+            struct.pack_into("<I", self._map, COUNT_OFFSET, self._count)
+            return row
+
+    def remove(self, name):
+        """Forget every embedding of a person; returns how many were removed"""
+        with self._lock:
+            count = self._count
+            keep = self._names[:count] != name.encode("utf-8")
+            removed = count - int(keep.sum())
+            if removed:
+                kept = int(keep.sum())
+                self._vectors[:kept] = self._vectors[:count][keep]
+                self._names[:kept] = self._names[:count][keep]
+                self._count = kept
+                struct.pack_into("<I", self._map, COUNT_OFFSET, kept)
+            return removed
+
+    def query(self, embedding, k=1):
+        """Nearest enrolled faces by cosine similarity
+
+        Returns:
+            list: (name, similarity) pairs, most similar first
+        """
+        vector = _normalize(embedding)
+        with self._lock:
+            count = self._count
+            if count == 0:
+                return []
+            scores = self._vectors[:count] @ vector
+            if k == 1:
+                rows = [int(np.argmax(scores))]
+            else:
+                k = min(k, count)
+                rows = np.argpartition(-scores, k - 1)[:k]
+                rows = rows[np.argsort(-scores[rows])]
+            return [(self._names[row].decode("utf-8"), float(scores[row])) for row in rows]
+
+    def query_batch(self, embeddings):
+        """Best match for each of several embeddings, as (name, similarity) pairs"""
+        vectors = _normalize(np.atleast_2d(embeddings))
+        with self._lock:
+            count = self._count
+            if count == 0:
+                return [(None, 0.0)] * len(vectors)
+            scores = vectors @ self._vectors[:count].T
+            rows = scores.argmax(axis=1)
+            return [(self._names[row].decode("utf-8"), float(scores[i, row])) for i, row in enumerate(rows)]
+
+    def flush(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.flush()
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.flush()
+            self._close_map()
+        return True
+
+
+class FaceRecognizer:
+    """Matches faces in camera images against a FaceIndex
+
+    Args:
+        index (FaceIndex): Enrolled faces
+        embedder (Embedder): Must match the index's embedder
+        on_seen (callable): Called as on_seen(name, similarity) for a match, at
+            most once per SEEN_INTERVAL for the same person
+    """
+
+    def __init__(self, index, embedder, on_seen=None, seen_interval=SEEN_INTERVAL):
+        self.index = index
+        self.embedder = embedder
+        self.on_seen = on_seen
+        self.seen_interval = seen_interval
+        self._last_seen = {}
+
+    def recognize(self, rgb):
+        """Every face in an image with its best match
+
+        Returns:
+            list: dicts with "box", "person" (None when unknown) and "confidence"
+        """
+        faces = self.embedder.embed(rgb)
+        if not faces:
+            return []
+        matches = self.index.query_batch([vector for _, vector in faces])
+        results = []
+        now = time.monotonic()
+        for (box, _), (name, similarity) in zip(faces, matches):
+            known = name is not None and similarity >= self.embedder.threshold
+            results.append({"box": box, "person": name if known else None, "confidence": round(similarity, 3)})
+            if known and self.on_seen and now - self._last_seen.get(name, -self.seen_interval) >= self.seen_interval:
+                self._last_seen[name] = now
+                self.on_seen(name, similarity)
+        return results
+
+    def enroll(self, name, rgb):
+        """Add the largest face in an image under a name; returns False if none was found"""
+        faces = self.embedder.embed(rgb)
+        if not faces:
+            return False
+        box, vector = max(faces, key=lambda face: face[0][2] * face[0][3])
+        self.index.add(name, vector)
+        return True
+
+
+def _load_rgb(path):
+    from PIL import Image
+
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def _benchmark(count, dim, queries):
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.fidx")
+        index = FaceIndex(path, dim, "bench")
+        vectors = _normalize(rng.standard_normal((count, dim)))
+        start = time.perf_counter()
+        for row, vector in enumerate(vectors):
+            index.add(f"person {row // 3}", vector)   # three embeddings per person
+        enroll_ms = (time.perf_counter() - start) * 1000
+        index.close()
+
+        start = time.perf_counter()
+        index = FaceIndex(path, dim, "bench")
+        open_ms = (time.perf_counter() - start) * 1000
+
+        # Noisy copies of enrolled faces
+        rows = rng.integers(0, count, queries)
+        probes = vectors[rows] + 0.05 * rng.standard_normal((queries, dim)).astype(np.float32)
+        index.query(probes[0])   # pages the matrix in
+        timings = np.empty(queries)
+        correct = 0
+        for i, probe in enumerate(probes):
+            start = time.perf_counter()
+            name, similarity = index.query(probe)[0]
+            timings[i] = time.perf_counter() - start
+            correct += name == f"person {rows[i] // 3}"
+        start = time.perf_counter()
+        index.query_batch(probes)
+        batch_us = (time.perf_counter() - start) * 1e6 / queries
+        index.close()
+
+    print(f"{count} faces x {dim}-d ({count * dim * 4 / 1024:.0f} KiB of vectors)")
+    print(f"  enroll     {enroll_ms / count * 1000:.1f} us per face ({count} incremental adds)")
+    print(f"  open       {open_ms:.2f} ms")
+    print(f"  query      p50 {np.percentile(timings, 50) * 1e6:.1f} us, p99 {np.percentile(timings, 99) * 1e6:.1f} us, "
+          f"{correct / queries:.1%} correct")
+    print(f"  batched    {batch_us:.1f} us per query")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="DETROIT face index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("bench", help="Time queries against random embeddings")
+    bench.add_argument("--count", type=int, default=5000, help="Enrolled embeddings")
+    bench.add_argument("--dim", type=int, default=128, help="Embedding size")
+    bench.add_argument("--queries", type=int, default=1000, help="Queries to time")
+    for name in ("enroll", "query", "list"):
+        command = sub.add_parser(name)
+        command.add_argument("--index", required=True, help="Index file")
+        command.add_argument("--embedder", default=DEFAULT_EMBEDDER, help="Embedder name")
+        if name != "list":
+            command.add_argument("--image", required=True, help="Image file")
+        if name == "enroll":
+            command.add_argument("--name", required=True, help="Person's name")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        _benchmark(args.count, args.dim, args.queries)
+        sys.exit(0)
+    embedder = make_embedder(args.embedder)
+    index = FaceIndex(args.index, embedder.dim, embedder.name)
+    try:
+        if args.command == "list":
+            print(f"{len(index)} embeddings: {', '.join(index.names) or 'none'}")
+        elif args.command == "enroll":
+            ok = FaceRecognizer(index, embedder).enroll(args.name, _load_rgb(args.image))
+            print(f"Enrolled {args.name}" if ok else "No face found")
+        else:
+            for face in FaceRecognizer(index, embedder).recognize(_load_rgb(args.image)):
+                print(face)
+    finally:
+        index.close()
+
+__all__ = ['FaceIndex', 'FaceRecognizer', 'Embedder', 'register_embedder', 'embedder_available',
+           'make_embedder', 'DEFAULT_EMBEDDER', 'FALLBACK_EMBEDDER']
@@ -0,0 +1,495 @@
+"""
+MJPEG Stream Client for DETROIT EYES
+====================================
+Reads the ESP32-CAM stream (firmware/esp32_cam/esp32_cam.ino), which sends
+JPEGs as multipart/x-mixed-replace parts:
+
+    --frame\\r\\n
+    Content-Type: image/jpeg\\r\\n
+    Content-Length: <n>\\r\\n
+    \\r\\n
+    <n bytes of JPEG>\\r\\n
+
+The firmware writes these with httpd_resp_send_chunk(), so they arrive in
+HTTP chunked encoding, three chunks per JPEG: the boundary and part headers,
+the JPEG itself, and the trailing CRLF. Chunk boundaries mean nothing to the
+multipart parsing, which sees one continuous stream: the chunk framing is
+stripped on the way in and the payload is received with recv_into straight
+into a pooled bytearray; part headers are located with bytearray.find, and every JPEG is
+handed out as a memoryview slice of the buffer it arrived in, so frame data
+is never copied.
+When a frame is complete the receiver moves on to another buffer from the
+pool, carrying over only the few bytes of the next part already received.
+
+Only the most recent frame is kept: a consumer that falls behind skips
+frames instead of building up lag. Frames are reference counted; a buffer
+returns to the pool once its frame has been replaced and every consumer has
+released it, so hold frames with `with` and copy (frame.tobytes()) anything
+kept longer.
+
+Stats: frames per second, bytes per second, the age of the latest frame and
+how many frames nobody looked at.
+
+Usage:
+    python mjpeg.py --url http://192.168.1.50/stream
+    python mjpeg.py --replay            # against the local replay stand-in
+"""
+
+import time
+import socket
+import logging
+import argparse
+import itertools
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+
+logger = logging.getLogger('DETROIT.EYES')
+
+DEFAULT_BUFFER_SIZE = 256 * 1024   # a QVGA JPEG at quality 12 is 5-20 KiB
+RECV_SIZE = 64 * 1024
+RECONNECT_BACKOFF = (0.5, 5.0)
+STATS_WINDOW = 2.0                 # seconds of history behind the FPS and bytes/s figures
+
+_sources = itertools.count(1)      # BufferPool source tokens, never reused within a process
+
+
+class FrameBuffer:
+    """A reusable receive buffer with a reference count"""
+
+    def __init__(self, pool, size):
+        self.pool = pool
+        self.data = bytearray(size)
+        self.refs = 0
+
+    def release(self):
+        with self.pool.lock:
+            self.refs -= 1
+            if self.refs == 0:
+                self.pool.free.append(self)
+
+
+class BufferPool:
+    """Buffers for the receiver; grows only while consumers hold frames
+
+    Every frame source owns one pool, so the pool's `source` token tells frames
+    from different clients apart even though their ids all start at 1.
+    """
+
+    def __init__(self, size=DEFAULT_BUFFER_SIZE):
+        self.size = size
+        self.source = next(_sources)
+        self.lock = threading.Lock()
+        self.free = []
+        self.allocated = 0
+
+    def get(self, minimum=0):
+        with self.lock:
+            while self.free:
+                buffer = self.free.pop()
+                if len(buffer.data) >= minimum:
+                    buffer.refs = 1
+                    return buffer
+                self.allocated -= 1   # too small for what is coming; let it go
+            self.allocated += 1
+        buffer = FrameBuffer(self, max(self.size, minimum))
+        buffer.refs = 1
+        return buffer
+
+
+class Frame:
+    """One JPEG from the stream, as a view into a pooled buffer
+
+    Attributes:
+        id (int): Sequence number since the client started
+        timestamp (float): time.monotonic() when the last byte arrived
+        data (memoryview): The JPEG bytes (valid until released)
+    """
+
+    __slots__ = ("id", "timestamp", "data", "_buffer", "__weakref__")
+
+    def __init__(self, frame_id, timestamp, data, buffer):
+        self.id = frame_id
+        self.timestamp = timestamp
+        self.data = data
+        self._buffer = buffer
+
+    @property
+    def size(self):
+        return len(self.data)
+
+    @property
+    def source(self):
+        """Token of the client the frame came from; (source, id) is unique in the process"""
+        return self._buffer.pool.source
+
+    @property
+    def age(self):
+        """Seconds since the frame arrived"""
+        return time.monotonic() - self.timestamp
+
+    def acquire(self):
+        with self._buffer.pool.lock:
+            self._buffer.refs += 1
+        return self
+
+    def release(self):
+        self._buffer.release()
+
+    def tobytes(self):
+        """Copy the JPEG out, for keeping it beyond the frame's lifetime"""
+        return bytes(self.data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+class _BodyReader:
+    """Reads the HTTP response body into caller buffers, undoing chunked encoding
+
+    The ESP32's httpd_resp_send_chunk() sends each part as three HTTP chunks
+    (boundary and headers, JPEG, CRLF). The chunk framing is read through a
+    small side buffer and the payloads are received straight into the
+    caller's buffer, so a part may span any number of chunks.
+    """
+
+    def __init__(self, sock, initial, chunked):
+        self.sock = sock
+        self.pending = bytearray(initial)   # received but not yet handed out
+        self.chunked = chunked
+        self.remaining = 0                  # payload bytes left in the current chunk
+        self._after_chunk = False           # a CRLF closing the previous chunk is due
+
+    def _recv_pending(self):
+        more = self.sock.recv(256)
+        if not more:
+            raise ValueError("Camera closed the stream")
+        self.pending += more
+
+    def _next_chunk(self):
+        if self._after_chunk:
+            while len(self.pending) < 2:
+                self._recv_pending()
+            if self.pending[:2] != b"\r\n":
+                raise ValueError("Malformed chunked encoding")
+            del self.pending[:2]
+            self._after_chunk = False
+        while b"\r\n" not in self.pending:
+            self._recv_pending()
+        line_end = self.pending.index(b"\r\n")
+        size = int(bytes(self.pending[:line_end]).split(b";")[0], 16)
+        del self.pending[:line_end + 2]
+        if size == 0:
+            raise ValueError("Camera ended the stream")
+        self.remaining = size
+        self._after_chunk = True
+
+    def read_into(self, view):
+        """Receive up to len(view) body bytes into view; returns the count"""
+        limit = len(view)
+        if self.chunked:
+            while self.remaining == 0:
+                self._next_chunk()
+            limit = min(limit, self.remaining)
+        if self.pending:
+            count = min(limit, len(self.pending))
+            view[:count] = self.pending[:count]
+            del self.pending[:count]
+        else:
+            count = self.sock.recv_into(view, limit)
+            if count == 0:
+                raise ValueError("Camera closed the stream")
+        if self.chunked:
+            self.remaining -= count
+        return count
+
+
+class MJPEGClient:
+    """Background reader for a multipart JPEG stream, keeping only the latest frame
+
+    Args:
+        url (str): Stream URL, e.g. http://<camera>/stream
+        timeout (float): Socket timeout in seconds
+        buffer_size (int): Initial size of each pooled receive buffer
+    """
+
+    def __init__(self, url, timeout=5.0, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.url = url
+        self.timeout = timeout
+        self.pool = BufferPool(buffer_size)
+        self.stats = {"frames": 0, "bytes": 0, "unread": 0, "reconnects": 0, "errors": 0}
+        self.connected = False
+        self._latest = None
+        self._latest_read = True
+        self._next_id = 1
+        self._history = deque()     # (timestamp, bytes) of recent frames
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._socket = None
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="mjpeg-client")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        sock = self._socket
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        with self._condition:
+            if self._latest is not None:
+                self._latest.release()
+                self._latest = None
+        return True
+
+    def latest(self):
+        """The newest frame, acquired for the caller (use it with `with`), or None"""
+        with self._condition:
+            if self._latest is None:
+                return None
+            self._latest_read = True
+            return self._latest.acquire()
+
+    def wait_frame(self, after_id=0, timeout=None):
+        """Block until a frame newer than after_id arrives; returns it acquired, or None"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._latest is None or self._latest.id <= after_id:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0 or not self._running:
+                    return None
+                self._condition.wait(remaining if remaining is not None else 0.5)
+            self._latest_read = True
+            return self._latest.acquire()
+
+    def rates(self):
+        """Frames per second, bytes per second and latest frame age over the recent window"""
+        with self._condition:
+            history = list(self._history)
+            latest = self._latest
+        fps = bps = 0.0
+        if len(history) >= 2:
+            span = history[-1][0] - history[0][0]
+            if span > 0:
+                fps = (len(history) - 1) / span
+                bps = sum(size for _, size in history[1:]) / span
+        return {"fps": fps, "bytes_per_second": bps, "frame_age": latest.age if latest else None,
+                "buffers": self.pool.allocated, **self.stats}
+
+    def _publish(self, frame):
+        with self._condition:
+            previous = self._latest
+            if previous is not None and not self._latest_read:
+                self.stats["unread"] += 1
+            self._latest = frame
+            self._latest_read = False
+            self.stats["frames"] += 1
+            self.stats["bytes"] += frame.size
+            self._history.append((frame.timestamp, frame.size))
+            while self._history and frame.timestamp - self._history[0][0] > STATS_WINDOW:
+                self._history.popleft()
+            self._condition.notify_all()
+        if previous is not None:
+            previous.release()
+
+    def _run(self):
+        backoff = RECONNECT_BACKOFF[0]
+        while self._running:
+            try:
+                self._stream()
+                backoff = RECONNECT_BACKOFF[0]
+            except (OSError, ValueError) as e:
+                if not self._running:
+                    break
+                self.stats["errors"] += 1
+                logger.warning(f"Camera stream error: {e}; reconnecting in {backoff:.1f}s")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, RECONNECT_BACKOFF[1])
+            finally:
+                self.connected = False
+            if self._running:
+                self.stats["reconnects"] += 1
+
+    def _connect(self):
+        """Send the GET request; returns (reader, boundary)"""
+        parts = urlsplit(self.url)
+        sock = socket.create_connection((parts.hostname, parts.port or 80), timeout=self.timeout)
+        self._socket = sock
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        sock.sendall(f"GET {path} HTTP/1.1\r\nHost: {parts.hostname}\r\nConnection: close\r\n\r\n".encode())
+        head = bytearray()
+        while b"\r\n\r\n" not in head:
+            chunk = sock.recv(4096)
+            if not chunk:
+                raise ValueError("Connection closed during the HTTP response")
+            head += chunk
+            if len(head) > 65536:
+                raise ValueError("HTTP response header too long")
+        header_end = head.index(b"\r\n\r\n") + 4
+        lines = head[:header_end].decode("latin-1").split("\r\n")
+        status = lines[0].split()
+        if len(status) < 2 or status[1] != "200":
+            raise ValueError(f"Unexpected response: {lines[0]}")
+        boundary = b"frame"
+        chunked = False
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            name = name.strip().lower()
+            if name == "content-type":
+                for parameter in value.split(";"):
+                    key, _, setting = parameter.strip().partition("=")
+                    if key.lower() == "boundary":
+                        boundary = setting.strip().strip('"').encode()
+            elif name == "transfer-encoding" and "chunked" in value.lower():
+                chunked = True
+        return _BodyReader(sock, head[header_end:], chunked), boundary
+
+    def _stream(self):
+        reader, boundary = self._connect()
+        sock = self._socket
+        self.connected = True
+        logger.info(f"Camera stream connected: {self.url}")
+        marker = b"--" + boundary
+        buffer = self.pool.get()
+        data = buffer.data
+        start = end = 0
+        body_start = body_end = None   # set once a part header has been parsed
+        delimited = False              # part without Content-Length, ended by the next boundary
+        try:
+            while self._running:
+                if body_start is None:
+                    header_end = data.find(b"\r\n\r\n", start, end)
+                    if header_end >= 0:
+                        body_start, body_end = self._parse_part_header(data, start, header_end, marker)
+                        delimited = body_end is None
+                        if body_end is not None and body_end > len(data):
+                            # Frame larger than the buffer: move what we have to a bigger one
+                            buffer, data, start, end, body_start, body_end = self._move(
+                                buffer, start, end, body_start, body_end, body_end - start + RECV_SIZE)
+                        continue
+                elif body_end is None:
+                    found = data.find(marker, body_start, end)
+                    if found >= 0:
+                        body_end = found
+                        continue
+                elif end >= body_end:
+                    jpeg_end = body_end
+                    if delimited and data[jpeg_end - 2:jpeg_end] == b"\r\n":
+                        jpeg_end -= 2   # the CRLF in front of the boundary is not part of the JPEG
+                    frame = Frame(self._next_id, time.monotonic(), memoryview(data)[body_start:jpeg_end], buffer)
+                    self._next_id += 1
+                    # Continue in a fresh buffer; only the start of the next part is copied over
+                    leftover = end - body_end
+                    next_buffer = self.pool.get(leftover)
+                    next_buffer.data[:leftover] = data[body_end:end]
+                    self._publish(frame)
+                    buffer, data = next_buffer, next_buffer.data
+                    start, end = 0, leftover
+                    body_start = body_end = None
+                    continue
+
+                if end == len(data):
+                    if start > 0 and body_start is None:
+                        # Header hunting in a full buffer: drop what has been scanned
+                        data[:end - start] = data[start:end]
+                        end -= start
+                        start = 0
+                    else:
+                        buffer, data, start, end, body_start, body_end = self._move(
+                            buffer, start, end, body_start, body_end, 2 * len(data))
+                end += reader.read_into(memoryview(data)[end:end + RECV_SIZE])
+        finally:
+            buffer.release()
+            self._socket = None
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def _move(self, buffer, start, end, body_start, body_end, size):
+        """Copy the unfinished part into a buffer of at least `size` bytes"""
+        bigger = self.pool.get(size)
+        bigger.data[:end - start] = buffer.data[start:end]
+        buffer.release()
+        shift = lambda position: None if position is None else position - start
+        return bigger, bigger.data, 0, end - start, shift(body_start), shift(body_end)
+
+    @staticmethod
+    def _parse_part_header(data, start, header_end, marker):
+        """Returns (body start, body end or None) for the part header ending at header_end"""
+        header = bytes(data[start:header_end]).decode("latin-1")
+        if marker.decode("latin-1") not in header:
+            raise ValueError("Multipart boundary missing")
+        length = None
+        for line in header.split("\r\n"):
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value.strip())
+        body_start = header_end + 4
+        return body_start, None if length is None else body_start + length
+
+
+def _watch(client, seconds):
+    """Print stream stats once a second"""
+    end = time.monotonic() + seconds
+    last_id = 0
+    while time.monotonic() < end:
+        frame = client.wait_frame(last_id, timeout=1.0)
+        if frame is None:
+            print("waiting for frames...")
+            continue
+        with frame:
+            last_id = frame.id
+            valid = frame.data[:2] == b"\xff\xd8" and frame.data[-2:] == b"\xff\xd9"
+        rates = client.rates()
+        age = rates["frame_age"] * 1000 if rates["frame_age"] is not None else float("nan")
+        print(f"frame {last_id}: {rates['fps']:.1f} fps, {rates['bytes_per_second'] / 1024:.0f} KiB/s, "
+              f"age {age:.1f} ms, {rates['unread']} unread, {rates['buffers']} buffers, "
+              f"{'valid' if valid else 'CORRUPT'} JPEG")
+        time.sleep(1.0)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="DETROIT MJPEG stream client")
+    parser.add_argument("--url", help="Stream URL")
+    parser.add_argument("--replay", action="store_true", help="Serve synthetic frames locally and read them")
+    parser.add_argument("--fps", type=float, default=25.0, help="Replay frame rate")
+    parser.add_argument("--seconds", type=float, default=5.0, help="How long to watch")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if args.replay or not url:
+        from replay_server import ReplayServer
+
+        server = ReplayServer(fps=args.fps).start()
+        url = server.url
+    client = MJPEGClient(url).start()
+    try:
+        _watch(client, args.seconds)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.stop()
+        if server:
+            server.stop()
+
+__all__ = ['MJPEGClient', 'Frame', 'BufferPool']
@@ -0,0 +1,265 @@
+"""
+Motion Attention for DETROIT EYES
+=================================
+A cheap visual wake trigger. Each frame is decoded straight to grayscale at
+1/8 scale (40x30 for the QVGA camera, see decode.py) and compared with a
+running background model:
+
+    diff       = |frame - background|
+    moving     = diff > threshold
+    background += alpha * (frame - background), at a tenth of the rate
+                  where something is moving so a person standing still
+                  fades into the background slowly rather than at once
+
+When more than `trigger` of the image is moving for `min_frames` frames in a
+row, an "attention" event is emitted (at most once per `cooldown` seconds)
+with the moving fraction and its centroid. A change over most of the image
+is taken as the lights or the exposure changing: the background is reset
+and no event fires.
+
+Everything works on preallocated float32 buffers of a few thousand pixels,
+so a frame costs about 140 microseconds on top of a reduced decode of about
+0.6 ms; the measured cost and the resulting share of one CPU core are in
+rates().
+
+Usage:
+    python motion.py                   # synthetic footage: still, someone walks in, still
+    python motion.py --url http://192.168.1.50/stream --seconds 60
+"""
+
+import time
+import logging
+import argparse
+import threading
+from collections import deque
+
+import numpy as np
+
+from decode import get_pixels
+
+logger = logging.getLogger('DETROIT.EYES')
+
+DEFAULT_FPS = 8.0          # frames examined per second
+DEFAULT_SCALE = 8          # decode reduction
+ALPHA = 0.05               # background learning rate per frame
+MOVING_RATE = 0.1          # share of ALPHA used where motion was found
+THRESHOLD = 20.0           # grey levels that count as a change
+TRIGGER = 0.02             # share of moving pixels that counts as motion
+MIN_FRAMES = 2             # consecutive motion frames before an event
+COOLDOWN = 10.0            # seconds between attention events
+GLOBAL_CHANGE = 0.6        # a share of changed pixels this large is a lighting change
+STATS_WINDOW = 5.0
+
+
+class MotionDetector:
+    """Running-background motion detection on downscaled grayscale frames
+
+    Args:
+        source: Frame source with next_frame(timeout), e.g. a relay Subscription
+        scale (int): Decode reduction (1, 2, 4 or 8)
+        on_attention (callable): Called with each attention event dict
+    """
+
+    def __init__(self, source=None, scale=DEFAULT_SCALE, alpha=ALPHA, threshold=THRESHOLD, trigger=TRIGGER,
+                 min_frames=MIN_FRAMES, cooldown=COOLDOWN, on_attention=None):
+        self.source = source
+        self.scale = scale
+        self.alpha = alpha
+        self.threshold = threshold
+        self.trigger = trigger
+        self.min_frames = min_frames
+        self.cooldown = cooldown
+        self.on_attention = on_attention
+        self.stats = {"frames": 0, "events": 0, "lighting_resets": 0}
+        self.fraction = 0.0
+        self._background = None
+        self._streak = 0
+        self._last_event = -float("inf")
+        self._events = deque(maxlen=16)
+        self._history = deque()       # (time, decode seconds, motion seconds)
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    def reset(self):
+        self._background = None
+        self._streak = 0
+
+    def _allocate(self, shape):
+        self._background = np.empty(shape, dtype=np.float32)
+        self._frame = np.empty(shape, dtype=np.float32)
+        self._delta = np.empty(shape, dtype=np.float32)
+        self._diff = np.empty(shape, dtype=np.float32)
+        self._mask = np.empty(shape, dtype=bool)
+        self._rate = np.empty(shape, dtype=np.float32)
+        height, width = shape
+        self._xs = (np.arange(width, dtype=np.float32) + 0.5) / width
+        self._ys = (np.arange(height, dtype=np.float32) + 0.5) / height
+
+    def process(self, gray, frame_id=None, now=None):
+        """Feed one grayscale frame; returns an attention event dict or None"""
+        now = time.monotonic() if now is None else now
+        if self._background is None or self._background.shape != gray.shape:
+            self._allocate(gray.shape)
+            np.copyto(self._background, gray, casting="unsafe")
+            return None
+        frame, delta, diff, mask = self._frame, self._delta, self._diff, self._mask
+        np.copyto(frame, gray, casting="unsafe")
+        np.subtract(frame, self._background, out=delta)
+        np.abs(delta, out=diff)
+        np.greater(diff, self.threshold, out=mask)
+        moving = int(np.count_nonzero(mask))
+        fraction = moving / mask.size
+        self.fraction = fraction
+        self.stats["frames"] += 1
+
+        if fraction > GLOBAL_CHANGE:
+            np.copyto(self._background, frame)
+            self._streak = 0
+            self.stats["lighting_resets"] += 1
+            return None
+
+        # background += alpha * delta, slower where something moves
+        np.multiply(mask, self.alpha * (MOVING_RATE - 1.0), out=self._rate)
+        self._rate += self.alpha
+        delta *= self._rate
+        self._background += delta
+
+        self._streak = self._streak + 1 if fraction >= self.trigger else 0
+        if self._streak < self.min_frames or now - self._last_event < self.cooldown:
+            return None
+        self._last_event = now
+        event = {"type": "attention", "time": time.time(), "frame_id": frame_id, "fraction": round(fraction, 4),
+                 "centroid": (round(float(mask.sum(axis=0) @ self._xs) / moving, 3),
+                              round(float(mask.sum(axis=1) @ self._ys) / moving, 3))}
+        self.stats["events"] += 1
+        with self._lock:
+            self._events.append(event)
+        if self.on_attention:
+            try:
+                self.on_attention(event)
+            except Exception as e:
+                logger.error(f"Attention handler failed: {e}")
+        return event
+
+    def poll_event(self):
+        """The oldest attention event not yet collected, or None"""
+        with self._lock:
+            return self._events.popleft() if self._events else None
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="motion-attention")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while self._running:
+            frame = self.source.next_frame(timeout=0.5)
+            if frame is None:
+                continue
+            with frame:
+                start = time.perf_counter()
+                gray = get_pixels(frame, self.scale, "L")
+                decoded = time.perf_counter()
+                self.process(gray, frame.id)
+                finished = time.perf_counter()
+            with self._lock:
+                now = time.monotonic()
+                self._history.append((now, decoded - start, finished - decoded))
+                while self._history and now - self._history[0][0] > STATS_WINDOW:
+                    self._history.popleft()
+
+    def rates(self):
+        """Frames per second, per-frame cost (us) and the resulting share of one core"""
+        with self._lock:
+            history = list(self._history)
+        result = dict(self.stats)
+        result["fps"] = (len(history) - 1) / (history[-1][0] - history[0][0]) if len(history) >= 2 else 0.0
+        if history:
+            decode_us = np.array([entry[1] for entry in history]) * 1e6
+            motion_us = np.array([entry[2] for entry in history]) * 1e6
+            result["decode_us"] = float(np.median(decode_us))
+            result["motion_us"] = float(np.median(motion_us))
+            result["motion_p95_us"] = float(np.percentile(motion_us, 95))
+            result["cpu_percent"] = float((decode_us.mean() + motion_us.mean()) * result["fps"] / 1e4)
+        return result
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        return True
+
+
+def synthetic_footage(still=40, moving=30, size=(320, 240), noise=4.0, seed=0):
+    """JPEGs of a still, noisy scene, a figure crossing it, then stillness again"""
+    import io
+    from PIL import Image, ImageDraw
+
+    rng = np.random.default_rng(seed)
+    width, height = size
+    scene = Image.new("RGB", size, (90, 90, 100))
+    draw = ImageDraw.Draw(scene)
+    for x in range(0, width, 32):
+        draw.rectangle([x, height * 2 // 3, x + 16, height], fill=(60, 70, 60))
+    frames = []
+    for index in range(still + moving + still):
+        image = scene.copy()
+        step = index - still
+        if 0 <= step < moving:
+            left = int(step * (width + 60) / moving) - 60
+            ImageDraw.Draw(image).rectangle([left, height // 4, left + 60, height - 10], fill=(200, 160, 120))
+        pixels = np.asarray(image, dtype=np.float32) + rng.normal(0, noise, (height, width, 1))
+        out = io.BytesIO()
+        Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(out, format="JPEG", quality=80)
+        frames.append(out.getvalue())
+    return frames
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="DETROIT motion attention trigger")
+    parser.add_argument("--url", help="Stream URL (default: synthetic footage)")
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS, help="Frames examined per second")
+    parser.add_argument("--scale", type=int, default=DEFAULT_SCALE, help="Decode reduction: 1, 2, 4 or 8")
+    parser.add_argument("--seconds", type=float, default=None, help="How long to run")
+    args = parser.parse_args()
+
+    from relay import StreamRelay
+
+    server = None
+    url = args.url
+    seconds = args.seconds
+    if not url:
+        from replay_server import ReplayServer
+
+        footage = synthetic_footage()
+        server = ReplayServer(footage, fps=args.fps).start()
+        url = server.url
+        seconds = seconds or len(footage) / args.fps
+    relay = StreamRelay(url, host=None).start()
+    detector = MotionDetector(relay.subscribe(args.fps, "motion"), args.scale,
+                              on_attention=lambda event: print(f"attention: {event}")).start()
+    try:
+        end = time.monotonic() + (seconds or float("inf"))
+        while time.monotonic() < end:
+            time.sleep(min(1.0, max(0.0, end - time.monotonic())))
+            print(f"moving {detector.fraction:6.1%}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        detector.stop()
+        relay.stop()
+        if server:
+            server.stop()
+    rates = detector.rates()
+    if "motion_us" in rates:
+        print(f"{rates['frames']} frames at {rates['fps']:.1f} fps: decode {rates['decode_us']:.0f} us, motion "
+              f"{rates['motion_us']:.0f} us (p95 {rates['motion_p95_us']:.0f}), {rates['cpu_percent']:.2f}% of a core, "
+              f"{rates['events']} events, {rates['lighting_resets']} lighting resets")
+
+__all__ = ['MotionDetector', 'synthetic_footage', 'DEFAULT_FPS', 'DEFAULT_SCALE']
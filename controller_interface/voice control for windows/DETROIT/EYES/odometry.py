@@ -0,0 +1,681 @@
+"""
+Visual Odometry for DETROIT EYES
+================================
+Measures how far SPARK really walks and turns per gait cycle, from the head
+camera alone, so stride and speed can be calibrated for each knee setting
+('1'..'9') and compared across firmware versions.
+
+Each frame is decoded to grayscale at reduced scale (160x120 for the QVGA
+camera) and a few hundred corners are tracked from the previous frame with
+pyramidal Lucas-Kanade optical flow. The tracker is written in numpy with
+every feature solved at once: patches are gathered with one bilinear
+sample per pyramid level and iteration, and the 2x2 systems are solved in
+closed form for all features together. Tracks are checked forward and
+backward, then a similarity transform is fitted to the survivors with a
+trimmed least-squares fit:
+
+    horizontal shift  ->  yaw          (the scene slides sideways)
+    vertical shift    ->  pitch        (the body bob of the tripod gait)
+    scale             ->  forward      (the scene grows as we approach it)
+    rotation          ->  roll
+
+A single camera cannot see absolute distance, so forward motion is given in
+metres for a scene at `scene_depth` - the distance to the textured surface
+the robot faces during calibration - and the depth is reduced as the robot
+walks towards it. Yaw needs no such assumption, only the field of view.
+
+Gait cycles come from the motion bridge: attach() hooks its on_write
+callback, and every motion command written opens a window as long as the
+firmware takes to run that cycle. Frame motion is summed into the window it
+was captured in, split by time where a frame interval straddles two cycles,
+and each closed window becomes one record in the log.
+
+Usage:
+    python odometry.py --synthetic                           # accuracy on synthetic walks
+    python odometry.py --calibrate --port COM5 --url http://192.168.1.50/stream \\
+                       --depth 1.5 --speeds 1 5 9 --cycles 6 --firmware v1.2
+    python odometry.py --summary                             # stride per speed and firmware
+"""
+
+import io
+import os
+import sys
+import json
+import math
+import time
+import logging
+import argparse
+import threading
+from collections import deque
+
+import numpy as np
+
+from decode import get_pixels
+
+LEGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'LEGS')
+if LEGS_DIR not in sys.path:
+    sys.path.append(LEGS_DIR)
+
+from motion_bridge import MOTION_COMMANDS, SPEED_COMMANDS, DEFAULT_KNEE_CENTER, gait_cycle_seconds
+
+logger = logging.getLogger('DETROIT.EYES')
+
+ODOMETRY_LOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'BRAIN',
+                            'odometry_log.jsonl')
+
+DEFAULT_SCALE = 2              # decode reduction: 160x120 for the QVGA stream
+HFOV_DEGREES = 60.0            # OV2640 with the stock lens
+SCENE_DEPTH = 1.5              # metres to the surface in view
+CAMERA_LATENCY = 0.12          # seconds from exposure to the frame's arrival
+MAX_FEATURES = 200
+MIN_FEATURES = 60              # below this many tracks, new corners are found
+CELL = 8                       # at most one corner per CELL x CELL pixels
+WINDOW = 4                     # Lucas-Kanade window radius (9x9)
+LEVELS = 3                     # pyramid levels
+ITERATIONS = 10
+FB_LIMIT = 0.5                 # pixels a track may miss its start when tracked back
+STATS_WINDOW = 5.0
+
+DIRECTIONS = {command: direction for direction, command in MOTION_COMMANDS.items()}
+SPEED_LEVELS = {command: (level, knee) for level, (command, knee) in SPEED_COMMANDS.items()}
+
+
+def _box_sum(image, radius):
+    """Sum over a (2r+1)^2 box around every pixel, through an integral image"""
+    size = 2 * radius + 1
+    padded = np.pad(image, radius + 1, mode="edge")
+    integral = padded.cumsum(0).cumsum(1)
+    return (integral[size:, size:] - integral[:-size, size:] - integral[size:, :-size]
+            + integral[:-size, :-size])[:image.shape[0], :image.shape[1]]
+
+
+def select_features(gray, count=MAX_FEATURES, cell=CELL, border=WINDOW * 2 ** LEVELS // 2 + 2, quality=0.01):
+    """Strong corners (Shi-Tomasi), the best one per cell of the image
+
+    Returns:
+        numpy.ndarray: (n, 2) float32 x, y positions, strongest first
+    """
+    image = gray.astype(np.float32)
+    gy, gx = np.gradient(image)
+    sxx = _box_sum(gx * gx, 2)
+    syy = _box_sum(gy * gy, 2)
+    sxy = _box_sum(gx * gy, 2)
+    # Smaller eigenvalue of the structure tensor
+    response = (sxx + syy) / 2 - np.sqrt(((sxx - syy) / 2) ** 2 + sxy ** 2)
+    response[:border] = response[-border:] = 0
+    response[:, :border] = response[:, -border:] = 0
+
+    height, width = response.shape
+    rows, cols = height // cell, width // cell
+    cells = response[:rows * cell, :cols * cell].reshape(rows, cell, cols, cell).transpose(0, 2, 1, 3)
+    cells = cells.reshape(rows, cols, cell * cell)
+    best = cells.argmax(axis=2)
+    strength = np.take_along_axis(cells, best[..., None], axis=2)[..., 0]
+    keep = strength > quality * response.max()
+    cell_y, cell_x = np.nonzero(keep)
+    offset = best[keep]
+    ys = cell_y * cell + offset // cell
+    xs = cell_x * cell + offset % cell
+    order = np.argsort(-strength[keep])[:count]
+    return np.stack([xs[order], ys[order]], axis=1).astype(np.float32)
+
+
+def build_pyramid(gray, levels=LEVELS):
+    """Float32 images, each half the size of the one before"""
+    pyramid = [gray.astype(np.float32)]
+    for _ in range(1, levels):
+        image = pyramid[-1]
+        height, width = image.shape[0] // 2 * 2, image.shape[1] // 2 * 2
+        image = image[:height, :width]
+        pyramid.append(0.25 * (image[0::2, 0::2] + image[1::2, 0::2] + image[0::2, 1::2] + image[1::2, 1::2]))
+    return pyramid
+
+
+def _patches(image, centres, window):
+    """Bilinear (2w+1)^2 patches around float centres, one row per centre
+
+    Every pixel of a patch shares its centre's sub-pixel fraction, so the
+    bilinear weights are per centre and the gather is plain integer indexing.
+    Centres closer than the window to the border are clamped inside it.
+    """
+    height, width = image.shape
+    xs = np.clip(centres[:, 0], window, width - window - 1.001)
+    ys = np.clip(centres[:, 1], window, height - window - 1.001)
+    x0 = xs.astype(np.int32)
+    y0 = ys.astype(np.int32)
+    fx = (xs - x0)[:, None]
+    fy = (ys - y0)[:, None]
+    offsets = np.arange(-window, window + 1)
+    relative = (offsets[:, None] * width + offsets[None, :]).ravel()
+    index = (y0 * width + x0)[:, None] + relative[None, :]
+    flat = image.ravel()
+    top = flat[index] * (1 - fx) + flat[index + 1] * fx
+    bottom = flat[index + width] * (1 - fx) + flat[index + width + 1] * fx
+    return top * (1 - fy) + bottom * fy
+
+
+def track_features(previous, current, points, window=WINDOW, iterations=ITERATIONS):
+    """Pyramidal Lucas-Kanade for all points at once
+
+    Args:
+        previous, current: Pyramids from build_pyramid
+        points (numpy.ndarray): (n, 2) positions in previous[0]
+
+    Returns:
+        tuple: (n, 2) positions in current[0], (n,) bool status
+    """
+    samples = (2 * window + 1) ** 2
+    flow = np.zeros_like(points, dtype=np.float32)
+    status = np.ones(len(points), dtype=bool)
+    for level in range(len(previous) - 1, -1, -1):
+        factor = 2.0 ** level
+        if level < len(previous) - 1:
+            flow *= 2.0
+        prev_image, curr_image = previous[level], current[level]
+        gy, gx = np.gradient(prev_image)
+        centres = points / np.float32(factor)
+        template = _patches(prev_image, centres, window)
+        ix = _patches(gx, centres, window)
+        iy = _patches(gy, centres, window)
+        sxx = (ix * ix).sum(1)
+        syy = (iy * iy).sum(1)
+        sxy = (ix * iy).sum(1)
+        det = sxx * syy - sxy * sxy
+        min_eigen = ((sxx + syy) / 2 - np.sqrt(((sxx - syy) / 2) ** 2 + sxy ** 2)) / samples
+        good = (det > 1e-6) & (min_eigen > 1e-3)
+        # Only features still moving are iterated
+        active = np.flatnonzero(good)
+        for _ in range(iterations):
+            if not len(active):
+                break
+            error = template[active] - _patches(curr_image, centres[active] + flow[active], window)
+            bx = (error * ix[active]).sum(1)
+            by = (error * iy[active]).sum(1)
+            dx = (syy[active] * bx - sxy[active] * by) / det[active]
+            dy = (sxx[active] * by - sxy[active] * bx) / det[active]
+            flow[active, 0] += dx
+            flow[active, 1] += dy
+            active = active[(np.abs(dx) >= 0.01) | (np.abs(dy) >= 0.01)]
+        if level == 0:
+            status &= good
+    tracked = points + flow
+    height, width = current[0].shape
+    status &= ((tracked[:, 0] >= window) & (tracked[:, 0] < width - window)
+               & (tracked[:, 1] >= window) & (tracked[:, 1] < height - window))
+    return tracked, status
+
+
+def fit_similarity(start, end, center, rounds=3):
+    """Trimmed least-squares similarity transform end ~ s R(start - c) + c + t
+
+    Returns:
+        tuple: (scale, roll radians, tx, ty, inlier mask) or None
+    """
+    u = start - center
+    v = end - center
+    inliers = np.ones(len(u), dtype=bool)
+    solution = None
+    for _ in range(rounds):
+        if inliers.sum() < 6:
+            return None
+        a_rows = np.zeros((2 * inliers.sum(), 4), dtype=np.float64)
+        ui, vi = u[inliers], v[inliers]
+        a_rows[0::2, 0] = ui[:, 0]
+        a_rows[0::2, 1] = -ui[:, 1]
+        a_rows[0::2, 2] = 1.0
+        a_rows[1::2, 0] = ui[:, 1]
+        a_rows[1::2, 1] = ui[:, 0]
+        a_rows[1::2, 3] = 1.0
+        solution = np.linalg.lstsq(a_rows, vi.reshape(-1).astype(np.float64), rcond=None)[0]
+        a, b, tx, ty = solution
+        predicted = np.stack([a * u[:, 0] - b * u[:, 1] + tx, b * u[:, 0] + a * u[:, 1] + ty], axis=1)
+        residual = np.hypot(*(predicted - v).T)
+        inliers = residual < max(3.0 * np.median(residual[inliers]), 0.3)
+    a, b, tx, ty = solution
+    return math.hypot(a, b), math.atan2(b, a), tx, ty, inliers
+
+
+class VisualOdometry:
+    """Frame-to-frame camera motion, summed per gait cycle
+
+    Args:
+        source: Frame source with next_frame(timeout), e.g. a relay Subscription
+        scale (int): Decode reduction (1, 2, 4 or 8)
+        hfov (float): Horizontal field of view in degrees
+        scene_depth (float): Metres to the surface in view, for forward distance
+        latency (float): Seconds from exposure to a frame's arrival
+        firmware (str): Label stored with every cycle record
+        log_path (str): JSONL file cycle records are appended to (None to keep them in memory only)
+        on_cycle (callable): Called with each cycle record
+    """
+
+    def __init__(self, source=None, scale=DEFAULT_SCALE, hfov=HFOV_DEGREES, scene_depth=SCENE_DEPTH,
+                 latency=CAMERA_LATENCY, firmware=None, log_path=None, on_cycle=None):
+        self.source = source
+        self.scale = scale
+        self.hfov = hfov
+        self.scene_depth = scene_depth
+        self.latency = latency
+        self.firmware = firmware
+        self.log_path = log_path
+        self.on_cycle = on_cycle
+        self.pose = np.zeros(3)        # x, y metres and heading radians since the start
+        self.depth = scene_depth
+        self.cycles = []
+        self.stats = {"frames": 0, "lost": 0, "redetections": 0, "cycles": 0}
+        self.level, self.knee_center = None, DEFAULT_KNEE_CENTER
+        self._pyramid = None
+        self._points = None
+        self._time = None
+        self._open = deque()           # cycle windows waiting for their frames
+        self._history = deque()        # (time, seconds, tracked features)
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    def reset(self, scene_depth=None):
+        """Forget the previous frame and the pose, e.g. after the robot was moved by hand"""
+        with self._lock:
+            self._pyramid = None
+            self._points = None
+            self._time = None
+            self.pose[:] = 0.0
+            self.depth = self.scene_depth if scene_depth is None else scene_depth
+
+    def focal_length(self, width):
+        """Focal length in pixels for an image width"""
+        return width / 2.0 / math.tan(math.radians(self.hfov) / 2.0)
+
+    def mark_cycle(self, command, now=None):
+        """Note a command written to the firmware; motion commands open a gait cycle window"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._open and self._open[-1]["end"] > now:
+                # A new command (or the stop) cuts the running cycle short
+                self._open[-1]["end"] = now
+            if command in SPEED_LEVELS:
+                self.level, self.knee_center = SPEED_LEVELS[command]
+            elif command in DIRECTIONS:
+                self._open.append({"command": command, "start": now,
+                                   "end": now + gait_cycle_seconds(self.knee_center),
+                                   "level": self.level, "knee_center": self.knee_center,
+                                   "forward": 0.0, "yaw": 0.0, "pitch": [0.0], "roll": 0.0,
+                                   "frames": 0, "features": []})
+
+    def attach(self, bridge):
+        """Open a cycle window for every command the motion bridge writes"""
+        previous = bridge.on_write
+
+        def on_write(command, when):
+            self.mark_cycle(command)
+            if previous is not None:
+                previous(command, when)
+
+        bridge.on_write = on_write
+        self.knee_center = bridge.knee_center
+        return self
+
+    def process(self, gray, timestamp=None):
+        """Feed one grayscale frame captured at timestamp (monotonic); returns the step dict or None"""
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        pyramid = build_pyramid(gray)
+        step = None
+        with self._lock:
+            previous, points, previous_time = self._pyramid, self._points, self._time
+        if previous is not None and points is not None and len(points):
+            tracked, status = track_features(previous, pyramid, points)
+            back, back_status = track_features(pyramid, previous, tracked)
+            status &= back_status & (np.hypot(*(back - points).T) < FB_LIMIT)
+            height, width = gray.shape
+            center = np.array([(width - 1) / 2.0, (height - 1) / 2.0], dtype=np.float32)
+            fit = fit_similarity(points[status], tracked[status], center) if status.sum() >= 6 else None
+            if fit is None:
+                self.stats["lost"] += 1
+            else:
+                scale, roll, tx, ty, inliers = fit
+                focal = self.focal_length(width)
+                step = {"time": timestamp, "dt": timestamp - previous_time, "features": int(inliers.sum()),
+                        "yaw": -math.atan2(tx, focal), "pitch": math.atan2(ty, focal), "roll": roll,
+                        "forward": self.depth * (1.0 - 1.0 / scale)}
+                self._integrate(step, previous_time, timestamp)
+            points = tracked[status]
+        self.stats["frames"] += 1
+        if points is None or len(points) < MIN_FEATURES:
+            fresh = select_features(gray)
+            if points is not None and len(points):
+                # Keep surviving tracks; add corners from cells they do not cover
+                taken = set(map(tuple, (points // CELL).astype(np.int32).tolist()))
+                fresh = fresh[[tuple(cell) not in taken for cell in (fresh // CELL).astype(np.int32).tolist()]]
+                points = np.concatenate([points, fresh])[:MAX_FEATURES]
+            else:
+                points = fresh
+            self.stats["redetections"] += 1
+        with self._lock:
+            self._pyramid, self._points, self._time = pyramid, points.astype(np.float32), timestamp
+        self._close_cycles(timestamp)
+        return step
+
+    def _integrate(self, step, start, end):
+        with self._lock:
+            self.depth = max(0.1, self.depth - step["forward"])
+            self.pose[2] += step["yaw"]
+            self.pose[0] += step["forward"] * math.cos(self.pose[2])
+            self.pose[1] += step["forward"] * math.sin(self.pose[2])
+            for window in self._open:
+                # A step spanning a cycle boundary is shared by the time in each cycle
+                overlap = min(end, window["end"]) - max(start, window["start"])
+                if overlap <= 0:
+                    continue
+                share = overlap / (end - start) if end > start else 1.0
+                window["forward"] += step["forward"] * share
+                window["yaw"] += step["yaw"] * share
+                window["roll"] += step["roll"] * share
+                window["pitch"].append(window["pitch"][-1] + step["pitch"] * share)
+                window["frames"] += share
+                window["features"].append(step["features"])
+
+    def _close_cycles(self, now):
+        finished = []
+        with self._lock:
+            while self._open and self._open[0]["end"] <= now:
+                finished.append(self._open.popleft())
+        for window in finished:
+            self._record(window)
+
+    def flush(self):
+        """Close every open cycle window, whether or not its frames have arrived"""
+        with self._lock:
+            finished = list(self._open)
+            self._open.clear()
+        for window in finished:
+            self._record(window)
+
+    def _record(self, window):
+        duration = window["end"] - window["start"]
+        pitch = window["pitch"]
+        record = {
+            "time": time.time(),
+            "firmware": self.firmware,
+            "direction": DIRECTIONS[window["command"]],
+            "speed_level": window["level"],
+            "knee_center": window["knee_center"],
+            "duration": round(duration, 3),
+            "frames": round(window["frames"], 1),
+            "features": int(np.median(window["features"])) if window["features"] else 0,
+            "forward_m": round(window["forward"], 4),
+            "speed_mps": round(window["forward"] / duration, 4) if duration > 0 else 0.0,
+            "yaw_deg": round(math.degrees(window["yaw"]), 2),
+            "roll_deg": round(math.degrees(window["roll"]), 2),
+            "bob_deg": round(math.degrees(max(pitch) - min(pitch)), 2),
+        }
+        self.cycles.append(record)
+        self.stats["cycles"] += 1
+        if self.log_path:
+            try:
+                with open(self.log_path, 'a') as f:
+                    f.write(json.dumps(record) + '\n')
+            except OSError as e:
+                logger.error(f"Could not write odometry log: {e}")
+        if self.on_cycle:
+            try:
+                self.on_cycle(record)
+            except Exception as e:
+                logger.error(f"Cycle handler failed: {e}")
+        return record
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="visual-odometry")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while self._running:
+            frame = self.source.next_frame(timeout=0.5)
+            if frame is None:
+                self._close_cycles(time.monotonic() - self.latency - 1.0)
+                continue
+            with frame:
+                start = time.perf_counter()
+                gray = get_pixels(frame, self.scale, "L")
+                step = self.process(gray, frame.timestamp - self.latency)
+                elapsed = time.perf_counter() - start
+            with self._lock:
+                now = time.monotonic()
+                self._history.append((now, elapsed, step["features"] if step else 0))
+                while self._history and now - self._history[0][0] > STATS_WINDOW:
+                    self._history.popleft()
+
+    def rates(self):
+        """Frames per second, per-frame cost (ms) and tracked features"""
+        with self._lock:
+            history = list(self._history)
+        result = dict(self.stats)
+        result["fps"] = (len(history) - 1) / (history[-1][0] - history[0][0]) if len(history) >= 2 else 0.0
+        if history:
+            result["frame_ms"] = float(np.median([entry[1] for entry in history]) * 1000)
+            result["features_tracked"] = int(np.median([entry[2] for entry in history]))
+        return result
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        self.flush()
+        return True
+
+
+def load_log(path=ODOMETRY_LOG):
+    """Cycle records from an odometry log"""
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    return records
+
+
+def summarize(records):
+    """Mean and spread of the per-cycle motion for each firmware, direction and speed level
+
+    Returns:
+        list: dicts sorted by firmware, direction and speed level
+    """
+    groups = {}
+    for record in records:
+        key = (record.get("firmware") or "", record["direction"], record.get("speed_level") or 0)
+        groups.setdefault(key, []).append(record)
+    summary = []
+    for (firmware, direction, level), group in sorted(groups.items()):
+        forward = np.array([r["forward_m"] for r in group])
+        yaw = np.array([r["yaw_deg"] for r in group])
+        duration = np.array([r["duration"] for r in group])
+        summary.append({"firmware": firmware, "direction": direction, "speed_level": level or None,
+                        "cycles": len(group), "stride_m": float(forward.mean()), "stride_sd": float(forward.std()),
+                        "yaw_deg": float(yaw.mean()), "yaw_sd": float(yaw.std()),
+                        "speed_mps": float(forward.sum() / duration.sum()) if duration.sum() else 0.0,
+                        "bob_deg": float(np.mean([r["bob_deg"] for r in group]))})
+    return summary
+
+
+def _print_summary(summary):
+    print(f"{'firmware':>10} {'direction':>9} {'speed':>5} {'cycles':>6} {'stride cm':>12} "
+          f"{'yaw deg':>12} {'cm/s':>6} {'bob deg':>7}")
+    for row in summary:
+        print(f"{row['firmware']:>10} {row['direction']:>9} {row['speed_level'] or '-':>5} {row['cycles']:>6} "
+              f"{row['stride_m'] * 100:>6.2f}+-{row['stride_sd'] * 100:<4.2f} "
+              f"{row['yaw_deg']:>6.1f}+-{row['yaw_sd']:<4.1f} {row['speed_mps'] * 100:>6.2f} {row['bob_deg']:>7.2f}")
+
+
+def _texture(size, seed):
+    """A random textured surface with features at several scales"""
+    from PIL import Image, ImageFilter
+
+    rng = np.random.default_rng(seed)
+    width, height = size
+    image = np.zeros((height, width), dtype=np.float32)
+    for cell, weight in ((4, 0.5), (12, 1.0), (40, 1.0)):
+        coarse = rng.uniform(0, 255, (height // cell + 1, width // cell + 1)).astype(np.uint8)
+        layer = Image.fromarray(coarse).resize((width, height), Image.BICUBIC)
+        image += weight * np.asarray(layer.filter(ImageFilter.GaussianBlur(1)), dtype=np.float32)
+    image = (image - image.min()) / (image.max() - image.min()) * 200 + 28
+    return Image.fromarray(image.astype(np.uint8))
+
+
+def synthetic_walk(direction="forward", level=1, cycles=6, stride=0.04, turn=15.0, fps=15.0, depth=SCENE_DEPTH,
+                   bob=1.0, size=(320, 240), hfov=HFOV_DEGREES, seed=0):
+    """JPEGs the head camera would see over a number of gait cycles, with the truth
+
+    Walking faces a textured wall `depth` metres away; turning stands inside a
+    textured cylinder. The body bobs `bob` degrees twice per cycle (once per
+    tripod) and a forward walk wobbles 1 degree of yaw per cycle.
+
+    Returns:
+        tuple: (frames as (time, jpeg), commands as (time, command), truth per cycle)
+    """
+    from PIL import Image
+
+    width, height = size
+    focal = width / 2.0 / math.tan(math.radians(hfov) / 2.0)
+    knee = SPEED_COMMANDS[level][1]
+    cycle = gait_cycle_seconds(knee)
+    if direction in ("left", "right"):
+        # A panorama of the full circle around the robot
+        texture = _texture((int(2 * math.pi * focal) + width, height * 2), seed)
+    else:
+        texture = _texture((width * 3, height * 3), seed)
+    sign = {"forward": 1.0, "backward": -1.0, "right": 1.0, "left": -1.0}[direction]
+    frames, commands, truth = [], [(0.0, SPEED_COMMANDS[level][0])], []
+    for index in range(cycles):
+        commands.append((index * cycle + 0.1, MOTION_COMMANDS[direction]))
+        truth.append({"forward_m": stride * sign if direction in ("forward", "backward") else 0.0,
+                      "yaw_deg": turn * sign if direction in ("left", "right") else 0.0})
+    total = cycles * cycle + 0.2
+    tex_w, tex_h = texture.size
+    for index in range(int(total * fps) + 1):
+        t = index / fps
+        # Progress through the cycles, with the robot at rest before and after
+        phase = min(max((t - 0.1) / cycle, 0.0), cycles)
+        wobble = math.sin(2 * math.pi * phase) if 0 < phase < cycles else 0.0
+        pitch = math.radians(bob / 2) * (1 - math.cos(4 * math.pi * phase)) if 0 < phase < cycles else 0.0
+        shift_y = focal * math.tan(pitch)
+        if direction in ("left", "right"):
+            yaw = math.radians(turn * sign * phase)
+            # Cylinder: turning slides the panorama at f pixels per radian
+            left = tex_w / 2 - width / 2 + focal * yaw
+            transform = (1, 0, left, 0, 1, tex_h / 2 - height / 2 + shift_y)
+        else:
+            travelled = stride * sign * phase
+            k = (depth - travelled) / depth
+            yaw = math.radians(1.0) * wobble
+            cx, cy = tex_w / 2 + k * focal * math.tan(yaw), tex_h / 2 + k * shift_y
+            transform = (k, 0, cx - k * width / 2, 0, k, cy - k * height / 2)
+        image = texture.transform(size, Image.AFFINE, transform, resample=Image.BILINEAR)
+        out = io.BytesIO()
+        image.convert("RGB").save(out, format="JPEG", quality=80)
+        frames.append((t, out.getvalue()))
+    return frames, commands, truth
+
+
+def run_synthetic(direction, level, cycles=6, scale=DEFAULT_SCALE, seed=0):
+    """Odometry over a synthetic walk; returns (records, truth, per-frame ms)"""
+    from decode import decode
+
+    frames, commands, truth = synthetic_walk(direction, level, cycles, seed=seed)
+    odometry = VisualOdometry(scale=scale)
+    elapsed = []
+    pending = list(commands)
+    for t, jpeg in frames:
+        while pending and pending[0][0] <= t:
+            odometry.mark_cycle(pending[0][1], pending.pop(0)[0])
+        gray = decode(jpeg, scale, "L")
+        start = time.perf_counter()
+        odometry.process(gray, t)
+        elapsed.append((time.perf_counter() - start) * 1000)
+    odometry.flush()
+    return odometry.cycles, truth, elapsed
+
+
+def calibrate(port, url, speeds, cycles, depth, firmware, log_path, baud=9600, scale=DEFAULT_SCALE):
+    """Walk towards a textured surface and back at each speed level, logging every cycle"""
+    from relay import StreamRelay
+    from motion_bridge import MotionBridge
+
+    relay = StreamRelay(url, host=None).start()
+    bridge = MotionBridge(port, baud)
+    if not bridge.open():
+        relay.stop()
+        raise RuntimeError(f"Could not open {port}")
+    odometry = VisualOdometry(relay.subscribe(None, "odometry"), scale, scene_depth=depth, firmware=firmware,
+                              log_path=log_path)
+    odometry.attach(bridge).start()
+    try:
+        for level in speeds:
+            for direction in ("forward", "backward"):
+                bridge.set_speed(level)
+                bridge.move(direction, cycles)
+                time.sleep(0.2)
+                bridge.wait_idle()
+                time.sleep(0.5)
+            print(f"speed {level}: depth now {odometry.depth:.2f} m")
+    finally:
+        bridge.close()
+        odometry.stop()
+        relay.stop()
+    return odometry.cycles
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="DETROIT visual odometry")
+    parser.add_argument("--synthetic", action="store_true", help="Measure accuracy on synthetic walks")
+    parser.add_argument("--calibrate", action="store_true", help="Walk at each speed and log every cycle")
+    parser.add_argument("--summary", action="store_true", help="Summarise the odometry log")
+    parser.add_argument("--port", help="Serial port of the robot")
+    parser.add_argument("--baud", type=int, default=9600)
+    parser.add_argument("--url", help="Camera stream URL")
+    parser.add_argument("--speeds", type=int, nargs="+", default=[1, 5, 9], help="Speed levels to calibrate")
+    parser.add_argument("--cycles", type=int, default=6, help="Gait cycles per run")
+    parser.add_argument("--depth", type=float, default=SCENE_DEPTH, help="Metres to the surface in view")
+    parser.add_argument("--scale", type=int, default=DEFAULT_SCALE, help="Decode reduction: 1, 2, 4 or 8")
+    parser.add_argument("--firmware", help="Firmware label stored with the records")
+    parser.add_argument("--log", default=ODOMETRY_LOG, help="Odometry log (JSONL)")
+    args = parser.parse_args()
+
+    if args.calibrate:
+        if not args.port or not args.url:
+            parser.error("--calibrate needs --port and --url")
+        calibrate(args.port, args.url, args.speeds, args.cycles, args.depth, args.firmware, args.log,
+                  args.baud, args.scale)
+        _print_summary(summarize([r for r in load_log(args.log) if r.get("firmware") == args.firmware]))
+    elif args.summary:
+        _print_summary(summarize(load_log(args.log)))
+    else:
+        print(f"{'walk':>8} {'speed':>5} {'cycle':>5} {'true':>8} {'measured':>9} {'error':>7} "
+              f"{'bob deg':>7} {'features':>8}")
+        timings = []
+        for direction, level in (("forward", 1), ("forward", 9), ("backward", 5), ("left", 1), ("right", 5)):
+            records, truth, elapsed = run_synthetic(direction, level, args.cycles, args.scale)
+            timings.extend(elapsed)
+            for index, (record, expected) in enumerate(zip(records, truth)):
+                if direction in ("left", "right"):
+                    true, measured, unit = expected["yaw_deg"], record["yaw_deg"], "deg"
+                else:
+                    true, measured, unit = expected["forward_m"] * 100, record["forward_m"] * 100, "cm"
+                print(f"{direction:>8} {level:>5} {index:>5} {true:>5.2f}{unit:>3} {measured:>6.2f}{unit:>3} "
+                      f"{measured - true:>+7.2f} {record['bob_deg']:>7.2f} {record['features']:>8}")
+        timings = np.array(timings)
+        print(f"per frame: median {np.median(timings):.2f} ms, p95 {np.percentile(timings, 95):.2f} ms "
+              f"at 1/{args.scale} scale")
+
+__all__ = ['VisualOdometry', 'select_features', 'build_pyramid', 'track_features', 'fit_similarity',
+           'synthetic_walk', 'load_log', 'summarize', 'ODOMETRY_LOG']
@@ -0,0 +1,566 @@
+"""
+Flight Recorder for DETROIT EYES
+================================
+Keeps the last few minutes of what the camera saw, and what the robot did,
+in a fixed-size ring file, so that when something goes wrong the moments
+before it can be saved as a clip.
+
+Camera frames are stored as the JPEG bytes the camera sent; robot events
+(commands, emergency stops, errors) are stored next to them as small JSON
+records. The ring file is created at full size and memory-mapped, so disk
+use never changes and recording a frame is one memcpy of the JPEG from the
+receive buffer into the mapped page cache, plus a 40-byte index entry. The
+kernel writes the pages back on its own; nothing is flushed per frame.
+
+File layout (little endian):
+    header   - magic, version, flags, data size, index slots, head (bytes
+               ever reserved), next sequence number (HEADER_FORMAT)
+    index    - index_slots entries of ENTRY_FORMAT: sequence, absolute
+               position, wall time, frame id, length, kind
+    data     - data_size bytes of ring, starting at a page boundary
+
+Each record is contiguous in the data ring (a record that would cross the
+end starts again at offset 0). Positions are absolute byte counts, so a
+record is intact exactly when its position is at least head - data_size.
+The head is advanced before the bytes are copied, which keeps that rule
+true even if the process dies halfway through a copy.
+
+The header has a "dirty" flag that is set while the ring is open for
+writing. Finding it set on open means the last session crashed, and
+recovered is True so the caller can save what led up to it.
+
+A clip is two files: <name>.mjpeg holds the frames in the camera's own
+multipart format with an X-Timestamp header per part (ffplay -f mpjpeg
+plays it, and "python recorder.py serve" streams it to the EYES modules),
+and <name>.json holds the reason, the frame times and the events. The
+clips directory is kept to max_clips clips and max_clips_mb megabytes,
+deleting the oldest clips first.
+
+Usage:
+    python recorder.py info --ring ../BRAIN/recordings/camera.ring
+    python recorder.py snapshot --ring ../BRAIN/recordings/camera.ring --seconds 30
+    python recorder.py export clip.mjpeg --out frames/
+    python recorder.py serve clip.mjpeg --port 8080
+    python recorder.py bench --size-mb 16              # write cost and constant disk use
+"""
+
+import os
+import re
+import sys
+import json
+import mmap
+import time
+import struct
+import logging
+import argparse
+import threading
+import traceback
+
+logger = logging.getLogger('DETROIT.EYES')
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'BRAIN',
+                              'recordings')
+
+MAGIC = b"DRRB"
+VERSION = 1
+HEADER_FORMAT = "<4sHHQIIQQ"   # magic, version, flags, data size, index slots, reserved, head, sequence
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+HEAD_OFFSET = struct.calcsize("<4sHHQII")
+ENTRY_FORMAT = "<QQdQIHH"      # sequence, position, wall time, frame id, length, kind, reserved
+ENTRY_SIZE = struct.calcsize(ENTRY_FORMAT)
+PAGE = 4096
+FLAG_DIRTY = 1
+
+KIND_FRAME = 1
+KIND_EVENT = 2
+
+DEFAULT_SIZE_MB = 64           # about five minutes of QVGA at 15 fps
+DEFAULT_INDEX_SLOTS = 65536
+DEFAULT_SECONDS = 30.0         # length of a clip
+TRIGGER_AFTER = 2.0            # seconds recorded after a trigger before the clip is cut
+TRIGGER_COOLDOWN = 10.0        # seconds between clips for the same reason
+MAX_CLIPS = 50                 # clips kept in the clips directory
+MAX_CLIPS_MB = 512             # megabytes of clips kept in the clips directory
+CLIP_NAME = re.compile(r"^\d{8}_\d{6}(_\d{3})?_[a-z0-9_]*\.mjpeg$")   # names snapshot() gives clips
+
+
+def _layout(data_size, index_slots):
+    """Byte offsets of the index and the data ring, and the file size"""
+    index_offset = -(-HEADER_SIZE // 64) * 64
+    data_offset = -(-(index_offset + index_slots * ENTRY_SIZE) // PAGE) * PAGE
+    return index_offset, data_offset, data_offset + data_size
+
+
+class RingRecorder:
+    """A memory-mapped ring of frames and events with a fixed size on disk
+
+    Args:
+        path (str): Ring file, created (or recreated if its layout differs) on open
+        size_mb (int): Data ring size in megabytes
+        index_slots (int): Records the index can hold
+        clips_dir (str): Where snapshot() writes clips (default: next to the ring)
+        readonly (bool): Open an existing ring to read it, e.g. while the robot is recording into it
+        max_clips (int): Clips kept in clips_dir; the oldest are deleted first
+        max_clips_mb (float): Megabytes of clips kept in clips_dir
+    """
+
+    def __init__(self, path, size_mb=DEFAULT_SIZE_MB, index_slots=DEFAULT_INDEX_SLOTS, clips_dir=None,
+                 readonly=False, max_clips=MAX_CLIPS, max_clips_mb=MAX_CLIPS_MB):
+        self.path = path
+        self.readonly = readonly
+        self.data_size = int(size_mb * 1024 * 1024)
+        self.index_slots = index_slots
+        self.clips_dir = clips_dir or os.path.dirname(os.path.abspath(path))
+        self.max_clips = max_clips
+        self.max_clips_size = int(max_clips_mb * 1024 * 1024)
+        self.index_offset, self.data_offset, self.file_size = _layout(self.data_size, index_slots)
+        self.stats = {"frames": 0, "events": 0, "bytes": 0, "dropped": 0, "clips": 0}
+        self.recovered = False
+        self.head = 0
+        self.sequence = 1
+        self._file = None
+        self._map = None
+        self._lock = threading.Lock()
+        self._last_trigger = {}
+        self._running = False
+        self._thread = None
+        self._hooks = None
+        self._open()
+
+    def _header_matches(self):
+        try:
+            if os.path.getsize(self.path) != self.file_size:
+                return False
+            with open(self.path, 'rb') as f:
+                magic, version, _, data_size, slots, _, _, _ = struct.unpack(HEADER_FORMAT, f.read(HEADER_SIZE))
+            return (magic == MAGIC and version == VERSION and data_size == self.data_size
+                    and slots == self.index_slots)
+        except Exception:
+            return False
+
+    def _create(self):
+        """Create the ring file at its full size, with the blocks allocated up front"""
+        with open(self.path, 'wb') as f:
+            f.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, 0, self.data_size, self.index_slots, 0, 0, 1))
+            f.truncate(self.file_size)
+            if hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(f.fileno(), 0, self.file_size)
+
+    def _open(self):
+        if self.readonly:
+            if not self._header_matches():
+                raise ValueError(f"Not a recorder ring with this layout: {self.path}")
+            self._file = open(self.path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), self.file_size, access=mmap.ACCESS_READ)
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if not os.path.exists(self.path) or not self._header_matches():
+            if os.path.exists(self.path):
+                logger.warning(f"Recorder ring layout changed, recreating: {self.path}")
+            self._create()
+        self._file = open(self.path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), self.file_size)
+        _, _, flags, _, _, _, self.head, self.sequence = struct.unpack_from(HEADER_FORMAT, self._map, 0)
+        if flags & FLAG_DIRTY:
+            logger.warning("Recorder ring was not closed cleanly; the last session may have crashed")
+            self.recovered = True
+        self._set_flags(FLAG_DIRTY)
+
+    def _set_flags(self, flags):
+        struct.pack_into("<H", self._map, 6, flags)
+        self._map.flush(0, PAGE)
+
+    def _write(self, data, kind, timestamp, frame_id):
+        if self.readonly:
+            raise ValueError("The ring is open read-only")
+        length = len(data)
+        if length == 0 or length > self.data_size // 4:
+            self.stats["dropped"] += 1
+            return None
+        with self._lock:
+            if self._map is None:
+                return None
+            position = self.head
+            offset = position % self.data_size
+            if offset + length > self.data_size:
+                # Records never wrap: skip the tail of the ring
+                position += self.data_size - offset
+                offset = 0
+            self.head = position + length
+            # The head moves first, so the bytes about to be overwritten are already invalid
+            struct.pack_into("<Q", self._map, HEAD_OFFSET, self.head)
+            start = self.data_offset + offset
+            self._map[start:start + length] = data
+            sequence = self.sequence
+            struct.pack_into(ENTRY_FORMAT, self._map, self.index_offset + (sequence % self.index_slots) * ENTRY_SIZE,
+                             sequence, position, timestamp, frame_id, length, kind, 0)
+            self.sequence = sequence + 1
+            struct.pack_into("<Q", self._map, HEAD_OFFSET + 8, self.sequence)
+            self.stats["bytes"] += length
+        return sequence
+
+    def write_frame(self, data, timestamp=None, frame_id=0):
+        """Record a JPEG (bytes or memoryview); returns its sequence number"""
+        sequence = self._write(data, KIND_FRAME, time.time() if timestamp is None else timestamp, frame_id or 0)
+        if sequence:
+            self.stats["frames"] += 1
+        return sequence
+
+    def write_event(self, kind, details=None, timestamp=None):
+        """Record a robot event, e.g. write_event("emergency_stop", {"word": "stop"})"""
+        timestamp = time.time() if timestamp is None else timestamp
+        payload = json.dumps({"type": kind, "time": timestamp, **(details or {})}, default=str).encode()
+        sequence = self._write(payload, KIND_EVENT, timestamp, 0)
+        if sequence:
+            self.stats["events"] += 1
+        return sequence
+
+    def _entry(self, sequence):
+        entry = struct.unpack_from(ENTRY_FORMAT, self._map,
+                                   self.index_offset + (sequence % self.index_slots) * ENTRY_SIZE)
+        return entry if entry[0] == sequence else None
+
+    def records(self, seconds=None, end=None):
+        """Intact records of the last `seconds` before `end` (default: the newest), oldest first
+
+        Returns:
+            list: (sequence, wall time, frame id, kind, bytes) tuples
+        """
+        with self._lock:
+            if self._map is None:
+                return []
+            if self.readonly:
+                # Another process is writing; take its head and sequence as of now
+                self.head, self.sequence = struct.unpack_from("<QQ", self._map, HEAD_OFFSET)
+            head, newest = self.head, self.sequence - 1
+            oldest_position = head - self.data_size
+            entries = []
+            sequence = newest
+            while sequence > 0 and newest - sequence < self.index_slots:
+                entry = self._entry(sequence)
+                if entry is None or entry[1] < oldest_position:
+                    break
+                if end is None:
+                    end = entry[2]
+                if seconds is not None and entry[2] < end - seconds:
+                    break
+                if entry[2] <= end:
+                    entries.append(entry)
+                sequence -= 1
+        # Copy the bytes without holding up the writer, then drop whatever it overwrote meanwhile
+        records = []
+        for sequence, position, timestamp, frame_id, length, kind, _ in reversed(entries):
+            start = self.data_offset + position % self.data_size
+            records.append((sequence, timestamp, frame_id, kind, bytes(self._map[start:start + length]), position))
+        with self._lock:
+            if self.readonly:
+                self.head = struct.unpack_from("<Q", self._map, HEAD_OFFSET)[0]
+            oldest_position = self.head - self.data_size
+        return [record[:5] for record in records if record[5] >= oldest_position]
+
+    def snapshot(self, seconds=DEFAULT_SECONDS, reason="manual", end=None, directory=None):
+        """Save the last `seconds` of the ring as a standalone clip
+
+        Returns:
+            str: Path of the clip's .mjpeg file, or None if the ring is empty
+        """
+        records = self.records(seconds, end)
+        frames = [(timestamp, data) for _, timestamp, _, kind, data in records if kind == KIND_FRAME]
+        events = [json.loads(data) for _, _, _, kind, data in records if kind == KIND_EVENT]
+        if not frames and not events:
+            return None
+        directory = directory or self.clips_dir
+        os.makedirs(directory, exist_ok=True)
+        last = records[-1][1]
+        name = (time.strftime("%Y%m%d_%H%M%S", time.localtime(last)) + f"_{int(last * 1000) % 1000:03d}_"
+                + re.sub(r"[^a-z0-9]+", "_", reason.lower()))
+        base = os.path.join(directory, name)
+        count = 1
+        while os.path.exists(base + ".mjpeg"):
+            # Another clip ending on the same millisecond with the same reason
+            count += 1
+            base = os.path.join(directory, f"{name}_{count}")
+        write_clip(base + ".mjpeg", frames)
+        with open(base + ".json", 'w') as f:
+            json.dump({"reason": reason, "saved": time.time(), "start": records[0][1], "end": last,
+                       "frames": [timestamp for timestamp, _ in frames], "events": events}, f, indent=1)
+        self.stats["clips"] += 1
+        logger.info(f"Saved {len(frames)} frames and {len(events)} events ({reason}) to {base}.mjpeg")
+        if os.path.abspath(directory) == os.path.abspath(self.clips_dir):
+            self.prune()
+        return base + ".mjpeg"
+
+    def prune(self):
+        """Delete the oldest clips until clips_dir is within max_clips and max_clips_mb
+
+        Only files named the way snapshot() names clips are touched, and the
+        newest clip is always kept. Returns the number of clips deleted.
+        """
+        clips = []
+        for name in os.listdir(self.clips_dir):
+            if not CLIP_NAME.match(name):
+                continue
+            base = os.path.join(self.clips_dir, name[:-len(".mjpeg")])
+            paths = [path for path in (base + ".mjpeg", base + ".json") if os.path.exists(path)]
+            try:
+                clips.append((os.path.getmtime(paths[0]), sum(os.path.getsize(path) for path in paths), paths))
+            except OSError:
+                continue
+        clips.sort()
+        total = sum(size for _, size, _ in clips)
+        deleted = 0
+        while len(clips) > 1 and (len(clips) > self.max_clips or total > self.max_clips_size):
+            _, size, paths = clips.pop(0)
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning(f"Could not delete old clip {path}: {e}")
+            total -= size
+            deleted += 1
+        if deleted:
+            logger.info(f"Deleted {deleted} old clips from {self.clips_dir}")
+        return deleted
+
+    def trigger(self, reason, details=None, seconds=DEFAULT_SECONDS, after=TRIGGER_AFTER, cooldown=TRIGGER_COOLDOWN):
+        """Record an event and save a clip around it a moment later, in the background
+
+        Clips for the same reason are at most one per `cooldown` seconds; the
+        event is recorded either way. Returns the thread saving the clip, or None.
+        """
+        self.write_event(reason, details)
+        now = time.monotonic()
+        if now - self._last_trigger.get(reason, -cooldown) < cooldown:
+            return None
+        self._last_trigger[reason] = now
+
+        def save():
+            time.sleep(after)
+            try:
+                self.snapshot(seconds + after, reason)
+            except Exception as e:
+                logger.error(f"Could not save {reason} clip: {e}")
+
+        thread = threading.Thread(target=save, name=f"recorder-{reason}")
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def watch_crashes(self, seconds=DEFAULT_SECONDS):
+        """Save a clip when an exception goes unhandled, on the main thread or any other"""
+        self.unwatch_crashes()
+        previous_hook = sys.excepthook
+        previous_thread_hook = threading.excepthook
+
+        def crashed(exc_type, exc_value, exc_traceback, thread_name):
+            try:
+                self.write_event("crash", {"thread": thread_name, "error": repr(exc_value),
+                                           "traceback": "".join(traceback.format_tb(exc_traceback))[-2000:]})
+                self.snapshot(seconds, "crash")
+            except Exception as e:
+                logger.error(f"Could not save crash clip: {e}")
+
+        def excepthook(exc_type, exc_value, exc_traceback):
+            if not issubclass(exc_type, KeyboardInterrupt):
+                crashed(exc_type, exc_value, exc_traceback, "main")
+            previous_hook(exc_type, exc_value, exc_traceback)
+
+        def thread_excepthook(args):
+            if args.exc_type is not SystemExit:
+                crashed(args.exc_type, args.exc_value, args.exc_traceback, getattr(args.thread, "name", None))
+            previous_thread_hook(args)
+
+        self._hooks = (previous_hook, previous_thread_hook, excepthook, thread_excepthook)
+        sys.excepthook = excepthook
+        threading.excepthook = thread_excepthook
+        return self
+
+    def unwatch_crashes(self):
+        """Put back the exception hooks watch_crashes() replaced, unless something replaced them since"""
+        if self._hooks is None:
+            return
+        previous_hook, previous_thread_hook, excepthook, thread_excepthook = self._hooks
+        if sys.excepthook is excepthook:
+            sys.excepthook = previous_hook
+        if threading.excepthook is thread_excepthook:
+            threading.excepthook = previous_thread_hook
+        self._hooks = None
+
+    def start(self, source):
+        """Record every frame from a source with next_frame(timeout), e.g. a relay Subscription"""
+        if self._running:
+            return self
+        self.source = source
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="recorder")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while self._running:
+            frame = self.source.next_frame(timeout=0.5)
+            if frame is None:
+                continue
+            with frame:
+                # Frame times are monotonic; the ring keeps wall time
+                timestamp = time.time() - (time.monotonic() - frame.timestamp)
+                self.write_frame(frame.data, timestamp, frame.id)
+
+    def summary(self):
+        """What the ring holds: records, frames, events, time span and frame rate"""
+        records = self.records()
+        frames = [timestamp for _, timestamp, _, kind, _ in records if kind == KIND_FRAME]
+        span = records[-1][1] - records[0][1] if len(records) >= 2 else 0.0
+        return {"records": len(records), "frames": len(frames), "events": len(records) - len(frames),
+                "seconds": round(span, 1), "fps": round((len(frames) - 1) / span, 1) if span and frames else 0.0,
+                "data_mb": self.data_size / 1048576, "file_mb": round(self.file_size / 1048576, 2),
+                "recovered": self.recovered, "this_session": dict(self.stats)}
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        return True
+
+    def close(self):
+        """Stop recording and watching for crashes, flush and mark the ring as closed cleanly"""
+        self.stop()
+        self.unwatch_crashes()
+        with self._lock:
+            if self._map is None:
+                return True
+            if not self.readonly:
+                self._set_flags(0)
+                self._map.flush()
+            self._map.close()
+            self._map = None
+            self._file.close()
+            self._file = None
+        return True
+
+
+def write_clip(path, frames):
+    """Write (wall time, JPEG) pairs as a multipart MJPEG file"""
+    with open(path, 'wb') as f:
+        for timestamp, jpeg in frames:
+            f.write(f"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n"
+                    f"X-Timestamp: {timestamp:.6f}\r\n\r\n".encode())
+            f.write(jpeg)
+            f.write(b"\r\n")
+
+
+def load_clip(path):
+    """Frames of a clip written by write_clip, as (wall time, JPEG) pairs"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    frames = []
+    position = 0
+    while True:
+        start = data.find(b"--frame\r\n", position)
+        if start < 0:
+            break
+        body = data.find(b"\r\n\r\n", start)
+        if body < 0:
+            break
+        headers = dict(line.split(": ", 1) for line in data[start + 9:body].decode(errors="replace").split("\r\n")
+                       if ": " in line)
+        length = int(headers.get("Content-Length", 0))
+        frames.append((float(headers.get("X-Timestamp", 0.0)), data[body + 4:body + 4 + length]))
+        position = body + 4 + length
+    return frames
+
+
+def _bench(size_mb, seconds):
+    import tempfile
+    from replay_server import synthetic_jpegs
+
+    jpegs = synthetic_jpegs(50)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.ring")
+        recorder = RingRecorder(path, size_mb)
+        try:
+            frame_size = sum(len(j) for j in jpegs) / len(jpegs)
+            print(f"ring {size_mb} MB, {os.path.getsize(path) / 1048576:.2f} MB on disk, "
+                  f"frames of {frame_size / 1024:.1f} KB")
+            views = [memoryview(j) for j in jpegs]
+            times = []
+            end = time.monotonic() + seconds
+            count = 0
+            while time.monotonic() < end:
+                view = views[count % len(views)]
+                start = time.perf_counter()
+                recorder.write_frame(view, frame_id=count)
+                times.append(time.perf_counter() - start)
+                count += 1
+            times.sort()
+            written = recorder.stats["bytes"] / 1048576
+            print(f"{count} frames ({written:.0f} MB, {written / size_mb:.1f} times round the ring): "
+                  f"median {times[len(times) // 2] * 1e6:.1f} us, "
+                  f"p99 {times[int(len(times) * 0.99)] * 1e6:.1f} us per frame")
+            print(f"on disk after writing: {os.path.getsize(path) / 1048576:.2f} MB")
+            start = time.perf_counter()
+            clip = recorder.snapshot(DEFAULT_SECONDS, "bench")
+            elapsed = time.perf_counter() - start
+            print(f"snapshot of the newest {DEFAULT_SECONDS:.0f} s: {len(load_clip(clip))} frames "
+                  f"in {elapsed * 1000:.1f} ms")
+        finally:
+            recorder.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="DETROIT camera flight recorder")
+    parser.add_argument("command", choices=["info", "snapshot", "export", "serve", "bench"])
+    parser.add_argument("clip", nargs="?", help="Clip .mjpeg file (export, serve)")
+    parser.add_argument("--ring", default=os.path.join(RECORDINGS_DIR, "camera.ring"), help="Ring file")
+    parser.add_argument("--size-mb", type=int, default=DEFAULT_SIZE_MB, help="Ring size")
+    parser.add_argument("--seconds", type=float, default=DEFAULT_SECONDS, help="Clip length, or bench duration")
+    parser.add_argument("--reason", default="manual", help="Reason stored with the clip")
+    parser.add_argument("--out", help="Output directory")
+    parser.add_argument("--port", type=int, default=0, help="Port to serve a clip on")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        _bench(args.size_mb, args.seconds if args.seconds != DEFAULT_SECONDS else 3.0)
+    elif args.command in ("export", "serve"):
+        if not args.clip:
+            parser.error(f"{args.command} needs a clip")
+        frames = load_clip(args.clip)
+        if args.command == "export":
+            out = args.out or os.path.splitext(args.clip)[0]
+            os.makedirs(out, exist_ok=True)
+            for index, (timestamp, jpeg) in enumerate(frames):
+                with open(os.path.join(out, f"{index:05d}.jpg"), 'wb') as f:
+                    f.write(jpeg)
+            print(f"Wrote {len(frames)} frames to {out}")
+        else:
+            from replay_server import ReplayServer
+
+            span = frames[-1][0] - frames[0][0] if len(frames) >= 2 else 0.0
+            fps = (len(frames) - 1) / span if span else 10.0
+            server = ReplayServer([jpeg for _, jpeg in frames], fps, port=args.port).start()
+            print(f"Serving {len(frames)} frames at {fps:.1f} fps on {server.url}")
+            try:
+                while True:
+                    time.sleep(1.0)
+            except KeyboardInterrupt:
+                server.stop()
+    else:
+        if not os.path.exists(args.ring):
+            parser.error(f"No ring file at {args.ring}")
+        # Open the ring with the layout it was created with
+        with open(args.ring, 'rb') as f:
+            header = struct.unpack(HEADER_FORMAT, f.read(HEADER_SIZE))
+        recorder = RingRecorder(args.ring, header[3] / 1048576, header[4], args.out, readonly=True)
+        if args.command == "info":
+            summary = recorder.summary()
+            summary["open"] = bool(header[2] & FLAG_DIRTY)   # being recorded, or the recorder crashed
+            for key, value in summary.items():
+                print(f"{key:>10}: {value}")
+        else:
+            print(recorder.snapshot(args.seconds, args.reason) or "The ring is empty")
+        recorder.close()
+
+__all__ = ['RingRecorder', 'write_clip', 'load_clip', 'RECORDINGS_DIR', 'KIND_FRAME', 'KIND_EVENT', 'MAX_CLIPS',
+           'MAX_CLIPS_MB']
@@ -0,0 +1,277 @@
+"""
+Camera Stream Relay for DETROIT EYES
+====================================
+The ESP32-CAM's stream handler runs one capture loop per client, so every
+extra viewer costs the camera CPU time and WiFi airtime. The relay holds a
+single upstream connection (an MJPEGClient) and shares its frames with any
+number of local consumers:
+
+    in-process    relay.subscribe(fps=5) returns a Subscription whose
+                  next_frame() hands out the shared Frame (reference counted,
+                  never copied) no faster than the requested rate
+    over HTTP     http://<host>:<port>/stream?fps=5 re-serves the stream in
+                  the camera's own multipart framing, writing the shared
+                  frame buffers straight to each socket
+
+Every subscriber gets latest-frame semantics at its own rate: a slow
+consumer skips frames, it never delays the upstream reader or other
+subscribers.
+
+Usage:
+    python relay.py --url http://192.168.1.50/stream --port 8081
+    python relay.py --replay --demo       # local replay, three paced subscribers
+"""
+
+import time
+import logging
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from mjpeg import MJPEGClient
+
+logger = logging.getLogger('DETROIT.EYES')
+
+DEFAULT_PORT = 8081
+
+
+class Subscription:
+    """One consumer's paced view of the relayed stream
+
+    Args:
+        relay (StreamRelay): The relay to read from
+        fps (float): Largest frame rate to deliver; None or 0 for every frame
+        name (str): Label for status reports
+    """
+
+    def __init__(self, relay, fps=None, name=None):
+        self.relay = relay
+        self.interval = 1.0 / fps if fps else 0.0
+        self.name = name or f"subscriber-{id(self):x}"
+        self.delivered = 0
+        self.skipped = 0
+        self.active = True
+        self._last_id = 0
+        self._due = 0.0
+        self._started = time.monotonic()
+
+    @property
+    def fps(self):
+        elapsed = time.monotonic() - self._started
+        return self.delivered / elapsed if elapsed > 0 else 0.0
+
+    def next_frame(self, timeout=None):
+        """Wait until this subscriber is due and a newer frame exists
+
+        Returns:
+            Frame: Acquired for the caller (release it, or use `with`), or None
+            on timeout or once the relay stops
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = self._due - time.monotonic()
+        if delay > 0:
+            if deadline is not None and self._due > deadline:
+                time.sleep(max(0.0, deadline - time.monotonic()))
+                return None
+            time.sleep(delay)
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        frame = self.relay.client.wait_frame(self._last_id, remaining)
+        if frame is None or not self.active:
+            if frame is not None:
+                frame.release()
+            return None
+        if self._last_id:
+            self.skipped += frame.id - self._last_id - 1
+        self._last_id = frame.id
+        self.delivered += 1
+        now = time.monotonic()
+        # Keep to the rate on average, but never try to catch up after a stall
+        self._due = max(self._due + self.interval, now) if self.interval else now
+        return frame
+
+    def close(self):
+        self.active = False
+        self.relay._unsubscribe(self)
+
+    def status(self):
+        return {"name": self.name, "fps": round(self.fps, 2), "delivered": self.delivered,
+                "skipped": self.skipped}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class StreamRelay:
+    """One upstream camera connection shared by local subscribers
+
+    Args:
+        url (str): Upstream stream URL
+        host (str): Interface for the HTTP re-server; None to not serve HTTP
+        port (int): Port for the HTTP re-server; 0 picks a free one
+    """
+
+    def __init__(self, url, host="127.0.0.1", port=DEFAULT_PORT):
+        self.url = url
+        self.host = host
+        self.port = port
+        self.client = MJPEGClient(url)
+        self._subscriptions = []
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def stream_url(self):
+        return f"http://{self.host}:{self.port}/stream" if self._server else None
+
+    def start(self):
+        self.client.start()
+        if self.host is not None:
+            self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+            self._server.daemon_threads = True
+            self.port = self._server.server_address[1]
+            self._thread = threading.Thread(target=self._server.serve_forever, name="mjpeg-relay")
+            self._thread.daemon = True
+            self._thread.start()
+            logger.info(f"Relaying {self.url} on {self.stream_url}")
+        return self
+
+    def subscribe(self, fps=None, name=None):
+        subscription = Subscription(self, fps, name)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def status(self):
+        """Upstream rates plus per-subscriber delivery"""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        return {"upstream": self.client.rates(), "subscribers": [s.status() for s in subscriptions]}
+
+    def _make_handler(self):
+        relay = self
+
+        class RelayHandler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug("Relay: " + format % args)
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                if parts.path != "/stream":
+                    self.send_error(404)
+                    return
+                query = parse_qs(parts.query)
+                try:
+                    fps = float(query.get("fps", ["0"])[0])
+                except ValueError:
+                    self.send_error(400, "fps must be a number")
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                subscription = relay.subscribe(fps, f"http {self.client_address[0]}:{self.client_address[1]}")
+                try:
+                    while subscription.active:
+                        frame = subscription.next_frame(timeout=1.0)
+                        if frame is None:
+                            continue
+                        with frame:
+                            self.wfile.write(f"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: "
+                                             f"{frame.size}\r\n\r\n".encode())
+                            self.wfile.write(frame.data)
+                            self.wfile.write(b"\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    subscription.close()
+
+        return RelayHandler
+
+    def stop(self):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.active = False
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        self.client.stop()
+        return True
+
+
+def _demo(relay, seconds):
+    """Three consumers at different rates: two in-process, one over HTTP"""
+    def consume(subscription):
+        while subscription.active:
+            frame = subscription.next_frame(timeout=0.5)
+            if frame is not None:
+                frame.release()
+
+    subscriptions = [relay.subscribe(None, "detector"), relay.subscribe(5, "recorder")]
+    threads = [threading.Thread(target=consume, args=(s,), daemon=True) for s in subscriptions]
+    viewer = MJPEGClient(relay.stream_url + "?fps=2")
+    for thread in threads:
+        thread.start()
+    viewer.start()
+    time.sleep(seconds)
+    status = relay.status()
+    viewer.stop()
+    for subscription in subscriptions:
+        subscription.close()
+
+    upstream = status["upstream"]
+    print(f"upstream: {upstream['fps']:.1f} fps, {upstream['frames']} frames, {upstream['buffers']} buffers")
+    for entry in status["subscribers"]:
+        print(f"  {entry['name']:<24} {entry['fps']:>6.1f} fps {entry['delivered']:>6} delivered "
+              f"{entry['skipped']:>6} skipped")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="DETROIT camera stream relay")
+    parser.add_argument("--url", help="Upstream stream URL")
+    parser.add_argument("--replay", action="store_true", help="Relay a local synthetic stream")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to serve on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to serve on")
+    parser.add_argument("--demo", action="store_true", help="Attach sample subscribers and print their rates")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Demo length")
+    args = parser.parse_args()
+
+    source = None
+    url = args.url
+    if args.replay or not url:
+        from replay_server import ReplayServer
+
+        source = ReplayServer(fps=25.0).start()
+        url = source.url
+    relay = StreamRelay(url, args.host, args.port).start()
+    try:
+        if args.demo:
+            _demo(relay, args.seconds)
+        else:
+            print(f"Relaying on {relay.stream_url} (Ctrl+C to stop)")
+            while True:
+                time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        relay.stop()
+        if source:
+            print(f"upstream connections to the camera: {source.connections}")
+            source.stop()
+
+__all__ = ['StreamRelay', 'Subscription', 'DEFAULT_PORT']
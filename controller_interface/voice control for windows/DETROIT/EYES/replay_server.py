@@ -0,0 +1,180 @@
+"""
+Camera Stream Replay for DETROIT EYES
+=====================================
+A local stand-in for the ESP32-CAM's /stream endpoint, so the EYES modules
+can be run and measured without the camera. Frames are sent exactly as
+jpg_stream_httpd_handler() sends them: HTTP chunked encoding with three
+chunks per frame (part header, JPEG, trailing CRLF) in a
+multipart/x-mixed-replace; boundary=frame response.
+
+Frames come from a directory of .jpg files, a list of JPEG byte strings, or
+are drawn on the fly (a QVGA test card with a moving block, which needs
+Pillow).
+
+Usage:
+    python replay_server.py                          # synthetic frames on a free port
+    python replay_server.py --port 8080 --dir captures/ --fps 10
+"""
+
+import io
+import os
+import time
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger('DETROIT.EYES')
+
+FRAME_SIZE = (320, 240)   # FRAMESIZE_QVGA in the firmware
+
+
+def synthetic_jpegs(count=50, size=FRAME_SIZE, quality=80):
+    """Test-card JPEGs with a block moving left to right and a frame counter"""
+    from PIL import Image, ImageDraw
+
+    width, height = size
+    block = max(8, height // 6)
+    frames = []
+    for index in range(count):
+        image = Image.new("RGB", size, (40, 40, 48))
+        draw = ImageDraw.Draw(image)
+        for x in range(0, width, 40):
+            draw.line([(x, 0), (x, height)], fill=(70, 70, 80))
+        left = int((width - block) * index / max(1, count - 1))
+        top = (height - block) // 2
+        draw.rectangle([left, top, left + block, top + block], fill=(230, 120, 30))
+        draw.text((6, 6), f"{index:04d}", fill=(255, 255, 255))
+        out = io.BytesIO()
+        image.save(out, format="JPEG", quality=quality)
+        frames.append(out.getvalue())
+    return frames
+
+
+def load_jpegs(directory):
+    """Every .jpg/.jpeg file in a directory, in name order"""
+    names = sorted(n for n in os.listdir(directory) if n.lower().endswith((".jpg", ".jpeg")))
+    if not names:
+        raise ValueError(f"No JPEG files in {directory}")
+    frames = []
+    for name in names:
+        with open(os.path.join(directory, name), 'rb') as f:
+            frames.append(f.read())
+    return frames
+
+
+class ReplayServer:
+    """Serves a list of JPEGs in a loop at /stream
+
+    Args:
+        jpegs (list): JPEG byte strings (default: synthetic_jpegs())
+        fps (float): Frame rate to send at
+        host (str): Interface to bind
+        port (int): Port to bind; 0 picks a free one
+    """
+
+    def __init__(self, jpegs=None, fps=25.0, host="127.0.0.1", port=0):
+        self.jpegs = jpegs if jpegs is not None else synthetic_jpegs()
+        self.fps = fps
+        self.host = host
+        self.port = port
+        self.clients = 0          # streams being served now
+        self.connections = 0      # streams served since start
+        self._server = None
+        self._thread = None
+        self._running = False
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/stream"
+
+    def _make_handler(self):
+        replay = self
+
+        class StreamHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug("Replay: " + format % args)
+
+            def _chunk(self, data):
+                self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/stream":
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                replay.clients += 1
+                replay.connections += 1
+                interval = 1.0 / replay.fps if replay.fps > 0 else 0.0
+                next_at = time.monotonic()
+                index = 0
+                try:
+                    while replay._running:
+                        jpeg = replay.jpegs[index % len(replay.jpegs)]
+                        self._chunk(f"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}"
+                                    "\r\n\r\n".encode())
+                        self._chunk(jpeg)
+                        self._chunk(b"\r\n")
+                        self.wfile.flush()
+                        index += 1
+                        next_at += interval
+                        delay = next_at - time.monotonic()
+                        if delay > 0:
+                            time.sleep(delay)
+                        else:
+                            next_at = time.monotonic()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    replay.clients -= 1
+                self.close_connection = True
+
+        return StreamHandler
+
+    def start(self):
+        self._running = True
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mjpeg-replay")
+        self._thread.daemon = True
+        self._thread.start()
+        logger.info(f"Replaying {len(self.jpegs)} frames at {self.fps:g} fps on {self.url}")
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        return True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="DETROIT camera stream replay")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=0, help="Port (default: any free port)")
+    parser.add_argument("--fps", type=float, default=25.0, help="Frame rate")
+    parser.add_argument("--dir", help="Directory of JPEG files to replay (default: synthetic frames)")
+    args = parser.parse_args()
+
+    server = ReplayServer(load_jpegs(args.dir) if args.dir else None, args.fps, args.host, args.port).start()
+    print(f"Serving {server.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+__all__ = ['ReplayServer', 'synthetic_jpegs', 'load_jpegs', 'FRAME_SIZE']
@@ -0,0 +1,122 @@
+"""
+Firmware Gait Descriptions for DETROIT LEGS
+===========================================
+The stock gaits of SPARK_bt_controlled.ino as data, so host tools can replay
+and recompile them without parsing C.
+
+Every firmware gait is a list of sweeps. A sweep is one of the sketch's `for`
+loops: a set of joints moving in lockstep, one degree per iteration, with a
+delay(6) after each iteration. Endpoints are symbolic where the sketch uses
+its variables ("K" = kneeCenter, "L" = lowest, "C" = center, "TL"/"TH" =
+thighLowest/thighHighest) and are resolved with resolve().
+
+Usage:
+    trajectory, dt = firmware_trajectory("forward")
+"""
+
+import numpy as np
+
+from geometry import JOINT_NAMES, CENTER, KNEE_CENTER, LOWEST, THIGH_THRESHOLD, stand_pose
+from motion_bridge import STEP_SECONDS
+
+# (joint, start, stop) triples, inclusive, transcribed loop by loop
+FIRMWARE_GAITS = {
+    "forward": [   # Walk_Forward()
+        [("sk2", "K", "L"), ("sk4", "K", "L"), ("sk6", "K", "L")],
+        [("st1", "C", "TL"), ("st3", "C", "TL"), ("st5", "C", "TH")],
+        [("sk2", "L", "K"), ("sk4", "L", "K"), ("sk6", "L", "K")],
+        [("sk1", "K", "L"), ("sk3", "K", "L"), ("sk5", "K", "L")],
+        [("st1", "TL", "C"), ("st3", "TL", "C"), ("st5", "TH", "C")],
+        [("st4", "C", "TH"), ("st6", "C", "TH"), ("st2", "C", "TL")],
+        [("sk1", "L", "K"), ("sk3", "L", "K"), ("sk5", "L", "K")],
+        [("st4", "TH", "C"), ("st6", "TH", "C"), ("st2", "TL", "C")],
+    ],
+    "backward": [   # Walk_Backward()
+        [("sk2", "K", "L"), ("sk4", "K", "L"), ("sk6", "K", "L")],
+        [("st1", "C", "TH"), ("st3", "C", "TH"), ("st5", "C", "TL")],
+        [("sk2", "L", "K"), ("sk4", "L", "K"), ("sk6", "L", "K")],
+        [("sk1", "K", "L"), ("sk3", "K", "L"), ("sk5", "K", "L")],
+        [("st1", "TH", "C"), ("st3", "TH", "C"), ("st5", "TL", "C")],
+        [("st4", "C", "TL"), ("st6", "C", "TL"), ("st2", "C", "TH")],
+        [("sk1", "L", "K"), ("sk3", "L", "K"), ("sk5", "L", "K")],
+        [("st4", "TL", "C"), ("st6", "TL", "C"), ("st2", "TH", "C")],
+    ],
+    "left": [   # turnL()
+        [("sk1", "K", "L"), ("sk3", "K", "L"), ("sk5", "K", "L")],
+        [("st1", "C", "TL"), ("st3", "C", "TL"), ("st5", "C", "TL")],
+        [("sk1", "L", "K"), ("sk3", "L", "K"), ("sk5", "L", "K")],
+        [("sk2", "K", "L"), ("sk4", "K", "L"), ("sk6", "K", "L")],
+        [("st1", "TL", "C-1"), ("st3", "TL", "C-1"), ("st5", "TL", "C-1")],
+        [("st2", "C", "TL"), ("st4", "C", "TL"), ("st6", "C", "TL")],
+        [("sk2", "L", "K"), ("sk4", "L", "K"), ("sk6", "L", "K")],
+    ],
+    "right": [   # turnR()
+        [("sk1", "K", "L"), ("sk3", "K", "L"), ("sk5", "K", "L")],
+        [("st1", "C", "TH"), ("st3", "C", "TH"), ("st5", "C", "TH")],
+        [("sk1", "L", "K"), ("sk3", "L", "K"), ("sk5", "L", "K")],
+        [("sk2", "K", "L"), ("sk4", "K", "L"), ("sk6", "K", "L")],
+        [("st1", "TH", "C+1"), ("st3", "TH", "C+1"), ("st5", "TH", "C+1")],
+        [("st2", "C", "TH"), ("st4", "C", "TH"), ("st6", "C", "TH")],
+        [("sk2", "L", "K"), ("sk4", "L", "K"), ("sk6", "L", "K")],
+    ],
+}
+
+_JOINT_INDEX = {name: index for index, name in enumerate(JOINT_NAMES)}
+
+
+def resolve(value, knee_center=KNEE_CENTER):
+    """Turn a symbolic sweep endpoint into degrees"""
+    if isinstance(value, (int, float)):
+        return value
+    symbols = {
+        "K": knee_center,
+        "L": LOWEST,
+        "C": CENTER,
+        "C-1": CENTER - 1,
+        "C+1": CENTER + 1,
+        "TL": CENTER - THIGH_THRESHOLD,
+        "TH": CENTER + THIGH_THRESHOLD,
+    }
+    return symbols[value]
+
+
+def joint_index(name):
+    """Column of a joint name (st1..st6, sk1..sk6) in a 12-joint array"""
+    return _JOINT_INDEX[name]
+
+
+def sweep_steps(sweep, knee_center=KNEE_CENTER):
+    """Number of loop iterations in a sweep"""
+    joint, start, stop = sweep[0]
+    return abs(resolve(stop, knee_center) - resolve(start, knee_center)) + 1
+
+
+def firmware_trajectory(name, knee_center=KNEE_CENTER, step_seconds=STEP_SECONDS, start_pose=None, sweeps=None):
+    """Setpoints the firmware writes for one call of a gait function
+
+    Args:
+        name (str): "forward", "backward", "left" or "right"
+        knee_center (int): kneeCenter at the time of the call
+        start_pose (array, optional): Angles before the call, the stand pose by default
+        sweeps (list, optional): Sweeps to replay instead of FIRMWARE_GAITS[name],
+            for another sketch's gaits
+
+    Returns:
+        tuple: (angles, dt) where angles is a float32 (steps, 12) array holding
+        the commanded pose after every loop iteration and dt the seconds that
+        iteration takes
+    """
+    pose = stand_pose(knee_center) if start_pose is None else np.array(start_pose, dtype=np.float32)
+    blocks = []
+    for sweep in FIRMWARE_GAITS[name] if sweeps is None else sweeps:
+        steps = sweep_steps(sweep, knee_center)
+        block = np.repeat(pose[None, :], steps, axis=0)
+        for joint, start, stop in sweep:
+            block[:, joint_index(joint)] = np.linspace(resolve(start, knee_center), resolve(stop, knee_center), steps)
+        pose = block[-1].copy()
+        blocks.append(block)
+    angles = np.concatenate(blocks)
+    return angles, np.full(len(angles), step_seconds)
+
+
+__all__ = ['FIRMWARE_GAITS', 'STEP_SECONDS', 'resolve', 'joint_index', 'sweep_steps', 'firmware_trajectory']
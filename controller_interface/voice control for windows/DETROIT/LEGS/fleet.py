@@ -0,0 +1,394 @@
+"""
+Fleet Controller for DETROIT LEGS
+=================================
+Drives several SPARK hexapods at once, one serial link per robot, from a
+single asyncio event loop.
+
+Every unit has its own command queue, its own pacing (a motion command is
+written once per gait cycle, as in motion_bridge.py) and its own health
+state: "online", "degraded" after a failed write, "offline" when the port is
+gone, in which case it is reopened with backoff. A stop bypasses the queue
+and is written at once.
+
+Commands are addressed to one unit by name or broadcast to all. A
+synchronized broadcast gives every unit the same start time, far enough
+ahead that the busiest unit has finished its current cycle; the units'
+timers then fire in the same pass of the event loop, so the first gait
+command reaches every robot within a fraction of one 20 ms gait frame.
+
+Voice commands pick a unit by starting with its name ("alpha, walk forward")
+and go to everyone otherwise or with "everyone" / "all units".
+
+FleetController runs the fleet on a background event loop for callers that
+are not async (the BRAIN). The benchmark drives dozens of units against
+FirmwareLoopback pty stand-ins.
+
+Usage:
+    python fleet.py --benchmark --units 32
+"""
+
+import re
+import time
+import asyncio
+import logging
+import argparse
+import threading
+
+from motion_bridge import (MOTION_COMMANDS, SPEED_COMMANDS, STAND_COMMAND, DEFAULT_BAUD, DEFAULT_KNEE_CENTER,
+                           STEP_SECONDS, gait_cycle_seconds, parse_motion_command)
+
+logger = logging.getLogger('DETROIT.LEGS.FLEET')
+
+ONLINE = "online"
+DEGRADED = "degraded"
+OFFLINE = "offline"
+
+FRAME_SECONDS = 0.02        # one gait frame at 50 Hz, the alignment target for synchronized starts
+SYNC_LEAD = 0.05            # how far ahead a synchronized start is scheduled
+MAX_WRITE_ERRORS = 3        # consecutive failed writes before a unit is considered offline
+RECONNECT_BACKOFF = (0.5, 8.0)
+BROADCAST_WORDS = r"\b(everyone|everybody|all units|all robots|fleet|all of you)\b"
+
+
+class FleetUnit:
+    """One robot: a serial link, a command queue and a health state
+
+    Args:
+        name (str): Unit name used to address it
+        port (str): Serial device or pyserial URL
+        baud (int): Link speed
+        step_seconds (float): Duration of one firmware gait step, for pacing
+    """
+
+    def __init__(self, name, port, baud=DEFAULT_BAUD, step_seconds=STEP_SECONDS):
+        self.name = name
+        self.port = port
+        self.baud = baud
+        self.step_seconds = step_seconds
+        self.serial = None
+        self.health = OFFLINE
+        self.knee_center = DEFAULT_KNEE_CENTER
+        self.busy_until = 0.0       # loop time when the current gait cycle ends
+        self.queue = None
+        self.stats = {"sent": 0, "errors": 0, "reconnects": 0}
+        self.last_error = None
+        self.last_write = None      # (command, loop time)
+        self._consecutive_errors = 0
+        self._stops = 0             # bumped by stop_now() to cancel a move in progress
+        self._task = None
+
+    @property
+    def byte_seconds(self):
+        return 10.0 / self.baud
+
+    async def connect(self):
+        """Open the port without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        try:
+            import serial
+            self.serial = await loop.run_in_executor(
+                None, lambda: serial.serial_for_url(self.port, baudrate=self.baud, timeout=0, write_timeout=0))
+        except Exception as e:
+            self.last_error = str(e)
+            self.health = OFFLINE
+            return False
+        self.health = ONLINE
+        self._consecutive_errors = 0
+        return True
+
+    def write(self, command):
+        """Write a command now; tracks health instead of raising"""
+        if self.serial is None:
+            return False
+        try:
+            self.serial.write(command.encode("ascii"))
+        except Exception as e:
+            self.stats["errors"] += 1
+            self._consecutive_errors += 1
+            self.last_error = str(e)
+            self.health = DEGRADED
+            if self._consecutive_errors >= MAX_WRITE_ERRORS:
+                self._drop()
+            return False
+        self._consecutive_errors = 0
+        self.health = ONLINE
+        self.stats["sent"] += 1
+        self.last_write = (command, asyncio.get_running_loop().time())
+        return True
+
+    def _drop(self):
+        try:
+            self.serial.close()
+        except Exception:
+            pass
+        self.serial = None
+        self.health = OFFLINE
+        logger.warning(f"Unit {self.name} went offline: {self.last_error}")
+
+    def stop_now(self):
+        """Drop everything queued and abort the gait in progress, including its remaining cycles"""
+        while self.queue is not None and not self.queue.empty():
+            self.queue.get_nowait()
+        self._stops += 1
+        self.busy_until = 0.0
+        return self.write(STAND_COMMAND)
+
+    async def run(self):
+        """Process the command queue, reconnecting while offline"""
+        loop = asyncio.get_running_loop()
+        backoff = RECONNECT_BACKOFF[0]
+        while True:
+            if self.health == OFFLINE:
+                if await self.connect():
+                    backoff = RECONNECT_BACKOFF[0]
+                    continue
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, RECONNECT_BACKOFF[1])
+                self.stats["reconnects"] += 1
+                continue
+            try:
+                action, value, cycles, start_at = await asyncio.wait_for(self.queue.get(), 1.0)
+            except asyncio.TimeoutError:
+                continue
+            if action == "speed":
+                command, knee_center = SPEED_COMMANDS[value]
+                if self.write(command):
+                    self.knee_center = knee_center
+            elif action == "stand":
+                self.write(STAND_COMMAND)
+            elif action == "move":
+                command = MOTION_COMMANDS[value]
+                planned = max(loop.time(), self.busy_until, start_at or 0.0)
+                stops = self._stops
+                for cycle in range(cycles):
+                    await asyncio.sleep(planned - loop.time())
+                    if self._stops != stops or not self.write(command):
+                        break
+                    # Plan from the scheduled time, not the wake-up time, so units started together stay together
+                    self.busy_until = planned + self.byte_seconds + gait_cycle_seconds(self.knee_center,
+                                                                                       self.step_seconds)
+                    planned = self.busy_until
+                    if not self.queue.empty():
+                        break   # a newer command replaces the remaining cycles
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+
+    async def close(self, stand=True):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if stand and self.serial is not None:
+            self.write(STAND_COMMAND)
+        if self.serial is not None:
+            self.serial.close()
+            self.serial = None
+        self.health = OFFLINE
+
+    def status(self):
+        return {"port": self.port, "health": self.health, "knee_center": self.knee_center,
+                "queued": self.queue.qsize() if self.queue else 0, "last_error": self.last_error, **self.stats}
+
+
+class Fleet:
+    """A set of FleetUnits on one event loop"""
+
+    def __init__(self, units, baud=DEFAULT_BAUD, step_seconds=STEP_SECONDS):
+        self.units = {name: FleetUnit(name, port, baud, step_seconds) for name, port in units.items()}
+
+    async def start(self):
+        """Open every link concurrently and start the unit tasks"""
+        await asyncio.gather(*(unit.connect() for unit in self.units.values()))
+        for unit in self.units.values():
+            unit.start()
+        return self.health()
+
+    def _targets(self, target):
+        if target in (None, "all"):
+            return list(self.units.values())
+        if target not in self.units:
+            raise KeyError(f"No unit named {target}")
+        return [self.units[target]]
+
+    async def command(self, target, action, value=None, cycles=None, sync=True):
+        """Send a motion intent to one unit or to all
+
+        Args:
+            target (str): Unit name, or None / "all" for every unit
+            action (str): "move", "speed", "stand" or "stop" (see parse_motion_command)
+            sync (bool): Align the gait start of a broadcast move across units
+
+        Returns:
+            float: The synchronized start time (loop time), or None
+        """
+        units = self._targets(target)
+        if action == "stop":
+            for unit in units:
+                unit.stop_now()
+            return None
+        start_at = None
+        if action == "move" and sync and len(units) > 1:
+            loop = asyncio.get_running_loop()
+            start_at = max([loop.time()] + [unit.busy_until for unit in units if unit.health != OFFLINE]) + SYNC_LEAD
+        for unit in units:
+            if unit.health != OFFLINE:
+                unit.queue.put_nowait((action, value, max(1, cycles or 1), start_at))
+        return start_at
+
+    async def handle_text(self, text, sync=True):
+        """Route a spoken command; returns the response text or None"""
+        target, motion = parse_fleet_command(text, self.units)
+        if motion is None:
+            return None
+        await self.command(target, *motion, sync=sync)
+        who = "Everyone" if target in (None, "all") else target.title()
+        return f"{who}: {motion[0]}" + (f" {motion[1]}" if motion[1] is not None else "") + "."
+
+    def health(self):
+        return {name: unit.status() for name, unit in self.units.items()}
+
+    async def close(self, stand=True):
+        await asyncio.gather(*(unit.close(stand) for unit in self.units.values()))
+
+
+def parse_fleet_command(text, names):
+    """Split a spoken command into (target, motion intent)
+
+    A command that starts with a unit name goes to that unit; everything else
+    goes to all units ("all").
+    """
+    text = text.lower().strip()
+    target = "all"
+    for name in names:
+        match = re.match(rf"(?:unit\s+)?{re.escape(name.lower())}\b[\s,:]*", text)
+        if match:
+            target = name
+            text = text[match.end():]
+            break
+    else:
+        text = re.sub(BROADCAST_WORDS, "", text).strip(" ,:")
+    return target, parse_motion_command(text)
+
+
+class FleetController:
+    """Runs a Fleet on a background event loop for synchronous callers"""
+
+    def __init__(self, units, baud=DEFAULT_BAUD, step_seconds=STEP_SECONDS):
+        self.fleet = Fleet(units, baud, step_seconds)
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="fleet-loop")
+        self._thread.daemon = True
+
+    def _call(self, coroutine, timeout=5.0):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    def start(self):
+        self._thread.start()
+        health = self._call(self.fleet.start())
+        online = sum(1 for status in health.values() if status["health"] == ONLINE)
+        logger.info(f"Fleet started: {online}/{len(health)} units online")
+        return health
+
+    def command(self, target, action, value=None, cycles=None, sync=True):
+        return self._call(self.fleet.command(target, action, value, cycles, sync))
+
+    def handle_text(self, text):
+        return self._call(self.fleet.handle_text(text))
+
+    def stop_all(self):
+        """Emergency stop every unit (safe to call from any thread)"""
+        return self._call(self.fleet.command("all", "stop"), timeout=1.0)
+
+    def health(self):
+        return self._call(self._health())
+
+    async def _health(self):
+        return self.fleet.health()
+
+    def close(self, stand=True):
+        try:
+            self._call(self.fleet.close(stand))
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout=1.0)
+        return True
+
+
+async def _benchmark(count, broadcasts):
+    from loopback import FirmwareLoopback
+
+    loopbacks = [FirmwareLoopback() for _ in range(count)]
+    fleet = Fleet({f"unit{index}": loopback.start() for index, loopback in enumerate(loopbacks)})
+    started = time.perf_counter()
+    await fleet.start()
+    print(f"{count} units online in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    async def spread(sync):
+        """Desynchronize the units, broadcast a move and return how far apart it reached them"""
+        # Every unit mid-gait at a different speed, as after a round of addressed commands
+        for index, name in enumerate(fleet.units):
+            await fleet.command(name, "speed", 1 + index % 9)
+            await fleet.command(name, "move", "forward", 1)
+            await asyncio.sleep(0.005)
+        seen = [len(loopback.received) for loopback in loopbacks]
+        await fleet.command("all", "move", "backward", 1, sync=sync)
+        deadline = time.monotonic() + 10.0
+        while time.monotonic() < deadline:
+            arrivals = [next((arrived for command, arrived, _ in loopback.received[n:] if command == "B"), None)
+                        for loopback, n in zip(loopbacks, seen)]
+            if all(arrivals):
+                return (max(arrivals) - min(arrivals)) * 1000
+            await asyncio.sleep(0.01)
+        return float("nan")
+
+    try:
+        for sync in (False, True):
+            spreads = []
+            for _ in range(broadcasts):
+                spreads.append(await spread(sync))
+                await fleet.command("all", "stop")
+                await asyncio.sleep(0.1)
+            spreads.sort()
+            label = "synchronized" if sync else "unsynchronized"
+            print(f"{label:<15} start spread: median {spreads[len(spreads) // 2]:.2f} ms, "
+                  f"worst {spreads[-1]:.2f} ms (one frame = {FRAME_SECONDS * 1000:.0f} ms)")
+        # A stop during a multi-cycle move must be the last thing every unit hears
+        await fleet.command("all", "move", "forward", 4)
+        await asyncio.sleep(0.2)
+        seen = [len(loopback.received) for loopback in loopbacks]
+        await fleet.command("all", "stop")
+        await asyncio.sleep(2 * gait_cycle_seconds(DEFAULT_KNEE_CENTER))
+        after = [loopback.commands()[n:] for loopback, n in zip(loopbacks, seen)]
+        clean = sum(1 for commands in after if commands.endswith(STAND_COMMAND))
+        print(f"Stop mid-move: {clean}/{count} units wrote nothing after {STAND_COMMAND!r}")
+        reply = await fleet.handle_text("unit3, turn left")
+        await asyncio.sleep(0.1)
+        print(f"Addressed command: {reply!r} -> unit3 received {loopbacks[3].commands()[-1:]!r}" if count > 3 else "")
+        await fleet.command("all", "stop")
+        health = fleet.health()
+        online = sum(1 for status in health.values() if status["health"] == ONLINE)
+        print(f"Health: {online}/{count} online, {sum(s['errors'] for s in health.values())} write errors")
+    finally:
+        await fleet.close()
+        for loopback in loopbacks:
+            loopback.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="DETROIT fleet controller")
+    parser.add_argument("--benchmark", action="store_true", help="Drive pty stand-ins and measure start alignment")
+    parser.add_argument("--units", type=int, default=16, help="Units in the benchmark")
+    parser.add_argument("--broadcasts", type=int, default=5, help="Broadcasts per mode")
+    args = parser.parse_args()
+    if args.benchmark:
+        raise SystemExit(asyncio.run(_benchmark(args.units, args.broadcasts)))
+    parser.print_help()
+
+__all__ = ['Fleet', 'FleetUnit', 'FleetController', 'parse_fleet_command', 'ONLINE', 'DEGRADED', 'OFFLINE']
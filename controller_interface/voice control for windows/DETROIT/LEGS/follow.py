@@ -0,0 +1,598 @@
+"""
+Follow Mode for DETROIT LEGS
+============================
+Closes the loop from the camera to the gaits: a tracker turns camera frames
+into the target's bearing (degrees, positive to the right) and apparent
+size (its height as a share of the image), and a controller running at a
+fixed rate turns that into the firmware's F/L/R commands.
+
+Trackers:
+    BlobTracker        a coloured object (something the person carries or
+                       wears), found in a 1/4 scale decode of the latest frame
+    DetectionTracker   the largest box with a given label from the detection
+                       pipeline (EYES/detection.py), e.g. "person"
+
+Every control tick the controller takes the newest observation and corrects
+its bearing for the frame's age: the robot may have been turning since the
+image was captured (CAMERA_LATENCY before it arrived), so the yaw it turned
+since then, known from the commands it sent, is taken off. Then, with
+hysteresis:
+
+    |bearing| above TURN_ENTER       turn towards the target until it is
+                                     inside TURN_EXIT
+    target smaller than wanted       walk forward
+    close enough / target lost       stop (the stop command aborts the gait
+                                     within one step)
+
+TURN_DEGREES_PER_CYCLE and STRIDE_PER_CYCLE are estimates from the ±10 degree
+thigh sweeps at FOLLOW_SPEED; calibrate them on the floor. Speed level 1 has
+the quickest cycle only because it leaves kneeCenter at LOWEST, where no foot
+lifts, so following walks at a level that lifts the tripods.
+
+A direction in effect is a dead-man hold, as in teleop.py: the bridge gets
+HOLD_CYCLES gait cycles at a time, topped up every tick while nothing is
+queued, so if the control thread stalls the robot halts within that many
+cycles. A tick that raises is logged and stops the robot, and the loop
+carries on. The controller records its tick times, so report() gives the
+achieved period and jitter.
+
+Usage:
+    python follow.py --simulate                  # synthetic video of a walking target
+    python follow.py --simulate --no-compensation
+    python follow.py --simulate --speed 6
+    python follow.py --port COM5 --url http://192.168.1.50/stream --colour 230 120 30
+"""
+
+import os
+import sys
+import math
+import time
+import json
+import logging
+import argparse
+import threading
+from collections import deque
+
+import numpy as np
+
+from motion_bridge import MotionBridge, DEFAULT_BAUD, SPEED_COMMANDS, gait_cycle_seconds
+
+logger = logging.getLogger('DETROIT.LEGS.FOLLOW')
+
+EYES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'EYES')
+
+CONTROL_RATE = 5.0            # control ticks per second
+FOLLOW_SPEED = 10             # speed level while following: 'q', the firmware's default knee height
+CAMERA_LATENCY = 0.12         # seconds from exposure to the frame's arrival
+TURN_ENTER = 12.0             # degrees off centre that start a turn
+TURN_EXIT = 3.0               # degrees off centre that end it
+TARGET_SIZE = 0.5             # wanted target height as a share of the image
+SIZE_BAND = 0.1               # relative size band that counts as close enough
+LOST_AFTER = 1.0              # seconds without a fresh observation before stopping
+REVERSE_HOLD = 0.6            # seconds a turn is kept before turning the other way
+HOLD_CYCLES = 2               # gait cycles queued at a time for a direction, topped up every tick
+HFOV_DEGREES = 60.0           # horizontal field of view of the OV2640 with the stock lens
+TURN_DEGREES_PER_CYCLE = 15.0
+STRIDE_PER_CYCLE = 0.04       # metres
+
+
+def _eyes_path():
+    if EYES_DIR not in sys.path:
+        sys.path.append(EYES_DIR)
+
+
+def pixel_bearing(x, width, hfov=HFOV_DEGREES):
+    """Bearing in degrees of image column x (positive to the right)"""
+    offset = (x / width - 0.5) * 2.0 * math.tan(math.radians(hfov) / 2.0)
+    return math.degrees(math.atan(offset))
+
+
+def turn_rate(knee_center=None, degrees_per_cycle=TURN_DEGREES_PER_CYCLE):
+    """Degrees per second of a turn gait at a knee level"""
+    knee_center = SPEED_COMMANDS[FOLLOW_SPEED][1] if knee_center is None else knee_center
+    return degrees_per_cycle / gait_cycle_seconds(knee_center)
+
+
+class BlobTracker:
+    """The target as a coloured blob in the latest camera frame
+
+    Args:
+        client: Frame source with latest() (MJPEGClient)
+        colour (tuple): Target RGB
+        tolerance (int): Summed absolute RGB difference that still matches
+        scale (int): Decode reduction
+        min_fraction (float): Share of the image the blob must cover
+    """
+
+    def __init__(self, client, colour=(230, 120, 30), tolerance=90, scale=4, min_fraction=0.002,
+                 hfov=HFOV_DEGREES):
+        _eyes_path()
+        from decode import get_pixels
+
+        self._get_pixels = get_pixels
+        self.client = client
+        self.colour = np.array(colour, dtype=np.int16)
+        self.tolerance = tolerance
+        self.scale = scale
+        self.min_fraction = min_fraction
+        self.hfov = hfov
+        self._last = (None, None)   # (frame id, observation)
+
+    def observe(self):
+        """Newest observation {frame_id, timestamp, bearing, size}, or None"""
+        frame = self.client.latest()
+        if frame is None:
+            return None
+        with frame:
+            if frame.id == self._last[0]:
+                return self._last[1]
+            rgb = self._get_pixels(frame, self.scale, "RGB")
+            frame_id, timestamp = frame.id, frame.timestamp
+        mask = np.abs(rgb.astype(np.int16) - self.colour).sum(axis=2) < self.tolerance
+        count = int(np.count_nonzero(mask))
+        observation = None
+        if count >= self.min_fraction * mask.size:
+            height, width = mask.shape
+            columns = mask.sum(axis=0)
+            x = float(columns @ (np.arange(width) + 0.5)) / count
+            rows = np.flatnonzero(mask.any(axis=1))
+            observation = {"frame_id": frame_id, "timestamp": timestamp,
+                           "bearing": pixel_bearing(x, width, self.hfov),
+                           "size": (rows[-1] - rows[0] + 1) / height}
+        self._last = (frame_id, observation)
+        return observation
+
+
+class DetectionTracker:
+    """The target as the largest detection with a label
+
+    Args:
+        pipeline (DetectionPipeline): Running detection pipeline
+        label (str): Detection label to follow
+        frame_size (tuple): Camera frame (width, height) in pixels
+    """
+
+    def __init__(self, pipeline, label="person", frame_size=(320, 240), hfov=HFOV_DEGREES):
+        self.pipeline = pipeline
+        self.label = label
+        self.frame_size = frame_size
+        self.hfov = hfov
+
+    def observe(self):
+        result = self.pipeline.latest()
+        if result is None:
+            return None
+        boxes = [d["box"] for d in result["detections"] if d["label"] == self.label]
+        if not boxes:
+            return None
+        x, y, w, h = max(boxes, key=lambda box: box[2] * box[3])
+        width, height = self.frame_size
+        return {"frame_id": result["frame_id"], "timestamp": result["timestamp"],
+                "bearing": pixel_bearing(x + w / 2.0, width, self.hfov), "size": h / height}
+
+
+class FollowController:
+    """Fixed-rate controller from tracker observations to gait commands
+
+    Args:
+        bridge (MotionBridge): Open motion bridge (or anything with the same methods)
+        tracker: Object with observe() returning {frame_id, timestamp, bearing, size} or None
+        rate (float): Control ticks per second
+        compensate (bool): Correct bearings for the yaw turned since the frame was captured
+    """
+
+    def __init__(self, bridge, tracker, rate=CONTROL_RATE, speed_level=FOLLOW_SPEED, target_size=TARGET_SIZE,
+                 camera_latency=CAMERA_LATENCY, compensate=True, turn_enter=TURN_ENTER, turn_exit=TURN_EXIT,
+                 lost_after=LOST_AFTER, degrees_per_cycle=TURN_DEGREES_PER_CYCLE):
+        self.bridge = bridge
+        self.tracker = tracker
+        self.period = 1.0 / rate
+        self.speed_level = speed_level
+        self.target_size = target_size
+        self.camera_latency = camera_latency
+        self.compensate = compensate
+        self.turn_enter = turn_enter
+        self.turn_exit = turn_exit
+        self.lost_after = lost_after
+        self.turn_rate = turn_rate(SPEED_COMMANDS[speed_level][1], degrees_per_cycle)
+        self.stats = {"ticks": 0, "commands": 0, "reversals": 0, "lost_ticks": 0, "overruns": 0, "errors": 0}
+        self.direction = None
+        self._since = 0.0
+        self._commands = deque(maxlen=64)   # (time, direction) sent
+        self._ticks = []
+        self._lateness = []
+        self._ages = []
+        self._running = False
+        self._thread = None
+
+    def yaw_since(self, start, now):
+        """Degrees turned to the right between two monotonic times, from the commands sent"""
+        yaw = 0.0
+        commands = list(self._commands)
+        for index, (at, direction) in enumerate(commands):
+            until = commands[index + 1][0] if index + 1 < len(commands) else now
+            overlap = min(until, now) - max(at, start)
+            if overlap > 0 and direction in ("left", "right"):
+                yaw += overlap * self.turn_rate * (1 if direction == "right" else -1)
+        return yaw
+
+    def decide(self, observation, now):
+        """Direction for one tick: "forward", "left", "right" or None to stand"""
+        if observation is None:
+            self.stats["lost_ticks"] += 1
+            return None
+        captured = observation["timestamp"] - self.camera_latency
+        age = now - captured
+        self._ages.append(age)
+        if age > self.lost_after:
+            self.stats["lost_ticks"] += 1
+            return None
+        bearing = observation["bearing"]
+        if self.compensate:
+            bearing -= self.yaw_since(captured, now)
+        turning = self.direction in ("left", "right")
+        if abs(bearing) > self.turn_enter or (turning and abs(bearing) > self.turn_exit):
+            wanted = "right" if bearing > 0 else "left"
+            if turning and wanted != self.direction and now - self._since < REVERSE_HOLD:
+                return self.direction
+            return wanted
+        if observation["size"] < self.target_size * (1.0 - SIZE_BAND):
+            return "forward"
+        return None
+
+    def _send(self, direction, now):
+        if direction == self.direction:
+            if direction is not None and not self.bridge.pending():
+                self.bridge.move(direction, HOLD_CYCLES)
+            return False
+        if {direction, self.direction} == {"left", "right"}:
+            self.stats["reversals"] += 1
+        if self.direction is not None:
+            # Abort the gait in progress first; stepDelay() only sees a stop at the head of the buffer
+            self.bridge.emergency_stop()
+        if direction is not None:
+            self.bridge.move(direction, HOLD_CYCLES)
+        self.direction = direction
+        self._since = now
+        self._commands.append((now, direction))
+        self.stats["commands"] += 1
+        return True
+
+    def step(self, now=None):
+        """One control tick; returns the direction in effect"""
+        now = time.monotonic() if now is None else now
+        self.stats["ticks"] += 1
+        self._send(self.decide(self.tracker.observe(), now), now)
+        return self.direction
+
+    def run(self, duration=None):
+        """Tick at the control rate until stop() or `duration` seconds"""
+        self._running = True
+        start = time.monotonic()
+        next_tick = start
+        try:
+            self.bridge.set_speed(self.speed_level)
+            while self._running and (duration is None or time.monotonic() - start < duration):
+                now = time.monotonic()
+                self._ticks.append(now)
+                self._lateness.append(now - next_tick)
+                try:
+                    self.step(now)
+                except Exception as e:
+                    # A bad frame or a tracker hiccup costs one tick, not follow mode
+                    self.stats["errors"] += 1
+                    logger.error(f"Follow tick failed: {e}")
+                    self._send(None, now)
+                next_tick += self.period
+                if next_tick < time.monotonic():
+                    self.stats["overruns"] += 1
+                    next_tick = time.monotonic()
+                time.sleep(max(0.0, next_tick - time.monotonic()))
+        finally:
+            try:
+                self._send(None, time.monotonic())
+            finally:
+                self._running = False
+        return True
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self.run, name="follow-control")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self, wait=True):
+        """End the loop; it stops the robot on its way out"""
+        self._running = False
+        if wait and self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        return True
+
+    @property
+    def running(self):
+        return self._running
+
+    def report(self):
+        """Control period, jitter and observation age figures"""
+        periods = np.diff(self._ticks) * 1000 if len(self._ticks) > 1 else np.array([np.nan])
+        lateness = np.abs(self._lateness) * 1000 if self._lateness else np.array([np.nan])
+        ages = np.array(self._ages) * 1000 if self._ages else np.array([np.nan])
+        return {
+            **self.stats,
+            "period_ms": round(float(np.mean(periods)), 2),
+            "period_p99_ms": round(float(np.percentile(periods, 99)), 2),
+            "jitter_ms": round(float(np.std(periods)), 2),
+            "lateness_p99_ms": round(float(np.percentile(lateness, 99)), 2),
+            "frame_age_p50_ms": round(float(np.percentile(ages, 50)), 1),
+        }
+
+
+class SimWorld:
+    """A robot and a walking target on a plane, with stand-ins for the bridge and camera
+
+    The robot moves as the gait estimates say; the target walks an arc with a
+    pause. Positions are metres, headings radians anticlockwise.
+    """
+
+    def __init__(self, target_speed=0.03, start_distance=1.6, start_heading=-25.0, target_height=0.5,
+                 target_width=0.3, link_delay=0.02, speed_level=FOLLOW_SPEED):
+        # The robot starts with the target near the edge of the view, so it has to turn
+        self.robot = np.array([0.0, 0.0, math.radians(start_heading)])
+        self.target_speed = target_speed
+        self.start_distance = start_distance
+        self.target_height = target_height
+        self.target_width = target_width
+        self.link_delay = link_delay
+        self.cycle = gait_cycle_seconds(SPEED_COMMANDS[speed_level][1])
+        self.speed = STRIDE_PER_CYCLE / self.cycle
+        self.yaw_rate = math.radians(TURN_DEGREES_PER_CYCLE) / self.cycle
+        self.stats = {"sent": 0}
+        self.on_write = None
+        self._motion = None
+        self._held = None
+        self._hold_until = 0.0      # when the cycles queued for the held direction run out
+        self._changes = []          # (effective at, direction)
+        self._clock = None
+        self._lock = threading.Lock()
+
+    def target(self, t):
+        """Target position at t seconds: ahead, then an arc to the left, a pause, then on"""
+        x0 = self.start_distance
+        walked = t if t < 12 else 12 if t < 15 else t - 3   # stands still from 12 to 15 s
+        distance = self.target_speed * walked
+        if distance < 0.2:
+            return np.array([x0 + distance, 0.0])
+        radius = 0.6
+        angle = (distance - 0.2) / radius
+        return np.array([x0 + 0.2 + radius * math.sin(angle), radius * (1 - math.cos(angle))])
+
+    def advance(self, now):
+        """Move the robot up to `now` by the commands that have taken effect"""
+        with self._lock:
+            if self._clock is None:
+                self._clock = now
+            while self._clock < now:
+                self._apply_changes()
+                pending = [c[0] for c in self._changes if c[0] > self._clock]
+                if self._hold_until > self._clock:
+                    pending.append(self._hold_until)
+                until = min([now] + pending)
+                dt = until - self._clock
+                x, y, heading = self.robot
+                if self._motion == "forward":
+                    self.robot[:2] += self.speed * dt * np.array([math.cos(heading), math.sin(heading)])
+                elif self._motion in ("left", "right"):
+                    self.robot[2] += self.yaw_rate * dt * (1 if self._motion == "left" else -1)
+                self._clock = until
+                self._apply_changes()
+
+    def _apply_changes(self):
+        for change in [c for c in self._changes if c[0] <= self._clock]:
+            self._motion = change[1]
+            self._changes.remove(change)
+        if self._motion is not None and self._clock >= self._hold_until:
+            # The queued cycles ran out without a top-up
+            self._motion = None
+
+    # MotionBridge stand-in
+    def _command(self, direction, cycles=0):
+        with self._lock:
+            at = time.monotonic() + self.link_delay
+            self._changes.append((at, direction))
+            if direction is None:
+                self._held = None
+            else:
+                # Cycles queue behind those still running in the same direction, as on the bridge
+                start = self._hold_until if direction == self._held and self._hold_until > at else at
+                self._hold_until = start + cycles * self.cycle
+                self._held = direction
+            self.stats["sent"] += 1
+        return True
+
+    def move(self, direction, cycles=1):
+        return self._command(direction, cycles)
+
+    def pending(self):
+        with self._lock:
+            return time.monotonic() + self.link_delay < self._hold_until - self.cycle
+
+    def emergency_stop(self):
+        return self._command(None)
+
+    def stand(self):
+        return self._command(None)
+
+    def set_speed(self, level):
+        return True
+
+    def close(self, stand=True):
+        return True
+
+    def view(self, t, now):
+        """True bearing (degrees, right positive) and distance of the target"""
+        self.advance(now)
+        x, y, heading = self.robot
+        dx, dy = self.target(t) - self.robot[:2]
+        relative = math.atan2(dy, dx) - heading
+        relative = (relative + math.pi) % (2 * math.pi) - math.pi
+        return -math.degrees(relative), math.hypot(dx, dy)
+
+
+class SimCamera:
+    """Renders what the robot sees and delivers it CAMERA_LATENCY later, like MJPEGClient
+
+    Args:
+        world (SimWorld): The scene
+        fps (float): Frame rate
+        latency (float): Seconds from exposure to arrival
+    """
+
+    def __init__(self, world, fps=15.0, latency=CAMERA_LATENCY, size=(320, 240), colour=(230, 120, 30)):
+        _eyes_path()
+        from mjpeg import BufferPool
+
+        self.world = world
+        self.fps = fps
+        self.latency = latency
+        self.size = size
+        self.colour = colour
+        self.pool = BufferPool(64 * 1024)
+        self.truth = []             # (time, bearing, distance) at each exposure
+        self._latest = None
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+        self._start = None
+
+    def _render(self, bearing, distance):
+        import io
+        from PIL import Image, ImageDraw
+
+        width, height = self.size
+        focal = (width / 2.0) / math.tan(math.radians(HFOV_DEGREES) / 2.0)
+        image = Image.new("RGB", self.size, (95, 95, 105))
+        draw = ImageDraw.Draw(image)
+        draw.rectangle([0, height * 2 // 3, width, height], fill=(70, 75, 70))
+        if distance > 0.05 and abs(bearing) < 80:
+            centre = width / 2.0 + focal * math.tan(math.radians(bearing))
+            half_width = focal * self.world.target_width / distance / 2.0
+            half_height = focal * self.world.target_height / distance / 2.0
+            draw.rectangle([centre - half_width, height / 2.0 - half_height, centre + half_width,
+                            height / 2.0 + half_height], fill=self.colour)
+        out = io.BytesIO()
+        image.save(out, format="JPEG", quality=80)
+        return out.getvalue()
+
+    def _run(self):
+        from mjpeg import Frame
+
+        pending = deque()   # (arrival time, jpeg)
+        next_exposure = time.monotonic()
+        while self._running:
+            now = time.monotonic()
+            if now >= next_exposure:
+                bearing, distance = self.world.view(now - self._start, now)
+                self.truth.append((now, bearing, distance))
+                pending.append((now + self.latency, self._render(bearing, distance)))
+                next_exposure += 1.0 / self.fps
+            while pending and pending[0][0] <= now:
+                _, jpeg = pending.popleft()
+                buffer = self.pool.get(len(jpeg))
+                buffer.data[:len(jpeg)] = jpeg
+                frame = Frame(self._next_id, time.monotonic(), memoryview(buffer.data)[:len(jpeg)], buffer)
+                self._next_id += 1
+                with self._lock:
+                    previous, self._latest = self._latest, frame
+                if previous is not None:
+                    previous.release()
+            wake = min([next_exposure] + [p[0] for p in pending])
+            time.sleep(max(0.0, min(0.005, wake - time.monotonic())))
+
+    def latest(self):
+        with self._lock:
+            return self._latest.acquire() if self._latest is not None else None
+
+    def start(self):
+        self._running = True
+        self._start = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="sim-camera")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        return True
+
+
+def simulate(seconds=30.0, compensate=True, rate=CONTROL_RATE, fps=15.0, latency=CAMERA_LATENCY,
+             speed_level=FOLLOW_SPEED):
+    """Follow a simulated target through synthetic video; returns the report plus tracking figures"""
+    world = SimWorld(speed_level=speed_level)
+    camera = SimCamera(world, fps, latency).start()
+    controller = FollowController(world, BlobTracker(camera), rate, speed_level, camera_latency=latency,
+                                  compensate=compensate)
+    try:
+        controller.run(seconds)
+    finally:
+        camera.stop()
+    truth = np.array(camera.truth)
+    settled = truth[truth[:, 0] - truth[0, 0] > 3.0]    # after the first approach
+    result = controller.report()
+    result.update({
+        # How far the first turn carried the target past the centre
+        "overshoot_deg": round(float(max(0.0, np.max(-np.sign(truth[0, 1]) * truth[:, 1]))), 1),
+        "bearing_error_mean_deg": round(float(np.mean(np.abs(settled[:, 1]))), 1),
+        "bearing_error_p95_deg": round(float(np.percentile(np.abs(settled[:, 1]), 95)), 1),
+        "target_in_view": round(float(np.mean(np.abs(settled[:, 1]) < HFOV_DEGREES / 2)), 3),
+        "distance_mean_m": round(float(np.mean(settled[:, 2])), 2),
+        "distance_final_m": round(float(truth[-1, 2]), 2),
+    })
+    return result
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="DETROIT follow mode")
+    parser.add_argument("--simulate", action="store_true", help="Follow a simulated target in synthetic video")
+    parser.add_argument("--no-compensation", action="store_true", help="Ignore frame age")
+    parser.add_argument("--seconds", type=float, default=30.0, help="How long to run")
+    parser.add_argument("--rate", type=float, default=CONTROL_RATE, help="Control ticks per second")
+    parser.add_argument("--latency", type=float, default=CAMERA_LATENCY, help="Camera latency in seconds")
+    parser.add_argument("--port", help="Serial port of the robot")
+    parser.add_argument("--baud", type=int, default=DEFAULT_BAUD)
+    parser.add_argument("--url", help="Camera stream URL")
+    parser.add_argument("--colour", type=int, nargs=3, default=[230, 120, 30], help="Target RGB")
+    parser.add_argument("--speed", type=int, default=FOLLOW_SPEED, choices=sorted(SPEED_COMMANDS),
+                        help="Speed level while following")
+    args = parser.parse_args()
+
+    if args.simulate or not (args.port and args.url):
+        print(json.dumps(simulate(args.seconds, not args.no_compensation, args.rate, latency=args.latency,
+                                  speed_level=args.speed), indent=2))
+        sys.exit(0)
+
+    _eyes_path()
+    from mjpeg import MJPEGClient
+
+    client = MJPEGClient(args.url).start()
+    bridge = MotionBridge(args.port, args.baud)
+    if not bridge.open():
+        sys.exit(1)
+    controller = FollowController(bridge, BlobTracker(client, tuple(args.colour)), args.rate, args.speed,
+                                  camera_latency=args.latency, compensate=not args.no_compensation)
+    try:
+        controller.run(args.seconds)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        bridge.close()
+        client.stop()
+    print(json.dumps(controller.report(), indent=2))
+
+__all__ = ['FollowController', 'BlobTracker', 'DetectionTracker', 'SimWorld', 'SimCamera', 'simulate',
+           'pixel_bearing', 'turn_rate']
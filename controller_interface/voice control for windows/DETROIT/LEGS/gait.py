@@ -0,0 +1,263 @@
+"""
+Gait Engine for DETROIT LEGS
+============================
+Generates tripod, ripple and wave gaits for all 12 joints on the host and
+streams them to the controller as timed setpoint frames.
+
+A gait cycle is computed in one go with NumPy: every leg's phase for every
+frame is a (frames, 6) array, and the thigh sweep and knee lift are evaluated
+over it without Python loops. Cycles are cached by their parameters, so
+switching back to a gait that has been used before costs nothing.
+
+Angles follow the firmware's conventions (see geometry.py): thighs sweep
+`stride` degrees around center, knees lift from `knee_center` by `height`
+degrees during swing, and the stand pose is hm().
+
+With --port the frames go to the controller over a FrameLink; the PCA9685
+sketch accepts them when built with USE_FRAME_STREAM set to 1.
+
+Usage:
+    python gait.py --gait ripple --direction left --seconds 3
+    python gait.py --port COM5 --rate 25 --seconds 10
+    python gait.py --benchmark
+"""
+
+import time
+import logging
+import argparse
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+from geometry import (JOINT_COUNT, LEG_COUNT, CENTER, KNEE_CENTER, LOWEST, THIGH_THRESHOLD,
+                      STANCE_SIGN, GAIT_PHASES, stand_pose, clip_to_limits)
+
+logger = logging.getLogger('DETROIT.LEGS.GAIT')
+
+DEFAULT_RATE_HZ = 50
+DEFAULT_CYCLE_SECONDS = 1.0
+DEFAULT_STRIDE = 2 * THIGH_THRESHOLD        # thigh sweep, degrees peak to peak
+DEFAULT_HEIGHT = KNEE_CENTER - LOWEST       # knee lift, degrees
+
+
+@lru_cache(maxsize=64)
+def generate_cycle(gait="tripod", direction="forward", stride=DEFAULT_STRIDE, height=DEFAULT_HEIGHT,
+                   cycle_seconds=DEFAULT_CYCLE_SECONDS, rate_hz=DEFAULT_RATE_HZ, knee_center=KNEE_CENTER):
+    """Generate one gait cycle of joint setpoints
+
+    Args:
+        gait (str): "tripod", "ripple" or "wave"
+        direction (str): "forward", "backward", "left" or "right"
+        stride (float): Thigh sweep in degrees, peak to peak
+        height (float): Knee lift in degrees during swing
+        cycle_seconds (float): Duration of one full cycle
+        rate_hz (int): Frame rate the cycle is sampled at
+        knee_center (float): Knee angle with the foot down
+
+    Returns:
+        numpy.ndarray: Read-only float32 array of shape (frames, 12), joints in
+        channel order st1..st6, sk1..sk6. Cached per parameter set.
+    """
+    if gait not in GAIT_PHASES:
+        raise ValueError(f"Unknown gait: {gait}")
+    if direction not in STANCE_SIGN:
+        raise ValueError(f"Unknown direction: {direction}")
+    duty, offsets = GAIT_PHASES[gait]
+    frames = max(2, int(round(cycle_seconds * rate_hz)))
+
+    # Phase of every leg at every frame, 0..1
+    phase = (np.arange(frames)[:, None] / frames + offsets[None, :]) % 1.0
+    stance = phase < duty
+    # Stance: the foot pushes linearly from +stride/2 to -stride/2 (in stance direction)
+    stance_progress = phase / duty
+    # Swing: the foot comes back with a cosine profile while the knee lifts
+    swing_progress = np.clip((phase - duty) / (1.0 - duty), 0.0, 1.0)
+    sweep = np.where(stance,
+                     stance_progress - 0.5,
+                     0.5 - 0.5 * (1.0 - np.cos(np.pi * swing_progress)))
+    lift = np.where(stance, 0.0, np.sin(np.pi * swing_progress))
+
+    angles = np.empty((frames, JOINT_COUNT), dtype=np.float32)
+    angles[:, :LEG_COUNT] = CENTER + STANCE_SIGN[direction] * stride * sweep
+    angles[:, LEG_COUNT:] = knee_center - height * lift
+    clip_to_limits(angles)
+    angles.setflags(write=False)
+    return angles
+
+
+def cache_info():
+    """Hit/miss statistics of the gait cycle cache"""
+    return generate_cycle.cache_info()
+
+
+class GaitStreamer:
+    """Streams gait frames to a sink at a fixed rate on a background thread
+
+    Args:
+        sink (callable): Called as sink(seq, angles, dt_ms) for every frame, where
+            angles is a float32 array of 12 joint angles and dt_ms the time since
+            the previous frame. It should return quickly.
+        rate_hz (int): Frame rate
+    """
+
+    def __init__(self, sink, rate_hz=DEFAULT_RATE_HZ):
+        self.sink = sink
+        self.rate_hz = rate_hz
+        self.params = None
+        self.stats = {"frames": 0, "late": 0, "max_lag_ms": 0.0}
+        self._cycle = None
+        self._index = 0
+        self._seq = 0
+        self._pending = None         # latest requested gait, applied at the next frame
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    def set_gait(self, gait="tripod", direction="forward", stride=DEFAULT_STRIDE, height=DEFAULT_HEIGHT,
+                 cycle_seconds=DEFAULT_CYCLE_SECONDS, knee_center=KNEE_CENTER):
+        """Switch gait without stopping; the new gait keeps the current phase"""
+        params = (gait, direction, float(stride), float(height), float(cycle_seconds), self.rate_hz,
+                  float(knee_center))
+        cycle = generate_cycle(*params)
+        with self._lock:
+            self._pending = (params, cycle)
+        return True
+
+    def stand(self):
+        """Stop walking and hold the stand pose"""
+        with self._lock:
+            self._pending = (None, stand_pose()[None, :])
+        return True
+
+    def start(self):
+        """Start streaming frames"""
+        if self._running:
+            return True
+        self._running = True
+        self._thread = threading.Thread(target=self._stream_loop, name="gait-streamer")
+        self._thread.daemon = True
+        self._thread.start()
+        return True
+
+    def _next_frame(self):
+        with self._lock:
+            if self._pending is not None:
+                params, cycle = self._pending
+                self._pending = None
+                # Carry the phase over so switching gait does not jerk the legs back to frame 0
+                if self._cycle is not None and len(self._cycle) > 1:
+                    phase = self._index / len(self._cycle)
+                    self._index = int(phase * len(cycle)) % len(cycle)
+                else:
+                    self._index = 0
+                self.params, self._cycle = params, cycle
+            if self._cycle is None:
+                return None
+            frame = self._cycle[self._index]
+            self._index = (self._index + 1) % len(self._cycle)
+            return frame
+
+    def _stream_loop(self):
+        period = 1.0 / self.rate_hz
+        next_time = time.perf_counter()
+        last_sent = None
+        while self._running:
+            frame = self._next_frame()
+            now = time.perf_counter()
+            if frame is not None:
+                dt_ms = 0.0 if last_sent is None else (now - last_sent) * 1000
+                self._seq = (self._seq + 1) & 0xFF
+                try:
+                    self.sink(self._seq, frame, dt_ms)
+                except Exception as e:
+                    logger.error(f"Gait sink failed: {e}")
+                last_sent = now
+                self.stats["frames"] += 1
+                lag_ms = (now - next_time) * 1000
+                if lag_ms > period * 1000:
+                    self.stats["late"] += 1
+                self.stats["max_lag_ms"] = max(self.stats["max_lag_ms"], lag_ms)
+            # Absolute deadlines, so sink time does not accumulate as drift
+            next_time += period
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_time = time.perf_counter()
+
+    def stop(self):
+        """Stop streaming"""
+        self._running = False
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        return True
+
+
+def benchmark(repeats=200):
+    """Time cycle generation uncached vs. cached"""
+    print(f"{'gait':<8} {'frames':>7} {'generate':>12} {'cached':>10}")
+    for gait in GAIT_PHASES:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            generate_cycle.__wrapped__(gait, "forward")
+        uncached = (time.perf_counter() - start) / repeats
+        generate_cycle(gait, "forward")
+        start = time.perf_counter()
+        for _ in range(repeats):
+            cycle = generate_cycle(gait, "forward")
+        cached = (time.perf_counter() - start) / repeats
+        print(f"{gait:<8} {len(cycle):>7} {uncached * 1e6:>10.1f}us {cached * 1e6:>8.2f}us")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DETROIT gait engine")
+    parser.add_argument("--gait", default="tripod", choices=sorted(GAIT_PHASES))
+    parser.add_argument("--direction", default="forward", choices=sorted(STANCE_SIGN))
+    parser.add_argument("--stride", type=float, default=DEFAULT_STRIDE, help="Thigh sweep in degrees")
+    parser.add_argument("--height", type=float, default=DEFAULT_HEIGHT, help="Knee lift in degrees")
+    parser.add_argument("--cycle", type=float, default=DEFAULT_CYCLE_SECONDS, help="Seconds per gait cycle")
+    parser.add_argument("--rate", type=int, default=DEFAULT_RATE_HZ, help="Frame rate in Hz")
+    parser.add_argument("--seconds", type=float, default=2.0, help="How long to stream")
+    parser.add_argument("--port", help="Stream to the controller on this serial port instead of printing")
+    parser.add_argument("--baud", type=int, default=9600, help="Link speed (9600 for the HC-05)")
+    parser.add_argument("--benchmark", action="store_true", help="Time cycle generation")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        return benchmark()
+
+    def print_sink(seq, angles, dt_ms):
+        print(f"{seq:3d} {dt_ms:6.1f}ms " + " ".join(f"{a:5.1f}" for a in angles))
+
+    link = None
+    sink = print_sink
+    if args.port:
+        from servo_protocol import FrameLink
+        link = FrameLink(args.port, args.baud)
+        if not link.open():
+            return 1
+        sink = link.send_frame
+
+    streamer = GaitStreamer(sink, rate_hz=args.rate)
+    streamer.set_gait(args.gait, args.direction, args.stride, args.height, args.cycle)
+    streamer.start()
+    time.sleep(args.seconds)
+    streamer.stand()
+    time.sleep(2.0 / args.rate)
+    streamer.stop()
+    print(f"Streamed {streamer.stats['frames']} frames, {streamer.stats['late']} late, "
+          f"max lag {streamer.stats['max_lag_ms']:.1f} ms")
+    if link is not None:
+        time.sleep(0.2)
+        link.close()
+        print(f"Acked {link.stats['acked']} ({link.stats['gaps']} after a gap), nacked {link.stats['nacked']} "
+              f"of {link.stats['sent']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
+
+__all__ = ['generate_cycle', 'cache_info', 'GaitStreamer']
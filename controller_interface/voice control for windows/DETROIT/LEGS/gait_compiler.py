@@ -0,0 +1,201 @@
+"""
+Gait Table Compiler for DETROIT LEGS
+====================================
+Compiles host-authored gaits into PROGMEM keyframe tables for the SPARK
+firmware, replacing the one-degree-per-6 ms `for` loops.
+
+A gait description is the sweep list used by firmware_gaits.py (or a JSON
+file in the same shape). Each sweep becomes a single keyframe: the firmware
+writes the sweep's end pose once and waits only as long as the slowest servo
+in that keyframe needs to get there at SPEED_FRACTION of the SG90 no-load
+speed, rounded up to whole stepDelay() calls so stop commands are still seen.
+Knee endpoints that follow kneeCenter are stored as KNEE_SENTINEL and filled
+in on the board, so the speed levels keep working.
+
+The timing report compares each compiled gait with the stock loops for every
+kneeCenter level and replays the keyframe schedule through simulator.py: the
+residual column is how far a servo still is from its pose when the next
+keyframe starts, and the margins are the worst static stability margin of the
+compiled and the stock gait.
+
+The PS2 sketch's gaits are described in firmware/arduino with PS2/ps2_gaits.json
+and compiled into a spark_gaits.h next to that sketch.
+
+Usage:
+    python gait_compiler.py                      # write spark_gaits.h and print the report
+    python gait_compiler.py --gaits my_gaits.json --out my_gaits.h
+    python gait_compiler.py --ps2                # the PS2 sketch's tables
+"""
+
+import os
+import json
+import math
+import argparse
+
+import numpy as np
+
+from geometry import JOINT_COUNT, SERVO_MAX_SPEED, KNEE_CENTER, stand_pose
+from firmware_gaits import FIRMWARE_GAITS, resolve, joint_index, firmware_trajectory
+from motion_bridge import SPEED_COMMANDS, STEP_SECONDS
+from simulator import simulate
+
+KNEE_SENTINEL = 0xFF          # table value meaning "the current kneeCenter"
+SPEED_FRACTION = 0.5          # share of the no-load servo speed a loaded leg is planned at
+STEP_DELAY_MS = 6             # delay() inside the firmware's stepDelay()
+FIRMWARE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "..", "firmware")
+DEFAULT_HEADER = os.path.join(FIRMWARE_DIR, "arduino with PCA9685", "spark_gaits.h")
+PS2_GAITS = os.path.join(FIRMWARE_DIR, "arduino with PS2", "ps2_gaits.json")
+PS2_HEADER = os.path.join(FIRMWARE_DIR, "arduino with PS2", "spark_gaits.h")
+PS2_STEP_SECONDS = 0.0055     # the PS2 sketch's loops: delay(5) plus three PCA9685 writes
+_FUNCTION_NAMES = {"forward": "Walk_Forward", "backward": "Walk_Backward", "left": "turnL", "right": "turnR",
+                   "left_forward": "Walk_Left_Forward", "right_forward": "Walk_Right_Forward",
+                   "left_backward": "Walk_Left_Backward", "right_backward": "Walk_Right_Backward"}
+
+
+def load_gaits(path=None):
+    """Gait descriptions from a JSON file, or the stock firmware gaits"""
+    if path is None:
+        return FIRMWARE_GAITS
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {name: [[tuple(move) for move in sweep] for sweep in sweeps] for name, sweeps in data.items()}
+
+
+def keyframes(sweeps):
+    """Symbolic end pose of every sweep
+
+    Returns:
+        list: One list of 12 table values per keyframe (degrees or KNEE_SENTINEL)
+    """
+    pose = [resolve("C")] * (JOINT_COUNT // 2) + [KNEE_SENTINEL] * (JOINT_COUNT // 2)
+    frames = []
+    for sweep in sweeps:
+        pose = list(pose)
+        for joint, start, stop in sweep:
+            pose[joint_index(joint)] = KNEE_SENTINEL if stop == "K" else int(resolve(stop))
+        frames.append(pose)
+    return frames
+
+
+def us_per_degree(speed_fraction=SPEED_FRACTION, max_speed=SERVO_MAX_SPEED):
+    """Planned microseconds per degree of servo travel"""
+    return int(math.ceil(1e6 / (max_speed * speed_fraction)))
+
+
+def schedule(frames, knee_center=KNEE_CENTER, speed_fraction=SPEED_FRACTION, max_speed=SERVO_MAX_SPEED):
+    """Minimum-time hold of every keyframe, exactly as the firmware computes it
+
+    Returns:
+        tuple: (poses, hold_ms) with poses a float32 (frames, 12) array of resolved angles
+    """
+    table = np.array(frames, dtype=np.float32)
+    poses = np.where(table == KNEE_SENTINEL, knee_center, table).astype(np.float32)
+    previous = np.vstack([stand_pose(knee_center), poses[:-1]])
+    travel = np.abs(poses - previous).max(axis=1).astype(np.int64)
+    wait_ms = travel * us_per_degree(speed_fraction, max_speed) // 1000
+    # The firmware waits in whole stepDelay() calls
+    hold_ms = -(-wait_ms // STEP_DELAY_MS) * STEP_DELAY_MS
+    return poses, np.maximum(hold_ms, STEP_DELAY_MS)
+
+
+def check_schedule(poses, hold_ms, knee_center=KNEE_CENTER):
+    """Replay a keyframe schedule through the simulator in stepDelay() sized steps
+
+    Returns:
+        tuple: (SimResult, residual) where residual is the largest distance (degrees)
+        any servo is still away from its keyframe pose when the next keyframe starts
+    """
+    repeats = (hold_ms // STEP_DELAY_MS).astype(np.int64)
+    angles = np.repeat(poses, repeats, axis=0)
+    result = simulate(angles, STEP_DELAY_MS / 1000.0, start_pose=stand_pose(knee_center))
+    ends = np.cumsum(repeats) - 1
+    residual = np.abs(result.targets[ends] - result.positions[ends]).max()
+    return result, float(residual)
+
+
+def render_header(gaits, speed_fraction=SPEED_FRACTION, max_speed=SERVO_MAX_SPEED):
+    """C header with one PROGMEM keyframe table per gait"""
+    lines = [
+        "// SPARK gait keyframe tables",
+        "// Generated by controller_interface/voice control for windows/DETROIT/LEGS/gait_compiler.py -- do not edit.",
+        "//",
+        "// Each row is the pose at the end of one keyframe, st1..st6 then sk1..sk6 in degrees;",
+        "// SPARK_GAIT_KNEE stands for the current kneeCenter. Hold a keyframe for",
+        "// (largest joint travel) * SPARK_GAIT_US_PER_DEGREE microseconds.",
+        f"// Planned at {speed_fraction:.0%} of {max_speed:.0f} deg/s.",
+        "",
+        "#ifndef SPARK_GAITS_H",
+        "#define SPARK_GAITS_H",
+        "",
+        "#include <Arduino.h>",
+        "#include <avr/pgmspace.h>",
+        "",
+        f"#define SPARK_GAIT_JOINTS {JOINT_COUNT}",
+        f"#define SPARK_GAIT_KNEE {KNEE_SENTINEL}",
+        f"#define SPARK_GAIT_US_PER_DEGREE {us_per_degree(speed_fraction, max_speed)}",
+    ]
+    for name, sweeps in gaits.items():
+        frames = keyframes(sweeps)
+        symbol = "gait" + name.title().replace("_", "")
+        origin = _FUNCTION_NAMES.get(name)
+        lines += ["", f"// {name}" + (f" (replaces {origin}())" if origin else ""),
+                  f"#define GAIT_{name.upper()}_FRAMES {len(frames)}",
+                  f"const uint8_t {symbol}[][SPARK_GAIT_JOINTS] PROGMEM = {{"]
+        for frame in frames:
+            values = ", ".join("SPARK_GAIT_KNEE" if v == KNEE_SENTINEL else str(v) for v in frame)
+            lines.append(f"  {{{values}}},")
+        lines.append("};")
+    lines += ["", "#endif", ""]
+    return "\n".join(lines)
+
+
+def report(gaits, speed_fraction=SPEED_FRACTION, max_speed=SERVO_MAX_SPEED, step_seconds=STEP_SECONDS):
+    """Print stock loop time against compiled keyframe time for every speed level
+
+    The stock loops are the gaits' own sweeps, one step_seconds iteration per degree.
+    """
+    knees = sorted({knee for _, knee in SPEED_COMMANDS.values()})
+    print(f"{'gait':<14} {'knee':>5} {'frames':>7} {'loops s':>8} {'table s':>8} {'speedup':>8} "
+          f"{'residual':>9} {'margin':>8} {'stock':>8}")
+    for name, sweeps in gaits.items():
+        frames = keyframes(sweeps)
+        for knee in knees:
+            poses, hold_ms = schedule(frames, knee, speed_fraction, max_speed)
+            compiled = hold_ms.sum() / 1000.0
+            result, residual = check_schedule(poses, hold_ms, knee)
+            angles, dt = firmware_trajectory(name, knee, step_seconds, sweeps=sweeps)
+            stock = f"{dt.sum():.3f}"
+            speedup = f"{dt.sum() / compiled:.1f}x"
+            baseline = simulate(angles, dt, start_pose=stand_pose(knee))
+            stock_margin = f"{baseline.margin.min() * 1000:.1f}mm"
+            print(f"{name:<14} {knee:>5} {len(frames):>7} {stock:>8} {compiled:>8.3f} {speedup:>8} "
+                  f"{residual:>8.1f}d {result.margin.min() * 1000:>6.1f}mm {stock_margin:>8}")
+        print(f"{'':<14} table: {len(frames) * JOINT_COUNT} bytes of flash")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DETROIT gait table compiler")
+    parser.add_argument("--gaits", help="JSON gait description (default: the stock firmware gaits)")
+    parser.add_argument("--out", default=DEFAULT_HEADER, help="Header to write")
+    parser.add_argument("--speed-fraction", type=float, default=SPEED_FRACTION,
+                        help="Share of the no-load servo speed to plan for")
+    parser.add_argument("--max-speed", type=float, default=SERVO_MAX_SPEED, help="No-load servo speed in deg/s")
+    parser.add_argument("--no-report", action="store_true", help="Skip the timing report")
+    parser.add_argument("--ps2", action="store_true", help="Compile the PS2 sketch's gaits next to that sketch")
+    args = parser.parse_args()
+
+    step_seconds = STEP_SECONDS
+    if args.ps2:
+        args.gaits = args.gaits or PS2_GAITS
+        args.out = PS2_HEADER if args.out == DEFAULT_HEADER else args.out
+        step_seconds = PS2_STEP_SECONDS
+    gaits = load_gaits(args.gaits)
+    header = render_header(gaits, args.speed_fraction, args.max_speed)
+    with open(args.out, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(header)
+    print(f"Wrote {len(gaits)} gaits to {os.path.normpath(args.out)}")
+    if not args.no_report:
+        report(gaits, args.speed_fraction, args.max_speed, step_seconds)
+
+__all__ = ['KNEE_SENTINEL', 'SPEED_FRACTION', 'load_gaits', 'keyframes', 'us_per_degree', 'schedule',
+           'check_schedule', 'render_header', 'report']
@@ -0,0 +1,122 @@
+"""
+SPARK Leg Geometry for DETROIT LEGS
+===================================
+Joint layout and angle conventions of the SPARK hexapod, taken from the
+firmware (firmware/arduino with PCA9685/SPARK_bt_controlled.ino) so that
+host-side code produces the same poses the sketch does.
+
+Joint order everywhere on the host is the PCA9685 channel order:
+st1..st6 (thighs, channels 1-6) then sk1..sk6 (knees, channels 7-12).
+Legs 1-3 are on one side and legs 4-6 on the other; the tripods are
+{1, 3, 5} and {2, 4, 6}.
+"""
+
+import numpy as np
+
+LEG_COUNT = 6
+JOINT_COUNT = 12
+JOINT_NAMES = tuple([f"st{leg}" for leg in range(1, 7)] + [f"sk{leg}" for leg in range(1, 7)])
+THIGH_CHANNELS = tuple(range(1, 7))
+KNEE_CHANNELS = tuple(range(7, 13))
+
+# Firmware angles (degrees)
+CENTER = 90            # thigh neutral
+THIGH_THRESHOLD = 20   # thigh swing either side of center in the stock gaits
+KNEE_CENTER = 80       # knee with the foot down (stand pose)
+LOWEST = 5             # knee with the foot fully lifted
+
+# Soft limits applied to every generated setpoint
+THIGH_LIMITS = (CENTER - 45, CENTER + 45)
+KNEE_LIMITS = (0, 100)
+
+# Servo mapping: angle 0..180 -> PCA9685 counts pos0..pos180
+PWM_POS0 = 102
+PWM_POS180 = 512
+
+# SG90 no-load speed: 0.1 s / 60 degrees at 4.8 V
+SERVO_MAX_SPEED = 600.0   # degrees per second
+
+# Hip positions in the body frame (x forward, y left, meters). Legs 1-3 are
+# the left side front to back, legs 4-6 the right side; nominal like the
+# link lengths below. Each leg points straight out from its side.
+HIP_POSITIONS = np.array([
+    [0.060, 0.040], [0.000, 0.050], [-0.060, 0.040],
+    [0.060, -0.040], [0.000, -0.050], [-0.060, -0.040],
+])
+HIP_SIDE = np.array([1, 1, 1, -1, -1, -1], dtype=np.float64)
+
+TRIPOD_A = (1, 3, 5)
+TRIPOD_B = (2, 4, 6)
+
+# Direction each thigh turns during stance when walking forward, read off
+# Walk_Forward(): st1-st3 count down while st4-st6 count up
+FORWARD_STANCE_SIGN = np.array([-1, -1, -1, 1, 1, 1], dtype=np.float64)
+
+# Turning moves both sides the same way in servo space (turnL()/turnR())
+STANCE_SIGN = {
+    "forward": FORWARD_STANCE_SIGN,
+    "backward": -FORWARD_STANCE_SIGN,
+    "left": np.ones(LEG_COUNT),
+    "right": -np.ones(LEG_COUNT),
+}
+
+# Link lengths in meters. There are no drawings in the repo; these are nominal
+# for the SG90-sized legs and should be measured on the robot
+COXA_LENGTH = 0.045    # hip yaw axis to knee axis
+TIBIA_LENGTH = 0.065   # knee axis to foot tip
+
+# Servo angle <-> joint angle. The thigh servo yaws the leg about the vertical
+# axis (90 = straight out from the body); the knee servo angle is the tibia's
+# angle below horizontal (kneeCenter 80 = nearly vertical, foot down; lowest
+# 5 = nearly horizontal, foot lifted). A foot moving forward turns the thigh
+# servo against its stance direction.
+THIGH_FORWARD_SIGN = -FORWARD_STANCE_SIGN
+
+# Gait -> (duty factor, phase offset per leg 1..6)
+GAIT_PHASES = {
+    "tripod": (0.5, np.array([0.0, 0.5, 0.0, 0.5, 0.0, 0.5])),
+    "ripple": (2.0 / 3.0, np.array([0.0, 1.0 / 3.0, 2.0 / 3.0, 0.5, 5.0 / 6.0, 1.0 / 6.0])),
+    "wave": (5.0 / 6.0, np.array([0.0, 1.0 / 6.0, 2.0 / 6.0, 3.0 / 6.0, 4.0 / 6.0, 5.0 / 6.0])),
+}
+
+
+def stand_pose(knee_center=KNEE_CENTER):
+    """Joint angles of the firmware's stand pose, hm()"""
+    pose = np.empty(JOINT_COUNT, dtype=np.float32)
+    pose[:LEG_COUNT] = CENTER
+    pose[LEG_COUNT:] = knee_center
+    return pose
+
+
+def clip_to_limits(angles):
+    """Clamp joint angles (..., 12) to the soft limits in place and return them"""
+    np.clip(angles[..., :LEG_COUNT], *THIGH_LIMITS, out=angles[..., :LEG_COUNT])
+    np.clip(angles[..., LEG_COUNT:], *KNEE_LIMITS, out=angles[..., LEG_COUNT:])
+    return angles
+
+
+def angles_to_pwm(angles):
+    """Convert joint angles to PCA9685 counts like the firmware's map() call"""
+    angles = np.asarray(angles)
+    return (PWM_POS0 + (angles * (PWM_POS180 - PWM_POS0)) // 180).astype(np.int16)
+
+
+def pwm_to_angles(counts):
+    """Angle the servo actually receives for PCA9685 counts"""
+    return (np.asarray(counts, dtype=np.float64) - PWM_POS0) * 180.0 / (PWM_POS180 - PWM_POS0)
+
+
+def feet_in_body_frame(feet):
+    """Convert foot positions (..., 6, 3) from hip frames to the body frame"""
+    feet = np.asarray(feet, dtype=np.float64)
+    body = np.empty_like(feet)
+    body[..., 0] = HIP_POSITIONS[:, 0] + feet[..., 1]
+    body[..., 1] = HIP_POSITIONS[:, 1] + HIP_SIDE * feet[..., 0]
+    body[..., 2] = feet[..., 2]
+    return body
+
+
+__all__ = ['JOINT_NAMES', 'JOINT_COUNT', 'LEG_COUNT', 'CENTER', 'KNEE_CENTER', 'LOWEST',
+           'THIGH_THRESHOLD', 'STANCE_SIGN', 'GAIT_PHASES', 'COXA_LENGTH', 'TIBIA_LENGTH',
+           'THIGH_FORWARD_SIGN', 'SERVO_MAX_SPEED', 'HIP_POSITIONS', 'stand_pose', 'clip_to_limits',
+           'angles_to_pwm', 'pwm_to_angles', 'feet_in_body_frame']
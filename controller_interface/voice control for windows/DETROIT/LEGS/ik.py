@@ -0,0 +1,197 @@
+"""
+Leg Inverse Kinematics for DETROIT LEGS
+=======================================
+Analytic IK for SPARK's 2-DOF legs: a thigh servo that yaws the leg about
+the vertical axis and a knee servo that pitches the tibia (see geometry.py
+for the link lengths and angle conventions).
+
+Foot positions are given per leg in that leg's hip frame, in meters:
+x points straight out from the body, y forward and z up. The yaw comes from
+atan2(y, x) and the knee from the foot height, asin(-z / tibia). With only two
+joints the foot lives on a surface, so the horizontal reach follows from the
+height; reach_error() reports how far a target is from that surface.
+
+solve() works on arrays of any batch shape (..., 6, 3), so one call solves all
+six legs for a single pose or for a whole trajectory. IKTable trades a little
+accuracy for a fixed-cost lookup with bilinear interpolation, and solve_leg()
+is a plain-math path for one leg at a time.
+
+Benchmark usage:
+    python ik.py --benchmark
+"""
+
+import math
+import time
+import argparse
+
+import numpy as np
+
+from geometry import (LEG_COUNT, JOINT_COUNT, CENTER, COXA_LENGTH, TIBIA_LENGTH, THIGH_FORWARD_SIGN,
+                      clip_to_limits)
+
+
+def forward_kinematics(angles, coxa=COXA_LENGTH, tibia=TIBIA_LENGTH):
+    """Foot positions for servo angles
+
+    Args:
+        angles (array): Servo angles of shape (..., 12), st1..st6 then sk1..sk6
+
+    Returns:
+        numpy.ndarray: Foot positions of shape (..., 6, 3) in each leg's hip frame
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    yaw = np.radians((angles[..., :LEG_COUNT] - CENTER) * THIGH_FORWARD_SIGN)
+    knee = np.radians(angles[..., LEG_COUNT:])
+    reach = coxa + tibia * np.cos(knee)
+    return np.stack([reach * np.cos(yaw), reach * np.sin(yaw), -tibia * np.sin(knee)], axis=-1)
+
+
+def solve(feet, tibia=TIBIA_LENGTH, out=None):
+    """Servo angles for foot positions, all legs and frames at once
+
+    Args:
+        feet (array): Foot positions of shape (..., 6, 3)
+        out (numpy.ndarray, optional): float32 array of shape (..., 12) to fill
+
+    Returns:
+        numpy.ndarray: Servo angles of shape (..., 12), clipped to the soft limits
+    """
+    feet = np.asarray(feet, dtype=np.float64)
+    if out is None:
+        out = np.empty(feet.shape[:-2] + (JOINT_COUNT,), dtype=np.float32)
+    yaw = np.degrees(np.arctan2(feet[..., 1], feet[..., 0]))
+    knee = np.degrees(np.arcsin(np.clip(-feet[..., 2] / tibia, -1.0, 1.0)))
+    out[..., :LEG_COUNT] = CENTER + THIGH_FORWARD_SIGN * yaw
+    out[..., LEG_COUNT:] = knee
+    return clip_to_limits(out)
+
+
+def solve_leg(x, y, z, leg, tibia=TIBIA_LENGTH):
+    """Servo angles (thigh, knee) for one foot of leg 1..6, without NumPy"""
+    yaw = math.degrees(math.atan2(y, x))
+    knee = math.degrees(math.asin(max(-1.0, min(1.0, -z / tibia))))
+    return CENTER + THIGH_FORWARD_SIGN[leg - 1] * yaw, knee
+
+
+def reach_error(feet, coxa=COXA_LENGTH, tibia=TIBIA_LENGTH):
+    """Horizontal distance (m) between each target and the reachable surface"""
+    feet = np.asarray(feet, dtype=np.float64)
+    knee = np.arcsin(np.clip(-feet[..., 2] / tibia, -1.0, 1.0))
+    return np.hypot(feet[..., 0], feet[..., 1]) - (coxa + tibia * np.cos(knee))
+
+
+class IKTable:
+    """Precomputed IK on a dense grid, solved by bilinear interpolation
+
+    The yaw table covers the (x, y) workspace and the knee table the z range,
+    so a solve costs a fixed handful of array operations regardless of where
+    the feet are. Targets outside the grid are clamped to its edge. The z range
+    stops just short of a fully vertical tibia (knee 82 degrees, past
+    kneeCenter), where asin is too steep to interpolate accurately.
+
+    Args:
+        x_range, y_range, z_range (tuple): Workspace bounds in meters
+        resolution (float): Grid spacing in meters
+    """
+
+    def __init__(self, x_range=(0.04, 0.12), y_range=(-0.08, 0.08), z_range=(-0.99 * TIBIA_LENGTH, 0.0),
+                 resolution=0.0005, tibia=TIBIA_LENGTH):
+        self.resolution = resolution
+        self.origin = np.array([x_range[0], y_range[0], z_range[0]])
+        xs = np.arange(x_range[0], x_range[1] + resolution / 2, resolution)
+        ys = np.arange(y_range[0], y_range[1] + resolution / 2, resolution)
+        zs = np.arange(z_range[0], z_range[1] + resolution / 2, resolution)
+        # yaw_table[iy, ix], knee_table[iz], both in degrees
+        self.yaw_table = np.degrees(np.arctan2(ys[:, None], xs[None, :])).astype(np.float32)
+        self.knee_table = np.degrees(np.arcsin(np.clip(-zs / tibia, -1.0, 1.0))).astype(np.float32)
+        self.shape = (len(xs), len(ys), len(zs))
+
+    @property
+    def nbytes(self):
+        return self.yaw_table.nbytes + self.knee_table.nbytes
+
+    def _grid(self, values, axis):
+        """Split coordinates into integer cell indices and fractions"""
+        position = (values - self.origin[axis]) / self.resolution
+        position = np.clip(position, 0.0, self.shape[axis] - 1.000001)
+        index = position.astype(np.intp)
+        return index, position - index
+
+    def solve(self, feet, out=None):
+        """Servo angles for foot positions of shape (..., 6, 3), like solve()"""
+        feet = np.asarray(feet, dtype=np.float64)
+        if out is None:
+            out = np.empty(feet.shape[:-2] + (JOINT_COUNT,), dtype=np.float32)
+        ix, fx = self._grid(feet[..., 0], 0)
+        iy, fy = self._grid(feet[..., 1], 1)
+        iz, fz = self._grid(feet[..., 2], 2)
+        table = self.yaw_table
+        top = table[iy, ix] * (1 - fx) + table[iy, ix + 1] * fx
+        bottom = table[iy + 1, ix] * (1 - fx) + table[iy + 1, ix + 1] * fx
+        yaw = top * (1 - fy) + bottom * fy
+        knee = self.knee_table[iz] * (1 - fz) + self.knee_table[iz + 1] * fz
+        out[..., :LEG_COUNT] = CENTER + THIGH_FORWARD_SIGN * yaw
+        out[..., LEG_COUNT:] = knee
+        return clip_to_limits(out)
+
+    def max_error(self, samples=100000, seed=0):
+        """Largest angle difference (degrees) from the analytic solve on random in-range targets"""
+        rng = np.random.default_rng(seed)
+        low = self.origin
+        high = self.origin + (np.array(self.shape) - 1) * self.resolution
+        feet = rng.uniform(low, high, size=(samples // LEG_COUNT, LEG_COUNT, 3))
+        return float(np.abs(self.solve(feet) - solve(feet)).max())
+
+
+def _rate(func, batch, seconds=0.5):
+    """Run func repeatedly for about `seconds` and return solves (feet) per second"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        func()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return calls * batch / elapsed
+
+
+def benchmark(frames=1000):
+    """Print leg solves per second for single-leg, six-leg and trajectory batches"""
+    rng = np.random.default_rng(1)
+    trajectory = np.stack([
+        rng.uniform(0.06, 0.10, (frames, LEG_COUNT)),
+        rng.uniform(-0.03, 0.03, (frames, LEG_COUNT)),
+        rng.uniform(-0.064, -0.02, (frames, LEG_COUNT)),
+    ], axis=-1)
+    pose = trajectory[0]
+    x, y, z = pose[0]
+    table = IKTable()
+    out_pose = np.empty(JOINT_COUNT, dtype=np.float32)
+    out_traj = np.empty((frames, JOINT_COUNT), dtype=np.float32)
+
+    print(f"IK table: {table.shape[0]}x{table.shape[1]} yaw + {table.shape[2]} knee cells, "
+          f"{table.nbytes / 1024:.0f} KiB, max error {table.max_error():.3f} deg")
+    print(f"{'batch':<28} {'analytic':>16} {'table':>16}")
+    rows = [
+        ("single leg (math)", 1, lambda: solve_leg(x, y, z, 1), None),
+        ("six legs, one pose", LEG_COUNT, lambda: solve(pose, out=out_pose), lambda: table.solve(pose, out=out_pose)),
+        (f"trajectory, {frames} frames", frames * LEG_COUNT,
+         lambda: solve(trajectory, out=out_traj), lambda: table.solve(trajectory, out=out_traj)),
+    ]
+    for name, batch, analytic, lookup in rows:
+        analytic_rate = _rate(analytic, batch)
+        lookup_rate = f"{_rate(lookup, batch):>12,.0f}/s" if lookup else f"{'-':>14}"
+        print(f"{name:<28} {analytic_rate:>12,.0f}/s {lookup_rate}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DETROIT leg inverse kinematics")
+    parser.add_argument("--benchmark", action="store_true", help="Measure solves per second")
+    parser.add_argument("--frames", type=int, default=1000, help="Frames in the trajectory batch")
+    args = parser.parse_args()
+    if args.benchmark:
+        raise SystemExit(benchmark(args.frames))
+    parser.print_help()
+
+__all__ = ['forward_kinematics', 'solve', 'solve_leg', 'reach_error', 'IKTable']
@@ -0,0 +1,246 @@
+"""
+Serial Link Benchmark for DETROIT LEGS
+======================================
+Measures how quickly commands get across the serial link to the SPARK
+controller (HC-05 Bluetooth or USB serial), for the single-character commands
+and for binary setpoint frames.
+
+Every message in a burst is timestamped on the host:
+
+    write   - time for write() to return (the OS accepting the bytes)
+    flush   - time until the OS reports the bytes sent (no-echo runs only)
+    rtt     - time until the echo of the message's last byte is back
+    queue   - rtt minus the message's own time on the wire both ways, i.e.
+              how long it waited behind earlier bytes and in buffers
+
+and every burst reports its sustained throughput against the line rate. RTT
+and queueing need a controller that echoes what it receives; without one, use
+--no-echo and only write/flush times and throughput are measured.
+
+With no --port the harness runs against EchoLoopback, a pty stand-in paced
+at the chosen baud rate, so it works in CI without hardware.
+
+Usage:
+    python link_bench.py                                 # loopback, 9600 baud, chars and frames
+    python link_bench.py --port COM5 --kind char --no-echo --csv hc05.csv
+"""
+
+import csv
+import time
+import bisect
+import argparse
+import threading
+
+import numpy as np
+
+from geometry import stand_pose
+from motion_bridge import DEFAULT_BAUD, STAND_COMMAND
+from servo_protocol import encode_frame
+
+CSV_FIELDS = ["kind", "baud", "burst", "index", "bytes", "sent_at_ms", "write_ms", "flush_ms", "rtt_ms",
+              "queue_ms"]
+
+
+def make_messages(kind, count, chars=STAND_COMMAND):
+    """Messages for one burst: single command characters or 17-byte setpoint frames"""
+    if kind == "char":
+        return [chars[i % len(chars)].encode("ascii") for i in range(count)]
+    if kind == "frame":
+        pose = stand_pose()
+        return [encode_frame(i & 0xFF, pose, 20) for i in range(count)]
+    raise ValueError(f"Unknown message kind: {kind}")
+
+
+class LinkBench:
+    """Sends timestamped bursts on a serial port and times the echoes
+
+    Args:
+        port (str): Serial device or pyserial URL
+        baud (int): Link speed
+        echo (bool): Whether the far end echoes every byte
+        timeout (float): Seconds to wait for the echoes of a burst
+    """
+
+    def __init__(self, port, baud=DEFAULT_BAUD, echo=True, timeout=5.0):
+        self.port = port
+        self.baud = baud
+        self.echo = echo
+        self.timeout = timeout
+        self.serial = None
+        self._echoed = 0
+        self._echo_counts = []   # cumulative echoed bytes ...
+        self._echo_times = []    # ... and when they arrived
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    @property
+    def byte_seconds(self):
+        return 10.0 / self.baud
+
+    def open(self):
+        import serial
+
+        self.serial = serial.serial_for_url(self.port, baudrate=self.baud, timeout=0.05, write_timeout=2)
+        self._running = True
+        if self.echo:
+            self._thread = threading.Thread(target=self._read_loop, name="link-bench-rx")
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def _read_loop(self):
+        while self._running:
+            try:
+                data = self.serial.read(self.serial.in_waiting or 1)
+            except Exception:
+                break
+            if not data:
+                continue
+            now = time.perf_counter()
+            with self._condition:
+                self._echoed += len(data)
+                self._echo_counts.append(self._echoed)
+                self._echo_times.append(now)
+                self._condition.notify_all()
+
+    def _echo_time(self, count):
+        """When the echo reached `count` cumulative bytes, or None"""
+        index = bisect.bisect_left(self._echo_counts, count)
+        return self._echo_times[index] if index < len(self._echo_times) else None
+
+    def run_burst(self, messages, gap=0.0, label="", burst=0):
+        """Send messages back to back (or `gap` seconds apart) and time each one
+
+        Returns:
+            tuple: (rows, throughput) with one CSV row dict per message and the
+            burst's sustained throughput in bytes per second
+        """
+        with self._condition:
+            base = self._echoed
+        sent = []   # (start, write_end, flush_end, cumulative bytes)
+        total = 0
+        first = time.perf_counter()
+        for message in messages:
+            start = time.perf_counter()
+            self.serial.write(message)
+            write_end = time.perf_counter()
+            flush_end = None
+            if not self.echo:
+                self.serial.flush()
+                flush_end = time.perf_counter()
+            total += len(message)
+            sent.append((start, write_end, flush_end, base + total))
+            if gap:
+                time.sleep(gap)
+
+        if self.echo:
+            deadline = time.monotonic() + self.timeout
+            with self._condition:
+                while self._echoed < base + total and time.monotonic() < deadline:
+                    self._condition.wait(0.05)
+            last = self._echo_time(base + total)
+        else:
+            last = sent[-1][2] if sent else first
+        throughput = total / (last - first) if last and last > first else float("nan")
+
+        rows = []
+        for index, (message, (start, write_end, flush_end, count)) in enumerate(zip(messages, sent)):
+            echoed_at = self._echo_time(count) if self.echo else None
+            rtt = (echoed_at - start) * 1000 if echoed_at else None
+            wire_ms = 2 * len(message) * self.byte_seconds * 1000
+            rows.append({
+                "kind": label,
+                "baud": self.baud,
+                "burst": burst,
+                "index": index,
+                "bytes": len(message),
+                "sent_at_ms": round((start - first) * 1000, 3),
+                "write_ms": round((write_end - start) * 1000, 3),
+                "flush_ms": round((flush_end - start) * 1000, 3) if flush_end else "",
+                "rtt_ms": round(rtt, 3) if rtt is not None else "",
+                "queue_ms": round(max(0.0, rtt - wire_ms), 3) if rtt is not None else "",
+            })
+        return rows, throughput
+
+    def close(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=1.0)
+        if self.serial is not None:
+            self.serial.close()
+            self.serial = None
+
+
+def _percentiles(values):
+    values = np.array([v for v in values if v != ""], dtype=np.float64)
+    if not len(values):
+        return "      -        -"
+    return f"{np.percentile(values, 50):>7.2f} {np.percentile(values, 99):>8.2f}"
+
+
+def run(port=None, baud=DEFAULT_BAUD, kinds=("char", "frame"), burst=50, bursts=5, gap=0.0, echo=True,
+        chars=STAND_COMMAND, csv_path=None, turnaround=0.0):
+    """Benchmark every message kind and print a summary; returns all CSV rows"""
+    loopback = None
+    if port is None:
+        from loopback import EchoLoopback
+
+        loopback = EchoLoopback(baud, turnaround)
+        port = loopback.start()
+        echo = True
+    bench = LinkBench(port, baud, echo).open()
+    rows = []
+    line_rate = baud / 10.0
+    print(f"{port} at {baud} baud, line rate {line_rate:.0f} B/s, {'echo' if echo else 'no echo'}")
+    print(f"{'kind':<6} {'bytes':>5} {'write p50':>9} {'p99':>8} {'rtt p50':>7} {'p99':>8} {'queue p50':>9} "
+          f"{'p99':>8} {'B/s':>7} {'of line':>7}")
+    try:
+        for kind in kinds:
+            messages = make_messages(kind, burst, chars)
+            rates = []
+            kind_rows = []
+            for number in range(bursts):
+                burst_rows, throughput = bench.run_burst(messages, gap, kind, number)
+                kind_rows += burst_rows
+                rates.append(throughput)
+                time.sleep(0.1)
+            rows += kind_rows
+            rate = float(np.nanmean(rates))
+            print(f"{kind:<6} {len(messages[0]):>5} {_percentiles([r['write_ms'] for r in kind_rows]):>18} "
+                  f"{_percentiles([r['rtt_ms'] for r in kind_rows]):>16} "
+                  f"{_percentiles([r['queue_ms'] for r in kind_rows]):>18} {rate:>7.0f} {rate / line_rate:>7.0%}")
+    finally:
+        bench.close()
+        if loopback:
+            loopback.stop()
+
+    if csv_path:
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Wrote {len(rows)} rows to {csv_path}")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DETROIT serial link benchmark")
+    parser.add_argument("--port", help="Serial port or pyserial URL (default: built-in paced loopback)")
+    parser.add_argument("--baud", type=int, default=DEFAULT_BAUD, help="Link speed")
+    parser.add_argument("--kind", choices=["char", "frame", "both"], default="both", help="Messages to send")
+    parser.add_argument("--chars", default=STAND_COMMAND,
+                        help="Command characters to cycle through (default: stand, which is safe on a robot)")
+    parser.add_argument("--burst", type=int, default=50, help="Messages per burst")
+    parser.add_argument("--bursts", type=int, default=5, help="Bursts per kind")
+    parser.add_argument("--gap", type=float, default=0.0, help="Seconds between messages in a burst")
+    parser.add_argument("--no-echo", action="store_true", help="The far end does not echo")
+    parser.add_argument("--turnaround", type=float, default=0.0, help="Loopback echo delay in seconds")
+    parser.add_argument("--csv", help="Write per-message results to this CSV file")
+    args = parser.parse_args()
+
+    kinds = ("char", "frame") if args.kind == "both" else (args.kind,)
+    run(args.port, args.baud, kinds, args.burst, args.bursts, args.gap, not args.no_echo, args.chars,
+        args.csv, args.turnaround)
+
+__all__ = ['LinkBench', 'make_messages', 'run', 'CSV_FIELDS']
@@ -0,0 +1,332 @@
+"""
+Serial Loopback for DETROIT LEGS
+================================
+A pseudo-terminal stand-in for the SPARK firmware, so the motion bridge can be
+exercised without a robot attached.
+
+FirmwareLoopback opens a pty pair and hands out the slave device path, which
+the motion bridge opens like any serial port. A reader thread plays the
+firmware on the master side: it takes one byte at a time, stays busy for the
+gait cycle a motion command would take (aborting it step by step when a stop
+command arrives, like stepDelay()), and records every command with the
+time it arrived and the time the "firmware" got round to it. The difference
+between the two is the backlog on the link.
+
+FrameLoopback does the same for the binary servo protocol: it paces incoming
+bytes at the configured baud rate, decodes setpoint frames and answers each
+one with an acknowledgement, as the reference decoder in spark_frame.h does.
+
+EchoLoopback is a plain wire at a given baud rate: every byte comes back once
+it has been clocked in and out again, for benchmarking the link itself.
+
+pty is POSIX only; on Windows use a virtual COM port pair (com0com) instead.
+
+Usage:
+    python loopback.py            # print the device path and log received commands
+"""
+
+import os
+import sys
+import time
+import queue
+import logging
+import threading
+
+from motion_bridge import (SPEED_COMMANDS, MOTION_COMMANDS, STAND_COMMAND, DEFAULT_KNEE_CENTER,
+                           STEP_SECONDS, gait_cycle_seconds)
+
+logger = logging.getLogger('DETROIT.LEGS.LOOPBACK')
+
+RX_BUFFER_SIZE = 64   # Arduino hardware serial receive buffer
+
+
+class FirmwareLoopback:
+    """Emulates the SPARK firmware's command handling on a pty
+
+    Args:
+        step_seconds (float): Duration of one gait step, 0 to consume commands instantly
+    """
+
+    def __init__(self, step_seconds=STEP_SECONDS):
+        self.step_seconds = step_seconds
+        self.master_fd = None
+        self.slave_fd = None
+        self.device = None
+        self.knee_center = DEFAULT_KNEE_CENTER
+        self.received = []   # (command, arrived_at, started_at)
+        self.overflows = 0
+        self.aborted = 0     # gait cycles cut short by a stop command
+        self._buffer = []    # (command, arrived_at) waiting for the "firmware" loop
+        self._lock = threading.Lock()
+        self._data = threading.Event()
+        self._running = False
+        self._threads = []
+
+    def start(self):
+        """Create the pty pair and start emulating; returns the device path"""
+        _open_pty(self)
+        self._running = True
+        for target, name in ((self._read_loop, "loopback-rx"), (self._firmware_loop, "loopback-firmware")):
+            thread = threading.Thread(target=target, name=name)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Firmware loopback listening on {self.device}")
+        return self.device
+
+    def _read_loop(self):
+        """Move bytes from the pty into the emulated receive buffer"""
+        while self._running:
+            try:
+                data = os.read(self.master_fd, 256)
+            except OSError:
+                break
+            if not data:
+                break
+            now = time.monotonic()
+            with self._lock:
+                for byte in data.decode("ascii", errors="replace"):
+                    if len(self._buffer) >= RX_BUFFER_SIZE:
+                        self.overflows += 1
+                        continue
+                    self._buffer.append((byte, now))
+            self._data.set()
+
+    def _firmware_loop(self):
+        """Handle one command per loop() pass, like the sketch does"""
+        while self._running:
+            self._data.wait(0.1)
+            with self._lock:
+                if not self._buffer:
+                    self._data.clear()
+                    continue
+                command, arrived_at = self._buffer.pop(0)
+            self.received.append((command, arrived_at, time.monotonic()))
+            if command in MOTION_COMMANDS.values():
+                self._walk(gait_cycle_seconds(self.knee_center, self.step_seconds))
+            else:
+                for speed_command, knee_center in SPEED_COMMANDS.values():
+                    if command == speed_command:
+                        self.knee_center = knee_center
+                        break
+
+    def _walk(self, duration):
+        """Stay busy for a gait cycle, stopping early if a stop command is next in line"""
+        end = time.monotonic() + duration
+        step = max(self.step_seconds, 0.001)
+        while time.monotonic() < end:
+            time.sleep(min(step, max(0.0, end - time.monotonic())))
+            with self._lock:
+                if self._buffer and self._buffer[0][0] == STAND_COMMAND:
+                    self.aborted += 1
+                    return
+
+    def commands(self):
+        """The command characters handled so far, in order"""
+        return "".join(command for command, _, _ in self.received)
+
+    def max_backlog(self):
+        """Longest time a command sat in the receive buffer, in seconds"""
+        return max((started - arrived for _, arrived, started in self.received), default=0.0)
+
+    def stop(self):
+        """Stop emulating and close the pty"""
+        self._running = False
+        self._data.set()
+        _close_pty(self)
+
+
+def _open_pty(owner):
+    """Open a raw pty pair on owner and return the slave device path"""
+    import pty
+    import tty
+
+    owner.master_fd, owner.slave_fd = pty.openpty()
+    tty.setraw(owner.master_fd)
+    tty.setraw(owner.slave_fd)
+    owner.device = os.ttyname(owner.slave_fd)
+    return owner.device
+
+
+def _close_pty(owner):
+    for fd in (owner.slave_fd, owner.master_fd):
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+    owner.master_fd = owner.slave_fd = None
+
+
+class FrameLoopback:
+    """Emulates a controller running the binary servo protocol on a pty
+
+    Bytes are released to the decoder no faster than the baud rate allows, and
+    acknowledgements are delayed by their own time on the wire, so round-trip
+    times resemble a real UART link.
+
+    Args:
+        baud (int): Emulated link speed
+    """
+
+    def __init__(self, baud=115200):
+        from servo_protocol import StreamDecoder
+
+        self.baud = baud
+        self.byte_seconds = 10.0 / baud
+        self.decoder = StreamDecoder()
+        self.frames = []          # (seq, angles, dt_ms, decoded_at)
+        self.master_fd = None
+        self.slave_fd = None
+        self.device = None
+        self._acks = queue.Queue()
+        self._running = False
+
+    def start(self):
+        """Create the pty pair and start decoding; returns the device path"""
+        _open_pty(self)
+        self._running = True
+        # The UART is full duplex: acknowledgements go out while frames come in
+        for target, name in ((self._decode_loop, "loopback-frames"), (self._ack_loop, "loopback-acks")):
+            thread = threading.Thread(target=target, name=name)
+            thread.daemon = True
+            thread.start()
+        return self.device
+
+    def _ack_loop(self):
+        while self._running:
+            ack = self._acks.get()
+            if ack is None:
+                break
+            time.sleep(len(ack) * self.byte_seconds)
+            try:
+                os.write(self.master_fd, ack)
+            except (OSError, TypeError):
+                break
+
+    def _decode_loop(self):
+        from servo_protocol import encode_ack, ACK_OK, ACK_SEQ_GAP
+
+        wire_free_at = time.perf_counter()   # when the emulated UART finishes the bytes so far
+        expected_seq = None
+        while self._running:
+            try:
+                data = os.read(self.master_fd, 256)
+            except OSError:
+                break
+            if not data:
+                break
+            # The last byte of this chunk lands after every byte before it has been clocked in
+            wire_free_at = max(wire_free_at, time.perf_counter()) + len(data) * self.byte_seconds
+            delay = wire_free_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            for message in self.decoder.feed(data):
+                if isinstance(message, tuple):
+                    continue
+                status = ACK_OK if expected_seq in (None, message.seq) else ACK_SEQ_GAP
+                expected_seq = (message.seq + 1) & 0xFF
+                self.frames.append((message.seq, message.angles, message.dt_ms, time.perf_counter()))
+                self._acks.put(encode_ack(message.seq, status))
+
+    def stop(self):
+        """Stop decoding and close the pty"""
+        self._running = False
+        self._acks.put(None)
+        _close_pty(self)
+
+
+class EchoLoopback:
+    """Echoes every byte back on a pty, paced at the baud rate in both directions
+
+    Args:
+        baud (int): Emulated link speed
+        turnaround (float): Extra seconds before each chunk is echoed, like a
+            firmware loop() that only polls the UART now and then
+    """
+
+    def __init__(self, baud=9600, turnaround=0.0):
+        self.baud = baud
+        self.byte_seconds = 10.0 / baud
+        self.turnaround = turnaround
+        self.received = 0
+        self.master_fd = None
+        self.slave_fd = None
+        self.device = None
+        self._echoes = queue.Queue()
+        self._running = False
+
+    def start(self):
+        """Create the pty pair and start echoing; returns the device path"""
+        _open_pty(self)
+        self._running = True
+        for target, name in ((self._receive_loop, "loopback-echo-rx"), (self._echo_loop, "loopback-echo-tx")):
+            thread = threading.Thread(target=target, name=name)
+            thread.daemon = True
+            thread.start()
+        return self.device
+
+    def _receive_loop(self):
+        # Release bytes in slices of about a millisecond of wire time, so the
+        # echo streams back while the rest of a burst is still coming in
+        slice_size = max(1, int(0.001 / self.byte_seconds))
+        wire_free_at = time.perf_counter()
+        while self._running:
+            try:
+                data = os.read(self.master_fd, 256)
+            except OSError:
+                break
+            if not data:
+                break
+            # Pace from when the data arrived, so oversleeping does not slow the emulated wire
+            wire_free_at = max(wire_free_at, time.perf_counter())
+            for offset in range(0, len(data), slice_size):
+                chunk = data[offset:offset + slice_size]
+                wire_free_at += len(chunk) * self.byte_seconds
+                delay = wire_free_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                self.received += len(chunk)
+                self._echoes.put((chunk, wire_free_at))
+
+    def _echo_loop(self):
+        wire_free_at = time.perf_counter()
+        while self._running:
+            item = self._echoes.get()
+            if item is None:
+                break
+            data, received_at = item
+            wire_free_at = max(wire_free_at, received_at + self.turnaround) + len(data) * self.byte_seconds
+            delay = wire_free_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                os.write(self.master_fd, data)
+            except (OSError, TypeError):
+                break
+
+    def stop(self):
+        """Stop echoing and close the pty"""
+        self._running = False
+        self._echoes.put(None)
+        _close_pty(self)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    loopback = FirmwareLoopback()
+    print(f"Firmware loopback on {loopback.start()} (Ctrl+C to stop)")
+    seen = 0
+    try:
+        while True:
+            time.sleep(0.2)
+            for command, arrived, started in loopback.received[seen:]:
+                print(f"{command!r} waited {(started - arrived) * 1000:.0f} ms")
+            seen = len(loopback.received)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loopback.stop()
+    sys.exit(0)
+
+__all__ = ['FirmwareLoopback', 'FrameLoopback', 'EchoLoopback']
@@ -0,0 +1,358 @@
+"""
+Motion Bridge for DETROIT Robot System
+======================================
+Turns DETROIT motion intents into the SPARK firmware's single-character
+serial commands (firmware/arduino with PCA9685/SPARK_bt_controlled.ino):
+
+    'F' 'B' 'L' 'R'   one gait cycle forward / backward / turn left / right
+    '1'..'9' 'q'      knee center (stride height), which also sets the speed
+    'S'               stop: aborts the gait in progress and stands (default: hm())
+
+The firmware handles one command per gait cycle and lets everything else pile
+up in its 64-byte receive buffer, so the bridge never writes faster than the
+firmware can walk. Intents go into a latest-command-wins slot rather than a
+FIFO: a new motion replaces whatever has not been sent yet, and repeated speed
+changes collapse into one. A single writer thread owns the serial port.
+"""
+
+import re
+import time
+import logging
+import threading
+
+logger = logging.getLogger('DETROIT.LEGS')
+
+DEFAULT_BAUD = 9600
+STAND_COMMAND = "S"   # the firmware's stopCmd; it also aborts a gait in progress
+
+MOTION_COMMANDS = {
+    "forward": "F",
+    "backward": "B",
+    "left": "L",
+    "right": "R",
+}
+
+# Speed level -> (command, knee center the firmware sets)
+SPEED_COMMANDS = {
+    1: ("1", 5), 2: ("2", 15), 3: ("3", 25), 4: ("4", 35), 5: ("5", 45),
+    6: ("6", 55), 7: ("7", 65), 8: ("8", 75), 9: ("9", 80), 10: ("q", 80),
+}
+DEFAULT_KNEE_CENTER = 80
+
+# Firmware gait timing: every step is a delay(6) plus three PCA9685 writes over I2C
+STEP_SECONDS = 0.0065
+LOWEST = 5
+THIGH_STEPS = 21
+
+# The sketch plays the keyframe tables from spark_gaits.h (USE_GAIT_TABLES 1): each sweep is
+# one keyframe, held for its travel at SPARK_GAIT_US_PER_DEGREE in whole stepDelay() calls
+GAIT_TABLES = True
+TABLE_US_PER_DEGREE = 3334
+TABLE_STEP_MS = 6
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+MAX_CYCLES = 20
+
+
+def gait_cycle_seconds(knee_center=DEFAULT_KNEE_CENTER, step_seconds=STEP_SECONDS, tables=GAIT_TABLES):
+    """How long the firmware takes to run one gait cycle
+
+    Each gait lifts and lowers both tripods (four knee sweeps from knee_center
+    down to LOWEST) and swings the thighs through four 21-step sweeps. The
+    stock loops take one step per degree; a compiled table holds each sweep
+    for table_steps() of its travel.
+    """
+    knee_travel = max(knee_center, LOWEST) - LOWEST
+    if tables:
+        return (4 * table_steps(knee_travel) + 4 * table_steps(THIGH_STEPS - 1)) * step_seconds
+    return (4 * (knee_travel + 1) + 4 * THIGH_STEPS) * step_seconds
+
+
+def table_steps(travel):
+    """stepDelay() calls playGait() spends on a keyframe whose largest joint move is `travel` degrees"""
+    wait_ms = travel * TABLE_US_PER_DEGREE // 1000
+    return max(1, -(-wait_ms // TABLE_STEP_MS))
+
+
+def parse_motion_command(text):
+    """Parse spoken text into a motion intent
+
+    Returns:
+        tuple: ("move", direction, cycles), ("speed", level, None),
+        ("stand", None, None), ("stop", None, None) or None if the text is
+        not a motion command
+    """
+    text = text.lower()
+    if re.search(r"\b(stand( up)?|stand still|rest position)\b", text):
+        return ("stand", None, None)
+    if re.search(r"\b(stop|halt|freeze)\b", text) and "stop listening" not in text:
+        return ("stop", None, None)
+
+    speed = re.search(r"\bspeed (?:to |level )?(\w+)\b", text)
+    if speed:
+        word = speed.group(1)
+        level = NUMBER_WORDS.get(word) or (int(word) if word.isdigit() else None)
+        if level in SPEED_COMMANDS:
+            return ("speed", level, None)
+        return None
+
+    if not re.search(r"\b(walk|move|go|step|turn)\b", text):
+        return None
+    if re.search(r"\bturn (to the )?left\b|\bleft\b", text):
+        direction = "left"
+    elif re.search(r"\bturn (to the )?right\b|\bright\b", text):
+        direction = "right"
+    elif re.search(r"\b(back|backward|backwards|reverse)\b", text):
+        direction = "backward"
+    elif re.search(r"\b(forward|forwards|ahead|straight)\b", text) or re.search(r"\b(walk|step)\b", text):
+        direction = "forward"
+    else:
+        return None
+
+    cycles = 1
+    count = re.search(r"\b(\d+|" + "|".join(NUMBER_WORDS) + r")\s+(steps?|times|cycles?)\b", text)
+    if count:
+        word = count.group(1)
+        cycles = NUMBER_WORDS.get(word) or int(word)
+    return ("move", direction, max(1, min(cycles, MAX_CYCLES)))
+
+
+class MotionBridge:
+    """Owns the serial link to the SPARK firmware and paces commands to it
+
+    Args:
+        port (str): Serial device (COM3, /dev/ttyUSB0, a pty path) or a pyserial URL
+        baud (int): Link speed, 9600 for the stock firmware
+        step_seconds (float): Duration of one firmware gait step, for pacing
+    """
+
+    def __init__(self, port, baud=DEFAULT_BAUD, step_seconds=STEP_SECONDS):
+        self.port = port
+        self.baud = baud
+        self.step_seconds = step_seconds
+        self.serial = None
+        self.knee_center = DEFAULT_KNEE_CENTER
+        self._knee_center_sent = False  # until we send one, the firmware may be at any speed
+        self.stats = {"sent": 0, "coalesced": 0, "bytes": 0, "dropped": 0}
+        self.last_command = None
+        self.on_write = None         # optional callback(command, perf_counter time) after every write
+        self._motion = None          # pending (command, cycles remaining)
+        self._speed = None           # pending (command, knee center)
+        self._stand = False
+        self._busy_until = 0.0       # when the firmware finishes its current gait cycle
+        self._stops = 0              # bumped by emergency_stop(), so commands from before it are dropped
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    @property
+    def byte_seconds(self):
+        """Time to put one byte on the wire (8N1 = 10 bits)"""
+        return 10.0 / self.baud
+
+    def open(self):
+        """Open the serial port and start the writer thread"""
+        if self._running:
+            return True
+        try:
+            import serial
+            self.serial = serial.serial_for_url(self.port, baudrate=self.baud, timeout=0, write_timeout=1)
+        except Exception as e:
+            logger.error(f"Could not open motion serial port {self.port}: {e}")
+            self.serial = None
+            return False
+        self._running = True
+        self._thread = threading.Thread(target=self._writer_loop, name="motion-bridge")
+        self._thread.daemon = True
+        self._thread.start()
+        logger.info(f"Motion bridge connected on {self.port} at {self.baud} baud")
+        return True
+
+    def is_open(self):
+        """Check whether the serial link is up"""
+        return self._running and self.serial is not None
+
+    @property
+    def stops(self):
+        """Emergency stops so far; pass it to move() to have the move dropped if a stop comes first"""
+        return self._stops
+
+    def move(self, direction, cycles=1, stops=None):
+        """Walk or turn for a number of gait cycles, replacing any pending motion
+
+        Args:
+            stops (int): The stops count the caller last saw; the move is
+                dropped (returning False) if an emergency stop came since
+        """
+        command = MOTION_COMMANDS.get(direction)
+        if command is None:
+            raise ValueError(f"Unknown direction: {direction}")
+        with self._condition:
+            if stops is not None and stops != self._stops:
+                self.stats["dropped"] += 1
+                return False
+            if self._motion is not None:
+                self.stats["coalesced"] += 1
+            self._motion = (command, max(1, int(cycles)))
+            self._stand = False
+            self._condition.notify()
+        return True
+
+    def set_speed(self, level):
+        """Set the gait speed level (1 = fastest, short strides ... 10 = 'q')"""
+        if level not in SPEED_COMMANDS:
+            raise ValueError(f"Speed level must be 1-10, got {level}")
+        with self._condition:
+            if self._speed is not None:
+                self.stats["coalesced"] += 1
+            self._speed = SPEED_COMMANDS[level]
+            self._condition.notify()
+        return True
+
+    def stand(self):
+        """Drop any pending motion and return to the stand pose"""
+        with self._condition:
+            if self._motion is not None:
+                self.stats["coalesced"] += 1
+            self._motion = None
+            self._stand = True
+            self._condition.notify()
+        return True
+
+    def emergency_stop(self):
+        """Drop everything pending and write the stop command right now
+
+        Called from the emergency stop listener rather than through the queue.
+        The firmware aborts the gait in progress within one step. A command the
+        writer took from the queue before the stop, but has not written yet, is
+        dropped rather than sent after the stop.
+        """
+        with self._condition:
+            self._motion = None
+            self._stand = False
+            self._stops += 1
+            self._condition.notify()
+        with self._write_lock:
+            self._busy_until = 0.0
+            written = self._write(STAND_COMMAND)
+        if written:
+            self._written(STAND_COMMAND)
+        return written
+
+    def pending(self):
+        """Check whether commands are still waiting to be sent"""
+        with self._condition:
+            return self._motion is not None or self._speed is not None or self._stand
+
+    def wait_idle(self, timeout=None):
+        """Wait until everything has been sent and the last gait cycle is over"""
+        end = None if timeout is None else time.monotonic() + timeout
+        while self.pending() or time.monotonic() < self._busy_until:
+            if end is not None and time.monotonic() >= end:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def write_now(self, command):
+        """Write a command immediately, bypassing the queue and the pacing"""
+        with self._write_lock:
+            written = self._write(command)
+        if written:
+            self._written(command)
+        return written
+
+    def _write(self, command):
+        """Put a command on the wire (called with the write lock held)"""
+        if self.serial is None:
+            return False
+        try:
+            self.serial.write(command.encode("ascii"))
+            self.serial.flush()
+        except Exception as e:
+            logger.error(f"Motion serial write failed: {e}")
+            return False
+        return True
+
+    def _written(self, command):
+        """Count a command that went out and tell on_write"""
+        self.stats["sent"] += 1
+        self.stats["bytes"] += len(command)
+        self.last_command = command
+        if self.on_write is not None:
+            self.on_write(command, time.perf_counter())
+        return True
+
+    def _next_command(self):
+        """Pick the next command to send, or return a wait time (called with the lock held)"""
+        now = time.monotonic()
+        if self._stand:
+            # A stand command is a single byte; the firmware takes it after the current cycle
+            self._stand = False
+            return STAND_COMMAND, 0.0
+        if self._speed is not None:
+            # Speed changes apply instantly on the firmware side, so they are not paced
+            command, knee_center = self._speed
+            self._speed = None
+            if knee_center == self.knee_center and self._knee_center_sent:
+                self.stats["coalesced"] += 1
+                return None, 0.0
+            self.knee_center = knee_center
+            self._knee_center_sent = True
+            return command, 0.0
+        if self._motion is not None:
+            if now < self._busy_until:
+                return None, self._busy_until - now
+            command, cycles = self._motion
+            self._motion = (command, cycles - 1) if cycles > 1 else None
+            return command, gait_cycle_seconds(self.knee_center, self.step_seconds)
+        return None, None
+
+    def _writer_loop(self):
+        while self._running:
+            with self._condition:
+                command, duration = self._next_command()
+                if command is None:
+                    if duration != 0.0:
+                        self._condition.wait(duration)
+                    continue
+                stops = self._stops
+            with self._write_lock:
+                # A gait cycle taken before an emergency stop must not start after the 'S'
+                if duration and stops != self._stops:
+                    self.stats["dropped"] += 1
+                    continue
+                written = self._write(command)
+                if written and duration:
+                    self._busy_until = time.monotonic() + self.byte_seconds + duration
+            if written:
+                self._written(command)
+
+    def close(self, stand=True):
+        """Stop the writer thread and close the port, standing the robot up first"""
+        if not self._running:
+            return True
+        with self._condition:
+            self._motion = None
+            self._speed = None
+            self._stand = False
+            self._running = False
+            self._condition.notify()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        if stand:
+            self.write_now(STAND_COMMAND)
+        try:
+            self.serial.close()
+        except Exception:
+            pass
+        self.serial = None
+        logger.info("Motion bridge closed")
+        return True
+
+
+__all__ = ['MotionBridge', 'parse_motion_command', 'gait_cycle_seconds', 'table_steps',
+           'MOTION_COMMANDS', 'SPEED_COMMANDS', 'STAND_COMMAND']
@@ -0,0 +1,1117 @@
+"""
+Navigation for DETROIT LEGS
+===========================
+Gives the gaits a notion of space: an occupancy grid of the floor, a path
+planner over it, and a navigator that turns a path into the firmware's
+F/L/R commands to reach a named place ("go to the door").
+
+Map:
+    OccupancyGrid is a NumPy array of log-odds per cell (5 cm cells, 500x500
+    = 25 m square by default). Range readings clear the cells along each ray
+    and mark the cell they hit; obstacles seen by the camera detector are
+    projected onto the floor from the bottom of their box and marked with a
+    radius. Walls drawn with the CLI are kept in a fixed layer; sensed cells
+    can be forgotten. Unknown cells are planned through as free. For planning
+    the occupied cells are inflated by the robot's radius with shifted ORs of
+    the whole array and pooled into 20 cm planning cells (4x4 grid cells,
+    blocked if any of them is). Named places are stored with the map.
+
+Planning (8-connected, no corner cutting, costs of 10 per step and 14 per
+diagonal, octile heuristic):
+    astar()        one-shot A*, ties broken towards the deeper node
+    DStarLite      D* Lite, searching from the goal so that when the robot
+                   moves and cells change only the affected part of the
+                   search is repaired instead of planning from scratch
+    smooth_path()  line-of-sight shortcuts, so a path is a few waypoints
+
+Over the 500x500 grid (125x125 planning cells) A* takes under a millisecond
+within a room and 5-15 ms between rooms. D* Lite's first plan costs about
+three times an A* plan. Its repair is only cheaper than planning again when
+the route ahead is long and the change just bends it: corner to corner a
+repair takes a millisecond or two against about 10 ms for A*. When a change
+cuts across the route so most of it must be found again (a block in the way
+across rooms repairs in about 50 ms, against about 10 ms for A*), or the
+goal is close, planning from scratch is faster. Replans are mostly small
+changes along long walks, which is why the navigator keeps D* Lite (see
+python navigation.py bench). At full 5 cm resolution the same routes take
+hundreds of milliseconds in Python.
+
+Commands:
+    Each waypoint becomes a turn of whole turn cycles and then whole
+    forward cycles, using the stride and degrees per cycle from the
+    odometry calibration (EYES/odometry.py) when there is one. The pose is
+    dead-reckoned from every motion command the bridge writes, so it stays
+    current through manual commands too, or follows a running visual
+    odometry. Either way it drifts without a position fix. The navigator
+    looks again after every turn and every LOOKAHEAD_CYCLES forward cycles,
+    and replans as the map fills in; if no path is left it forgets what it
+    sensed beyond a couple of metres (drift smears it across doorways) and
+    tries again.
+
+    Navigation walks at NAV_SPEED, a level the odometry calibration covers
+    by default; level 1 cycles quickest only because its knees stay at
+    LOWEST, where no foot lifts.
+
+Usage:
+    python navigation.py simulate                 # rooms, an unknown map and a noisy gait
+    python navigation.py bench                    # planning times on a 500x500 map
+    python navigation.py place door 3.2 0.5 --map ../BRAIN/navigation_map.npz
+    python navigation.py wall 1.0 -2.0 1.0 2.0 --map ../BRAIN/navigation_map.npz
+    python navigation.py show --map ../BRAIN/navigation_map.npz
+    python navigation.py go door --port COM5 --map ../BRAIN/navigation_map.npz
+    python navigation.py go door --port COM5 --speed 5
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import heapq
+import logging
+import argparse
+import threading
+
+import numpy as np
+
+from motion_bridge import MotionBridge, DEFAULT_BAUD, MOTION_COMMANDS, SPEED_COMMANDS
+
+logger = logging.getLogger('DETROIT.LEGS.NAVIGATION')
+
+EYES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'EYES')
+
+GRID_SIZE = 500
+RESOLUTION = 0.05             # metres per cell
+ROBOT_RADIUS = 0.15           # metres kept clear around the robot's centre
+LOG_ODDS_FREE = -0.4
+LOG_ODDS_OCCUPIED = 0.9
+LOG_ODDS_LIMIT = 4.0
+OCCUPIED = 0.5                # log odds above which a cell is an obstacle
+NAV_SPEED = 9                 # speed level while navigating (kneeCenter 80, calibrated by odometry.py)
+LOOKAHEAD_CYCLES = 8          # forward cycles before sensing and replanning again
+GOAL_TOLERANCE = 0.15         # metres
+FORGET_KEEP = 2.0             # metres of sensed map kept when no path is left
+MAX_FORGETS = 3               # times sensed obstacles are forgotten before giving up
+CAMERA_HEIGHT = 0.12          # metres from the floor to the camera
+HFOV_DEGREES = 60.0
+VFOV_DEGREES = 45.0
+OBSTACLE_RADIUS = 0.15        # metres marked around a detected obstacle's foot
+PLAN_FACTOR = 4               # grid cells per planning cell side (20 cm planning cells)
+
+STRAIGHT, DIAGONAL = 10, 14   # integer step costs, so planner keys compare exactly
+TURNS = {"left": 1.0, "right": -1.0}
+DIRECTIONS = {command: direction for direction, command in MOTION_COMMANDS.items()}
+
+
+def _eyes_path():
+    if EYES_DIR not in sys.path:
+        sys.path.append(EYES_DIR)
+
+
+def load_calibration(log_path=None, speed_level=NAV_SPEED):
+    """Stride (metres) and turn (degrees) per gait cycle at a speed level
+
+    Taken from the visual odometry log when it has forward and turn cycles
+    at that level, otherwise from the estimates follow.py uses.
+    """
+    from follow import STRIDE_PER_CYCLE, TURN_DEGREES_PER_CYCLE
+
+    calibration = {"stride": STRIDE_PER_CYCLE, "turn": TURN_DEGREES_PER_CYCLE, "source": "estimate"}
+    try:
+        _eyes_path()
+        from odometry import ODOMETRY_LOG, load_log, summarize
+        rows = [row for row in summarize(load_log(log_path or ODOMETRY_LOG)) if row["speed_level"] == speed_level]
+    except Exception as e:
+        logger.debug(f"No odometry calibration: {e}")
+        return calibration
+    forward = [row for row in rows if row["direction"] == "forward" and row["stride_m"] > 0]
+    turns = [row for row in rows if row["direction"] in TURNS and row["yaw_deg"]]
+    if forward:
+        calibration["stride"] = sum(r["stride_m"] * r["cycles"] for r in forward) / sum(r["cycles"] for r in forward)
+        calibration["source"] = "odometry"
+    if turns:
+        calibration["turn"] = sum(abs(r["yaw_deg"]) * r["cycles"] for r in turns) / sum(r["cycles"] for r in turns)
+        calibration["source"] = "odometry"
+    return calibration
+
+
+class OccupancyGrid:
+    """Log-odds occupancy of the floor around the robot
+
+    Args:
+        size (int | tuple): Cells per side, or (rows, cols)
+        resolution (float): Metres per cell
+        origin (tuple): World (x, y) of the corner of cell (0, 0); by default
+            the grid is centred on (0, 0), where the robot starts
+
+    Walls drawn into the map are kept in a separate fixed layer; what the
+    robot senses can be forgotten (forget()) when drift has smeared it.
+    """
+
+    def __init__(self, size=GRID_SIZE, resolution=RESOLUTION, origin=None):
+        rows, cols = (size, size) if np.isscalar(size) else size
+        self.resolution = resolution
+        self.origin = origin if origin is not None else (-cols * resolution / 2.0, -rows * resolution / 2.0)
+        self.log_odds = np.zeros((rows, cols), dtype=np.float32)
+        self.fixed = np.zeros((rows, cols), dtype=bool)
+        self.places = {}
+        self.version = 0
+        self._inflated = {}
+
+    @property
+    def shape(self):
+        return self.log_odds.shape
+
+    def world_to_cell(self, x, y, factor=1):
+        """(row, col) of a world position, in cells of `factor` grid cells; arrays in, arrays out"""
+        size = self.resolution * factor
+        col = np.floor((np.asarray(x) - self.origin[0]) / size).astype(np.int64)
+        row = np.floor((np.asarray(y) - self.origin[1]) / size).astype(np.int64)
+        return row, col
+
+    def cell_to_world(self, row, col, factor=1):
+        """World (x, y) of a cell centre, in cells of `factor` grid cells"""
+        size = self.resolution * factor
+        return (self.origin[0] + (np.asarray(col) + 0.5) * size,
+                self.origin[1] + (np.asarray(row) + 0.5) * size)
+
+    def _inside(self, rows, cols):
+        return (rows >= 0) & (rows < self.shape[0]) & (cols >= 0) & (cols < self.shape[1])
+
+    def integrate_scan(self, pose, bearings, distances, max_range):
+        """Range readings from a pose: rays clear cells up to their hit, hits are marked
+
+        Args:
+            pose: (x, y, heading radians)
+            bearings: Ray angles in radians relative to the heading (left positive)
+            distances: Measured range per ray; max_range or more means no hit
+        """
+        x, y, heading = pose
+        bearings = np.asarray(bearings, dtype=np.float64)
+        distances = np.minimum(np.asarray(distances, dtype=np.float64), max_range)
+        angles = heading + bearings
+        steps = np.arange(0.0, max_range, self.resolution / 2.0)
+        # Every sample point of every ray at once; samples past the hit are dropped
+        along = steps[None, :] < distances[:, None] - self.resolution / 2.0
+        px = x + steps[None, :] * np.cos(angles)[:, None]
+        py = y + steps[None, :] * np.sin(angles)[:, None]
+        rows, cols = self.world_to_cell(px[along], py[along])
+        inside = self._inside(rows, cols)
+        free = np.unique(rows[inside] * self.shape[1] + cols[inside])
+        hit = distances < max_range
+        hit_rows, hit_cols = self.world_to_cell(x + distances[hit] * np.cos(angles[hit]),
+                                                y + distances[hit] * np.sin(angles[hit]))
+        inside = self._inside(hit_rows, hit_cols)
+        occupied = np.unique(hit_rows[inside] * self.shape[1] + hit_cols[inside])
+        flat = self.log_odds.reshape(-1)
+        flat[np.setdiff1d(free, occupied, assume_unique=True)] += LOG_ODDS_FREE
+        flat[occupied] += LOG_ODDS_OCCUPIED
+        np.clip(self.log_odds, -LOG_ODDS_LIMIT, LOG_ODDS_LIMIT, out=self.log_odds)
+        self.version += 1
+
+    def mark_obstacle(self, x, y, radius=OBSTACLE_RADIUS, fixed=False):
+        """Mark a disk around a world position (or arrays of them) as occupied, or as a fixed wall"""
+        reach = int(math.ceil(radius / self.resolution))
+        offsets = np.arange(-reach, reach + 1)
+        dr, dc = np.meshgrid(offsets, offsets, indexing="ij")
+        disk = (dr ** 2 + dc ** 2) * self.resolution ** 2 <= radius ** 2
+        rows, cols = self.world_to_cell(np.atleast_1d(x), np.atleast_1d(y))
+        rows = (rows[:, None] + dr[disk][None, :]).ravel()
+        cols = (cols[:, None] + dc[disk][None, :]).ravel()
+        inside = self._inside(rows, cols)
+        cells = np.unique(rows[inside] * self.shape[1] + cols[inside])
+        if fixed:
+            self.fixed.reshape(-1)[cells] = True
+        else:
+            self.log_odds.reshape(-1)[cells] = LOG_ODDS_LIMIT
+        self.version += 1
+
+    def mark_wall(self, x0, y0, x1, y1, thickness=None, fixed=True):
+        """Mark a straight wall between two world points"""
+        length = math.hypot(x1 - x0, y1 - y0)
+        samples = np.linspace(0.0, 1.0, max(2, int(length / (self.resolution / 2.0)) + 1))
+        self.mark_obstacle(x0 + (x1 - x0) * samples, y0 + (y1 - y0) * samples,
+                           (thickness or self.resolution) / 2.0, fixed)
+
+    def forget(self, x, y, keep):
+        """Clear sensed cells further than `keep` metres from a world position"""
+        rows, cols = self.shape
+        cell_x, cell_y = self.cell_to_world(np.arange(rows)[:, None], np.arange(cols)[None, :])
+        self.log_odds[(cell_x - x) ** 2 + (cell_y - y) ** 2 > keep ** 2] = 0.0
+        self.version += 1
+
+    def occupied(self):
+        return (self.log_odds > OCCUPIED) | self.fixed
+
+    def blocked(self, radius=ROBOT_RADIUS, factor=1):
+        """Cells the robot's centre cannot be in: obstacles grown by its radius, and the border
+
+        With a factor above 1 the mask is of planning cells of factor x factor
+        grid cells, blocked when any of their grid cells is, so a free
+        planning cell is free throughout.
+        """
+        cached = self._inflated.get((radius, factor))
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        occupied = self.occupied()
+        reach = int(math.ceil(radius / self.resolution))
+        padded = np.pad(occupied, reach)
+        rows, cols = occupied.shape
+        mask = np.zeros_like(occupied)
+        for dr in range(-reach, reach + 1):
+            for dc in range(-reach, reach + 1):
+                if (dr * dr + dc * dc) * self.resolution ** 2 <= radius ** 2:
+                    mask |= padded[reach + dr:reach + dr + rows, reach + dc:reach + dc + cols]
+        if factor > 1:
+            rows, cols = rows // factor, cols // factor
+            mask = mask[:rows * factor, :cols * factor].reshape(rows, factor, cols, factor).any(axis=(1, 3))
+        mask[0, :] = mask[-1, :] = True
+        mask[:, 0] = mask[:, -1] = True
+        self._inflated[(radius, factor)] = (self.version, mask)
+        return mask
+
+    def save(self, path):
+        np.savez_compressed(path, log_odds=self.log_odds, fixed=self.fixed, resolution=self.resolution,
+                            origin=np.array(self.origin), places=json.dumps(self.places))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            grid = cls(data["log_odds"].shape, float(data["resolution"]), tuple(data["origin"].tolist()))
+            grid.log_odds[:] = data["log_odds"]
+            grid.fixed[:] = data["fixed"]
+            grid.places = {name: tuple(value) for name, value in json.loads(str(data["places"])).items()}
+        return grid
+
+
+def _octile(a, b, width):
+    dy = abs(a // width - b // width)
+    dx = abs(a % width - b % width)
+    return STRAIGHT * (dx + dy) + (DIAGONAL - 2 * STRAIGHT) * min(dx, dy)
+
+
+def _moves(width):
+    """(offset, cost, row step, col step) for the 8 neighbours of a flat index"""
+    return [(-width, STRAIGHT, -1, 0), (width, STRAIGHT, 1, 0), (-1, STRAIGHT, 0, -1), (1, STRAIGHT, 0, 1),
+            (-width - 1, DIAGONAL, -1, -1), (-width + 1, DIAGONAL, -1, 1),
+            (width - 1, DIAGONAL, 1, -1), (width + 1, DIAGONAL, 1, 1)]
+
+
+def astar(blocked, start, goal):
+    """Shortest 8-connected path between two (row, col) cells
+
+    Args:
+        blocked (numpy.ndarray): bool mask with a blocked border (OccupancyGrid.blocked)
+
+    Returns:
+        list: Flat cell indices from start to goal, or None
+    """
+    width = blocked.shape[1]
+    free = (~blocked).ravel().tobytes()
+    source, target = start[0] * width + start[1], goal[0] * width + goal[1]
+    if not free[source] or not free[target]:
+        return None
+    moves = _moves(width)
+    gy, gx = divmod(target, width)
+    g = {source: 0}
+    parent = {source: None}
+    closed = set()
+    heap = [(_octile(source, target, width), 0, source)]
+    while heap:
+        _, cost, cell = heapq.heappop(heap)
+        if cell == target:
+            path = []
+            while cell is not None:
+                path.append(cell)
+                cell = parent[cell]
+            return path[::-1]
+        if cell in closed:
+            continue
+        closed.add(cell)
+        cost = -cost
+        for offset, step, dr, dc in moves:
+            neighbour = cell + offset
+            if not free[neighbour]:
+                continue
+            if dr and dc and not (free[cell + dc] and free[cell + dr * width]):
+                continue
+            new_cost = cost + step
+            if new_cost < g.get(neighbour, math.inf):
+                g[neighbour] = new_cost
+                parent[neighbour] = cell
+                dy = abs(neighbour // width - gy)
+                dx = abs(neighbour % width - gx)
+                # Ties go to the deeper node, which keeps the search narrow in open space
+                heapq.heappush(heap, (new_cost + STRAIGHT * (dx + dy) + (DIAGONAL - 2 * STRAIGHT) * min(dx, dy),
+                                      -new_cost, neighbour))
+    return None
+
+
+class DStarLite:
+    """Incremental shortest paths on a changing grid (Koenig and Likhachev's D* Lite)
+
+    The search runs from the goal, so g(cell) is the cost from the cell to
+    the goal (in tenths of a cell). Moving the start only offsets the queue keys (km), and changed
+    cells only requeue their neighbourhood.
+
+    Args:
+        blocked (numpy.ndarray): bool mask with a blocked border
+        start, goal: (row, col) cells
+    """
+
+    def __init__(self, blocked, start, goal):
+        self.width = blocked.shape[1]
+        self.free = bytearray((~blocked).ravel().tobytes())
+        self.moves = _moves(self.width)
+        self.start = start[0] * self.width + start[1]
+        self.goal = goal[0] * self.width + goal[1]
+        self.last = self.start
+        self.km = 0
+        self.g = {}
+        self.rhs = {self.goal: 0}
+        self.queue = {}
+        self.heap = []
+        self.stats = {"expanded": 0, "updates": 0}
+        self._push(self.goal)
+
+    def _key(self, cell):
+        best = min(self.g.get(cell, math.inf), self.rhs.get(cell, math.inf))
+        return (best + _octile(self.start, cell, self.width) + self.km, best)
+
+    def _push(self, cell):
+        key = self._key(cell)
+        self.queue[cell] = key
+        heapq.heappush(self.heap, (key, cell))
+
+    def _queue_update(self, cell):
+        if self.g.get(cell, math.inf) != self.rhs.get(cell, math.inf):
+            self._push(cell)
+        else:
+            self.queue.pop(cell, None)
+
+    def _edges(self, cell):
+        """Traversable (neighbour, cost) pairs of a cell"""
+        free, width = self.free, self.width
+        if not free[cell]:
+            return
+        for offset, step, dr, dc in self.moves:
+            neighbour = cell + offset
+            if free[neighbour] and (not (dr and dc) or (free[cell + dc] and free[cell + dr * width])):
+                yield neighbour, step
+
+    def _best_rhs(self, cell):
+        g = self.g
+        return min((step + g.get(neighbour, math.inf) for neighbour, step in self._edges(cell)), default=math.inf)
+
+    def compute(self):
+        """Expand until the start's cost is settled; returns that cost (inf if unreachable)"""
+        g, rhs, queue, heap = self.g, self.rhs, self.queue, self.heap
+        while heap:
+            key, cell = heap[0]
+            if queue.get(cell) != key:
+                heapq.heappop(heap)       # stale entry
+                continue
+            start_key = self._key(self.start)
+            if not (key < start_key or rhs.get(self.start, math.inf) != g.get(self.start, math.inf)):
+                break
+            heapq.heappop(heap)
+            self.stats["expanded"] += 1
+            new_key = self._key(cell)
+            g_cell, rhs_cell = g.get(cell, math.inf), rhs.get(cell, math.inf)
+            if key < new_key:
+                queue[cell] = new_key
+                heapq.heappush(heap, (new_key, cell))
+            elif g_cell > rhs_cell:
+                g[cell] = rhs_cell
+                del queue[cell]
+                for neighbour, step in self._edges(cell):
+                    if neighbour != self.goal and step + rhs_cell < rhs.get(neighbour, math.inf):
+                        rhs[neighbour] = step + rhs_cell
+                    self._queue_update(neighbour)
+            else:
+                g[cell] = math.inf
+                for neighbour, step in list(self._edges(cell)) + [(cell, 0)]:
+                    if neighbour != self.goal and (neighbour == cell or rhs.get(neighbour) == step + g_cell):
+                        rhs[neighbour] = self._best_rhs(neighbour)
+                    self._queue_update(neighbour)
+        return g.get(self.start, math.inf)
+
+    def move_start(self, start):
+        """The robot is now at another (row, col) cell"""
+        cell = start[0] * self.width + start[1]
+        self.km += _octile(self.last, cell, self.width)
+        self.last = self.start = cell
+
+    def update_cells(self, cells, blocked):
+        """Cells (flat indices) whose blocked state changed, with the new mask"""
+        values = blocked.reshape(-1)
+        touched = set()
+        for cell in cells:
+            cell = int(cell)
+            self.free[cell] = 0 if values[cell] else 1
+            touched.add(cell)
+            touched.update(cell + offset for offset, _, _, _ in self.moves)
+        size = len(self.free)
+        for cell in touched:
+            if 0 <= cell < size and cell != self.goal:
+                self.rhs[cell] = self._best_rhs(cell)
+                self._queue_update(cell)
+        self.stats["updates"] += len(cells)
+
+    def path(self, limit=None):
+        """Flat cells from the start to the goal along the current costs, or None"""
+        g = self.g
+        if g.get(self.start, math.inf) == math.inf:
+            return None
+        cell, path = self.start, [self.start]
+        limit = limit or len(self.free)
+        while cell != self.goal and len(path) < limit:
+            best, best_cost = None, math.inf
+            for neighbour, step in self._edges(cell):
+                cost = step + g.get(neighbour, math.inf)
+                if cost < best_cost:
+                    best, best_cost = neighbour, cost
+            if best is None or best_cost == math.inf:
+                return None
+            cell = best
+            path.append(cell)
+        return path
+
+
+def nearest_free(blocked, cell, reach=10):
+    """The free cell nearest to (row, col) within `reach` cells, or None"""
+    row, col = cell
+    if 0 <= row < blocked.shape[0] and 0 <= col < blocked.shape[1] and not blocked[row, col]:
+        return (int(row), int(col))
+    top, left = max(0, row - reach), max(0, col - reach)
+    window = blocked[top:row + reach + 1, left:col + reach + 1]
+    rows, cols = np.nonzero(~window)
+    if not len(rows):
+        return None
+    best = np.argmin((rows + top - row) ** 2 + (cols + left - col) ** 2)
+    return (int(rows[best] + top), int(cols[best] + left))
+
+
+def line_clear(blocked, a, b):
+    """Check the straight segment between two (row, col) cells crosses no blocked cell"""
+    steps = int(2 * max(abs(b[0] - a[0]), abs(b[1] - a[1]))) + 1
+    t = np.linspace(0.0, 1.0, steps + 1)
+    rows = np.rint(a[0] + (b[0] - a[0]) * t).astype(np.int64)
+    cols = np.rint(a[1] + (b[1] - a[1]) * t).astype(np.int64)
+    return not blocked[rows, cols].any()
+
+
+def smooth_path(blocked, path):
+    """Reduce a cell path to waypoints joined by clear straight lines
+
+    Returns:
+        list: (row, col) waypoints, the first being the path's start
+    """
+    width = blocked.shape[1]
+    cells = [divmod(cell, width) for cell in path]
+    waypoints = [cells[0]]
+    anchor = 0
+    while anchor < len(cells) - 1:
+        # Gallop out while the line stays clear, then bisect back to the last clear cell
+        good, probe = anchor + 1, anchor + 2
+        while probe < len(cells) and line_clear(blocked, cells[anchor], cells[probe]):
+            good, probe = probe, anchor + 2 * (probe - anchor)
+        high = min(probe, len(cells))
+        while high - good > 1:
+            middle = (good + high) // 2
+            if line_clear(blocked, cells[anchor], cells[middle]):
+                good = middle
+            else:
+                high = middle
+        waypoints.append(cells[good])
+        anchor = good
+    return waypoints
+
+
+def _wrap(angle):
+    return (angle + math.pi) % (2.0 * math.pi) - math.pi
+
+
+def path_commands(pose, waypoints, stride, turn_degrees, max_forward=None):
+    """Turn and forward cycles that take a pose through world waypoints
+
+    Returns:
+        tuple: ([(direction, cycles), ...], the pose the commands should end at)
+    """
+    x, y, heading = pose
+    turn_step = math.radians(turn_degrees)
+    commands = []
+    for wx, wy in waypoints:
+        turn = _wrap(math.atan2(wy - y, wx - x) - heading)
+        cycles = int(round(abs(turn) / turn_step))
+        if cycles:
+            direction = "left" if turn > 0 else "right"
+            commands.append((direction, cycles))
+            heading = _wrap(heading + TURNS[direction] * cycles * turn_step)
+        # Walk the part of the leg that lies along the heading we ended up with
+        along = (wx - x) * math.cos(heading) + (wy - y) * math.sin(heading)
+        cycles = int(round(max(0.0, along) / stride))
+        if max_forward is not None:
+            cycles = min(cycles, max_forward)
+        if cycles:
+            commands.append(("forward", cycles))
+            x += cycles * stride * math.cos(heading)
+            y += cycles * stride * math.sin(heading)
+        if max_forward is not None:
+            break
+    merged = []
+    for direction, cycles in commands:
+        if merged and merged[-1][0] == direction:
+            merged[-1] = (direction, merged[-1][1] + cycles)
+        else:
+            merged.append((direction, cycles))
+    return merged, (x, y, heading)
+
+
+def firmware_commands(commands):
+    """The serial command string for a command list, e.g. "LLLFFFFFFFF" """
+    return "".join(MOTION_COMMANDS[direction] * cycles for direction, cycles in commands)
+
+
+def parse_navigation_command(text):
+    """Parse spoken text into a navigation intent
+
+    Returns:
+        tuple: ("go", place), ("remember", place) or None
+    """
+    text = text.lower().strip(" .!?")
+    match = re.search(r"\b(?:remember|mark|call) this (?:place|spot|room) (?:as )?(?:the |my )?([a-z][a-z ]*)$", text)
+    if match:
+        return ("remember", match.group(1).strip())
+    match = re.search(r"\b(?:go|walk|navigate|take me) to (?:the |my )([a-z][a-z ]*)$", text)
+    if match and match.group(1).strip() not in ("left", "right", "front", "back"):
+        return ("go", match.group(1).strip())
+    return None
+
+
+class DetectionSensor:
+    """Obstacles from the camera detector, placed on the floor below each box
+
+    The bottom edge of a box is where the object meets the floor; with the
+    camera CAMERA_HEIGHT above a flat floor and level, the angle below the
+    horizon gives the distance and the box's centre column the bearing.
+    """
+
+    def __init__(self, pipeline, camera_height=CAMERA_HEIGHT, frame_size=(320, 240), hfov=HFOV_DEGREES,
+                 vfov=VFOV_DEGREES, max_range=3.0, radius=OBSTACLE_RADIUS):
+        self.pipeline = pipeline
+        self.camera_height = camera_height
+        self.frame_size = frame_size
+        self.focal_x = frame_size[0] / 2.0 / math.tan(math.radians(hfov) / 2.0)
+        self.focal_y = frame_size[1] / 2.0 / math.tan(math.radians(vfov) / 2.0)
+        self.max_range = max_range
+        self.radius = radius
+        self._last_id = None
+
+    def project(self, box):
+        """Robot-relative (distance, bearing radians, left positive) of a box's foot, or None"""
+        left, top, box_width, box_height = box
+        width, height = self.frame_size
+        below = math.atan((top + box_height - height / 2.0) / self.focal_y)
+        if below <= 0:
+            return None
+        distance = self.camera_height / math.tan(below)
+        if distance > self.max_range:
+            return None
+        return distance, -math.atan((left + box_width / 2.0 - width / 2.0) / self.focal_x)
+
+    def sense(self, grid, pose):
+        result = self.pipeline.latest() if self.pipeline else None
+        if not result or result.get("frame_id") == self._last_id:
+            return 0
+        self._last_id = result.get("frame_id")
+        x, y, heading = pose
+        marked = 0
+        for detection in result.get("detections", []):
+            foot = self.project(detection["box"])
+            if foot:
+                distance, bearing = foot
+                grid.mark_obstacle(x + distance * math.cos(heading + bearing),
+                                   y + distance * math.sin(heading + bearing), self.radius)
+                marked += 1
+        return marked
+
+
+class Navigator:
+    """Plans over an occupancy grid and walks the plan with the firmware gaits
+
+    Args:
+        bridge (MotionBridge): Open motion bridge (or anything with the same methods)
+        grid (OccupancyGrid): The map, updated by the sensor as the robot goes
+        sensor: Object with sense(grid, pose), or None
+        calibration (dict): {"stride": metres, "turn": degrees} per cycle (load_calibration())
+        pose (tuple): Starting (x, y, heading radians)
+        odometry (VisualOdometry): When given and running, the pose follows the
+            motion it measures instead of counting nominal cycles
+    """
+
+    def __init__(self, bridge, grid, sensor=None, calibration=None, pose=(0.0, 0.0, 0.0), speed_level=NAV_SPEED,
+                 robot_radius=ROBOT_RADIUS, lookahead=LOOKAHEAD_CYCLES, tolerance=GOAL_TOLERANCE, factor=PLAN_FACTOR,
+                 odometry=None):
+        self.bridge = bridge
+        self.grid = grid
+        self.sensor = sensor
+        self.odometry = odometry
+        self._odometry_pose = odometry.pose.copy() if odometry is not None else None
+        self.calibration = calibration or load_calibration(speed_level=speed_level)
+        self.pose = np.array(pose, dtype=np.float64)
+        self.speed_level = speed_level
+        self.robot_radius = robot_radius
+        self.lookahead = lookahead
+        self.tolerance = tolerance
+        self.factor = factor
+        self.result = None
+        self.goal = None
+        self.stats = {"plans": 0, "replans": 0, "forgets": 0, "plan_ms": 0.0, "replan_ms": [], "cycles": {},
+                      "commands": ""}
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+        self._previous_on_write = bridge.on_write
+        bridge.on_write = self._on_write
+
+    def _on_write(self, command, when):
+        """Dead reckoning: every motion command the bridge writes is one gait cycle"""
+        direction = DIRECTIONS.get(command)
+        if direction and self.odometry is None:
+            with self._lock:
+                x, y, heading = self.pose
+                stride, turn = self.calibration["stride"], math.radians(self.calibration["turn"])
+                if direction in TURNS:
+                    self.pose[2] = _wrap(heading + TURNS[direction] * turn)
+                else:
+                    step = stride if direction == "forward" else -stride
+                    self.pose[0] += step * math.cos(heading)
+                    self.pose[1] += step * math.sin(heading)
+        if direction:
+            self.stats["cycles"][direction] = self.stats["cycles"].get(direction, 0) + 1
+            self.stats["commands"] += command
+        if self._previous_on_write is not None:
+            self._previous_on_write(command, when)
+
+    def current_pose(self):
+        with self._lock:
+            if self.odometry is not None:
+                # Odometry turns clockwise-positive; fold in what it measured since the last look
+                current = self.odometry.pose.copy()
+                dx, dy, yaw = current - self._odometry_pose
+                forward = dx * math.cos(self._odometry_pose[2]) + dy * math.sin(self._odometry_pose[2])
+                self._odometry_pose = current
+                self.pose[2] = _wrap(self.pose[2] - yaw)
+                self.pose[0] += forward * math.cos(self.pose[2])
+                self.pose[1] += forward * math.sin(self.pose[2])
+            return tuple(float(value) for value in self.pose)
+
+    def remember(self, name):
+        """Store the current position as a named place"""
+        x, y, _ = self.current_pose()
+        self.grid.places[name] = (round(x, 3), round(y, 3))
+        return self.grid.places[name]
+
+    def resolve(self, goal):
+        """World (x, y) of a place name or an (x, y) pair"""
+        if isinstance(goal, str):
+            if goal not in self.grid.places:
+                raise KeyError(goal)
+            return self.grid.places[goal]
+        return tuple(goal)
+
+    def _sense(self):
+        if self.sensor is not None:
+            self.sensor.sense(self.grid, self.current_pose())
+
+    def run(self, goal, max_legs=500):
+        """Walk to a place name or world (x, y)
+
+        Returns:
+            str: "arrived", "no path", "stuck", "stopped" or "gave up"
+        """
+        self._running = True
+        self.goal = self.resolve(goal)
+        self.result = None
+        self.bridge.set_speed(self.speed_level)
+        # Moves carry the bridge's stop count, so one racing an emergency stop is dropped, not queued after it
+        stops = self.bridge.stops
+        planner = None
+        mask = None
+        forgets = 0
+        result = "gave up"
+        try:
+            for _ in range(max_legs):
+                if not self._running:
+                    result = "stopped"
+                    break
+                self._sense()
+                pose = self.current_pose()
+                if math.hypot(self.goal[0] - pose[0], self.goal[1] - pose[1]) <= self.tolerance:
+                    result = "arrived"
+                    break
+                new_mask = self.grid.blocked(self.robot_radius, self.factor)
+                start = nearest_free(new_mask, self.grid.world_to_cell(pose[0], pose[1], self.factor))
+                goal_cell = nearest_free(new_mask, self.grid.world_to_cell(self.goal[0], self.goal[1], self.factor))
+                path = None
+                if start is not None and goal_cell is not None:
+                    begin = time.perf_counter()
+                    if planner is None or goal_cell != divmod(planner.goal, planner.width):
+                        planner = DStarLite(new_mask, start, goal_cell)
+                        planner.compute()
+                        self.stats["plans"] += 1
+                        self.stats["plan_ms"] = (time.perf_counter() - begin) * 1000
+                    else:
+                        planner.move_start(start)
+                        if new_mask is not mask:
+                            planner.update_cells(np.flatnonzero(new_mask != mask), new_mask)
+                        planner.compute()
+                        self.stats["replans"] += 1
+                        self.stats["replan_ms"].append((time.perf_counter() - begin) * 1000)
+                    mask = new_mask
+                    path = planner.path()
+                if path is None:
+                    if forgets == MAX_FORGETS:
+                        result = "no path"
+                        break
+                    # Drift smears what was sensed across doorways; keep only the surroundings and look again
+                    forgets += 1
+                    self.stats["forgets"] += 1
+                    self.grid.forget(pose[0], pose[1], FORGET_KEEP)
+                    planner = None
+                    continue
+                waypoints = smooth_path(mask, path)
+                if len(waypoints) < 2:
+                    waypoints.append(goal_cell)
+                last_leg = waypoints[1] == goal_cell
+                target = self.goal if last_leg else self.grid.cell_to_world(*waypoints[1], self.factor)
+                commands, _ = path_commands(pose, [target], self.calibration["stride"], self.calibration["turn"],
+                                            self.lookahead)
+                if not commands:
+                    # Within half a stride and half a turn: as near as whole cycles get
+                    result = "arrived" if last_leg else "stuck"
+                    break
+                if commands[0][0] in TURNS:
+                    # Look along the new heading before walking it
+                    commands = commands[:1]
+                for direction, cycles in commands:
+                    if not self._running:
+                        break
+                    if not self.bridge.move(direction, cycles, stops):
+                        self._running = False
+                        break
+                    self.bridge.wait_idle()
+        finally:
+            self.bridge.stand()
+            self._running = False
+        self.result = result
+        pose = self.current_pose()
+        logger.info(f"Navigation to {self.goal}: {result} at ({pose[0]:.2f}, {pose[1]:.2f})")
+        return result
+
+    def start(self, goal):
+        self.goal = self.resolve(goal)
+        self._running = True
+        self._thread = threading.Thread(target=self.run, args=(goal,), name="navigation")
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self, wait=True):
+        """End the walk; the robot stands on the way out"""
+        self._running = False
+        if wait and self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5.0)
+        return True
+
+    @property
+    def running(self):
+        return self._running
+
+    def report(self):
+        replans = self.stats["replan_ms"]
+        return {
+            "result": self.result,
+            "plans": self.stats["plans"],
+            "replans": self.stats["replans"],
+            "forgets": self.stats["forgets"],
+            "plan_ms": round(self.stats["plan_ms"], 2),
+            "replan_ms_mean": round(float(np.mean(replans)), 2) if replans else None,
+            "replan_ms_max": round(float(np.max(replans)), 2) if replans else None,
+            "cycles": dict(self.stats["cycles"]),
+        }
+
+
+def rooms_map(size=GRID_SIZE, rooms=4, door=16, wall=2, furniture=40, seed=0):
+    """A floor of rooms x rooms rooms joined by doors, with furniture; True is blocked"""
+    rng = np.random.default_rng(seed)
+    blocked = np.zeros((size, size), dtype=bool)
+    blocked[:wall, :] = blocked[-wall:, :] = blocked[:, :wall] = blocked[:, -wall:] = True
+    room = size // rooms
+    for k in range(1, rooms):
+        blocked[k * room:k * room + wall, :] = True
+        blocked[:, k * room:k * room + wall] = True
+    for k in range(1, rooms):
+        for j in range(rooms):
+            centre = j * room + room // 2 + int(rng.integers(-room // 5, room // 5))
+            blocked[k * room:k * room + wall, centre - door // 2:centre + door // 2] = False
+            blocked[centre - door // 2:centre + door // 2, k * room:k * room + wall] = False
+    for _ in range(furniture):
+        row, col = rng.integers(wall + 20, size - 40, 2)
+        blocked[row:row + rng.integers(4, 20), col:col + rng.integers(4, 20)] = True
+    return blocked
+
+
+class SimRangeSensor:
+    """Range rays across the camera's field of view, cast in the simulated world
+
+    Rays start from the robot's true pose but are written into the map at
+    the pose the navigator believes, so dead-reckoning drift shows up.
+    """
+
+    def __init__(self, world, rays=15, fov=HFOV_DEGREES, max_range=2.0):
+        self.world = world
+        self.bearings = np.radians(np.linspace(-fov / 2.0, fov / 2.0, rays))
+        self.max_range = max_range
+
+    def sense(self, grid, pose):
+        x, y, heading = self.world.pose
+        steps = np.arange(0.0, self.max_range, self.world.resolution / 2.0)
+        angles = heading + self.bearings
+        rows, cols = self.world.cell(x + steps[None, :] * np.cos(angles)[:, None],
+                                     y + steps[None, :] * np.sin(angles)[:, None])
+        rows = np.clip(rows, 0, self.world.blocked.shape[0] - 1)
+        cols = np.clip(cols, 0, self.world.blocked.shape[1] - 1)
+        hits = self.world.blocked[rows, cols]
+        first = np.where(hits.any(axis=1), hits.argmax(axis=1), len(steps))
+        distances = np.where(first < len(steps), steps[np.minimum(first, len(steps) - 1)], self.max_range)
+        grid.integrate_scan(pose, self.bearings, distances, self.max_range)
+        return len(self.bearings)
+
+
+class SimWorld:
+    """A robot on a floor plan, standing in for the motion bridge
+
+    Each gait cycle moves the true pose by the calibrated stride or turn with
+    some random error, which the navigator's dead reckoning does not see.
+    A forward step that would put the robot's centre in a wall is refused
+    and counted as a bump.
+    """
+
+    def __init__(self, blocked, resolution=RESOLUTION, pose=(0.0, 0.0, 0.0), stride=0.04, turn=15.0,
+                 stride_noise=0.03, turn_noise=0.03, seed=0, speed_level=NAV_SPEED):
+        self.blocked = blocked
+        self.resolution = resolution
+        self.origin = (-blocked.shape[1] * resolution / 2.0, -blocked.shape[0] * resolution / 2.0)
+        self.pose = np.array(pose, dtype=np.float64)
+        self.stride = stride
+        self.turn = math.radians(turn)
+        self.stride_noise = stride_noise
+        self.turn_noise = turn_noise
+        self.knee_center = SPEED_COMMANDS[speed_level][1]
+        self.on_write = None
+        self.stops = 0
+        self.stats = {"sent": 0, "bumps": 0}
+        self._rng = np.random.default_rng(seed)
+
+    def cell(self, x, y):
+        return (np.floor((np.asarray(y) - self.origin[1]) / self.resolution).astype(np.int64),
+                np.floor((np.asarray(x) - self.origin[0]) / self.resolution).astype(np.int64))
+
+    def _cycle(self, direction):
+        x, y, heading = self.pose
+        if direction in TURNS:
+            self.pose[2] = _wrap(heading + TURNS[direction] * self.turn * (1 + self._rng.normal(0, self.turn_noise)))
+        else:
+            step = self.stride * (1 + self._rng.normal(0, self.stride_noise)) * (1 if direction == "forward" else -1)
+            nx, ny = x + step * math.cos(heading), y + step * math.sin(heading)
+            row, col = self.cell(nx, ny)
+            if self.blocked[row, col]:
+                self.stats["bumps"] += 1
+            else:
+                self.pose[:2] = nx, ny
+        self.stats["sent"] += 1
+        if self.on_write is not None:
+            self.on_write(MOTION_COMMANDS[direction], time.perf_counter())
+
+    # MotionBridge stand-in: cycles happen at once
+    def move(self, direction, cycles=1, stops=None):
+        if stops is not None and stops != self.stops:
+            return False
+        for _ in range(cycles):
+            self._cycle(direction)
+        return True
+
+    def set_speed(self, level):
+        self.knee_center = SPEED_COMMANDS[level][1]
+        return True
+
+    def stand(self):
+        return True
+
+    def emergency_stop(self):
+        self.stops += 1
+        return True
+
+    def wait_idle(self, timeout=None):
+        return True
+
+    def close(self, stand=True):
+        return True
+
+
+def render(grid, pose=None, path=None, goal=None, columns=100):
+    """ASCII map: # obstacle, . explored free, * path, R robot, G goal (north up)"""
+    rows, cols = grid.shape
+    factor = max(1, cols // columns)
+    occupied = grid.occupied()[:rows // factor * factor, :cols // factor * factor]
+    occupied = occupied.reshape(rows // factor, factor, cols // factor, factor).any(axis=(1, 3))
+    explored = (grid.log_odds < 0)[:rows // factor * factor, :cols // factor * factor]
+    explored = explored.reshape(rows // factor, factor, cols // factor, factor).any(axis=(1, 3))
+    canvas = np.where(occupied, "#", np.where(explored, ".", " ")).astype("<U1")
+
+    def put(x, y, mark):
+        row, col = grid.world_to_cell(x, y)
+        if 0 <= row // factor < canvas.shape[0] and 0 <= col // factor < canvas.shape[1]:
+            canvas[row // factor, col // factor] = mark
+
+    for x, y in path or []:
+        put(x, y, "*")
+    if goal is not None:
+        put(goal[0], goal[1], "G")
+    if pose is not None:
+        put(pose[0], pose[1], "R")
+    return "\n".join("".join(line) for line in canvas[::-1])
+
+
+def simulate(seed=0, size=GRID_SIZE, noise=0.03, show=False, speed_level=NAV_SPEED):
+    """Navigate between rooms of an unknown floor with a noisy gait; returns the report
+
+    Args:
+        noise (float): Random error of each stride and turn, as a fraction of it
+    """
+    world_map = rooms_map(size, seed=seed)
+    grid = OccupancyGrid(size)
+    calibration = {"stride": 0.04, "turn": 15.0, "source": "simulation"}
+    # Start in the bottom-left room facing east; the goal is in the top-right room
+    start = (grid.origin[0] + 1.5, grid.origin[1] + 1.5, 0.0)
+    goal = (-grid.origin[0] - 1.5, -grid.origin[1] - 1.5)
+    world = SimWorld(world_map, pose=start, stride_noise=noise, turn_noise=noise, seed=seed, speed_level=speed_level)
+    navigator = Navigator(world, grid, SimRangeSensor(world), calibration, pose=start, speed_level=speed_level)
+    navigator.grid.places["door"] = goal
+    begin = time.perf_counter()
+    navigator.run("door", max_legs=2000)
+    elapsed = time.perf_counter() - begin
+    report = navigator.report()
+    believed = navigator.current_pose()
+    report.update({
+        "true_error_m": round(math.hypot(world.pose[0] - goal[0], world.pose[1] - goal[1]), 3),
+        "drift_m": round(math.hypot(world.pose[0] - believed[0], world.pose[1] - believed[1]), 3),
+        "bumps": world.stats["bumps"],
+        "firmware_bytes": len(navigator.stats["commands"]),
+        "seconds": round(elapsed, 2),
+    })
+    if show:
+        print(render(grid, believed, goal=goal))
+    return report
+
+
+def _bench(size=GRID_SIZE, factor=PLAN_FACTOR, seed=0):
+    grid = OccupancyGrid(size)
+    grid.log_odds[rooms_map(size, seed=seed)] = LOG_ODDS_LIMIT
+    mask = grid.blocked(factor=factor)
+    room = size // 4
+    pairs = [("same room", (20, 20), (room - 20, room - 20)),
+             ("across rooms", (room // 2, 20), (room // 2, size - 20)),
+             ("next room", (20, 20), (20, room + 40)),
+             ("corner to corner", (20, 20), (size - 20, size - 20))]
+    print(f"{size}x{size} grid planned in {mask.shape[0]}x{mask.shape[1]} cells of {factor}x{factor}, "
+          f"{int(mask.sum())} blocked after inflation")
+    print(f"{'route':>17} {'A* ms':>8} {'D* Lite ms':>11} {'repair ms':>10} {'A* again ms':>12} {'cells':>6}")
+    size = mask.shape[1]
+    for name, start, goal in pairs:
+        start = nearest_free(mask, (start[0] // factor, start[1] // factor))
+        goal = nearest_free(mask, (goal[0] // factor, goal[1] // factor))
+        begin = time.perf_counter()
+        path = astar(mask, start, goal)
+        astar_ms = (time.perf_counter() - begin) * 1000
+        begin = time.perf_counter()
+        planner = DStarLite(mask, start, goal)
+        planner.compute()
+        dstar_ms = (time.perf_counter() - begin) * 1000
+        if path is None:
+            print(f"{name:>17} no path")
+            continue
+        # Walk a fifth of the way, then find a new obstacle across the path just ahead
+        along = path[len(path) // 5]
+        ahead = divmod(path[min(len(path) - 1, len(path) // 5 + 3)], size)
+        planner.move_start(divmod(along, size))
+        changed_mask = mask.copy()
+        changed_mask[ahead[0] - 2:ahead[0] + 3, ahead[1] - 2:ahead[1] + 3] = True
+        changed_mask[divmod(along, size)] = False
+        begin = time.perf_counter()
+        planner.update_cells(np.flatnonzero(changed_mask != mask), changed_mask)
+        planner.compute()
+        repair_ms = (time.perf_counter() - begin) * 1000
+        begin = time.perf_counter()
+        again = astar(changed_mask, divmod(along, size), goal)
+        again_ms = (time.perf_counter() - begin) * 1000
+        repaired = planner.path()
+        assert (again is None) == (repaired is None)
+        print(f"{name:>17} {astar_ms:>8.1f} {dstar_ms:>11.1f} {repair_ms:>10.1f} {again_ms:>12.1f} {len(path):>6}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="DETROIT navigation")
+    parser.add_argument("command", choices=["simulate", "bench", "show", "place", "wall", "go"])
+    parser.add_argument("args", nargs="*", help="place: NAME X Y; wall: X0 Y0 X1 Y1; go: NAME or X Y")
+    parser.add_argument("--map", default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                                      'BRAIN', 'navigation_map.npz'), help="Map file")
+    parser.add_argument("--seed", type=int, default=0, help="Simulated floor plan")
+    parser.add_argument("--factor", type=int, default=PLAN_FACTOR, help="bench: grid cells per planning cell side")
+    parser.add_argument("--noise", type=float, default=0.03, help="simulate: stride and turn error per cycle")
+    parser.add_argument("--show", action="store_true", help="Print the map the simulation built")
+    parser.add_argument("--port", help="Serial port of the robot")
+    parser.add_argument("--baud", type=int, default=DEFAULT_BAUD)
+    parser.add_argument("--speed", type=int, default=NAV_SPEED, choices=sorted(SPEED_COMMANDS),
+                        help="Speed level while navigating")
+    args = parser.parse_args()
+
+    if args.command == "simulate":
+        print(json.dumps(simulate(args.seed, noise=args.noise, show=args.show, speed_level=args.speed), indent=1))
+    elif args.command == "bench":
+        _bench(factor=args.factor, seed=args.seed)
+    else:
+        grid = OccupancyGrid.load(args.map) if os.path.exists(args.map) else OccupancyGrid()
+        if args.command == "show":
+            print(render(grid))
+            for name, (x, y) in grid.places.items():
+                print(f"{name}: ({x:.2f}, {y:.2f})")
+        elif args.command == "place":
+            name, x, y = args.args[0], float(args.args[1]), float(args.args[2])
+            grid.places[name] = (x, y)
+            grid.save(args.map)
+        elif args.command == "wall":
+            grid.mark_wall(*(float(value) for value in args.args[:4]))
+            grid.save(args.map)
+        else:
+            if not args.port:
+                parser.error("go needs --port")
+            goal = args.args[0] if len(args.args) == 1 else (float(args.args[0]), float(args.args[1]))
+            bridge = MotionBridge(args.port, args.baud)
+            if not bridge.open():
+                sys.exit(1)
+            navigator = Navigator(bridge, grid, speed_level=args.speed)
+            try:
+                print(navigator.run(goal))
+            except KeyboardInterrupt:
+                navigator.stop(wait=False)
+            finally:
+                bridge.close()
+            print(json.dumps(navigator.report(), indent=1))
+
+__all__ = ['OccupancyGrid', 'DStarLite', 'Navigator', 'DetectionSensor', 'astar', 'smooth_path', 'path_commands',
+           'firmware_commands', 'parse_navigation_command', 'load_calibration', 'nearest_free', 'simulate']
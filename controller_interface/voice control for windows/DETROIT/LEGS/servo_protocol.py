@@ -0,0 +1,356 @@
+"""
+Binary Servo Protocol for DETROIT LEGS
+======================================
+A framed binary protocol that carries all 12 joint setpoints per frame, for
+host-streamed gaits. The Arduino side is the reference decoder in
+firmware/arduino with PCA9685/spark_frame.h.
+
+Setpoint frame (host -> controller), 17 bytes:
+
+    0      SYNC_FRAME (0xA5)
+    1      sequence number, wraps at 256
+    2-13   12 joint angles in degrees (0-180), st1..st6 then sk1..sk6
+    14-15  time since the previous frame in milliseconds, uint16 little-endian
+    16     CRC-8 (poly 0x07, init 0x00) over bytes 1-15
+
+Acknowledgement (controller -> host), 4 bytes:
+
+    0      SYNC_ACK (0x5A)
+    1      sequence number being acknowledged
+    2      status: ACK_OK, or ACK_CRC_ERROR / ACK_SEQ_GAP with the expected seq
+    3      CRC-8 over bytes 1-2
+
+The frame sync byte is outside the ASCII range of the single-character
+commands, so a sketch can accept both, provided it treats a byte as a command only
+while its decoder is idle: bytes inside a frame can take any value. A decoder that sees a bad CRC drops only
+the sync byte and hunts for the next one from the byte after it, since an angle of 165 looks like a sync
+byte and the real frame may start inside the bad one. At 9600 baud one frame takes 17.7 ms on the
+wire, just enough for 50 Hz; 115200 baud leaves room for several hundred.
+
+Benchmark usage (POSIX pty stand-in):
+    python servo_protocol.py --benchmark --baud 9600 115200
+"""
+
+import time
+import struct
+import logging
+import argparse
+import threading
+
+import numpy as np
+
+logger = logging.getLogger('DETROIT.LEGS.PROTOCOL')
+
+SYNC_FRAME = 0xA5
+SYNC_ACK = 0x5A
+FRAME_SIZE = 17
+ACK_SIZE = 4
+JOINTS = 12
+ACK_OK = 0
+ACK_CRC_ERROR = 1
+ACK_SEQ_GAP = 2
+
+_FRAME_BODY = struct.Struct("<B12BH")
+
+
+def _crc8_table(poly=0x07):
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ poly) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table.append(crc)
+    return bytes(table)
+
+
+CRC8_TABLE = _crc8_table()
+_CRC8_ARRAY = np.frombuffer(CRC8_TABLE, dtype=np.uint8)
+
+
+def crc8(data):
+    """CRC-8/SMBUS of a bytes-like object"""
+    crc = 0
+    for byte in data:
+        crc = CRC8_TABLE[crc ^ byte]
+    return crc
+
+
+def encode_frame(seq, angles, dt_ms):
+    """Encode one setpoint frame
+
+    Args:
+        seq (int): Sequence number (taken modulo 256)
+        angles (sequence): 12 joint angles in degrees, rounded and clamped to 0-180
+        dt_ms (float): Milliseconds since the previous frame
+
+    Returns:
+        bytes: The 17-byte frame
+    """
+    packed = [min(180, max(0, int(round(a)))) for a in angles]
+    if len(packed) != JOINTS:
+        raise ValueError(f"Expected {JOINTS} angles, got {len(packed)}")
+    body = _FRAME_BODY.pack(seq & 0xFF, *packed, min(0xFFFF, max(0, int(round(dt_ms)))))
+    return bytes((SYNC_FRAME,)) + body + bytes((crc8(body),))
+
+
+def encode_frames(angles, dt_ms, start_seq=0):
+    """Encode a whole trajectory at once
+
+    Args:
+        angles (array): Joint angles of shape (frames, 12)
+        dt_ms (float): Milliseconds between frames
+        start_seq (int): Sequence number of the first frame
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (frames, 17), one frame per row
+    """
+    angles = np.asarray(angles)
+    frames = np.empty((len(angles), FRAME_SIZE), dtype=np.uint8)
+    frames[:, 0] = SYNC_FRAME
+    frames[:, 1] = (start_seq + np.arange(len(angles))) & 0xFF
+    frames[:, 2:14] = np.clip(np.rint(angles), 0, 180)
+    dt = min(0xFFFF, max(0, int(round(dt_ms))))
+    frames[:, 14] = dt & 0xFF
+    frames[:, 15] = dt >> 8
+    # Table-driven CRC, one column at a time across all frames
+    crc = np.zeros(len(angles), dtype=np.uint8)
+    for column in range(1, FRAME_SIZE - 1):
+        crc = _CRC8_ARRAY[crc ^ frames[:, column]]
+    frames[:, 16] = crc
+    return frames
+
+
+def encode_ack(seq, status=ACK_OK):
+    """Encode an acknowledgement"""
+    body = bytes((seq & 0xFF, status & 0xFF))
+    return bytes((SYNC_ACK,)) + body + bytes((crc8(body),))
+
+
+class Frame:
+    """A decoded setpoint frame"""
+
+    __slots__ = ("seq", "angles", "dt_ms")
+
+    def __init__(self, seq, angles, dt_ms):
+        self.seq = seq
+        self.angles = angles
+        self.dt_ms = dt_ms
+
+
+class StreamDecoder:
+    """Incremental decoder for frames and acks from a byte stream
+
+    Feed it whatever the serial port returned; it yields complete messages and
+    resynchronises on the next sync byte after corruption.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.stats = {"frames": 0, "acks": 0, "crc_errors": 0, "dropped_bytes": 0}
+
+    def feed(self, data):
+        """Add received bytes and return the list of decoded messages
+
+        Returns:
+            list: Frame objects and ("ack", seq, status) tuples, in order
+        """
+        self.buffer.extend(data)
+        messages = []
+        buffer = self.buffer
+        while buffer:
+            sync = buffer[0]
+            if sync == SYNC_FRAME:
+                size = FRAME_SIZE
+            elif sync == SYNC_ACK:
+                size = ACK_SIZE
+            else:
+                # Skip to the next possible start of a message
+                next_sync = min((i for i in (buffer.find(SYNC_FRAME), buffer.find(SYNC_ACK)) if i >= 0),
+                                default=len(buffer))
+                self.stats["dropped_bytes"] += next_sync
+                del buffer[:next_sync]
+                continue
+            if len(buffer) < size:
+                break
+            if crc8(buffer[1:size - 1]) != buffer[size - 1]:
+                # Only drop the sync byte: the real frame may start inside this one
+                self.stats["crc_errors"] += 1
+                self.stats["dropped_bytes"] += 1
+                del buffer[:1]
+                continue
+            if sync == SYNC_FRAME:
+                seq, *angles, dt_ms = _FRAME_BODY.unpack_from(buffer, 1)
+                messages.append(Frame(seq, angles, dt_ms))
+                self.stats["frames"] += 1
+            else:
+                messages.append(("ack", buffer[1], buffer[2]))
+                self.stats["acks"] += 1
+            del buffer[:size]
+        return messages
+
+
+class FrameLink:
+    """Streams setpoint frames over a serial port and tracks acknowledgements
+
+    send_frame(seq, angles, dt_ms) has the GaitStreamer sink signature, so a
+    streamer can drive the link directly.
+
+    Args:
+        port (str): Serial device or pyserial URL
+        baud (int): Link speed
+    """
+
+    def __init__(self, port, baud=115200):
+        self.port = port
+        self.baud = baud
+        self.serial = None
+        self.decoder = StreamDecoder()
+        self.stats = {"sent": 0, "acked": 0, "nacked": 0, "gaps": 0}
+        self.rtt_ms = []
+        self._sent_at = {}      # seq -> perf_counter() when written
+        self._acked = threading.Condition()
+        self._last_ack = None
+        self._running = False
+        self._thread = None
+
+    def open(self):
+        """Open the port and start reading acknowledgements"""
+        try:
+            import serial
+            self.serial = serial.serial_for_url(self.port, baudrate=self.baud, timeout=0.05, write_timeout=1)
+        except Exception as e:
+            logger.error(f"Could not open frame link on {self.port}: {e}")
+            return False
+        self._running = True
+        self._thread = threading.Thread(target=self._read_loop, name="frame-link")
+        self._thread.daemon = True
+        self._thread.start()
+        return True
+
+    def send_frame(self, seq, angles, dt_ms):
+        """Encode and write one frame"""
+        frame = encode_frame(seq, angles, dt_ms)
+        self._sent_at[seq & 0xFF] = time.perf_counter()
+        self.serial.write(frame)
+        self.stats["sent"] += 1
+        return True
+
+    def send_raw(self, seq, frame):
+        """Write an already encoded frame (a row from encode_frames)"""
+        self._sent_at[seq & 0xFF] = time.perf_counter()
+        self.serial.write(frame)
+        self.stats["sent"] += 1
+        return True
+
+    def wait_ack(self, seq, timeout=1.0):
+        """Wait for the acknowledgement of a sequence number"""
+        end = time.perf_counter() + timeout
+        with self._acked:
+            while self._last_ack != (seq & 0xFF):
+                remaining = end - time.perf_counter()
+                if remaining <= 0:
+                    return False
+                self._acked.wait(remaining)
+        return True
+
+    def _read_loop(self):
+        while self._running:
+            try:
+                data = self.serial.read(self.serial.in_waiting or 1)
+            except Exception:
+                break
+            if not data:
+                continue
+            now = time.perf_counter()
+            for message in self.decoder.feed(data):
+                if not isinstance(message, tuple):
+                    continue
+                _, seq, status = message
+                sent_at = self._sent_at.pop(seq, None)
+                if status in (ACK_OK, ACK_SEQ_GAP):
+                    # A gap ack still means this frame was applied; frames before it were lost
+                    self.stats["acked"] += 1
+                    if status == ACK_SEQ_GAP:
+                        self.stats["gaps"] += 1
+                    if sent_at is not None:
+                        self.rtt_ms.append((now - sent_at) * 1000)
+                else:
+                    self.stats["nacked"] += 1
+                with self._acked:
+                    self._last_ack = seq
+                    self._acked.notify_all()
+
+    def close(self):
+        """Stop reading and close the port"""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=1.0)
+        if self.serial is not None:
+            self.serial.close()
+            self.serial = None
+        return True
+
+
+def benchmark(bauds=(9600, 115200), frames=200, rate_hz=50):
+    """Measure frame throughput and round-trip latency against a paced pty stand-in"""
+    from loopback import FrameLoopback
+    from gait import generate_cycle
+
+    cycle = generate_cycle("tripod", rate_hz=rate_hz)
+    trajectory = np.resize(cycle, (frames, JOINTS))
+    encoded = encode_frames(trajectory, 1000.0 / rate_hz)
+    start = time.perf_counter()
+    for _ in range(100):
+        encode_frames(trajectory, 1000.0 / rate_hz)
+    encode_us = (time.perf_counter() - start) / 100 / frames * 1e6
+    print(f"Encoding: {encode_us:.2f} us/frame batched, {FRAME_SIZE} bytes/frame")
+    print(f"{'baud':>7} {'wire ms':>8} {'max Hz':>7} {'paced Hz':>9} {'RTT p50':>9} {'RTT p99':>9} "
+          f"{'burst Hz':>9} {'errors':>7}")
+
+    for baud in bauds:
+        loopback = FrameLoopback(baud)
+        link = FrameLink(loopback.start(), baud)
+        link.open()
+        wire_ms = FRAME_SIZE * 10 * 1000.0 / baud
+        try:
+            # Paced: one frame per period, like a live gait stream
+            period = 1.0 / rate_hz
+            paced_start = next_time = time.perf_counter()
+            for seq in range(frames):
+                link.send_raw(seq, encoded[seq].tobytes())
+                next_time += period
+                time.sleep(max(0.0, next_time - time.perf_counter()))
+            link.wait_ack((frames - 1) & 0xFF, timeout=2.0)
+            paced_hz = link.stats["acked"] / (time.perf_counter() - paced_start)
+            rtt = sorted(link.rtt_ms)
+            # Burst: as fast as the link takes them, stop-and-wait on each ack
+            link.rtt_ms = []
+            link.stats["acked"] = 0
+            burst_start = time.perf_counter()
+            for seq in range(frames):
+                link.send_raw(seq, encoded[seq].tobytes())
+                link.wait_ack(seq, timeout=1.0)
+            burst_hz = link.stats["acked"] / (time.perf_counter() - burst_start)
+            errors = loopback.decoder.stats["crc_errors"]
+        finally:
+            link.close()
+            loopback.stop()
+        p = lambda q: rtt[min(len(rtt) - 1, int(q * len(rtt)))] if rtt else float("nan")
+        print(f"{baud:>7} {wire_ms:>8.2f} {1000.0 / wire_ms:>7.0f} {paced_hz:>9.1f} {p(0.5):>7.2f}ms "
+              f"{p(0.99):>7.2f}ms {burst_hz:>9.1f} {errors:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DETROIT binary servo protocol")
+    parser.add_argument("--benchmark", action="store_true", help="Measure throughput and latency")
+    parser.add_argument("--baud", type=int, nargs="+", default=[9600, 115200], help="Baud rates to test")
+    parser.add_argument("--frames", type=int, default=200, help="Frames per run")
+    parser.add_argument("--rate", type=int, default=50, help="Paced frame rate in Hz")
+    args = parser.parse_args()
+    if args.benchmark:
+        raise SystemExit(benchmark(args.baud, args.frames, args.rate))
+    parser.print_help()
+
+__all__ = ['encode_frame', 'encode_frames', 'encode_ack', 'crc8', 'StreamDecoder', 'Frame', 'FrameLink',
+           'SYNC_FRAME', 'SYNC_ACK', 'FRAME_SIZE', 'ACK_SIZE', 'ACK_OK', 'ACK_CRC_ERROR', 'ACK_SEQ_GAP']
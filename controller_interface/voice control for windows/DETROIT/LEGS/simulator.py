@@ -0,0 +1,223 @@
+"""
+Headless Gait Simulator for DETROIT LEGS
+========================================
+Replays servo setpoints through a model of the SPARK hardware and reports how
+the gait actually plays out, without flashing the UNO:
+
+    * PCA9685 mapping: every setpoint is quantized through the firmware's
+      map(angle, 0, 180, pos0, pos180) to the counts the servo really gets
+    * SG90 slew limit: each servo moves toward its setpoint at no more than
+      SERVO_MAX_SPEED degrees per second
+    * leg geometry: forward kinematics of the simulated servo positions give
+      the foot positions, the feet on the ground and the support polygon
+
+Reports per run: cycle time (including the time servos need to catch up
+after the last setpoint), per-joint velocity saturation, worst tracking
+error, and the static stability margin (distance from the body center to the
+nearest support polygon edge, negative when outside) at every step.
+
+Simulation is vectorized over joints and over any leading batch dimension,
+so a whole parameter sweep advances in one pass: a single run is several
+hundred times faster than real time and a batched sweep over a thousand.
+
+Usage:
+    python simulator.py --firmware forward
+    python simulator.py --gait tripod --cycle 0.8 --stride 40
+    python simulator.py --sweep
+"""
+
+import time
+import argparse
+from itertools import combinations
+
+import numpy as np
+
+from geometry import (JOINT_NAMES, LEG_COUNT, SERVO_MAX_SPEED, stand_pose, angles_to_pwm, pwm_to_angles,
+                      feet_in_body_frame)
+from ik import forward_kinematics
+from firmware_gaits import FIRMWARE_GAITS, firmware_trajectory
+from gait import generate_cycle, GAIT_PHASES, DEFAULT_RATE_HZ
+
+CONTACT_TOLERANCE = 0.005   # meters above the lowest foot that still count as on the ground
+_PAIRS = list(combinations(range(LEG_COUNT), 2))
+
+
+class SimResult:
+    """Outcome of a simulation run (arrays keep any batch dimensions)"""
+
+    def __init__(self, targets, positions, dt, max_speed):
+        self.targets = targets
+        self.positions = positions
+        self.dt = dt
+        self.max_speed = max_speed
+        self.times = np.cumsum(dt)
+
+        previous = np.concatenate([positions[..., :1, :], targets[..., :-1, :]], axis=-2)
+        self.commanded_speed = np.abs(targets - previous) / dt[:, None]
+        self.saturation = (self.commanded_speed > max_speed + 1e-9).mean(axis=-2)
+        self.tracking_error = np.abs(targets - positions).max(axis=-2)
+        # After the last setpoint the servos still need time to get there
+        self.settle_time = np.abs(targets[..., -1, :] - positions[..., -1, :]).max(axis=-1) / max_speed
+        self.cycle_time = dt.sum() + self.settle_time
+
+        feet = feet_in_body_frame(forward_kinematics(positions))
+        self.contact = feet[..., 2] - feet[..., 2].min(axis=-1, keepdims=True) < CONTACT_TOLERANCE
+        self.margin = stability_margin(feet[..., :2], self.contact)
+
+    def summary(self):
+        """Scalar report for an unbatched run"""
+        margin = self.margin
+        return {
+            "cycle_time_s": float(self.cycle_time),
+            "commanded_time_s": float(self.dt.sum()),
+            "settle_time_s": float(self.settle_time),
+            "saturation": {name: float(value) for name, value in zip(JOINT_NAMES, self.saturation)},
+            "max_tracking_error_deg": float(self.tracking_error.max()),
+            "min_margin_m": float(margin.min()),
+            "mean_margin_m": float(margin[np.isfinite(margin)].mean()) if np.isfinite(margin).any() else float("-inf"),
+            "unstable_fraction": float((margin < 0).mean()),
+        }
+
+    def format(self):
+        """Human-readable report"""
+        s = self.summary()
+        lines = [
+            f"Cycle time      {s['cycle_time_s']:.3f} s ({s['commanded_time_s']:.3f} s commanded "
+            f"+ {s['settle_time_s'] * 1000:.0f} ms settling)",
+            f"Tracking error  {s['max_tracking_error_deg']:.1f} deg worst",
+            f"Stability       min margin {s['min_margin_m'] * 1000:.1f} mm, mean {s['mean_margin_m'] * 1000:.1f} mm, "
+            f"{s['unstable_fraction'] * 100:.1f}% of steps unstable",
+            "Saturation      " + " ".join(f"{name}:{value * 100:.0f}%" for name, value in s["saturation"].items()),
+        ]
+        return "\n".join(lines)
+
+
+def stability_margin(points, contact):
+    """Static stability margin of the support polygon for every step
+
+    Args:
+        points (array): Foot positions (..., 6, 2) in the body frame
+        contact (array): Feet on the ground (..., 6)
+
+    Returns:
+        numpy.ndarray: Signed distance (m) from the body center to the nearest
+        polygon edge, positive inside, -inf with fewer than three feet down
+    """
+    margin = np.full(points.shape[:-2], np.inf)
+    for i, j in _PAIRS:
+        a, b = points[..., i, :], points[..., j, :]
+        edge = b - a
+        length = np.hypot(edge[..., 0], edge[..., 1])
+        length = np.where(length < 1e-9, 1e-9, length)
+        relative = points - a[..., None, :]
+        cross = edge[..., None, 0] * relative[..., 1] - edge[..., None, 1] * relative[..., 0]
+        others = contact.copy()
+        others[..., i] = False
+        others[..., j] = False
+        left = np.all((cross >= -1e-12) | ~others, axis=-1)
+        right = np.all((cross <= 1e-12) | ~others, axis=-1)
+        # A hull edge has every other supporting foot on one side of it
+        is_edge = contact[..., i] & contact[..., j] & (left | right)
+        origin = (edge[..., 0] * -a[..., 1] - edge[..., 1] * -a[..., 0]) / length
+        distance = np.where(left, origin, -origin)
+        margin = np.where(is_edge, np.minimum(margin, distance), margin)
+    margin[contact.sum(axis=-1) < 3] = -np.inf
+    return margin
+
+
+def simulate(angles, dt, max_speed=SERVO_MAX_SPEED, start_pose=None, quantize=True):
+    """Run setpoints through the PCA9685 and servo model
+
+    Args:
+        angles (array): Setpoints of shape (..., steps, 12); leading dimensions are a batch
+        dt (array): Seconds each setpoint is held, shape (steps,) or a scalar
+        start_pose (array, optional): Servo positions before the first setpoint, broadcastable
+            to (..., 12); the stand pose by default
+        quantize (bool): Pass setpoints through the PWM count mapping
+
+    Returns:
+        SimResult
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    dt = np.broadcast_to(np.asarray(dt, dtype=np.float64), angles.shape[-2:-1])
+    targets = pwm_to_angles(angles_to_pwm(angles)) if quantize else angles
+    position = np.broadcast_to(stand_pose() if start_pose is None else start_pose,
+                               targets[..., 0, :].shape).astype(np.float64)
+    positions = np.empty_like(targets)
+    for step in range(targets.shape[-2]):
+        limit = max_speed * dt[step]
+        position = position + np.clip(targets[..., step, :] - position, -limit, limit)
+        positions[..., step, :] = position
+    return SimResult(targets, positions, dt, max_speed)
+
+
+def simulate_firmware(name, knee_center=80, max_speed=SERVO_MAX_SPEED):
+    """Simulate one call of a stock firmware gait from the stand pose"""
+    angles, dt = firmware_trajectory(name, knee_center)
+    return simulate(angles, dt, max_speed, start_pose=stand_pose(knee_center))
+
+
+def simulate_cycle(cycle, rate_hz=DEFAULT_RATE_HZ, max_speed=SERVO_MAX_SPEED):
+    """Simulate one cycle of host frames in steady state (starting from the cycle's last frame)"""
+    cycle = np.asarray(cycle)
+    return simulate(cycle, 1.0 / rate_hz, max_speed, start_pose=cycle[..., -1, :])
+
+
+def sweep(cycle_times=(0.3, 0.4, 0.5, 0.75, 1.0, 1.5), strides=(20.0, 30.0, 40.0), rate_hz=DEFAULT_RATE_HZ):
+    """Simulate every gait x stride combination for each cycle time, batched"""
+    gaits = list(GAIT_PHASES)
+    print(f"{'gait':<8} {'cycle':>6} {'stride':>7} {'time s':>7} {'sat %':>6} {'track':>7} {'margin':>8} {'unstable':>9}")
+    simulated = 0.0
+    start = time.perf_counter()
+    for cycle_seconds in cycle_times:
+        batch = np.stack([[generate_cycle(gait, "forward", stride, cycle_seconds=cycle_seconds, rate_hz=rate_hz)
+                           for stride in strides] for gait in gaits])
+        result = simulate(batch, 1.0 / rate_hz, start_pose=batch[..., -1, :])
+        simulated += float(result.cycle_time.sum())
+        for g, gait in enumerate(gaits):
+            for s, stride in enumerate(strides):
+                margin = result.margin[g, s]
+                print(f"{gait:<8} {cycle_seconds:>6.2f} {stride:>7.0f} {result.cycle_time[g, s]:>7.3f} "
+                      f"{result.saturation[g, s].max() * 100:>6.0f} {result.tracking_error[g, s].max():>6.1f}d "
+                      f"{margin.min() * 1000:>6.1f}mm {(margin < 0).mean() * 100:>8.1f}%")
+    elapsed = time.perf_counter() - start
+    print(f"Simulated {simulated:.1f} s of walking in {elapsed * 1000:.0f} ms ({simulated / elapsed:.0f}x real time)")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DETROIT headless gait simulator")
+    parser.add_argument("--firmware", choices=sorted(FIRMWARE_GAITS), help="Replay a stock firmware gait")
+    parser.add_argument("--knee-center", type=int, default=80, help="kneeCenter for firmware gaits")
+    parser.add_argument("--gait", choices=sorted(GAIT_PHASES), help="Simulate a host-generated gait")
+    parser.add_argument("--direction", default="forward")
+    parser.add_argument("--cycle", type=float, default=1.0, help="Seconds per host gait cycle")
+    parser.add_argument("--stride", type=float, default=40.0, help="Thigh sweep in degrees")
+    parser.add_argument("--rate", type=int, default=DEFAULT_RATE_HZ, help="Host frame rate in Hz")
+    parser.add_argument("--max-speed", type=float, default=SERVO_MAX_SPEED, help="Servo speed limit in deg/s")
+    parser.add_argument("--sweep", action="store_true", help="Batch sweep over gaits, strides and cycle times")
+    args = parser.parse_args()
+
+    if args.sweep:
+        return sweep(rate_hz=args.rate)
+    start = time.perf_counter()
+    if args.firmware:
+        result = simulate_firmware(args.firmware, args.knee_center, args.max_speed)
+        label = f"firmware {args.firmware} (kneeCenter {args.knee_center})"
+    elif args.gait:
+        cycle = generate_cycle(args.gait, args.direction, args.stride, cycle_seconds=args.cycle, rate_hz=args.rate)
+        result = simulate_cycle(cycle, args.rate, args.max_speed)
+        label = f"{args.gait} {args.direction}, {args.cycle:.2f} s cycle, {args.stride:.0f} deg stride"
+    else:
+        parser.print_help()
+        return 0
+    elapsed = time.perf_counter() - start
+    print(f"{label}: simulated in {elapsed * 1000:.1f} ms ({float(result.cycle_time) / elapsed:.0f}x real time)")
+    print(result.format())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
+
+__all__ = ['simulate', 'simulate_firmware', 'simulate_cycle', 'stability_margin', 'SimResult']
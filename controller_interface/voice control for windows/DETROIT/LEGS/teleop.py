@@ -0,0 +1,343 @@
+"""
+Gamepad Teleoperation for DETROIT LEGS
+======================================
+Drives SPARK from a gamepad plugged into the laptop, through the same motion
+bridge the voice commands use.
+
+    left stick / d-pad    walk forward / backward, turn left / right
+    release / unplug      stop the gait at once and stand
+    L1 / R1               slower / faster: speed level up / down (10 = 'q' ... 2 = '2')
+    B                     stop and stand
+
+Speed level 1 is the quickest cycle only because kneeCenter sits at LOWEST and
+no foot lifts, so R1 stops at FASTEST_LEVEL.
+
+Stick axes go through a deadzone with hysteresis, and only changes of the
+resulting command are acted on, so a stick resting at 60% sends nothing. A
+held direction is a dead-man hold: the bridge gets HOLD_CYCLES gait cycles at
+a time, topped up by every poll(), so if input stops being read (a hung loop,
+a pad that vanished without a removal event) the robot halts within that many
+cycles. Changes are additionally capped at MAX_SEND_RATE per second, keeping
+only the latest, so a wobbling stick cannot flood the 9600 baud link.
+Any change while walking writes the stop command straight away, which aborts
+the gait in progress within one step, before the new speed and direction go
+out; a speed digit queued ahead of it would keep the firmware from seeing it.
+
+The latency from every input event to the serial write it caused is
+recorded. Events can be recorded to and replayed from JSON lines files
+({"t": seconds, "type": "axis" | "button" | "hat" | "removed", "index": n, "value": v}),
+so teleop runs without a gamepad and without a robot (FirmwareLoopback).
+
+Usage:
+    python teleop.py --port COM5                    # live gamepad
+    python teleop.py --record drive.jsonl           # live gamepad, loopback robot, save events
+    python teleop.py --events drive.jsonl --fast    # replay
+    python teleop.py --demo                         # built-in synthetic drive
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+
+import numpy as np
+
+from motion_bridge import MotionBridge, MOTION_COMMANDS, SPEED_COMMANDS, STAND_COMMAND, DEFAULT_BAUD
+
+logger = logging.getLogger('DETROIT.LEGS.TELEOP')
+
+DEADZONE = 0.35          # stick deflection that starts a motion
+RELEASE_ZONE = 0.25      # deflection below which it stops again
+MAX_SEND_RATE = 20.0     # command changes per second at most
+HOLD_CYCLES = 2          # gait cycles queued at a time for a held direction, topped up by poll()
+SLOWEST_LEVEL = len(SPEED_COMMANDS)
+FASTEST_LEVEL = 2        # level 1 puts kneeCenter at LOWEST, so no leg lifts
+
+# Default pad layout (SDL numbering for Xbox-style pads)
+AXIS_X = 0
+AXIS_Y = 1
+BUTTON_STOP = 1
+BUTTON_SLOWER = 4
+BUTTON_FASTER = 5
+
+
+class TeleopMapper:
+    """Turns raw gamepad state into a direction and a speed level"""
+
+    def __init__(self, deadzone=DEADZONE, release_zone=RELEASE_ZONE, speed_level=SLOWEST_LEVEL):
+        self.deadzone = deadzone
+        self.release_zone = release_zone
+        self.axes = {}
+        self.hat = (0, 0)
+        self.direction = None
+        self.speed_level = speed_level
+        self.stop_requested = False
+
+    def update(self, kind, index, value):
+        """Apply one input event; returns True if the direction or speed changed"""
+        before = (self.direction, self.speed_level)
+        if kind == "axis":
+            self.axes[index] = float(value)
+        elif kind == "hat":
+            self.hat = tuple(value)
+        elif kind == "removed":
+            # The pad is gone, so nothing is holding a direction any more
+            self.axes.clear()
+            self.hat = (0, 0)
+            self.stop_requested = True
+            self.direction = None
+            return True
+        elif kind == "button" and value:
+            # Lower levels are quicker gait cycles
+            if index == BUTTON_SLOWER:
+                self.speed_level = min(SLOWEST_LEVEL, self.speed_level + 1)
+            elif index == BUTTON_FASTER:
+                self.speed_level = max(FASTEST_LEVEL, self.speed_level - 1)
+            elif index == BUTTON_STOP:
+                self.stop_requested = True
+                self.direction = None
+                return True
+        self.direction = self._direction()
+        return (self.direction, self.speed_level) != before
+
+    def _direction(self):
+        hat_x, hat_y = self.hat
+        if hat_y or hat_x:
+            # d-pad: up is +1 in SDL
+            return ("forward" if hat_y > 0 else "backward") if hat_y else ("right" if hat_x > 0 else "left")
+        x = self.axes.get(AXIS_X, 0.0)
+        y = self.axes.get(AXIS_Y, 0.0)
+        # Hysteresis: keep the current direction until the stick is well inside the release zone
+        threshold = self.release_zone if self.direction else self.deadzone
+        if max(abs(x), abs(y)) < threshold:
+            return None
+        if abs(y) >= abs(x):
+            return "forward" if y < 0 else "backward"
+        return "right" if x > 0 else "left"
+
+
+class Teleop:
+    """Feeds mapped gamepad input to a MotionBridge and times it
+
+    Args:
+        bridge (MotionBridge): An open motion bridge
+        mapper (TeleopMapper, optional): Input mapping, the defaults if omitted
+        max_rate (float): Command changes per second at most
+    """
+
+    def __init__(self, bridge, mapper=None, max_rate=MAX_SEND_RATE):
+        self.bridge = bridge
+        self.mapper = mapper or TeleopMapper()
+        self.min_interval = 1.0 / max_rate
+        self.latencies_ms = []
+        self.stats = {"events": 0, "changes": 0, "sent_changes": 0, "coalesced": 0}
+        self._sent = (None, self.mapper.speed_level)   # (direction, speed level) last acted on
+        self._last_send = 0.0
+        self._pending_since = None     # input time of the oldest change not yet acted on
+        self._awaiting = {}            # command -> input time, until the bridge writes it
+        bridge.on_write = self._on_write
+
+    def _on_write(self, command, written_at):
+        input_time = self._awaiting.pop(command, None)
+        if input_time is not None:
+            self.latencies_ms.append((written_at - input_time) * 1000)
+
+    def handle(self, kind, index, value, at=None):
+        """Process one input event stamped with its perf_counter time"""
+        at = time.perf_counter() if at is None else at
+        self.stats["events"] += 1
+        if self.mapper.update(kind, index, value):
+            self.stats["changes"] += 1
+            if self._pending_since is None:
+                self._pending_since = at
+            else:
+                self.stats["coalesced"] += 1
+        self.poll(at)
+
+    def poll(self, now=None):
+        """Act on the latest state if it changed and the rate cap allows; call regularly"""
+        now = time.perf_counter() if now is None else now
+        held = self._sent[0]
+        if held is not None and not self.bridge.pending():
+            # Dead-man hold: keep the held direction queued only while we keep polling
+            self.bridge.move(held, HOLD_CYCLES)
+        if self._pending_since is None or now - self._last_send < self.min_interval:
+            return False
+        input_time = self._pending_since
+        self._pending_since = None
+        self._last_send = now
+        direction, level = self.mapper.direction, self.mapper.speed_level
+        sent_direction, sent_level = self._sent
+        if self.mapper.stop_requested:
+            self.mapper.stop_requested = False
+            sent_direction = "stop"
+        if (direction, level) == (sent_direction, sent_level):
+            return False
+        self.stats["sent_changes"] += 1
+        if sent_direction is not None:
+            # Abort the gait in progress instead of waiting for its cycle to end. This
+            # goes first: stepDelay() only sees a stop command at the head of the buffer
+            self._awaiting[STAND_COMMAND] = input_time
+            self.bridge.emergency_stop()
+        if level != sent_level:
+            self._awaiting[SPEED_COMMANDS[level][0]] = input_time
+            self.bridge.set_speed(level)
+        if direction is not None:
+            self._awaiting[MOTION_COMMANDS[direction]] = input_time
+            self.bridge.move(direction, HOLD_CYCLES)
+        self._sent = (direction, level)
+        return True
+
+    def run(self, events, duration=None):
+        """Consume (time, kind, index, value) events until they run out or `duration` passes"""
+        end = None if duration is None else time.perf_counter() + duration
+        for at, kind, index, value in events:
+            if kind is not None:
+                self.handle(kind, index, value, at)
+            else:
+                self.poll()
+            if end is not None and time.perf_counter() >= end:
+                break
+        # Let a change held back by the rate cap go out
+        time.sleep(self.min_interval)
+        self.poll()
+
+    def report(self):
+        """Latency and coalescing summary"""
+        lat = np.array(self.latencies_ms) if self.latencies_ms else np.array([np.nan])
+        return {
+            **self.stats,
+            "serial_writes": self.bridge.stats["sent"],
+            "latency_p50_ms": float(np.nanpercentile(lat, 50)) if self.latencies_ms else None,
+            "latency_p99_ms": float(np.nanpercentile(lat, 99)) if self.latencies_ms else None,
+            "latency_max_ms": float(np.nanmax(lat)) if self.latencies_ms else None,
+        }
+
+
+def gamepad_events(index=0, poll_interval=0.005, record=None):
+    """Yield events from a pygame joystick, stamped when read; idles yield (time, None, None, None)"""
+    import pygame
+
+    pygame.init()
+    pygame.joystick.init()
+    if pygame.joystick.get_count() <= index:
+        raise RuntimeError("No gamepad found")
+    pad = pygame.joystick.Joystick(index)
+    pad.init()
+    logger.info(f"Using gamepad: {pad.get_name()}")
+    kinds = {pygame.JOYAXISMOTION: "axis", pygame.JOYBUTTONDOWN: "button", pygame.JOYBUTTONUP: "button",
+             pygame.JOYHATMOTION: "hat"}
+    removed = getattr(pygame, "JOYDEVICEREMOVED", None)   # pygame 2
+    start = time.perf_counter()
+    out = open(record, 'w', encoding='utf-8') if record else None
+    try:
+        while True:
+            for event in pygame.event.get():
+                if removed is not None and event.type == removed:
+                    logger.warning("Gamepad disconnected, stopping")
+                    if out:
+                        out.write(json.dumps({"t": round(time.perf_counter() - start, 4), "type": "removed",
+                                              "index": index, "value": None}) + "\n")
+                    yield time.perf_counter(), "removed", index, None
+                    return
+                kind = kinds.get(event.type)
+                if kind is None:
+                    continue
+                now = time.perf_counter()
+                if kind == "axis":
+                    index_, value = event.axis, round(event.value, 3)
+                elif kind == "hat":
+                    index_, value = event.hat, list(event.value)
+                else:
+                    index_, value = event.button, int(event.type == pygame.JOYBUTTONDOWN)
+                if out:
+                    out.write(json.dumps({"t": round(now - start, 4), "type": kind, "index": index_,
+                                          "value": value}) + "\n")
+                yield now, kind, index_, value
+            yield time.perf_counter(), None, None, None
+            time.sleep(poll_interval)
+    finally:
+        if out:
+            out.close()
+
+
+def recorded_events(items, fast=False, poll_interval=0.005):
+    """Replay events from a JSON lines file or a list of dicts, with their original timing unless fast"""
+    if isinstance(items, str):
+        with open(items, 'r', encoding='utf-8') as f:
+            items = [json.loads(line) for line in f if line.strip()]
+    start = time.perf_counter()
+    for item in items:
+        if not fast:
+            while time.perf_counter() < start + item["t"]:
+                yield time.perf_counter(), None, None, None
+                time.sleep(min(poll_interval, max(0.0, start + item["t"] - time.perf_counter())))
+        yield time.perf_counter(), item["type"], item["index"], item["value"]
+
+
+def synthetic_events():
+    """A short drive: wobbly forward, turn left, speed changes, release"""
+    rng = np.random.default_rng(0)
+    items = []
+    t = 0.0
+    for _ in range(60):   # 1.2 s of a noisy forward push around 80%
+        t += 0.02
+        items.append({"t": round(t, 3), "type": "axis", "index": AXIS_Y, "value": float(-0.8 + rng.normal(0, 0.1))})
+    items.append({"t": t + 0.02, "type": "axis", "index": AXIS_Y, "value": 0.0})
+    items.append({"t": t + 0.03, "type": "axis", "index": AXIS_X, "value": -0.9})
+    items.append({"t": t + 0.5, "type": "button", "index": BUTTON_FASTER, "value": 1})
+    items.append({"t": t + 0.6, "type": "button", "index": BUTTON_FASTER, "value": 0})
+    items.append({"t": t + 0.61, "type": "button", "index": BUTTON_FASTER, "value": 1})
+    items.append({"t": t + 1.0, "type": "axis", "index": AXIS_X, "value": 0.1})
+    items.append({"t": t + 1.5, "type": "hat", "index": 0, "value": [0, -1]})
+    items.append({"t": t + 2.0, "type": "hat", "index": 0, "value": [0, 0]})
+    return items
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="DETROIT gamepad teleoperation")
+    parser.add_argument("--port", help="Serial port of the robot (default: firmware loopback)")
+    parser.add_argument("--baud", type=int, default=DEFAULT_BAUD)
+    parser.add_argument("--events", help="Replay a recorded JSON lines event file instead of a gamepad")
+    parser.add_argument("--demo", action="store_true", help="Replay a built-in synthetic drive")
+    parser.add_argument("--fast", action="store_true", help="Replay events without their original timing")
+    parser.add_argument("--record", help="Save live gamepad events to this file")
+    parser.add_argument("--joystick", type=int, default=0, help="Gamepad index")
+    parser.add_argument("--max-rate", type=float, default=MAX_SEND_RATE, help="Command changes per second at most")
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds")
+    args = parser.parse_args()
+
+    loopback = None
+    port = args.port
+    if port is None:
+        from loopback import FirmwareLoopback
+
+        loopback = FirmwareLoopback()
+        port = loopback.start()
+    bridge = MotionBridge(port, args.baud)
+    if not bridge.open():
+        sys.exit(1)
+    teleop = Teleop(bridge, max_rate=args.max_rate)
+    try:
+        if args.events or args.demo:
+            events = recorded_events(args.events or synthetic_events(), args.fast)
+        else:
+            events = gamepad_events(args.joystick, record=args.record)
+        teleop.run(events, args.duration)
+        bridge.wait_idle(timeout=0.5)
+    except KeyboardInterrupt:
+        pass
+    except (ImportError, RuntimeError) as e:
+        logger.error(f"Gamepad unavailable: {e}")
+    finally:
+        bridge.close()
+        if loopback:
+            time.sleep(0.4)
+            print(f"Firmware received: {loopback.commands()!r} ({loopback.aborted} gait cycles aborted)")
+            loopback.stop()
+    print(json.dumps(teleop.report(), indent=2))
+    sys.exit(0)
+
+__all__ = ['Teleop', 'TeleopMapper', 'gamepad_events', 'recorded_events', 'synthetic_events']
@@ -1,6 +1,13 @@
 // Jai Shree Ram
 
 #include <Adafruit_PWMServoDriver.h>
+#include "spark_gaits.h" // keyframe tables generated by LEGS/gait_compiler.py
+
+#include "spark_frame.h" // setpoint frames streamed by LEGS/gait.py --port
+
+#define USE_GAIT_TABLES 1 // 1 = play the compiled keyframe tables instead of the one-degree loops (GAIT_TABLES in motion_bridge.py)
+#define USE_FRAME_STREAM 0 // 1 = also accept streamed setpoint frames alongside the single-character commands
+#define FRAME_HOLD_MS 250 // hold the last streamed pose this long before falling back to hm()
 
 Adafruit_PWMServoDriver pwm = Adafruit_PWMServoDriver();
 int pos0 = 102, pos180 = 512, i, j;
@@ -14,6 +21,9 @@ int power = 8; // power pin to power the HC05 Module
 
 int st1 = 1, st2 = 2, st3 = 3, st4 = 4, st5 = 5, st6 = 6, sk1 = 7, sk2 = 8, sk3 = 9, sk4 = 10, sk5 = 11, sk6 = 12;
 char cmd; // received command in cmd
+char stopCmd = 'S'; // emergency stop: aborts the current gait and returns to the stand pose
+SparkFrameDecoder frameDecoder; // decodes streamed frames byte by byte
+unsigned long lastFrameMs = 0; // millis() of the last good frame
 
 // *******************void setup()*************
 
@@ -31,16 +41,23 @@ void loop()
   if (Serial.available())
   {
     cmd = Serial.read(); // take commands from the Serial commmunication in cmd
+#if USE_FRAME_STREAM
+    // bytes inside a frame can equal any command, so only an idle decoder may dispatch them
+    if (!frameDecoder.idle() || (uint8_t)cmd == SPARK_SYNC_FRAME) {
+      if (frameDecoder.feed((uint8_t)cmd)) playFrame();
+      return;
+    }
+#endif
     switch (cmd)
     {
       case 'F': // Forward button
-        Walk_Forward();
+        Walk_Forward(); break;
       case 'B': // Backward button
-        Walk_Backward();
+        Walk_Backward(); break;
       case 'L': // Left side turn
-        turnL();
+        turnL(); break;
       case 'R': // Right side turn
-        turnR();
+        turnR(); break;
       case '1':
         kneeCenter = 5; break;
       case '2':
@@ -64,6 +81,9 @@ void loop()
       default : hm(); break;
     }
   } else {
+#if USE_FRAME_STREAM
+    if (lastFrameMs != 0 && millis() - lastFrameMs < FRAME_HOLD_MS) return; // between streamed frames
+#endif
     hm();
   }
 }
@@ -77,6 +97,48 @@ void loop()
       pwm.setPWM(servo, 0, duty);
     }
 
+    // ******************Wait one gait step, watching for a stop command *************
+
+    bool stepDelay()  // returns true if a stop command is waiting, leaving it for loop() to read
+    {
+      delay(6);
+      return Serial.available() && Serial.peek() == stopCmd;
+    }
+
+    // ******************Write a streamed frame from spark_frame.h *************
+
+    void playFrame()
+    {
+      for (int k = 0; k < SPARK_JOINTS; k++) servoWrite(k + 1, frameDecoder.angles[k]);
+      lastFrameMs = millis();
+      sparkSendAck(frameDecoder.seq, frameDecoder.status);
+    }
+
+    // ******************Play a compiled gait from spark_gaits.h *************
+
+    void playGait(const uint8_t frames[][SPARK_GAIT_JOINTS], int count)  // gaits start from the hm() pose
+    {
+      int pose[SPARK_GAIT_JOINTS];
+      for (int k = 0; k < SPARK_GAIT_JOINTS; k++) pose[k] = k < 6 ? center : kneeCenter;
+      for (int f = 0; f < count; f++) {
+        int travel = 0; // largest joint move in this keyframe
+        for (int k = 0; k < SPARK_GAIT_JOINTS; k++) {
+          int angle = pgm_read_byte(&frames[f][k]);
+          if (angle == SPARK_GAIT_KNEE) angle = kneeCenter;
+          int moved = abs(angle - pose[k]);
+          if (moved > travel) travel = moved;
+          pose[k] = angle;
+          servoWrite(k + 1, angle);
+        }
+        unsigned long waitMs = (unsigned long)travel * SPARK_GAIT_US_PER_DEGREE / 1000;
+        unsigned long waited = 0;
+        do {
+          if (stepDelay()) return;
+          waited += 6;
+        } while (waited < waitMs);
+      }
+    }
+
     // *********************stand position***********************
 
     void hm() {
@@ -98,200 +160,216 @@ void loop()
     // ********************************* Walk_Forward() *********************
 
     void Walk_Forward() {
+#if USE_GAIT_TABLES
+      playGait(gaitForward, GAIT_FORWARD_FRAMES);
+#else
       for (i = kneeCenter; i >= lowest; i--) {
         servoWrite(sk2, i);
         servoWrite(sk4, i);
         servoWrite(sk6, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = center, j = center; i >= thighLowest ; i--, j++) {
         servoWrite(st1, i);
         servoWrite(st3, i);
         servoWrite(st5, j);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = lowest; i <= kneeCenter; i++) {
         servoWrite(sk2, i);
         servoWrite(sk4, i);
         servoWrite(sk6, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = kneeCenter; i >= lowest; i--) {
         servoWrite(sk1, i);
         servoWrite(sk3, i);
         servoWrite(sk5, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = thighLowest, j = thighHighest; i <= center; i++, j--) {
         servoWrite(st1, i);
         servoWrite(st3, i);
         servoWrite(st5, j);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = center, j = center; i <= thighHighest; i++, j--) {
         servoWrite(st4, i);
         servoWrite(st6, i);
         servoWrite(st2, j);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = lowest; i <= kneeCenter; i++) {
         servoWrite(sk1, i);
         servoWrite(sk3, i);
         servoWrite(sk5, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = thighHighest, j = thighLowest; i >= center; i--, j++) {
         servoWrite(st4, i);
         servoWrite(st6, i);
         servoWrite(st2, j);
-        delay(6);
+        if (stepDelay()) return;
       }
+#endif
     }
 
     //****************************** Walk_Backward() **********
 
     void Walk_Backward() {
+#if USE_GAIT_TABLES
+      playGait(gaitBackward, GAIT_BACKWARD_FRAMES);
+#else
       for (i = kneeCenter; i >= lowest; i--) {
         servoWrite(sk2, i);
         servoWrite(sk4, i);
         servoWrite(sk6, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = center, j = center; i <= thighHighest; i++, j--) {
         servoWrite(st1, i);
         servoWrite(st3, i);
         servoWrite(st5, j);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = lowest; i <= kneeCenter; i++) {
         servoWrite(sk2, i);
         servoWrite(sk4, i);
         servoWrite(sk6, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = kneeCenter; i >= lowest; i--) {
         servoWrite(sk1, i);
         servoWrite(sk3, i);
         servoWrite(sk5, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = thighHighest, j = thighLowest; i >= center; i--, j++) {
         servoWrite(st1, i);
         servoWrite(st3, i);
         servoWrite(st5, j);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = center, j = center; i >= thighLowest; i--, j++) {
         servoWrite(st4, i);
         servoWrite(st6, i);
         servoWrite(st2, j);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = lowest; i <= kneeCenter; i++) {
         servoWrite(sk1, i);
         servoWrite(sk3, i);
         servoWrite(sk5, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = thighLowest, j = thighHighest; i <= center; i++, j--) {
         servoWrite(st4, i);
         servoWrite(st6, i);
         servoWrite(st2, j);
-        delay(6);
+        if (stepDelay()) return;
       }
+#endif
     }
 
     // ***************************************** turn Left ********************
     void turnL() {
+#if USE_GAIT_TABLES
+      playGait(gaitLeft, GAIT_LEFT_FRAMES);
+#else
       for (i = kneeCenter; i >= lowest; i--) {
         servoWrite(sk1, i);
         servoWrite(sk3, i);
         servoWrite(sk5, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = center; i >= thighLowest; i--) {
         servoWrite(st1, i);
         servoWrite(st3, i);
         servoWrite(st5, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = lowest; i <= kneeCenter; i++) {
         servoWrite(sk1, i);
         servoWrite(sk3, i);
         servoWrite(sk5, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = kneeCenter; i >= lowest; i--) {
         servoWrite(sk2, i);
         servoWrite(sk4, i);
         servoWrite(sk6, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = thighLowest; i < center; i++)
       {
         servoWrite(st1, i);
         servoWrite(st3, i);
         servoWrite(st5, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = center; i >= thighLowest; i--) {
         servoWrite(st2, i);
         servoWrite(st4, i);
         servoWrite(st6, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = lowest; i <= kneeCenter; i++) {
         servoWrite(sk2, i);
         servoWrite(sk4, i);
         servoWrite(sk6, i);
-        delay(6);
+        if (stepDelay()) return;
       }
+#endif
     }
 
     // ************************************************ turn Right ********
 
     void turnR() {
+#if USE_GAIT_TABLES
+      playGait(gaitRight, GAIT_RIGHT_FRAMES);
+#else
       for (i = kneeCenter; i >= lowest; i--) {
         servoWrite(sk1, i);
         servoWrite(sk3, i);
         servoWrite(sk5, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = center; i <= thighHighest; i++) {
         servoWrite(st1, i);
         servoWrite(st3, i);
         servoWrite(st5, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = lowest; i <= kneeCenter; i++) {
         servoWrite(sk1, i);
         servoWrite(sk3, i);
         servoWrite(sk5, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = kneeCenter; i >= lowest; i--) {
         servoWrite(sk2, i);
         servoWrite(sk4, i);
         servoWrite(sk6, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = thighHighest; i > center; i--)
       {
         servoWrite(st1, i);
         servoWrite(st3, i);
         servoWrite(st5, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = center; i <= thighHighest; i++) {
         servoWrite(st2, i);
         servoWrite(st4, i);
         servoWrite(st6, i);
-        delay(6);
+        if (stepDelay()) return;
       }
       for (i = lowest; i <= kneeCenter; i++) {
         servoWrite(sk2, i);
         servoWrite(sk4, i);
         servoWrite(sk6, i);
-        delay(6);
+        if (stepDelay()) return;
       }
+#endif
     }
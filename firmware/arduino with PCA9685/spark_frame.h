@@ -0,0 +1,135 @@
+// Reference decoder for the SPARK binary servo protocol
+// (host side: controller_interface/voice control for windows/DETROIT/LEGS/servo_protocol.py)
+//
+// Setpoint frame, 17 bytes:
+//   0xA5, seq, 12 angles (st1..st6, sk1..sk6, degrees 0-180), dt_ms (uint16 little-endian), crc8
+// Acknowledgement, 4 bytes:
+//   0x5A, seq, status, crc8
+// CRC-8 is poly 0x07, init 0x00, over everything between the sync byte and the CRC.
+//
+// Usage in a sketch:
+//
+//   #include "spark_frame.h"
+//   SparkFrameDecoder frameDecoder;
+//
+//   void loop() {
+//     while (Serial.available()) {
+//       uint8_t b = Serial.read();
+//       if (frameDecoder.idle() && b != SPARK_SYNC_FRAME) {
+//         handleCommand(b);             // 'F', 'B', 'S', '1'-'9', ...
+//       } else if (frameDecoder.feed(b)) {
+//         for (int k = 0; k < SPARK_JOINTS; k++) servoWrite(k + 1, frameDecoder.angles[k]);
+//         sparkSendAck(frameDecoder.seq, frameDecoder.status);
+//       }
+//     }
+//   }
+//
+// A byte may be treated as a single-character command only while the decoder is idle
+// (between frames). Inside a frame the angles, seq, dt and CRC bytes are arbitrary and
+// routinely equal 'F' (70), 'S' (83), 'L', 'R' or '1'-'9', so they must all go to feed().
+// The decoder uses no heap and no floats.
+
+#ifndef SPARK_FRAME_H
+#define SPARK_FRAME_H
+
+#include <Arduino.h>
+
+#define SPARK_SYNC_FRAME 0xA5
+#define SPARK_SYNC_ACK 0x5A
+#define SPARK_FRAME_SIZE 17
+#define SPARK_JOINTS 12
+#define SPARK_ACK_OK 0
+#define SPARK_ACK_CRC_ERROR 1
+#define SPARK_ACK_SEQ_GAP 2
+
+// *******************CRC-8 (poly 0x07), bitwise to save flash*************
+inline uint8_t sparkCrc8(uint8_t crc, uint8_t data)
+{
+  crc ^= data;
+  for (uint8_t bit = 0; bit < 8; bit++) {
+    crc = (crc & 0x80) ? (uint8_t)((crc << 1) ^ 0x07) : (uint8_t)(crc << 1);
+  }
+  return crc;
+}
+
+// *******************Send an acknowledgement*************
+inline void sparkSendAck(uint8_t seq, uint8_t status)
+{
+  uint8_t crc = sparkCrc8(sparkCrc8(0, seq), status);
+  Serial.write(SPARK_SYNC_ACK);
+  Serial.write(seq);
+  Serial.write(status);
+  Serial.write(crc);
+}
+
+// *******************Byte-at-a-time frame decoder*************
+struct SparkFrameDecoder {
+  uint8_t seq;                    // sequence number of the last good frame
+  uint8_t status;                 // its ack status: SPARK_ACK_OK, or SPARK_ACK_SEQ_GAP if frames were lost
+  uint8_t angles[SPARK_JOINTS];   // angles of the last good frame
+  uint16_t dtMs;                  // time since the previous frame, from the host
+  uint16_t crcErrors;
+  uint16_t seqGaps;
+
+  uint8_t buf[SPARK_FRAME_SIZE - 1];  // everything after the sync byte
+  uint8_t pos;                        // 0 = hunting for the sync byte
+  uint8_t expectedSeq;
+  bool synced;
+
+  SparkFrameDecoder() : seq(0), status(SPARK_ACK_OK), dtMs(0), crcErrors(0), seqGaps(0), pos(0), expectedSeq(0),
+                        synced(false) {}
+
+  // True between frames, when a received byte may be a single-character command
+  bool idle() const { return pos == 0; }
+
+  // After a bad CRC, carry on from the next sync byte already buffered: the sync byte taken
+  // may have been an angle of 165, with the real frame starting inside the bytes read since
+  void resync()
+  {
+    for (uint8_t k = 0; k < SPARK_FRAME_SIZE - 1; k++) {
+      if (buf[k] == SPARK_SYNC_FRAME) {
+        uint8_t kept = SPARK_FRAME_SIZE - 2 - k;   // bytes buffered after that sync byte
+        for (uint8_t j = 0; j < kept; j++) buf[j] = buf[k + 1 + j];
+        pos = 1 + kept;
+        return;
+      }
+    }
+  }
+
+  // Feed one received byte; returns true when a complete, valid frame is ready
+  bool feed(uint8_t b)
+  {
+    if (pos == 0) {
+      if (b == SPARK_SYNC_FRAME) pos = 1;
+      return false;
+    }
+    buf[pos - 1] = b;
+    pos++;
+    if (pos < SPARK_FRAME_SIZE) return false;
+    pos = 0;
+
+    uint8_t crc = 0;
+    for (uint8_t k = 0; k < SPARK_FRAME_SIZE - 2; k++) crc = sparkCrc8(crc, buf[k]);
+    if (crc != buf[SPARK_FRAME_SIZE - 2]) {
+      crcErrors++;
+      sparkSendAck(expectedSeq, SPARK_ACK_CRC_ERROR);
+      resync();
+      return false;
+    }
+    status = SPARK_ACK_OK;
+    if (synced && buf[0] != expectedSeq) {
+      seqGaps++;
+      status = SPARK_ACK_SEQ_GAP;
+    }
+    synced = true;
+    seq = buf[0];
+    expectedSeq = seq + 1;
+    for (uint8_t k = 0; k < SPARK_JOINTS; k++) {
+      angles[k] = buf[1 + k] > 180 ? 180 : buf[1 + k];
+    }
+    dtMs = buf[13] | ((uint16_t)buf[14] << 8);
+    return true;
+  }
+};
+
+#endif
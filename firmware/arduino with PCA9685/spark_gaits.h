@@ -0,0 +1,69 @@
+// SPARK gait keyframe tables
+// Generated by controller_interface/voice control for windows/DETROIT/LEGS/gait_compiler.py -- do not edit.
+//
+// Each row is the pose at the end of one keyframe, st1..st6 then sk1..sk6 in degrees;
+// SPARK_GAIT_KNEE stands for the current kneeCenter. Hold a keyframe for
+// (largest joint travel) * SPARK_GAIT_US_PER_DEGREE microseconds.
+// Planned at 50% of 600 deg/s.
+
+#ifndef SPARK_GAITS_H
+#define SPARK_GAITS_H
+
+#include <Arduino.h>
+#include <avr/pgmspace.h>
+
+#define SPARK_GAIT_JOINTS 12
+#define SPARK_GAIT_KNEE 255
+#define SPARK_GAIT_US_PER_DEGREE 3334
+
+// forward (replaces Walk_Forward())
+#define GAIT_FORWARD_FRAMES 8
+const uint8_t gaitForward[][SPARK_GAIT_JOINTS] PROGMEM = {
+  {90, 90, 90, 90, 90, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {70, 90, 70, 90, 110, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {70, 90, 70, 90, 110, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {70, 90, 70, 90, 110, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 90, 90, 90, 90, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 70, 90, 110, 90, 110, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 70, 90, 110, 90, 110, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {90, 90, 90, 90, 90, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+};
+
+// backward (replaces Walk_Backward())
+#define GAIT_BACKWARD_FRAMES 8
+const uint8_t gaitBackward[][SPARK_GAIT_JOINTS] PROGMEM = {
+  {90, 90, 90, 90, 90, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {110, 90, 110, 90, 70, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {110, 90, 110, 90, 70, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {110, 90, 110, 90, 70, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 90, 90, 90, 90, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 110, 90, 70, 90, 70, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 110, 90, 70, 90, 70, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {90, 90, 90, 90, 90, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+};
+
+// left (replaces turnL())
+#define GAIT_LEFT_FRAMES 7
+const uint8_t gaitLeft[][SPARK_GAIT_JOINTS] PROGMEM = {
+  {90, 90, 90, 90, 90, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {70, 90, 70, 90, 70, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {70, 90, 70, 90, 70, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {70, 90, 70, 90, 70, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {89, 90, 89, 90, 89, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {89, 70, 89, 70, 89, 70, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {89, 70, 89, 70, 89, 70, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+};
+
+// right (replaces turnR())
+#define GAIT_RIGHT_FRAMES 7
+const uint8_t gaitRight[][SPARK_GAIT_JOINTS] PROGMEM = {
+  {90, 90, 90, 90, 90, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {110, 90, 110, 90, 110, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {110, 90, 110, 90, 110, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {110, 90, 110, 90, 110, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {91, 90, 91, 90, 91, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {91, 110, 91, 110, 91, 110, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {91, 110, 91, 110, 91, 110, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+};
+
+#endif
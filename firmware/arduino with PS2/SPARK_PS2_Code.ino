@@ -11,6 +11,9 @@
 
 #include <Adafruit_PWMServoDriver.h>
 #include <PS2X_lib.h>  //for v1.6
+#include "spark_gaits.h" // keyframe tables generated by LEGS/gait_compiler.py --ps2 from ps2_gaits.json
+
+#define USE_GAIT_TABLES 1 // 1 = play the compiled keyframe tables instead of the one-degree loops
 
 PS2X ps2x; // create PS2 Controller Class
 
@@ -195,6 +198,35 @@ void servoWrite(int servo, int angle)  // servoWrite(pin address of servo, angle
   pwm.setPWM(servo, 0, duty);
 }
 
+// wait one gait step; gaits always finish their cycle, like the one-degree loops
+bool stepDelay() {
+  delay(6);
+  return false;
+}
+
+// play a compiled gait from spark_gaits.h, starting from the hm() pose
+void playGait(const uint8_t frames[][SPARK_GAIT_JOINTS], int count) {
+  int pose[SPARK_GAIT_JOINTS];
+  for (int k = 0; k < SPARK_GAIT_JOINTS; k++) pose[k] = k < 6 ? 90 : kneeCenter;
+  for (int f = 0; f < count; f++) {
+    int travel = 0; // largest joint move in this keyframe
+    for (int k = 0; k < SPARK_GAIT_JOINTS; k++) {
+      int angle = pgm_read_byte(&frames[f][k]);
+      if (angle == SPARK_GAIT_KNEE) angle = kneeCenter;
+      int moved = abs(angle - pose[k]);
+      if (moved > travel) travel = moved;
+      pose[k] = angle;
+      servoWrite(k + 1, angle);
+    }
+    unsigned long waitMs = (unsigned long)travel * SPARK_GAIT_US_PER_DEGREE / 1000;
+    unsigned long waited = 0;
+    do {
+      if (stepDelay()) return;
+      waited += 6;
+    } while (waited < waitMs);
+  }
+}
+
 // untill it could not get conneted with bluetooth, it will be in it's initial position !
 void relax() {
   servoWrite(st1, 90);
@@ -231,6 +263,9 @@ void hm() {
 
 // *************** Walk_Forward() *********
 void Walk_Forward() {
+#if USE_GAIT_TABLES
+  playGait(gaitForward, GAIT_FORWARD_FRAMES);
+#else
   for(i = kneeCenter; i >= 5; i--) {
     cmd = Serial.read();
     while (cmd=='F') {
@@ -303,9 +338,13 @@ void Walk_Forward() {
     delay(5);
   }
   }
+#endif
   }
 //************* Walk_Backward() **********
 void Walk_Backward() {
+#if USE_GAIT_TABLES
+  playGait(gaitBackward, GAIT_BACKWARD_FRAMES);
+#else
     cmd = Serial.read();
     while (cmd=='B') {
   for (i = kneeCenter; i >= 5; i--) {
@@ -378,10 +417,14 @@ void Walk_Backward() {
     delay(5);
   }
 }
+#endif
 }
 
 // ***************************** turnR() ********
 void turnR() {
+#if USE_GAIT_TABLES
+  playGait(gaitRight, GAIT_RIGHT_FRAMES);
+#else
   for (i = kneeCenter; i >= 5; i--) {
     cmd = Serial.read();
     while (cmd=='L') {
@@ -436,10 +479,14 @@ void turnR() {
     delay(5);
   }
   }
+#endif
 }
 
 // ********** turnL() ********
 void turnL() {
+#if USE_GAIT_TABLES
+  playGait(gaitLeft, GAIT_LEFT_FRAMES);
+#else
   for (i = kneeCenter; i >= 5; i--) {
     cmd = Serial.read();
     while (cmd=='R') {
@@ -494,6 +541,25 @@ void turnL() {
     delay(5);
   }
 }
+#endif
+}
+
+// ********** diagonal walks ********
+// Their one-degree loops are in the commented-out block below; only the tables play them
+void Walk_Left_Forward() {
+  playGait(gaitLeftForward, GAIT_LEFT_FORWARD_FRAMES);
+}
+
+void Walk_Right_Forward() {
+  playGait(gaitRightForward, GAIT_RIGHT_FORWARD_FRAMES);
+}
+
+void Walk_Left_Backward() {
+  playGait(gaitLeftBackward, GAIT_LEFT_BACKWARD_FRAMES);
+}
+
+void Walk_Right_Backward() {
+  playGait(gaitRightBackward, GAIT_RIGHT_BACKWARD_FRAMES);
 }
 /*
 //**************** dance() ********
@@ -0,0 +1,119 @@
+// SPARK gait keyframe tables
+// Generated by controller_interface/voice control for windows/DETROIT/LEGS/gait_compiler.py -- do not edit.
+//
+// Each row is the pose at the end of one keyframe, st1..st6 then sk1..sk6 in degrees;
+// SPARK_GAIT_KNEE stands for the current kneeCenter. Hold a keyframe for
+// (largest joint travel) * SPARK_GAIT_US_PER_DEGREE microseconds.
+// Planned at 50% of 600 deg/s.
+
+#ifndef SPARK_GAITS_H
+#define SPARK_GAITS_H
+
+#include <Arduino.h>
+#include <avr/pgmspace.h>
+
+#define SPARK_GAIT_JOINTS 12
+#define SPARK_GAIT_KNEE 255
+#define SPARK_GAIT_US_PER_DEGREE 3334
+
+// forward (replaces Walk_Forward())
+#define GAIT_FORWARD_FRAMES 8
+const uint8_t gaitForward[][SPARK_GAIT_JOINTS] PROGMEM = {
+  {90, 90, 90, 90, 90, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {50, 90, 50, 90, 130, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {50, 90, 50, 90, 130, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {50, 90, 50, 90, 130, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 90, 90, 90, 90, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 50, 90, 130, 90, 130, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 50, 90, 130, 90, 130, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {90, 90, 90, 90, 90, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+};
+
+// backward (replaces Walk_Backward())
+#define GAIT_BACKWARD_FRAMES 8
+const uint8_t gaitBackward[][SPARK_GAIT_JOINTS] PROGMEM = {
+  {90, 90, 90, 90, 90, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {130, 90, 130, 90, 50, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {130, 90, 130, 90, 50, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {130, 90, 130, 90, 50, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 90, 90, 90, 90, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 130, 90, 50, 90, 50, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 130, 90, 50, 90, 50, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {90, 90, 90, 90, 90, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+};
+
+// right (replaces turnR())
+#define GAIT_RIGHT_FRAMES 6
+const uint8_t gaitRight[][SPARK_GAIT_JOINTS] PROGMEM = {
+  {90, 90, 90, 90, 90, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {50, 90, 50, 90, 50, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {50, 90, 50, 90, 50, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {50, 90, 50, 90, 50, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {50, 50, 50, 50, 50, 50, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {50, 50, 50, 50, 50, 50, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+};
+
+// left (replaces turnL())
+#define GAIT_LEFT_FRAMES 6
+const uint8_t gaitLeft[][SPARK_GAIT_JOINTS] PROGMEM = {
+  {90, 90, 90, 90, 90, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {130, 90, 130, 90, 130, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {130, 90, 130, 90, 130, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {130, 90, 130, 90, 130, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {130, 130, 130, 130, 130, 130, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {130, 130, 130, 130, 130, 130, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+};
+
+// left_forward (replaces Walk_Left_Forward())
+#define GAIT_LEFT_FORWARD_FRAMES 8
+const uint8_t gaitLeftForward[][SPARK_GAIT_JOINTS] PROGMEM = {
+  {90, 90, 90, 90, 90, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {135, 90, 45, 90, 45, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {135, 90, 45, 90, 45, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {135, 90, 45, 90, 45, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 90, 90, 90, 90, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 135, 90, 45, 90, 135, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 135, 90, 45, 90, 135, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {90, 90, 90, 90, 90, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+};
+
+// right_forward (replaces Walk_Right_Forward())
+#define GAIT_RIGHT_FORWARD_FRAMES 8
+const uint8_t gaitRightForward[][SPARK_GAIT_JOINTS] PROGMEM = {
+  {90, 90, 90, 90, 90, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {135, 90, 45, 90, 135, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {135, 90, 45, 90, 135, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {135, 90, 45, 90, 135, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 90, 90, 90, 90, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 45, 90, 45, 90, 135, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 45, 90, 45, 90, 135, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {90, 90, 90, 90, 90, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+};
+
+// left_backward (replaces Walk_Left_Backward())
+#define GAIT_LEFT_BACKWARD_FRAMES 8
+const uint8_t gaitLeftBackward[][SPARK_GAIT_JOINTS] PROGMEM = {
+  {90, 90, 90, 90, 90, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {45, 90, 135, 90, 45, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {45, 90, 135, 90, 45, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {45, 90, 135, 90, 45, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 90, 90, 90, 90, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 135, 90, 135, 90, 45, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 135, 90, 135, 90, 45, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {90, 90, 90, 90, 90, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+};
+
+// right_backward (replaces Walk_Right_Backward())
+#define GAIT_RIGHT_BACKWARD_FRAMES 8
+const uint8_t gaitRightBackward[][SPARK_GAIT_JOINTS] PROGMEM = {
+  {90, 90, 90, 90, 90, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {45, 90, 135, 90, 135, 90, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5},
+  {45, 90, 135, 90, 135, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {45, 90, 135, 90, 135, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 90, 90, 90, 90, 90, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 45, 90, 135, 90, 45, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE, 5, SPARK_GAIT_KNEE},
+  {90, 45, 90, 135, 90, 45, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+  {90, 90, 90, 90, 90, 90, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE, SPARK_GAIT_KNEE},
+};
+
+#endif